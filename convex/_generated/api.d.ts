@@ -9,6 +9,7 @@
  */
 
 import type * as aiAnalytics from "../aiAnalytics.js";
+import type * as aiCache from "../aiCache.js";
 import type * as aiChatbot from "../aiChatbot.js";
 import type * as aiDocumentAnalysis from "../aiDocumentAnalysis.js";
 import type * as aiDocuments from "../aiDocuments.js";
@@ -26,32 +27,45 @@ import type * as bankAccounts from "../bankAccounts.js";
 import type * as bankTransactions from "../bankTransactions.js";
 import type * as businessContinuityPlans from "../businessContinuityPlans.js";
 import type * as calendar from "../calendar.js";
+import type * as calendarIndex from "../calendarIndex.js";
+import type * as calendarSync from "../calendarSync.js";
 import type * as claims from "../claims.js";
 import type * as communications from "../communications.js";
 import type * as complaints from "../complaints.js";
 import type * as complianceCertifications from "../complianceCertifications.js";
 import type * as contractors from "../contractors.js";
 import type * as crons from "../crons.js";
+import type * as dashboard from "../dashboard.js";
 import type * as dataExport from "../dataExport.js";
 import type * as documents from "../documents.js";
 import type * as dwellings from "../dwellings.js";
 import type * as emergencyManagementPlans from "../emergencyManagementPlans.js";
 import type * as expectedPayments from "../expectedPayments.js";
 import type * as fixPaulDwelling from "../fixPaulDwelling.js";
+import type * as functionMetrics from "../functionMetrics.js";
 import type * as googleCalendar from "../googleCalendar.js";
 import type * as googleCalendarHelpers from "../googleCalendarHelpers.js";
 import type * as inboundEmail from "../inboundEmail.js";
+import type * as inboundEmailQueue from "../inboundEmailQueue.js";
 import type * as incidentActions from "../incidentActions.js";
 import type * as incidents from "../incidents.js";
 import type * as inspections from "../inspections.js";
 import type * as insurancePolicies from "../insurancePolicies.js";
 import type * as launchChecklist from "../launchChecklist.js";
 import type * as leads from "../leads.js";
+import type * as lib_aiCache from "../lib/aiCache.js";
+import type * as lib_calendarSync from "../lib/calendarSync.js";
+import type * as lib_claimCsv from "../lib/claimCsv.js";
 import type * as lib_consultationGate from "../lib/consultationGate.js";
+import type * as lib_dashboardSummary from "../lib/dashboardSummary.js";
 import type * as lib_encryption from "../lib/encryption.js";
+import type * as lib_expectedPaymentGeneration from "../lib/expectedPaymentGeneration.js";
 import type * as lib_fileValidation from "../lib/fileValidation.js";
+import type * as lib_functionMetrics from "../lib/functionMetrics.js";
 import type * as lib_passwordValidation from "../lib/passwordValidation.js";
 import type * as lib_redact from "../lib/redact.js";
+import type * as lib_stableHash from "../lib/stableHash.js";
+import type * as lib_threadSummaryCounters from "../lib/threadSummaryCounters.js";
 import type * as lib_threadingEngine from "../lib/threadingEngine.js";
 import type * as lib_validation from "../lib/validation.js";
 import type * as maintenancePhotos from "../maintenancePhotos.js";
@@ -68,7 +82,9 @@ import type * as ndisPriceGuide from "../ndisPriceGuide.js";
 import type * as notificationHelpers from "../notificationHelpers.js";
 import type * as notifications from "../notifications.js";
 import type * as occupationalTherapists from "../occupationalTherapists.js";
+import type * as offlineSync from "../offlineSync.js";
 import type * as organizations from "../organizations.js";
+import type * as orgStats from "../orgStats.js";
 import type * as outlookCalendar from "../outlookCalendar.js";
 import type * as outlookCalendarDb from "../outlookCalendarDb.js";
 import type * as ownerDistributions from "../ownerDistributions.js";
@@ -78,6 +94,9 @@ import type * as paginationHelpers from "../paginationHelpers.js";
 import type * as participantPlans from "../participantPlans.js";
 import type * as participants from "../participants.js";
 import type * as payments from "../payments.js";
+import type * as pdfCache from "../pdfCache.js";
+import type * as photoDerivatives from "../photoDerivatives.js";
+import type * as photoDerivativesHelpers from "../photoDerivativesHelpers.js";
 import type * as policies from "../policies.js";
 import type * as preventativeSchedule from "../preventativeSchedule.js";
 import type * as preventativeScheduleTemplates from "../preventativeScheduleTemplates.js";
@@ -86,6 +105,7 @@ import type * as propertyMedia from "../propertyMedia.js";
 import type * as providerSettings from "../providerSettings.js";
 import type * as pushSubscriptions from "../pushSubscriptions.js";
 import type * as quoteRequests from "../quoteRequests.js";
+import type * as rateLimits from "../rateLimits.js";
 import type * as registration from "../registration.js";
 import type * as reports from "../reports.js";
 import type * as restrictivePractices from "../restrictivePractices.js";
@@ -119,6 +139,7 @@ import type {
 
 declare const fullApi: ApiFromModules<{
   aiAnalytics: typeof aiAnalytics;
+  aiCache: typeof aiCache;
   aiChatbot: typeof aiChatbot;
   aiDocumentAnalysis: typeof aiDocumentAnalysis;
   aiDocuments: typeof aiDocuments;
@@ -136,32 +157,45 @@ declare const fullApi: ApiFromModules<{
   bankTransactions: typeof bankTransactions;
   businessContinuityPlans: typeof businessContinuityPlans;
   calendar: typeof calendar;
+  calendarIndex: typeof calendarIndex;
+  calendarSync: typeof calendarSync;
   claims: typeof claims;
   communications: typeof communications;
   complaints: typeof complaints;
   complianceCertifications: typeof complianceCertifications;
   contractors: typeof contractors;
   crons: typeof crons;
+  dashboard: typeof dashboard;
   dataExport: typeof dataExport;
   documents: typeof documents;
   dwellings: typeof dwellings;
   emergencyManagementPlans: typeof emergencyManagementPlans;
   expectedPayments: typeof expectedPayments;
   fixPaulDwelling: typeof fixPaulDwelling;
+  functionMetrics: typeof functionMetrics;
   googleCalendar: typeof googleCalendar;
   googleCalendarHelpers: typeof googleCalendarHelpers;
   inboundEmail: typeof inboundEmail;
+  inboundEmailQueue: typeof inboundEmailQueue;
   incidentActions: typeof incidentActions;
   incidents: typeof incidents;
   inspections: typeof inspections;
   insurancePolicies: typeof insurancePolicies;
   launchChecklist: typeof launchChecklist;
   leads: typeof leads;
+  "lib/aiCache": typeof lib_aiCache;
+  "lib/calendarSync": typeof lib_calendarSync;
+  "lib/claimCsv": typeof lib_claimCsv;
   "lib/consultationGate": typeof lib_consultationGate;
+  "lib/dashboardSummary": typeof lib_dashboardSummary;
   "lib/encryption": typeof lib_encryption;
+  "lib/expectedPaymentGeneration": typeof lib_expectedPaymentGeneration;
   "lib/fileValidation": typeof lib_fileValidation;
+  "lib/functionMetrics": typeof lib_functionMetrics;
   "lib/passwordValidation": typeof lib_passwordValidation;
   "lib/redact": typeof lib_redact;
+  "lib/stableHash": typeof lib_stableHash;
+  "lib/threadSummaryCounters": typeof lib_threadSummaryCounters;
   "lib/threadingEngine": typeof lib_threadingEngine;
   "lib/validation": typeof lib_validation;
   maintenancePhotos: typeof maintenancePhotos;
@@ -178,7 +212,9 @@ declare const fullApi: ApiFromModules<{
   notificationHelpers: typeof notificationHelpers;
   notifications: typeof notifications;
   occupationalTherapists: typeof occupationalTherapists;
+  offlineSync: typeof offlineSync;
   organizations: typeof organizations;
+  orgStats: typeof orgStats;
   outlookCalendar: typeof outlookCalendar;
   outlookCalendarDb: typeof outlookCalendarDb;
   ownerDistributions: typeof ownerDistributions;
@@ -188,6 +224,9 @@ declare const fullApi: ApiFromModules<{
   participantPlans: typeof participantPlans;
   participants: typeof participants;
   payments: typeof payments;
+  pdfCache: typeof pdfCache;
+  photoDerivatives: typeof photoDerivatives;
+  photoDerivativesHelpers: typeof photoDerivativesHelpers;
   policies: typeof policies;
   preventativeSchedule: typeof preventativeSchedule;
   preventativeScheduleTemplates: typeof preventativeScheduleTemplates;
@@ -196,6 +235,7 @@ declare const fullApi: ApiFromModules<{
   providerSettings: typeof providerSettings;
   pushSubscriptions: typeof pushSubscriptions;
   quoteRequests: typeof quoteRequests;
+  rateLimits: typeof rateLimits;
   registration: typeof registration;
   reports: typeof reports;
   restrictivePractices: typeof restrictivePractices;
@@ -0,0 +1,201 @@
+import { v } from "convex/values";
+import { internalQuery, internalMutation } from "./_generated/server";
+import { getOrgStats } from "./orgStats";
+import { AI_CACHE_TTL_MS, isCacheEntryFresh } from "./lib/aiCache";
+
+/**
+ * AI Assistant Caches & Turn Metrics
+ *
+ * processUserQueryV2 (aiChatbot.ts) keeps two kinds of per-organization
+ * entries in aiCacheEntries:
+ * - "response:" entries hold the full reply to a normalized question, so a
+ *   repeated question is answered without calling the model at all.
+ * - "tool:" entries hold a read-only tool's formatted result, so a new
+ *   question that resolves to the same tool call skips the heavy query.
+ *
+ * Entries are tagged with the organization's data version
+ * (organizationStats.updatedAt, bumped by trackOrgStats on writes) and
+ * expire after AI_CACHE_TTL_MS; see lib/aiCache.ts. Confirmed assistant
+ * actions clear the organization's entries outright.
+ *
+ * Every turn records latency and token usage in aiTurnMetrics.
+ */
+
+// Skip caching unusually large replies (documents are limited to 1 MB)
+const MAX_CACHED_RESPONSE_LENGTH = 100_000;
+const TURN_METRICS_RETENTION_DAYS = 30;
+// Drafts are deleted when their turn ends; anything older was orphaned
+const ORPHANED_DRAFT_AGE_MS = 60 * 60 * 1000;
+
+/**
+ * Resolve the caller's organization and data version, and look up a cached
+ * reply in the same round-trip.
+ */
+export const lookupResponse = internalQuery({
+  args: {
+    userId: v.id("users"),
+    key: v.optional(v.string()),
+  },
+  handler: async (ctx, args) => {
+    const user = await ctx.db.get(args.userId);
+    if (!user) {
+      throw new Error("User not found");
+    }
+    if (!user.organizationId) {
+      return { organizationId: null, dataVersion: 0, response: null };
+    }
+
+    const organizationId = user.organizationId;
+    const stats = await getOrgStats(ctx, organizationId);
+    const dataVersion = stats?.updatedAt ?? 0;
+
+    let response: string | null = null;
+    if (args.key) {
+      const key = args.key;
+      const entry = await ctx.db
+        .query("aiCacheEntries")
+        .withIndex("by_organizationId_key", (q) =>
+          q.eq("organizationId", organizationId).eq("key", key)
+        )
+        .first();
+      if (entry && isCacheEntryFresh(entry, dataVersion, Date.now())) {
+        response = entry.response;
+      }
+    }
+
+    return { organizationId, dataVersion, response };
+  },
+});
+
+export const get = internalQuery({
+  args: {
+    organizationId: v.id("organizations"),
+    key: v.string(),
+    dataVersion: v.number(),
+  },
+  handler: async (ctx, args): Promise<string | null> => {
+    const entry = await ctx.db
+      .query("aiCacheEntries")
+      .withIndex("by_organizationId_key", (q) =>
+        q.eq("organizationId", args.organizationId).eq("key", args.key)
+      )
+      .first();
+    return entry && isCacheEntryFresh(entry, args.dataVersion, Date.now())
+      ? entry.response
+      : null;
+  },
+});
+
+export const set = internalMutation({
+  args: {
+    organizationId: v.id("organizations"),
+    key: v.string(),
+    dataVersion: v.number(),
+    response: v.string(),
+  },
+  handler: async (ctx, args) => {
+    if (args.response.length > MAX_CACHED_RESPONSE_LENGTH) return;
+
+    const now = Date.now();
+    const fields = {
+      dataVersion: args.dataVersion,
+      response: args.response,
+      createdAt: now,
+      expiresAt: now + AI_CACHE_TTL_MS,
+    };
+    const existing = await ctx.db
+      .query("aiCacheEntries")
+      .withIndex("by_organizationId_key", (q) =>
+        q.eq("organizationId", args.organizationId).eq("key", args.key)
+      )
+      .first();
+
+    if (existing) {
+      await ctx.db.patch(existing._id, fields);
+    } else {
+      await ctx.db.insert("aiCacheEntries", {
+        organizationId: args.organizationId,
+        key: args.key,
+        ...fields,
+      });
+    }
+  },
+});
+
+/**
+ * Drop every cached entry for the user's organization (after an assistant action).
+ */
+export const invalidateForUser = internalMutation({
+  args: {
+    userId: v.id("users"),
+  },
+  handler: async (ctx, args) => {
+    const user = await ctx.db.get(args.userId);
+    const organizationId = user?.organizationId;
+    if (!organizationId) return;
+
+    const entries = await ctx.db
+      .query("aiCacheEntries")
+      .withIndex("by_organizationId_key", (q) => q.eq("organizationId", organizationId))
+      .take(500);
+    for (const entry of entries) {
+      await ctx.db.delete(entry._id);
+    }
+  },
+});
+
+export const recordTurn = internalMutation({
+  args: {
+    organizationId: v.optional(v.id("organizations")),
+    userId: v.id("users"),
+    toolName: v.optional(v.string()),
+    responseCacheHit: v.boolean(),
+    toolCacheHit: v.boolean(),
+    modelLatencyMs: v.number(),
+    toolLatencyMs: v.number(),
+    totalLatencyMs: v.number(),
+    inputTokens: v.number(),
+    outputTokens: v.number(),
+    cacheCreationInputTokens: v.number(),
+    cacheReadInputTokens: v.number(),
+  },
+  handler: async (ctx, args) => {
+    await ctx.db.insert("aiTurnMetrics", { ...args, createdAt: Date.now() });
+  },
+});
+
+/**
+ * Delete expired cache entries, old turn metrics and orphaned reply drafts.
+ */
+export const cleanupExpired = internalMutation({
+  args: {},
+  handler: async (ctx): Promise<number> => {
+    const now = Date.now();
+    const expired = await ctx.db
+      .query("aiCacheEntries")
+      .withIndex("by_expiresAt", (q) => q.lt("expiresAt", now))
+      .take(1000);
+    for (const entry of expired) {
+      await ctx.db.delete(entry._id);
+    }
+
+    const metricsCutoff = now - TURN_METRICS_RETENTION_DAYS * 24 * 60 * 60 * 1000;
+    const oldMetrics = await ctx.db
+      .query("aiTurnMetrics")
+      .withIndex("by_createdAt", (q) => q.lt("createdAt", metricsCutoff))
+      .take(1000);
+    for (const metric of oldMetrics) {
+      await ctx.db.delete(metric._id);
+    }
+
+    const orphanedDrafts = await ctx.db
+      .query("aiReplyDrafts")
+      .withIndex("by_updatedAt", (q) => q.lt("updatedAt", now - ORPHANED_DRAFT_AGE_MS))
+      .take(1000);
+    for (const draft of orphanedDrafts) {
+      await ctx.db.delete(draft._id);
+    }
+
+    return expired.length + oldMetrics.length + orphanedDrafts.length;
+  },
+});
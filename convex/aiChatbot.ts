@@ -1,12 +1,16 @@
 import { action, mutation, query, internalQuery, internalMutation } from "./_generated/server";
 import { v } from "convex/values";
 import { internal } from "./_generated/api";
+import { Id } from "./_generated/dataModel";
 import {
   callClaudeAPI,
   extractJSON,
   fuzzyMatch,
   daysUntil,
 } from "./aiUtils";
+import { syncCalendarIndex } from "./calendarIndex";
+import { requireTenant } from "./authHelpers";
+import { trackOrgStats } from "./orgStats";
 
 // Type definitions
 type QueryIntent =
@@ -731,6 +735,8 @@ export const createMaintenanceRequest = internalMutation({
       createdAt: now,
       updatedAt: now,
     });
+    await trackOrgStats(ctx, "maintenanceRequests", requestId, null);
+    await syncCalendarIndex(ctx, "maintenanceRequests", requestId);
 
     return {
       success: true,
@@ -797,6 +803,8 @@ export const updateMaintenanceStatus = internalMutation({
     }
 
     await ctx.db.patch(targetRequest._id, updates);
+    await trackOrgStats(ctx, "maintenanceRequests", targetRequest._id, targetRequest);
+    await syncCalendarIndex(ctx, "maintenanceRequests", targetRequest._id);
 
     return {
       success: true,
@@ -1466,15 +1474,18 @@ export const updateConversationTitle = mutation({
 // ==================== Tool-Based Chat (V2) ====================
 
 import {
-  callClaudeWithTools,
-  extractToolUse,
-  extractText,
+  streamClaudeWithTools,
+  extractToolUses,
+  type ClaudeContentBlock,
+  type ClaudeMessage,
 } from "./aiUtils";
 import {
   SDA_ASSISTANT_TOOLS,
   requiresConfirmation,
   getActionDescription,
+  isCacheableTool,
 } from "./aiTools";
+import { responseCacheKey, toolCacheKey } from "./lib/aiCache";
 
 const TOOL_SYSTEM_PROMPT = `You are an AI assistant for an SDA (Specialist Disability Accommodation) property management system in Australia.
 
@@ -1492,63 +1503,270 @@ When responding:
 - Be concise but helpful
 - For actions that modify data, always use the appropriate tool - never just describe what you would do
 
-Always use the available tools to answer questions. If you need to perform an action like moving a participant or creating maintenance, use the appropriate tool.`;
+Always use the available tools to answer questions. If you need to perform an action like moving a participant or creating maintenance, use the appropriate tool.
 
-// New tool-based query processor
+When a question has several parts, request every tool you need in the same response so they run in parallel. Tool results are shown to the user as they arrive, so after receiving them do not repeat them - call further tools if needed, otherwise add at most a one or two sentence conclusion.`;
+
+// Org and data version used to read/write the assistant caches (aiCache.ts)
+interface AiCacheScope {
+  organizationId: Id<"organizations">;
+  dataVersion: number;
+}
+
+// Model round-trips allowed per user turn (tool results feed the next one)
+const MAX_AGENT_ITERATIONS = 3;
+// Minimum gap between streamed draft writes
+const DRAFT_WRITE_INTERVAL_MS = 150;
+
+// Publishes the reply-so-far to aiReplyDrafts so the chat UI can render it
+// while the turn is still running. Writes are throttled and applied in order.
+function createDraftPublisher(
+  // eslint-disable-next-line @typescript-eslint/no-explicit-any
+  ctx: any,
+  userId: Id<"users">,
+  requestId: string | undefined
+) {
+  let lastWriteAt = 0;
+  let chain: Promise<void> = Promise.resolve();
+  return {
+    publish(content: string, force = false): Promise<void> {
+      if (!requestId) return chain;
+      const now = Date.now();
+      if (!force && now - lastWriteAt < DRAFT_WRITE_INTERVAL_MS) return chain;
+      lastWriteAt = now;
+      chain = chain.then(() =>
+        ctx.runMutation(internal.aiChatbot.writeReplyDraft, { userId, requestId, content })
+      );
+      return chain;
+    },
+    async clear(): Promise<void> {
+      if (!requestId) return;
+      await chain.catch(() => undefined);
+      await ctx.runMutation(internal.aiChatbot.deleteReplyDraft, { userId, requestId });
+    },
+  };
+}
+
+// New tool-based query processor (agent loop).
+// Every tool call in a model response runs concurrently; read-only results
+// are fed back so the model can call further tools or add a short
+// conclusion, for up to MAX_AGENT_ITERATIONS round-trips. Model text and
+// tool results stream to the UI through aiReplyDrafts when a requestId is
+// given. Repeated questions are answered from the reply cache without
+// calling the model, and each turn's latency and token usage is recorded in
+// aiTurnMetrics.
 export const processUserQueryV2 = action({
   args: {
     conversationId: v.optional(v.id("aiConversations")),
     userMessage: v.string(),
     userId: v.id("users"),
+    requestId: v.optional(v.string()), // Client-generated; enables streamed drafts
   },
   handler: async (ctx, args): Promise<ProcessQueryResult> => {
-    // Call Claude with tools
-    const response = await callClaudeWithTools(
-      TOOL_SYSTEM_PROMPT,
-      [{ role: "user", content: args.userMessage }],
-      SDA_ASSISTANT_TOOLS,
-      4096
-    );
+    const startedAt = Date.now();
+    const replyKey = responseCacheKey(args.userMessage);
+    const lookup = await ctx.runQuery(internal.aiCache.lookupResponse, {
+      userId: args.userId,
+      key: replyKey ?? undefined,
+    });
+    const cacheScope: AiCacheScope | undefined = lookup.organizationId
+      ? { organizationId: lookup.organizationId, dataVersion: lookup.dataVersion }
+      : undefined;
+
+    const metrics = {
+      organizationId: lookup.organizationId ?? undefined,
+      userId: args.userId,
+      toolName: undefined as string | undefined,
+      responseCacheHit: false,
+      toolCacheHit: false,
+      modelLatencyMs: 0,
+      toolLatencyMs: 0,
+      inputTokens: 0,
+      outputTokens: 0,
+      cacheCreationInputTokens: 0,
+      cacheReadInputTokens: 0,
+    };
+    const recordTurn = async () => {
+      const totalLatencyMs = Date.now() - startedAt;
+      console.log(
+        `[AI] turn ${totalLatencyMs}ms (model ${metrics.modelLatencyMs}ms, tool ${metrics.toolLatencyMs}ms)` +
+          ` tool=${metrics.toolName ?? "none"} replyCache=${metrics.responseCacheHit} toolCache=${metrics.toolCacheHit}` +
+          ` tokens in=${metrics.inputTokens} out=${metrics.outputTokens}` +
+          ` cacheRead=${metrics.cacheReadInputTokens} cacheWrite=${metrics.cacheCreationInputTokens}`
+      );
+      await ctx.runMutation(internal.aiCache.recordTurn, { ...metrics, totalLatencyMs });
+    };
+    const saveReply = (assistantResponse: string) =>
+      ctx.runMutation(internal.aiChatbot.saveMessage, {
+        conversationId: args.conversationId,
+        userId: args.userId,
+        userMessage: args.userMessage,
+        assistantResponse,
+      });
 
-    // Check if Claude wants to use a tool
-    const toolUse = extractToolUse(response);
+    if (lookup.response !== null) {
+      metrics.responseCacheHit = true;
+      const conversationId = await saveReply(lookup.response);
+      await recordTurn();
+      return { response: lookup.response, conversationId };
+    }
 
-    if (toolUse) {
-      // Handle tool use
-      const result = await handleToolUse(ctx, toolUse, args.userId);
+    const draft = createDraftPublisher(ctx, args.userId, args.requestId);
+    const sections: string[] = [];
+    let streamingText = "";
+    const composeReply = (inFlight: string[] = []) =>
+      [...sections, ...inFlight, streamingText].filter((part) => part.trim()).join("\n\n");
 
-      // Save to conversation
-      const conversationId = await ctx.runMutation(
-        internal.aiChatbot.saveMessage,
-        {
-          conversationId: args.conversationId,
-          userId: args.userId,
-          userMessage: args.userMessage,
-          assistantResponse: result.response,
+    const messages: ClaudeMessage[] = [{ role: "user", content: args.userMessage }];
+    const toolNames: string[] = [];
+    let allToolsCacheable = true;
+    let toolCacheHits = 0;
+    let pendingAction: ProcessQueryResult["pendingAction"];
+
+    try {
+      for (let iteration = 0; iteration < MAX_AGENT_ITERATIONS; iteration++) {
+        const modelStartedAt = Date.now();
+        streamingText = "";
+        const response = await streamClaudeWithTools(
+          TOOL_SYSTEM_PROMPT,
+          messages,
+          SDA_ASSISTANT_TOOLS,
+          (text) => {
+            streamingText += text;
+            return draft.publish(composeReply());
+          },
+          4096
+        );
+        metrics.modelLatencyMs += Date.now() - modelStartedAt;
+        metrics.inputTokens += response.usage?.input_tokens ?? 0;
+        metrics.outputTokens += response.usage?.output_tokens ?? 0;
+        metrics.cacheCreationInputTokens += response.usage?.cache_creation_input_tokens ?? 0;
+        metrics.cacheReadInputTokens += response.usage?.cache_read_input_tokens ?? 0;
+
+        const text = response.content
+          .filter((block) => block.type === "text" && block.text)
+          .map((block) => block.text)
+          .join("\n\n");
+        streamingText = "";
+        if (text.trim()) sections.push(text);
+
+        const toolUses = extractToolUses(response);
+        if (toolUses.length === 0) break;
+        toolNames.push(...toolUses.map((toolUse) => toolUse.name));
+
+        // A data-changing action ends the turn and waits for confirmation
+        const actionToolUse = toolUses.find((toolUse) => requiresConfirmation(toolUse.name));
+        if (actionToolUse) {
+          allToolsCacheable = false;
+          const result = await handleToolUse(ctx, actionToolUse, args.userId);
+          sections.push(result.response);
+          pendingAction = result.pendingAction;
+          break;
         }
-      );
 
-      return {
-        response: result.response,
-        conversationId,
-        pendingAction: result.pendingAction,
-      };
+        // Independent read-only tool calls run concurrently
+        const toolStartedAt = Date.now();
+        const completed: string[] = toolUses.map(() => "");
+        const results = await Promise.all(
+          toolUses.map(async (toolUse, i) => {
+            const result = await handleToolUse(ctx, toolUse, args.userId, cacheScope);
+            completed[i] = result.response;
+            await draft.publish(composeReply(completed), true);
+            return result;
+          })
+        );
+        metrics.toolLatencyMs += Date.now() - toolStartedAt;
+        sections.push(...results.map((result) => result.response));
+        toolCacheHits += results.filter((result) => result.toolCacheHit).length;
+        if (!toolUses.every((toolUse) => isCacheableTool(toolUse.name))) {
+          allToolsCacheable = false;
+        }
+
+        if (response.stop_reason !== "tool_use") break;
+        messages.push({ role: "assistant", content: response.content as ClaudeContentBlock[] });
+        messages.push({
+          role: "user",
+          content: toolUses.map((toolUse, i) => ({
+            type: "tool_result" as const,
+            tool_use_id: toolUse.id,
+            content: results[i].response,
+          })),
+        });
+      }
+    } finally {
+      await draft.clear();
     }
 
-    // No tool use - just text response
-    const textResponse = extractText(response) || "I'm not sure how to help with that. Could you please rephrase your question?";
+    metrics.toolName = toolNames.length > 0 ? toolNames.join(",") : undefined;
+    metrics.toolCacheHit = toolNames.length > 0 && toolCacheHits === toolNames.length;
 
-    const conversationId = await ctx.runMutation(
-      internal.aiChatbot.saveMessage,
-      {
-        conversationId: args.conversationId,
-        userId: args.userId,
-        userMessage: args.userMessage,
-        assistantResponse: textResponse,
-      }
-    );
+    const reply = composeReply() || "I'm not sure how to help with that. Could you please rephrase your question?";
+
+    // Only read-only answers can be replayed for the same question
+    if (cacheScope && replyKey && toolNames.length > 0 && allToolsCacheable) {
+      await ctx.runMutation(internal.aiCache.set, { ...cacheScope, key: replyKey, response: reply });
+    }
+
+    const conversationId = await saveReply(reply);
+    await recordTurn();
+    return { response: reply, conversationId, pendingAction };
+  },
+});
+
+// Streamed reply-so-far for an in-flight processUserQueryV2 call
+export const getReplyDraft = query({
+  args: {
+    userId: v.id("users"),
+    requestId: v.string(),
+  },
+  handler: async (ctx, args) => {
+    await requireTenant(ctx, args.userId);
+    const draft = await ctx.db
+      .query("aiReplyDrafts")
+      .withIndex("by_user_requestId", (q) =>
+        q.eq("userId", args.userId).eq("requestId", args.requestId)
+      )
+      .first();
+    return draft ? draft.content : null;
+  },
+});
+
+export const writeReplyDraft = internalMutation({
+  args: {
+    userId: v.id("users"),
+    requestId: v.string(),
+    content: v.string(),
+  },
+  handler: async (ctx, args) => {
+    const existing = await ctx.db
+      .query("aiReplyDrafts")
+      .withIndex("by_user_requestId", (q) =>
+        q.eq("userId", args.userId).eq("requestId", args.requestId)
+      )
+      .first();
+    if (existing) {
+      await ctx.db.patch(existing._id, { content: args.content, updatedAt: Date.now() });
+    } else {
+      await ctx.db.insert("aiReplyDrafts", { ...args, updatedAt: Date.now() });
+    }
+  },
+});
 
-    return { response: textResponse, conversationId };
+export const deleteReplyDraft = internalMutation({
+  args: {
+    userId: v.id("users"),
+    requestId: v.string(),
+  },
+  handler: async (ctx, args) => {
+    const existing = await ctx.db
+      .query("aiReplyDrafts")
+      .withIndex("by_user_requestId", (q) =>
+        q.eq("userId", args.userId).eq("requestId", args.requestId)
+      )
+      .first();
+    if (existing) {
+      await ctx.db.delete(existing._id);
+    }
   },
 });
 
@@ -1557,8 +1775,9 @@ async function handleToolUse(
   // eslint-disable-next-line @typescript-eslint/no-explicit-any
   ctx: any,
   toolUse: { name: string; input: Record<string, unknown> },
-  userId: string
-): Promise<{ response: string; pendingAction?: { actionType: string; description: string; params: Record<string, unknown> } }> {
+  userId: string,
+  cacheScope?: AiCacheScope
+): Promise<{ response: string; toolCacheHit?: boolean; pendingAction?: { actionType: string; description: string; params: Record<string, unknown> } }> {
   const { name, input } = toolUse;
 
   // Check if this action requires confirmation
@@ -1574,6 +1793,18 @@ async function handleToolUse(
     };
   }
 
+  // Serve read-only tools from the per-org tool cache when still fresh
+  const cacheKey = cacheScope && isCacheableTool(name) ? toolCacheKey(name, input) : null;
+  if (cacheScope && cacheKey) {
+    const cached: string | null = await ctx.runQuery(internal.aiCache.get, {
+      ...cacheScope,
+      key: cacheKey,
+    });
+    if (cached !== null) {
+      return { response: cached, toolCacheHit: true };
+    }
+  }
+
   // Execute query tools directly
   let queryResult: unknown = null;
 
@@ -1702,7 +1933,14 @@ async function handleToolUse(
 
   // Format the query result into a response
   const formattedResponse = await formatToolResult(name, queryResult);
-  return { response: formattedResponse };
+  if (cacheScope && cacheKey) {
+    await ctx.runMutation(internal.aiCache.set, {
+      ...cacheScope,
+      key: cacheKey,
+      response: formattedResponse,
+    });
+  }
+  return { response: formattedResponse, toolCacheHit: false };
 }
 
 // Generate text responses for general queries
@@ -3293,6 +3531,7 @@ export const scheduleInspection = internalMutation({
       createdAt: now,
       updatedAt: now,
     });
+    await syncCalendarIndex(ctx, "inspections", inspectionId);
 
     // Create inspection items from template
     let itemOrder = 0;
@@ -3435,6 +3674,11 @@ export const executeActionV2 = action({
       ? `Done! ${result.message || "Action completed successfully."}`
       : `Sorry, I couldn't complete this action. ${result.error || "Unknown error"}`;
 
+    // The action changed data; stop serving cached answers for this organization
+    if (result.success) {
+      await ctx.runMutation(internal.aiCache.invalidateForUser, { userId: args.userId });
+    }
+
     // Save result to conversation
     const conversationId = await ctx.runMutation(
       internal.aiChatbot.saveMessage,
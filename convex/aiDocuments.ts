@@ -4,8 +4,11 @@ import { v } from "convex/values";
 import {
   callClaudeAPI,
   extractJSON,
+  extractJSONArray,
   createVisionMessage,
 } from "./aiUtils";
+import { chunkCsvRows, parseClaimCsv, ParsedClaimRecord } from "./lib/claimCsv";
+import { syncCalendarIndex } from "./calendarIndex";
 
 // Type definitions
 interface ClassificationResult {
@@ -44,14 +47,10 @@ interface AccommodationAgreementData {
   warnings: string[];
 }
 
-interface ParsedClaimRecord {
-  ndisNumber: string;
-  supportsDeliveredFrom: string;
-  supportsDeliveredTo: string;
-  claimReference: string;
-  amount: number;
-  supportNumber: string;
-}
+// LLM fallback for claim CSVs with an unrecognised header: rows per request
+// (keeps each response well under the output cap) and requests in flight.
+const CSV_CLAIM_CHUNK_ROWS = 50;
+const CSV_CLAIM_CONCURRENCY = 5;
 
 // Classify a document using AI
 export const classifyDocument = action({
@@ -151,12 +150,22 @@ Respond with JSON only:
   },
 });
 
-// Parse CSV claim files
+// Parse CSV claim files.
+// Standard NDIA bulk-claim layouts are parsed deterministically; only files
+// whose header isn't recognised go to Claude, in parallel row chunks.
+// skippedRows lists CSV rows the deterministic parser could not use (missing
+// NDIS number, date or amount) so the UI can show them; the model path
+// reports none.
 export const parseCsvClaims = action({
   args: {
     csvContent: v.string(),
   },
-  handler: async (ctx, args): Promise<ParsedClaimRecord[]> => {
+  handler: async (ctx, args): Promise<{ records: ParsedClaimRecord[]; skippedRows: number[] }> => {
+    const parsed = parseClaimCsv(args.csvContent);
+    if (parsed) {
+      return parsed;
+    }
+
     const systemPrompt = `You are an expert at parsing Australian NDIS claim CSV files.
 
 The CSV typically has these columns:
@@ -185,19 +194,28 @@ Respond with a JSON array:
   }
 ]`;
 
-    const response = await callClaudeAPI(
-      systemPrompt,
-      [{ role: "user", content: `Parse these NDIS claims from CSV:\n\n${args.csvContent}` }],
-      4096
-    );
+    const chunks = chunkCsvRows(args.csvContent, CSV_CLAIM_CHUNK_ROWS);
+    const parseChunk = async (chunk: string, index: number) => {
+      const response = await callClaudeAPI(
+        systemPrompt,
+        [{ role: "user", content: `Parse these NDIS claims from CSV:\n\n${chunk}` }],
+        4096
+      );
+      try {
+        return extractJSONArray<ParsedClaimRecord>(response);
+      } catch (error) {
+        throw new Error(`Claim CSV chunk ${index + 1} of ${chunks.length}: ${error}`);
+      }
+    };
 
-    // Extract JSON array from response
-    const jsonMatch = response.match(/\[[\s\S]*\]/);
-    if (!jsonMatch) {
-      throw new Error("Could not find JSON array in Claude response");
+    const records: ParsedClaimRecord[] = [];
+    for (let i = 0; i < chunks.length; i += CSV_CLAIM_CONCURRENCY) {
+      const results = await Promise.all(
+        chunks.slice(i, i + CSV_CLAIM_CONCURRENCY).map((chunk, j) => parseChunk(chunk, i + j))
+      );
+      for (const result of results) records.push(...result);
     }
-
-    return JSON.parse(jsonMatch[0]) as ParsedClaimRecord[];
+    return { records, skippedRows: [] };
   },
 });
 
@@ -486,10 +504,12 @@ export const createDocumentRecord = internalMutation({
   },
   handler: async (ctx, args) => {
     const now = Date.now();
-    return await ctx.db.insert("documents", {
+    const documentId = await ctx.db.insert("documents", {
       ...args,
       createdAt: now,
       updatedAt: now,
     });
+    await syncCalendarIndex(ctx, "documents", documentId);
+    return documentId;
   },
 });
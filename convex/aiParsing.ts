@@ -1,6 +1,7 @@
 import { action, mutation } from "./_generated/server";
 import { v } from "convex/values";
 import { api } from "./_generated/api";
+import { trackOrgStats } from "./orgStats";
 
 // Type definitions for extracted data
 interface ExtractedParticipant {
@@ -393,18 +394,25 @@ export const createFromExtracted = mutation({
       throw new Error(`Participant with NDIS number ${args.participant.ndisNumber} already exists`);
     }
 
+    // The new records belong to the dwelling's organization
+    const dwelling = await ctx.db.get(args.dwellingId);
+    const organizationId = dwelling?.organizationId;
+
     // Create the participant
     const participantId = await ctx.db.insert("participants", {
       ...args.participant,
+      organizationId,
       dwellingId: args.dwellingId,
       moveInDate: args.moveInDate,
       status: "pending_move_in",
       createdAt: now,
       updatedAt: now,
     });
+    await trackOrgStats(ctx, "participants", participantId, null);
 
     // Create the plan
     const planId = await ctx.db.insert("participantPlans", {
+      organizationId,
       participantId,
       planStartDate: args.plan.planStartDate,
       planEndDate: args.plan.planEndDate,
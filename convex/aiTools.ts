@@ -552,6 +552,33 @@ export function requiresConfirmation(toolName: string): boolean {
   return ACTION_TOOLS.includes(toolName);
 }
 
+// Read-only tools whose formatted results can be served from the tool cache
+export const CACHEABLE_TOOLS = [
+  "get_vacancies",
+  "get_participant_plan_expiry",
+  "get_expiring_plans",
+  "get_overdue_maintenance",
+  "get_payment_status",
+  "get_expiring_documents",
+  "get_property_summary",
+  "get_participant_info",
+  "list_all_participants",
+  "get_recent_activity",
+  "calculate_owner_payment",
+  "get_compliance_status",
+  "match_participant_to_vacancy",
+  "get_contractor_history",
+  "get_property_financials",
+  "get_incident_summary",
+  "get_upcoming_payments",
+  "get_monthly_summary",
+];
+
+// Check if a tool's result may be cached
+export function isCacheableTool(toolName: string): boolean {
+  return CACHEABLE_TOOLS.includes(toolName);
+}
+
 // Get human-readable description for a tool action
 export function getActionDescription(
   toolName: string,
@@ -5,6 +5,11 @@ export const CLAUDE_MODEL = "claude-sonnet-4-20250514";
 export const CLAUDE_API_URL = "https://api.anthropic.com/v1/messages";
 export const ANTHROPIC_VERSION = "2023-06-01";
 
+// ANTHROPIC_API_URL points calls at a local stub model endpoint for testing
+function getClaudeApiUrl(): string {
+  return process.env.ANTHROPIC_API_URL || CLAUDE_API_URL;
+}
+
 // Type definitions
 export interface ClaudeMessage {
   role: "user" | "assistant";
@@ -56,6 +61,8 @@ export interface ClaudeResponse {
   usage: {
     input_tokens: number;
     output_tokens: number;
+    cache_creation_input_tokens?: number;
+    cache_read_input_tokens?: number;
   };
 }
 
@@ -97,7 +104,7 @@ export async function callClaudeAPI(
     headers["anthropic-beta"] = "pdfs-2024-09-25";
   }
 
-  const response = await fetch(CLAUDE_API_URL, {
+  const response = await fetch(getClaudeApiUrl(), {
     method: "POST",
     headers,
     body: JSON.stringify({
@@ -124,7 +131,10 @@ export async function callClaudeAPI(
   return content;
 }
 
-// Helper function to call Claude API with tool calling
+// Helper function to call Claude API with tool calling.
+// The tool definitions and system prompt are the same on every turn, so they
+// are marked as a cacheable prompt prefix; later turns read them from the
+// prompt cache (usage.cache_read_input_tokens) at a fraction of the cost.
 export async function callClaudeWithTools(
   systemPrompt: string,
   messages: ClaudeMessage[],
@@ -149,14 +159,15 @@ export async function callClaudeWithTools(
     headers["anthropic-beta"] = "pdfs-2024-09-25";
   }
 
-  const response = await fetch(CLAUDE_API_URL, {
+  const response = await fetch(getClaudeApiUrl(), {
     method: "POST",
     headers,
     body: JSON.stringify({
       model: CLAUDE_MODEL,
       max_tokens: maxTokens,
       messages,
-      system: systemPrompt,
+      // Tools precede the system prompt, so this breakpoint caches both
+      system: [{ type: "text", text: systemPrompt, cache_control: { type: "ephemeral" } }],
       tools,
     }),
   });
@@ -170,6 +181,154 @@ export async function callClaudeWithTools(
   return (await response.json()) as ClaudeResponse;
 }
 
+// Accumulates one streamed content block
+interface StreamedBlock {
+  type: string;
+  text?: string;
+  id?: string;
+  name?: string;
+  inputJson?: string;
+}
+
+// Same request as callClaudeWithTools, but streamed: onText receives text as
+// it is generated, so callers can show partial answers before the response
+// completes. Returns the assembled response. Endpoints that answer with plain
+// JSON (e.g. a local stub model) are accepted too.
+export async function streamClaudeWithTools(
+  systemPrompt: string,
+  messages: ClaudeMessage[],
+  tools: ClaudeTool[],
+  onText?: (text: string) => void | Promise<void>,
+  maxTokens: number = 4096
+): Promise<ClaudeResponse> {
+  const apiKey = process.env.ANTHROPIC_API_KEY;
+  if (!apiKey) {
+    throw new Error(
+      "ANTHROPIC_API_KEY not configured. Add it to your Convex environment variables."
+    );
+  }
+
+  const response = await fetch(getClaudeApiUrl(), {
+    method: "POST",
+    headers: {
+      "Content-Type": "application/json",
+      "x-api-key": apiKey,
+      "anthropic-version": ANTHROPIC_VERSION,
+    },
+    body: JSON.stringify({
+      model: CLAUDE_MODEL,
+      max_tokens: maxTokens,
+      messages,
+      system: [{ type: "text", text: systemPrompt, cache_control: { type: "ephemeral" } }],
+      tools,
+      stream: true,
+    }),
+  });
+
+  if (!response.ok) {
+    const errorData = await response.json();
+    console.error("Claude API error:", errorData);
+    throw new Error(`Claude API error: ${JSON.stringify(errorData)}`);
+  }
+
+  if (!response.body || !(response.headers.get("content-type") || "").includes("text/event-stream")) {
+    const data = (await response.json()) as ClaudeResponse;
+    const text = extractText(data);
+    if (text && onText) await onText(text);
+    return data;
+  }
+
+  const result: ClaudeResponse = {
+    content: [],
+    model: CLAUDE_MODEL,
+    stop_reason: "end_turn",
+    usage: { input_tokens: 0, output_tokens: 0 },
+  };
+  const blocks: StreamedBlock[] = [];
+
+  // eslint-disable-next-line @typescript-eslint/no-explicit-any
+  const handleEvent = async (event: Record<string, any>) => {
+    switch (event.type) {
+      case "message_start":
+        result.model = event.message?.model ?? result.model;
+        result.usage = { ...result.usage, ...event.message?.usage };
+        break;
+      case "content_block_start":
+        blocks[event.index] = {
+          type: event.content_block.type,
+          text: event.content_block.text ?? "",
+          id: event.content_block.id,
+          name: event.content_block.name,
+          inputJson: "",
+        };
+        break;
+      case "content_block_delta": {
+        const block = blocks[event.index];
+        if (!block) break;
+        if (event.delta.type === "text_delta") {
+          block.text += event.delta.text;
+          if (onText) await onText(event.delta.text);
+        } else if (event.delta.type === "input_json_delta") {
+          block.inputJson += event.delta.partial_json;
+        }
+        break;
+      }
+      case "message_delta":
+        if (event.delta?.stop_reason) result.stop_reason = event.delta.stop_reason;
+        if (event.usage?.output_tokens !== undefined) {
+          result.usage.output_tokens = event.usage.output_tokens;
+        }
+        break;
+      case "error":
+        throw new Error(`Claude API error: ${JSON.stringify(event.error)}`);
+    }
+  };
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  for (;;) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    // Server-sent events are separated by a blank line
+    let boundary = buffer.indexOf("\n\n");
+    while (boundary !== -1) {
+      const rawEvent = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      for (const line of rawEvent.split("\n")) {
+        if (line.startsWith("data:")) {
+          await handleEvent(JSON.parse(line.slice(5).trim()));
+        }
+      }
+      boundary = buffer.indexOf("\n\n");
+    }
+  }
+
+  result.content = blocks.filter(Boolean).map((block) =>
+    block.type === "tool_use"
+      ? {
+          type: "tool_use",
+          id: block.id,
+          name: block.name,
+          input: block.inputJson ? (JSON.parse(block.inputJson) as Record<string, unknown>) : {},
+        }
+      : { type: block.type, text: block.text }
+  );
+  return result;
+}
+
+// Extract all tool uses from Claude response, in order
+export function extractToolUses(response: ClaudeResponse): ClaudeToolUse[] {
+  const toolUses: ClaudeToolUse[] = [];
+  for (const block of response.content) {
+    if (block.type === "tool_use" && block.id && block.name && block.input) {
+      toolUses.push({ type: "tool_use", id: block.id, name: block.name, input: block.input });
+    }
+  }
+  return toolUses;
+}
+
 // Extract tool use from Claude response
 export function extractToolUse(response: ClaudeResponse): ClaudeToolUse | null {
   for (const block of response.content) {
@@ -1,5 +1,6 @@
 import { MutationCtx } from "./_generated/server";
 import { Id, Doc } from "./_generated/dataModel";
+import { markDashboardStale } from "./dashboard";
 
 // Alert types
 export type AlertType =
@@ -140,6 +141,7 @@ export async function createAlertIfNotExists(
     status: "active",
     createdAt: Date.now(),
   });
+  await markDashboardStale(ctx, organizationId);
 
   return alertId;
 }
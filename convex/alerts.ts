@@ -3,6 +3,7 @@ import { v } from "convex/values";
 import { internal } from "./_generated/api";
 import { requireAuth, requireTenant } from "./authHelpers";
 import { runAllAlertGenerators, createAlertIfNotExists, type CreateAlertArgs } from "./alertHelpers";
+import { markDashboardStale } from "./dashboard";
 
 // Create a new alert
 export const create = mutation({
@@ -65,6 +66,7 @@ export const create = mutation({
       status: "active",
       createdAt: now,
     });
+    await markDashboardStale(ctx, organizationId);
 
     // Trigger notifications for all users (will check preferences inside actions)
     const users = await ctx.db.query("users").collect();
@@ -295,6 +297,7 @@ export const acknowledge = mutation({
       acknowledgedBy: args.userId,
       acknowledgedAt: Date.now(),
     });
+    await markDashboardStale(ctx, organizationId);
     return { success: true };
   },
 });
@@ -319,6 +322,7 @@ export const resolve = mutation({
       resolvedBy: args.userId,
       resolvedAt: Date.now(),
     });
+    await markDashboardStale(ctx, organizationId);
     return { success: true };
   },
 });
@@ -341,6 +345,7 @@ export const dismiss = mutation({
     await ctx.db.patch(args.alertId, {
       status: "dismissed",
     });
+    await markDashboardStale(ctx, organizationId);
     return { success: true };
   },
 });
@@ -361,6 +366,7 @@ export const remove = mutation({
     }
 
     await ctx.db.delete(args.alertId);
+    await markDashboardStale(ctx, organizationId);
     return { success: true };
   },
 });
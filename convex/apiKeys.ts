@@ -1,5 +1,6 @@
 import { v } from "convex/values";
-import { mutation, query, internalMutation } from "./_generated/server";
+import { mutation, query, internalMutation, QueryCtx } from "./_generated/server";
+import { Id } from "./_generated/dataModel";
 import { requireTenant, requireAdmin } from "./authHelpers";
 
 /**
@@ -44,6 +45,24 @@ async function sha256(input: string): Promise<string> {
   return hashArray.map((b) => b.toString(16).padStart(2, "0")).join("");
 }
 
+/**
+ * Verify the shared secret the REST API layer presents when it resolves keys
+ * by hash or flushes usage. A dedicated secret, so key hashes alone (e.g. from
+ * a leaked backup) never resolve to an organization's context.
+ */
+function verifyServerSecret(providedSecret: string): void {
+  const expectedSecret = process.env.API_KEY_SERVER_SECRET;
+  if (!expectedSecret) {
+    throw new Error("API_KEY_SERVER_SECRET environment variable is not configured");
+  }
+  if (providedSecret !== expectedSecret) {
+    throw new Error("Invalid server secret - unauthorized access");
+  }
+}
+
+// Most usages one recordKeyUsage call accepts; the REST layer chunks its flush
+export const MAX_USAGE_BATCH = 500;
+
 // ============================================================================
 // QUERIES
 // ============================================================================
@@ -199,6 +218,63 @@ export const updateLastUsed = internalMutation({
   },
 });
 
+type ApiKeyValidation =
+  | {
+      valid: true;
+      organizationId: string;
+      permissions: string[];
+      keyId: string;
+      createdBy: string;
+      subscriptionStatus: string;
+      accessLevel: string;
+      expiresAt: number | null;
+    }
+  | { valid: false };
+
+/**
+ * Look up an API key by its SHA-256 hash and check active status and expiration.
+ * Shared by validateApiKey and resolveApiKey; performs no writes.
+ */
+async function lookupKeyByHash(
+  ctx: QueryCtx,
+  keyHash: string
+): Promise<ApiKeyValidation> {
+  const apiKey = await ctx.db
+    .query("apiKeys")
+    .withIndex("by_key", (q) => q.eq("key", keyHash))
+    .first();
+
+  if (!apiKey) {
+    return { valid: false };
+  }
+
+  // Check if key is active
+  if (!apiKey.isActive) {
+    return { valid: false };
+  }
+
+  // Check expiration
+  if (apiKey.expiresAt && apiKey.expiresAt < Date.now()) {
+    return { valid: false };
+  }
+
+  // B7 FIX: Include subscription status for API access level checks
+  const org = await ctx.db.get(apiKey.organizationId);
+  const subscriptionStatus = org?.subscriptionStatus ?? "active";
+  const accessLevel = org?.accessLevel ?? "full";
+
+  return {
+    valid: true,
+    organizationId: apiKey.organizationId as string,
+    permissions: apiKey.permissions,
+    keyId: apiKey._id as string,
+    createdBy: apiKey.createdBy as string,
+    subscriptionStatus,
+    accessLevel,
+    expiresAt: apiKey.expiresAt ?? null,
+  };
+}
+
 /**
  * Validate an API key from a raw key string.
  *
@@ -211,67 +287,94 @@ export const updateLastUsed = internalMutation({
  *
  * Returns { valid: true, organizationId, permissions, keyId } on success,
  * or { valid: false } on failure.
+ *
+ * The REST API layer uses resolveApiKey + recordKeyUsage instead so that
+ * validation is cacheable and lastUsedAt writes are batched.
  */
 export const validateApiKey = mutation({
   args: {
     key: v.string(),
   },
-  handler: async (
-    ctx,
-    args
-  ): Promise<
-    | {
-        valid: true;
-        organizationId: string;
-        permissions: string[];
-        keyId: string;
-        createdBy: string;
-        subscriptionStatus: string;
-        accessLevel: string;
-      }
-    | { valid: false }
-  > => {
+  handler: async (ctx, args): Promise<ApiKeyValidation> => {
     // Hash the incoming key to match stored hash
     const keyHash = await sha256(args.key);
+    const result = await lookupKeyByHash(ctx, keyHash);
 
-    // Look up by hash
-    const apiKey = await ctx.db
-      .query("apiKeys")
-      .withIndex("by_key", (q) => q.eq("key", keyHash))
-      .first();
-
-    if (!apiKey) {
-      return { valid: false };
+    if (result.valid) {
+      // Update lastUsedAt timestamp
+      await ctx.db.patch(result.keyId as Id<"apiKeys">, {
+        lastUsedAt: Date.now(),
+      });
     }
 
-    // Check if key is active
-    if (!apiKey.isActive) {
-      return { valid: false };
-    }
+    return result;
+  },
+});
+
+/**
+ * Resolve an API key from its SHA-256 hash without writing.
+ *
+ * Read-only counterpart of validateApiKey used by the REST API layer, which
+ * hashes the key itself and caches the result for a short window. The hash is
+ * never exposed, but is not treated as a credential on its own: callers must
+ * also present API_KEY_SERVER_SECRET.
+ */
+export const resolveApiKey = query({
+  args: {
+    serverSecret: v.string(),
+    keyHash: v.string(),
+  },
+  handler: async (ctx, args): Promise<ApiKeyValidation> => {
+    verifyServerSecret(args.serverSecret);
+    return await lookupKeyByHash(ctx, args.keyHash);
+  },
+});
 
-    // Check expiration
-    if (apiKey.expiresAt && apiKey.expiresAt < Date.now()) {
-      return { valid: false };
+/**
+ * Record batched lastUsedAt timestamps flushed from the REST API key cache.
+ *
+ * Each entry is the key hash and the latest time it was used since the last
+ * flush. Only moves lastUsedAt forward. Returns the hashes that are no longer
+ * valid (revoked, expired or deleted) so callers can evict them immediately.
+ * Accepts at most MAX_USAGE_BATCH entries; callers chunk larger flushes.
+ */
+export const recordKeyUsage = mutation({
+  args: {
+    serverSecret: v.string(),
+    usages: v.array(
+      v.object({
+        keyHash: v.string(),
+        lastUsedAt: v.number(),
+      })
+    ),
+  },
+  handler: async (ctx, args) => {
+    verifyServerSecret(args.serverSecret);
+    if (args.usages.length > MAX_USAGE_BATCH) {
+      throw new Error(`Too many usages in one batch (max ${MAX_USAGE_BATCH})`);
     }
 
-    // Update lastUsedAt timestamp
-    await ctx.db.patch(apiKey._id, {
-      lastUsedAt: Date.now(),
-    });
+    const now = Date.now();
+    const invalid: string[] = [];
+
+    for (const usage of args.usages) {
+      const apiKey = await ctx.db
+        .query("apiKeys")
+        .withIndex("by_key", (q) => q.eq("key", usage.keyHash))
+        .first();
+
+      if (!apiKey || !apiKey.isActive || (apiKey.expiresAt && apiKey.expiresAt < now)) {
+        invalid.push(usage.keyHash);
+        continue;
+      }
+
+      // Never record a future timestamp or move lastUsedAt backwards
+      const lastUsedAt = Math.min(usage.lastUsedAt, now);
+      if (!apiKey.lastUsedAt || lastUsedAt > apiKey.lastUsedAt) {
+        await ctx.db.patch(apiKey._id, { lastUsedAt });
+      }
+    }
 
-    // B7 FIX: Include subscription status for API access level checks
-    const org = await ctx.db.get(apiKey.organizationId);
-    const subscriptionStatus = org?.subscriptionStatus ?? "active";
-    const accessLevel = org?.accessLevel ?? "full";
-
-    return {
-      valid: true,
-      organizationId: apiKey.organizationId as string,
-      permissions: apiKey.permissions,
-      keyId: apiKey._id as string,
-      createdBy: apiKey.createdBy as string,
-      subscriptionStatus,
-      accessLevel,
-    };
+    return { invalid };
   },
 });
@@ -1,7 +1,15 @@
 import { v } from "convex/values";
 import { query, mutation } from "./_generated/server";
-import { Id } from "./_generated/dataModel";
+import { stream, QueryStream } from "convex-helpers/server/stream";
+import schema from "./schema";
+import { DataModel, Doc, Id } from "./_generated/dataModel";
 import { findOrCreateThread } from "./lib/threadingEngine";
+import { filterSignature, encodeApiCursor, decodeApiCursor } from "./lib/apiCursor";
+import { syncCalendarIndex } from "./calendarIndex";
+import { trackOrgStats } from "./orgStats";
+import { enforcePlanLimit } from "./authHelpers";
+import { cursorPaginationArgs } from "./paginationHelpers";
+import { applyThreadSummaryChange } from "./communications";
 
 /**
  * REST API Query & Mutation Module - Sprint 7
@@ -12,10 +20,31 @@ import { findOrCreateThread } from "./lib/threadingEngine";
  * Convex fields like `_creationTime`.
  *
  * All queries scope data by organizationId for full tenant isolation.
- * Results are capped at 100 records per request by default.
+ * Results are capped at 100 records per request by default. List endpoints
+ * for participants, maintenance, incidents, communications and threads are
+ * cursor-paginated (convex-helpers streams, so non-index filters still fill
+ * the page) and accept `updatedSince` for incremental sync.
  */
 
 const MAX_RESULTS = 100;
+// Rows a list request reads while looking for filter matches. A page comes
+// back short (with hasMore) only once this many rows have been scanned.
+const MAX_ROWS_SCANNED = 2000;
+
+/**
+ * Continuation fields shared by the paginated list endpoints.
+ * `nextCursor` is an opaque token to pass back as `cursor`; it is null on
+ * the last page.
+ */
+function pageInfo(
+  result: { isDone: boolean; continueCursor: string },
+  signature: string
+): { nextCursor: string | null; hasMore: boolean } {
+  return {
+    nextCursor: result.isDone ? null : encodeApiCursor(result.continueCursor, signature),
+    hasMore: !result.isDone,
+  };
+}
 
 // ============================================================================
 // PROPERTIES
@@ -117,6 +146,7 @@ export const createProperty = mutation({
   },
   handler: async (ctx, args) => {
     const { organizationId, ...propertyData } = args;
+    await enforcePlanLimit(ctx, organizationId, "properties");
     const now = Date.now();
 
     const propertyId = await ctx.db.insert("properties", {
@@ -126,6 +156,7 @@ export const createProperty = mutation({
       createdAt: now,
       updatedAt: now,
     });
+    await trackOrgStats(ctx, "properties", propertyId, null);
 
     return { id: propertyId };
   },
@@ -136,65 +167,96 @@ export const createProperty = mutation({
 // ============================================================================
 
 /**
- * List participants for an organization.
- * Supports optional status and search filters.
+ * List participants for an organization, one page at a time.
+ * Supports optional status, search, and updatedSince filters. Status and
+ * updatedSince are index-backed; search is applied while reading, so a page
+ * holds `limit` matches unless MAX_ROWS_SCANNED rows were read first.
  */
 export const listParticipants = query({
   args: {
     organizationId: v.id("organizations"),
     status: v.optional(v.string()),
     search: v.optional(v.string()),
-    limit: v.optional(v.number()),
+    updatedSince: v.optional(v.number()), // Only records updated after this time (ms)
+    ...cursorPaginationArgs, // cursor: opaque token from the previous page's nextCursor
   },
   handler: async (ctx, args) => {
     const limit = Math.min(args.limit ?? MAX_RESULTS, MAX_RESULTS);
+    const signature = filterSignature({
+      status: args.status,
+      search: args.search,
+      updatedSince: args.updatedSince,
+    });
 
-    let participants = await ctx.db
-      .query("participants")
-      .withIndex("by_organizationId", (q) =>
-        q.eq("organizationId", args.organizationId)
-      )
-      .collect();
-
-    // Filter by status
-    if (args.status) {
-      participants = participants.filter((p) => p.status === args.status);
+    // Pick the narrowest index for the filters given
+    let baseQuery: QueryStream<DataModel, "participants">;
+    if (args.updatedSince !== undefined) {
+      const updatedSince = args.updatedSince;
+      baseQuery = stream(ctx.db, schema)
+        .query("participants")
+        .withIndex("by_organizationId_updatedAt", (q) =>
+          q.eq("organizationId", args.organizationId).gt("updatedAt", updatedSince)
+        );
+      if (args.status) {
+        const status = args.status;
+        baseQuery = baseQuery.filterWith(async (doc) => doc.status === status);
+      }
+    } else if (args.status) {
+      const status = args.status as Doc<"participants">["status"];
+      baseQuery = stream(ctx.db, schema)
+        .query("participants")
+        .withIndex("by_organizationId_status", (q) =>
+          q.eq("organizationId", args.organizationId).eq("status", status)
+        );
+    } else {
+      baseQuery = stream(ctx.db, schema)
+        .query("participants")
+        .withIndex("by_organizationId", (q) =>
+          q.eq("organizationId", args.organizationId)
+        );
     }
 
     // Filter by search (name or NDIS number)
     if (args.search) {
       const searchLower = args.search.toLowerCase();
-      participants = participants.filter(
-        (p) =>
+      baseQuery = baseQuery.filterWith(
+        async (p) =>
           p.firstName.toLowerCase().includes(searchLower) ||
           p.lastName.toLowerCase().includes(searchLower) ||
           p.ndisNumber.toLowerCase().includes(searchLower)
       );
     }
 
-    // Cap results
-    participants = participants.slice(0, limit);
-
-    return participants.map((p) => ({
-      id: p._id,
-      ndisNumber: p.ndisNumber,
-      firstName: p.firstName,
-      lastName: p.lastName,
-      dateOfBirth: p.dateOfBirth ?? null,
-      email: p.email ?? null,
-      phone: p.phone ?? null,
-      dwellingId: p.dwellingId,
-      moveInDate: p.moveInDate ?? null,
-      moveOutDate: p.moveOutDate ?? null,
-      status: p.status,
-      silProviderName: p.silProviderName ?? null,
-      supportCoordinatorName: p.supportCoordinatorName ?? null,
-      supportCoordinatorEmail: p.supportCoordinatorEmail ?? null,
-      supportCoordinatorPhone: p.supportCoordinatorPhone ?? null,
-      notes: p.notes ?? null,
-      createdAt: p.createdAt,
-      updatedAt: p.updatedAt,
-    }));
+    const result = await baseQuery.paginate({
+      numItems: limit,
+      cursor: decodeApiCursor(args.cursor, signature),
+      maximumRowsRead: MAX_ROWS_SCANNED,
+    });
+    const participants = result.page;
+
+    return {
+      items: participants.map((p) => ({
+        id: p._id,
+        ndisNumber: p.ndisNumber,
+        firstName: p.firstName,
+        lastName: p.lastName,
+        dateOfBirth: p.dateOfBirth ?? null,
+        email: p.email ?? null,
+        phone: p.phone ?? null,
+        dwellingId: p.dwellingId,
+        moveInDate: p.moveInDate ?? null,
+        moveOutDate: p.moveOutDate ?? null,
+        status: p.status,
+        silProviderName: p.silProviderName ?? null,
+        supportCoordinatorName: p.supportCoordinatorName ?? null,
+        supportCoordinatorEmail: p.supportCoordinatorEmail ?? null,
+        supportCoordinatorPhone: p.supportCoordinatorPhone ?? null,
+        notes: p.notes ?? null,
+        createdAt: p.createdAt,
+        updatedAt: p.updatedAt,
+      })),
+      ...pageInfo(result, signature),
+    };
   },
 });
 
@@ -242,6 +304,7 @@ export const createParticipant = mutation({
       createdAt: now,
       updatedAt: now,
     });
+    await trackOrgStats(ctx, "participants", participantId, null);
 
     return { id: participantId };
   },
@@ -252,8 +315,10 @@ export const createParticipant = mutation({
 // ============================================================================
 
 /**
- * List maintenance requests for an organization.
- * Supports optional status, priority, and search filters.
+ * List maintenance requests for an organization, one page at a time.
+ * Supports optional status, priority, search, and updatedSince filters.
+ * Status and updatedSince are index-backed; priority and search are applied
+ * while reading (see listParticipants).
  */
 export const listMaintenanceRequests = query({
   args: {
@@ -261,64 +326,94 @@ export const listMaintenanceRequests = query({
     status: v.optional(v.string()),
     priority: v.optional(v.string()),
     search: v.optional(v.string()),
-    limit: v.optional(v.number()),
+    updatedSince: v.optional(v.number()), // Only records updated after this time (ms)
+    ...cursorPaginationArgs, // cursor: opaque token from the previous page's nextCursor
   },
   handler: async (ctx, args) => {
     const limit = Math.min(args.limit ?? MAX_RESULTS, MAX_RESULTS);
+    const signature = filterSignature({
+      status: args.status,
+      priority: args.priority,
+      search: args.search,
+      updatedSince: args.updatedSince,
+    });
 
-    let requests = await ctx.db
-      .query("maintenanceRequests")
-      .withIndex("by_organizationId", (q) =>
-        q.eq("organizationId", args.organizationId)
-      )
-      .collect();
-
-    // Filter by status
-    if (args.status) {
-      requests = requests.filter((r) => r.status === args.status);
+    let baseQuery: QueryStream<DataModel, "maintenanceRequests">;
+    if (args.updatedSince !== undefined) {
+      const updatedSince = args.updatedSince;
+      baseQuery = stream(ctx.db, schema)
+        .query("maintenanceRequests")
+        .withIndex("by_organizationId_updatedAt", (q) =>
+          q.eq("organizationId", args.organizationId).gt("updatedAt", updatedSince)
+        );
+      if (args.status) {
+        const status = args.status;
+        baseQuery = baseQuery.filterWith(async (doc) => doc.status === status);
+      }
+    } else if (args.status) {
+      const status = args.status as Doc<"maintenanceRequests">["status"];
+      baseQuery = stream(ctx.db, schema)
+        .query("maintenanceRequests")
+        .withIndex("by_organizationId_status", (q) =>
+          q.eq("organizationId", args.organizationId).eq("status", status)
+        );
+    } else {
+      baseQuery = stream(ctx.db, schema)
+        .query("maintenanceRequests")
+        .withIndex("by_organizationId", (q) =>
+          q.eq("organizationId", args.organizationId)
+        );
     }
 
     // Filter by priority
     if (args.priority) {
-      requests = requests.filter((r) => r.priority === args.priority);
+      const priority = args.priority;
+      baseQuery = baseQuery.filterWith(async (doc) => doc.priority === priority);
     }
 
     // Filter by search (title or description)
     if (args.search) {
       const searchLower = args.search.toLowerCase();
-      requests = requests.filter(
-        (r) =>
+      baseQuery = baseQuery.filterWith(
+        async (r) =>
           r.title.toLowerCase().includes(searchLower) ||
           r.description.toLowerCase().includes(searchLower)
       );
     }
 
-    // Cap results
-    requests = requests.slice(0, limit);
-
-    return requests.map((r) => ({
-      id: r._id,
-      dwellingId: r.dwellingId,
-      requestType: r.requestType,
-      category: r.category,
-      priority: r.priority,
-      title: r.title,
-      description: r.description,
-      reportedBy: r.reportedBy ?? null,
-      reportedDate: r.reportedDate,
-      status: r.status,
-      scheduledDate: r.scheduledDate ?? null,
-      completedDate: r.completedDate ?? null,
-      contractorName: r.contractorName ?? null,
-      assignedContractorId: r.assignedContractorId ?? null,
-      quotedAmount: r.quotedAmount ?? null,
-      actualCost: r.actualCost ?? null,
-      invoiceNumber: r.invoiceNumber ?? null,
-      notes: r.notes ?? null,
-      createdBy: r.createdBy,
-      createdAt: r.createdAt,
-      updatedAt: r.updatedAt,
-    }));
+    const result = await baseQuery.paginate({
+      numItems: limit,
+      cursor: decodeApiCursor(args.cursor, signature),
+      maximumRowsRead: MAX_ROWS_SCANNED,
+    });
+    const requests = result.page;
+
+    return {
+      items: requests.map((r) => ({
+        id: r._id,
+        dwellingId: r.dwellingId,
+        requestType: r.requestType,
+        category: r.category,
+        priority: r.priority,
+        title: r.title,
+        description: r.description,
+        reportedBy: r.reportedBy ?? null,
+        reportedDate: r.reportedDate,
+        status: r.status,
+        scheduledDate: r.scheduledDate ?? null,
+        completedDate: r.completedDate ?? null,
+        contractorName: r.contractorName ?? null,
+        assignedContractorId: r.assignedContractorId ?? null,
+        quotedAmount: r.quotedAmount ?? null,
+        actualCost: r.actualCost ?? null,
+        invoiceNumber: r.invoiceNumber ?? null,
+        notes: r.notes ?? null,
+        createdBy: r.createdBy,
+        createdAt: r.createdAt,
+        updatedAt: r.updatedAt,
+      })),
+      ...pageInfo(result, signature),
+    };
   },
 });
 
@@ -376,6 +471,8 @@ export const createMaintenanceRequest = mutation({
       createdAt: now,
       updatedAt: now,
     });
+    await trackOrgStats(ctx, "maintenanceRequests", requestId, null);
+    await syncCalendarIndex(ctx, "maintenanceRequests", requestId);
 
     return { id: requestId };
   },
@@ -386,8 +483,10 @@ export const createMaintenanceRequest = mutation({
 // ============================================================================
 
 /**
- * List incidents for an organization.
- * Supports optional status, severity, and search filters.
+ * List incidents for an organization, one page at a time.
+ * Supports optional status, severity, search, and updatedSince filters.
+ * Status and updatedSince are index-backed; severity and search are applied
+ * while reading (see listParticipants).
  */
 export const listIncidents = query({
   args: {
@@ -395,64 +494,94 @@ export const listIncidents = query({
     status: v.optional(v.string()),
     severity: v.optional(v.string()),
     search: v.optional(v.string()),
-    limit: v.optional(v.number()),
+    updatedSince: v.optional(v.number()), // Only records updated after this time (ms)
+    ...cursorPaginationArgs, // cursor: opaque token from the previous page's nextCursor
   },
   handler: async (ctx, args) => {
     const limit = Math.min(args.limit ?? MAX_RESULTS, MAX_RESULTS);
+    const signature = filterSignature({
+      status: args.status,
+      severity: args.severity,
+      search: args.search,
+      updatedSince: args.updatedSince,
+    });
 
-    let incidents = await ctx.db
-      .query("incidents")
-      .withIndex("by_organizationId", (q) =>
-        q.eq("organizationId", args.organizationId)
-      )
-      .collect();
-
-    // Filter by status
-    if (args.status) {
-      incidents = incidents.filter((i) => i.status === args.status);
+    let baseQuery: QueryStream<DataModel, "incidents">;
+    if (args.updatedSince !== undefined) {
+      const updatedSince = args.updatedSince;
+      baseQuery = stream(ctx.db, schema)
+        .query("incidents")
+        .withIndex("by_organizationId_updatedAt", (q) =>
+          q.eq("organizationId", args.organizationId).gt("updatedAt", updatedSince)
+        );
+      if (args.status) {
+        const status = args.status;
+        baseQuery = baseQuery.filterWith(async (doc) => doc.status === status);
+      }
+    } else if (args.status) {
+      const status = args.status as Doc<"incidents">["status"];
+      baseQuery = stream(ctx.db, schema)
+        .query("incidents")
+        .withIndex("by_organizationId_status", (q) =>
+          q.eq("organizationId", args.organizationId).eq("status", status)
+        );
+    } else {
+      baseQuery = stream(ctx.db, schema)
+        .query("incidents")
+        .withIndex("by_organizationId", (q) =>
+          q.eq("organizationId", args.organizationId)
+        );
     }
 
     // Filter by severity
     if (args.severity) {
-      incidents = incidents.filter((i) => i.severity === args.severity);
+      const severity = args.severity;
+      baseQuery = baseQuery.filterWith(async (doc) => doc.severity === severity);
     }
 
     // Filter by search (title or description)
     if (args.search) {
       const searchLower = args.search.toLowerCase();
-      incidents = incidents.filter(
-        (i) =>
+      baseQuery = baseQuery.filterWith(
+        async (i) =>
           i.title.toLowerCase().includes(searchLower) ||
           i.description.toLowerCase().includes(searchLower)
       );
     }
 
-    // Cap results
-    incidents = incidents.slice(0, limit);
-
-    return incidents.map((i) => ({
-      id: i._id,
-      propertyId: i.propertyId,
-      dwellingId: i.dwellingId ?? null,
-      participantId: i.participantId ?? null,
-      incidentType: i.incidentType,
-      severity: i.severity,
-      isNdisReportable: i.isNdisReportable ?? false,
-      ndisNotificationTimeframe: i.ndisNotificationTimeframe ?? null,
-      ndisCommissionNotified: i.ndisCommissionNotified ?? false,
-      ndisNotificationDueDate: i.ndisNotificationDueDate ?? null,
-      title: i.title,
-      description: i.description,
-      incidentDate: i.incidentDate,
-      incidentTime: i.incidentTime ?? null,
-      location: i.location ?? null,
-      followUpRequired: i.followUpRequired,
-      status: i.status,
-      reportedBy: i.reportedBy,
-      notes: i.followUpNotes ?? null,
-      createdAt: i.createdAt,
-      updatedAt: i.updatedAt,
-    }));
+    const result = await baseQuery.paginate({
+      numItems: limit,
+      cursor: decodeApiCursor(args.cursor, signature),
+      maximumRowsRead: MAX_ROWS_SCANNED,
+    });
+    const incidents = result.page;
+
+    return {
+      items: incidents.map((i) => ({
+        id: i._id,
+        propertyId: i.propertyId,
+        dwellingId: i.dwellingId ?? null,
+        participantId: i.participantId ?? null,
+        incidentType: i.incidentType,
+        severity: i.severity,
+        isNdisReportable: i.isNdisReportable ?? false,
+        ndisNotificationTimeframe: i.ndisNotificationTimeframe ?? null,
+        ndisCommissionNotified: i.ndisCommissionNotified ?? false,
+        ndisNotificationDueDate: i.ndisNotificationDueDate ?? null,
+        title: i.title,
+        description: i.description,
+        incidentDate: i.incidentDate,
+        incidentTime: i.incidentTime ?? null,
+        location: i.location ?? null,
+        followUpRequired: i.followUpRequired,
+        status: i.status,
+        reportedBy: i.reportedBy,
+        notes: i.followUpNotes ?? null,
+        createdAt: i.createdAt,
+        updatedAt: i.updatedAt,
+      })),
+      ...pageInfo(result, signature),
+    };
   },
 });
 
@@ -520,6 +649,7 @@ export const createIncident = mutation({
       createdAt: now,
       updatedAt: now,
     });
+    await trackOrgStats(ctx, "incidents", incidentId, null);
 
     return { id: incidentId };
   },
@@ -641,13 +771,22 @@ export const createCommunication = mutation({
       updatedAt: now,
     });
 
+    // Keep the thread summary current so findThreads sees this message
+    await applyThreadSummaryChange(ctx, threadId, null, await ctx.db.get(communicationId));
+
     return { communicationId, threadId };
   },
 });
 
 /**
- * List communications for an organization via REST API.
- * Supports contactType, contactName, and search filters.
+ * List communications for an organization via REST API, one page at a time.
+ * Supports contactType, date range, updatedSince, contactName, and search
+ * filters. contactType, date range and updatedSince are index-backed;
+ * contactName and search are applied while reading (see listParticipants).
+ *
+ * With updatedSince, results are ordered oldest change first and include
+ * soft-deleted communications as `isDeleted: true` so sync clients can
+ * remove them. Otherwise deleted communications are excluded.
  */
 export const listCommunications = query({
   args: {
@@ -655,148 +794,191 @@ export const listCommunications = query({
     contactType: v.optional(v.string()),
     contactName: v.optional(v.string()),
     search: v.optional(v.string()),
-    limit: v.optional(v.number()),
+    dateFrom: v.optional(v.string()), // YYYY-MM-DD inclusive
+    dateTo: v.optional(v.string()), // YYYY-MM-DD inclusive
+    updatedSince: v.optional(v.number()), // Only records updated after this time (ms)
+    ...cursorPaginationArgs, // cursor: opaque token from the previous page's nextCursor
   },
   handler: async (ctx, args) => {
     const limit = Math.min(args.limit ?? MAX_RESULTS, MAX_RESULTS);
+    const signature = filterSignature({
+      contactType: args.contactType,
+      contactName: args.contactName,
+      search: args.search,
+      dateFrom: args.dateFrom,
+      dateTo: args.dateTo,
+      updatedSince: args.updatedSince,
+    });
+    const { dateFrom, dateTo } = args;
 
-    let comms = await ctx.db
-      .query("communications")
-      .withIndex("by_organizationId", (q) =>
-        q.eq("organizationId", args.organizationId)
-      )
-      .order("desc")
-      .collect();
-
-    // Exclude soft-deleted
-    comms = comms.filter((c) => c.isDeleted !== true);
-
-    if (args.contactType) {
-      comms = comms.filter((c) => c.contactType === args.contactType);
+    let baseQuery: QueryStream<DataModel, "communications">;
+    if (args.updatedSince !== undefined) {
+      const updatedSince = args.updatedSince;
+      baseQuery = stream(ctx.db, schema)
+        .query("communications")
+        .withIndex("by_organizationId_updatedAt", (q) =>
+          q.eq("organizationId", args.organizationId).gt("updatedAt", updatedSince)
+        );
+      if (args.contactType) {
+        const contactType = args.contactType;
+        baseQuery = baseQuery.filterWith(async (doc) => doc.contactType === contactType);
+      }
+      if (dateFrom) {
+        baseQuery = baseQuery.filterWith(async (c) => c.communicationDate >= dateFrom);
+      }
+      if (dateTo) {
+        baseQuery = baseQuery.filterWith(async (c) => c.communicationDate <= dateTo);
+      }
+    } else {
+      if (args.contactType) {
+        const contactType = args.contactType as Doc<"communications">["contactType"];
+        baseQuery = stream(ctx.db, schema)
+          .query("communications")
+          .withIndex("by_organizationId_contactType_date", (q) => {
+            const eq = q.eq("organizationId", args.organizationId).eq("contactType", contactType);
+            if (dateFrom && dateTo) return eq.gte("communicationDate", dateFrom).lte("communicationDate", dateTo);
+            if (dateFrom) return eq.gte("communicationDate", dateFrom);
+            if (dateTo) return eq.lte("communicationDate", dateTo);
+            return eq;
+          })
+          .order("desc");
+      } else if (dateFrom || dateTo) {
+        baseQuery = stream(ctx.db, schema)
+          .query("communications")
+          .withIndex("by_organizationId_date", (q) => {
+            const eq = q.eq("organizationId", args.organizationId);
+            if (dateFrom && dateTo) return eq.gte("communicationDate", dateFrom).lte("communicationDate", dateTo);
+            if (dateFrom) return eq.gte("communicationDate", dateFrom);
+            return eq.lte("communicationDate", dateTo!);
+          })
+          .order("desc");
+      } else {
+        baseQuery = stream(ctx.db, schema)
+          .query("communications")
+          .withIndex("by_organizationId", (q) =>
+            q.eq("organizationId", args.organizationId)
+          )
+          .order("desc");
+      }
+      // Exclude soft-deleted
+      baseQuery = baseQuery.filterWith(async (c) => c.isDeleted !== true);
     }
 
     if (args.contactName) {
       const nameLower = args.contactName.toLowerCase();
-      comms = comms.filter((c) =>
+      baseQuery = baseQuery.filterWith(async (c) =>
         c.contactName.toLowerCase().includes(nameLower)
       );
     }
 
     if (args.search) {
       const searchLower = args.search.toLowerCase();
-      comms = comms.filter(
-        (c) =>
+      baseQuery = baseQuery.filterWith(
+        async (c) =>
           c.contactName.toLowerCase().includes(searchLower) ||
           (c.subject && c.subject.toLowerCase().includes(searchLower)) ||
           c.summary.toLowerCase().includes(searchLower)
       );
     }
 
-    comms = comms.slice(0, limit);
-
-    return comms.map((c) => ({
-      id: c._id,
-      communicationType: c.communicationType,
-      direction: c.direction,
-      communicationDate: c.communicationDate,
-      communicationTime: c.communicationTime ?? null,
-      contactType: c.contactType,
-      contactName: c.contactName,
-      contactEmail: c.contactEmail ?? null,
-      subject: c.subject ?? null,
-      summary: c.summary,
-      threadId: c.threadId ?? null,
-      linkedParticipantId: c.linkedParticipantId ?? null,
-      linkedPropertyId: c.linkedPropertyId ?? null,
-      createdBy: c.createdBy,
-      createdAt: c.createdAt,
-    }));
+    const result = await baseQuery.paginate({
+      numItems: limit,
+      cursor: decodeApiCursor(args.cursor, signature),
+      maximumRowsRead: MAX_ROWS_SCANNED,
+    });
+
+    return {
+      items: result.page.map((c) => ({
+        id: c._id,
+        communicationType: c.communicationType,
+        direction: c.direction,
+        communicationDate: c.communicationDate,
+        communicationTime: c.communicationTime ?? null,
+        contactType: c.contactType,
+        contactName: c.contactName,
+        contactEmail: c.contactEmail ?? null,
+        subject: c.subject ?? null,
+        summary: c.summary,
+        threadId: c.threadId ?? null,
+        linkedParticipantId: c.linkedParticipantId ?? null,
+        linkedPropertyId: c.linkedPropertyId ?? null,
+        isDeleted: c.isDeleted === true,
+        createdBy: c.createdBy,
+        createdAt: c.createdAt,
+        updatedAt: c.updatedAt,
+      })),
+      ...pageInfo(result, signature),
+    };
   },
 });
 
 /**
- * Find matching threads for the Outlook add-in.
- * Returns thread groups with subject, last activity, and message count.
+ * Find matching threads for the Outlook add-in, one page at a time.
+ * Reads the threadSummaries cache (most recent activity first) instead of
+ * grouping raw communications. contactName matches thread participant
+ * names; search also matches the subject and latest message preview.
+ * Filters are applied while reading (see listParticipants), so a search
+ * returns `limit` matches per page rather than a filtered slice.
+ * updatedSince returns only threads with activity after that time.
  */
 export const findThreads = query({
   args: {
     organizationId: v.id("organizations"),
     contactName: v.optional(v.string()),
     search: v.optional(v.string()),
-    limit: v.optional(v.number()),
+    updatedSince: v.optional(v.number()), // Only records updated after this time (ms)
+    ...cursorPaginationArgs, // cursor: opaque token from the previous page's nextCursor
   },
   handler: async (ctx, args) => {
     const limit = Math.min(args.limit ?? 20, 50);
+    const signature = filterSignature({
+      contactName: args.contactName,
+      search: args.search,
+      updatedSince: args.updatedSince,
+    });
+    const updatedSince = args.updatedSince;
 
-    let comms = await ctx.db
-      .query("communications")
-      .withIndex("by_organizationId", (q) =>
-        q.eq("organizationId", args.organizationId)
-      )
-      .order("desc")
-      .collect();
-
-    comms = comms.filter((c) => c.isDeleted !== true && c.threadId);
+    let threads: QueryStream<DataModel, "threadSummaries"> = stream(ctx.db, schema)
+      .query("threadSummaries")
+      .withIndex("by_organizationId_activity", (q) => {
+        const eq = q.eq("organizationId", args.organizationId);
+        return updatedSince !== undefined ? eq.gt("lastActivityAt", updatedSince) : eq;
+      })
+      .order("desc");
 
     if (args.contactName) {
       const nameLower = args.contactName.toLowerCase();
-      comms = comms.filter((c) =>
-        c.contactName.toLowerCase().includes(nameLower)
+      threads = threads.filterWith(async (t) =>
+        t.participantNames.some((n) => n.toLowerCase().includes(nameLower))
       );
     }
 
     if (args.search) {
       const searchLower = args.search.toLowerCase();
-      comms = comms.filter(
-        (c) =>
-          c.contactName.toLowerCase().includes(searchLower) ||
-          (c.subject && c.subject.toLowerCase().includes(searchLower)) ||
-          c.summary.toLowerCase().includes(searchLower)
+      threads = threads.filterWith(
+        async (t) =>
+          t.participantNames.some((n) => n.toLowerCase().includes(searchLower)) ||
+          t.subject.toLowerCase().includes(searchLower) ||
+          t.previewText.toLowerCase().includes(searchLower)
       );
     }
 
-    // Group by threadId
-    const threadMap = new Map<string, {
-      threadId: string;
-      subject: string | null;
-      contactNames: Set<string>;
-      lastActivityAt: number;
-      messageCount: number;
-    }>();
-
-    for (const c of comms) {
-      const tid = c.threadId!;
-      if (!threadMap.has(tid)) {
-        threadMap.set(tid, {
-          threadId: tid,
-          subject: c.subject ?? null,
-          contactNames: new Set([c.contactName]),
-          lastActivityAt: c.createdAt,
-          messageCount: 1,
-        });
-      } else {
-        const t = threadMap.get(tid)!;
-        t.contactNames.add(c.contactName);
-        t.messageCount++;
-        if (c.createdAt > t.lastActivityAt) {
-          t.lastActivityAt = c.createdAt;
-          if (c.subject) t.subject = c.subject;
-        }
-      }
-    }
+    const result = await threads.paginate({
+      numItems: limit,
+      cursor: decodeApiCursor(args.cursor, signature),
+      maximumRowsRead: MAX_ROWS_SCANNED,
+    });
 
-    // Sort by last activity, cap to limit
-    const threads = Array.from(threadMap.values())
-      .sort((a, b) => b.lastActivityAt - a.lastActivityAt)
-      .slice(0, limit);
-
-    return threads.map((t) => ({
-      threadId: t.threadId,
-      subject: t.subject,
-      participantNames: Array.from(t.contactNames),
-      lastActivityAt: t.lastActivityAt,
-      messageCount: t.messageCount,
-    }));
+    return {
+      items: result.page.map((t) => ({
+        threadId: t.threadId,
+        subject: t.subject,
+        participantNames: t.participantNames,
+        lastActivityAt: t.lastActivityAt,
+        messageCount: t.messageCount,
+      })),
+      ...pageInfo(result, signature),
+    };
   },
 });
 
@@ -6,6 +6,7 @@ import bcrypt from "bcryptjs";
 import { enforcePlanLimit, requireActiveSubscription } from "./authHelpers";
 import { requirePasswordComplexity } from "./lib/passwordValidation";
 import { assertValidEmail, assertValidPhone } from "./lib/validation";
+import { trackOrgStats, recordOrgLogin } from "./orgStats";
 
 // Secure password hashing using bcryptjs
 const SALT_ROUNDS = 12;
@@ -221,6 +222,7 @@ export const createUserInternal = internalMutation({
       createdAt: now,
       updatedAt: now,
     });
+    await trackOrgStats(ctx, "users", userId, null);
 
     // Audit log the user creation (if acting user is provided, i.e., not initial setup)
     if (args.actingUserId && args.actingUserEmail && args.actingUserName) {
@@ -399,9 +401,11 @@ export const processLogin = internalMutation({
     if (!user) throw new Error("User not found");
 
     // Update last login
+    const loginAt = Date.now();
     await ctx.db.patch(user._id, {
-      lastLogin: Date.now(),
+      lastLogin: loginAt,
     });
+    await recordOrgLogin(ctx, user.organizationId, loginAt);
 
     // Audit log the login
     await ctx.runMutation(internal.auditLog.log, {
@@ -569,6 +573,15 @@ export const updateUser = mutation({
 
     const { actingUserId, targetUserId, ...updates } = args;
 
+    // Reactivating a user takes a seat on the plan again
+    if (updates.isActive === true && !targetUser.isActive && targetUser.organizationId) {
+      await enforcePlanLimit(ctx, targetUser.organizationId, "users", {
+        userId: actingUser._id,
+        userEmail: actingUser.email,
+        userName: `${actingUser.firstName} ${actingUser.lastName}`,
+      });
+    }
+
     const filteredUpdates: Record<string, unknown> = { updatedAt: Date.now() };
     const changedFields: Record<string, { from: unknown; to: unknown }> = {};
 
@@ -586,6 +599,7 @@ export const updateUser = mutation({
     }
 
     await ctx.db.patch(targetUserId, filteredUpdates);
+    await trackOrgStats(ctx, "users", targetUserId, targetUser);
 
     // Audit log the update
     await ctx.runMutation(internal.auditLog.log, {
@@ -1030,6 +1044,7 @@ export const createSessionAndProcessLogin = internalMutation({
     await ctx.db.patch(user._id, {
       lastLogin: now,
     });
+    await recordOrgLogin(ctx, user.organizationId, now);
 
     // Audit log the login
     await ctx.runMutation(internal.auditLog.log, {
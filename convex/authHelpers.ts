@@ -1,6 +1,7 @@
 import { QueryCtx, MutationCtx, ActionCtx } from "./_generated/server";
 import { Id, Doc } from "./_generated/dataModel";
 import { internal } from "./_generated/api";
+import { getOrgStats } from "./orgStats";
 
 // Audit context for logging security events from helper functions.
 // Pass this from mutation handlers to enable audit trail logging.
@@ -163,22 +164,72 @@ export const rolePermissions: Record<UserRole, {
   },
 };
 
+export type PermissionResource = keyof typeof rolePermissions.admin;
+export type PermissionAction = "view" | "create" | "update" | "delete" | "export";
+
+// Flattened "resource:action" grants per role, built once at module load so
+// permission checks are a single Set lookup
+const permissionTable: Record<UserRole, ReadonlySet<string>> = Object.fromEntries(
+  (Object.entries(rolePermissions) as [UserRole, Record<string, Record<string, boolean>>][]).map(
+    ([role, resources]) => [
+      role,
+      new Set(
+        Object.entries(resources).flatMap(([resource, actions]) =>
+          Object.entries(actions)
+            .filter(([, allowed]) => allowed)
+            .map(([action]) => `${resource}:${action}`)
+        )
+      ),
+    ]
+  )
+) as Record<UserRole, ReadonlySet<string>>;
+
+// ============================================================================
+// PER-INVOCATION AUTH CONTEXT
+// ============================================================================
+
 /**
- * Validate that a userId corresponds to a real, active user with a valid organization.
- * This is the core identity validation function - all auth flows should go through this.
- *
- * Checks:
- * 1. User exists in the database
- * 2. User is active (not disabled/deactivated)
- * 3. User has an organizationId set (post-migration requirement)
- * 4. Organization exists and is active
- *
- * Returns the full validated user document for further checks.
+ * Everything the auth helpers know about the caller, resolved once per
+ * Convex function invocation.
  */
-export async function validateUserIdentity(
+export interface AuthContext {
+  user: Doc<"users">;
+  authUser: AuthenticatedUser;
+  organizationId: Id<"organizations">;
+  organization: Doc<"organizations">;
+  role: UserRole;
+  permissions: ReadonlySet<string>;
+}
+
+// Keyed on ctx.db, which is unique to each function invocation, so entries
+// are dropped with the invocation and never shared between callers
+const authContextCache = new WeakMap<object, Map<Id<"users">, Promise<AuthContext>>>();
+const organizationCache = new WeakMap<object, Map<Id<"organizations">, Promise<Doc<"organizations"> | null>>>();
+
+/**
+ * Read an organization at most once per invocation.
+ */
+async function getOrganization(
+  ctx: QueryCtx | MutationCtx,
+  organizationId: Id<"organizations">
+): Promise<Doc<"organizations"> | null> {
+  let cache = organizationCache.get(ctx.db);
+  if (!cache) {
+    cache = new Map();
+    organizationCache.set(ctx.db, cache);
+  }
+  let org = cache.get(organizationId);
+  if (!org) {
+    org = ctx.db.get(organizationId);
+    cache.set(organizationId, org);
+  }
+  return await org;
+}
+
+async function resolveAuthContext(
   ctx: QueryCtx | MutationCtx,
   userId: Id<"users">
-): Promise<Doc<"users">> {
+): Promise<AuthContext> {
   const user = await ctx.db.get(userId);
 
   if (!user) {
@@ -195,7 +246,7 @@ export async function validateUserIdentity(
   }
 
   // Verify the organization exists and is active
-  const org = await ctx.db.get(user.organizationId);
+  const org = await getOrganization(ctx, user.organizationId);
   if (!org) {
     throw new Error("Organization not found. Contact your administrator.");
   }
@@ -203,7 +254,92 @@ export async function validateUserIdentity(
     throw new Error("Organization has been deactivated. Contact support.");
   }
 
-  return user;
+  const role = user.role as UserRole;
+  return {
+    user,
+    authUser: {
+      _id: user._id,
+      email: user.email,
+      firstName: user.firstName,
+      lastName: user.lastName,
+      role,
+      isActive: user.isActive,
+    },
+    organizationId: user.organizationId,
+    organization: org,
+    role,
+    permissions: permissionTable[role] ?? new Set<string>(),
+  };
+}
+
+/**
+ * Resolve the caller's user, organization, role and permissions, validating
+ * them as validateUserIdentity does. The first call in an invocation reads
+ * the user and organization; later calls (requireAuth, requireTenant,
+ * requirePermission, requireActiveSubscription...) reuse the result.
+ *
+ * The context reflects the documents as first read. A mutation that changes
+ * the caller's own user or organization and then re-checks auth in the same
+ * invocation should read the documents directly.
+ *
+ * Usage:
+ * ```
+ * const auth = await getAuthContext(ctx, args.userId);
+ * if (auth.user.silProviderId) { ... }
+ * ```
+ */
+export async function getAuthContext(
+  ctx: QueryCtx | MutationCtx,
+  userId: Id<"users">
+): Promise<AuthContext> {
+  let cache = authContextCache.get(ctx.db);
+  if (!cache) {
+    cache = new Map();
+    authContextCache.set(ctx.db, cache);
+  }
+  let auth = cache.get(userId);
+  if (!auth) {
+    auth = resolveAuthContext(ctx, userId);
+    cache.set(userId, auth);
+  }
+  return await auth;
+}
+
+/**
+ * The caller's organization if getAuthContext already resolved it in this
+ * invocation, otherwise undefined. Never reads; for instrumentation that
+ * must not add reads of its own.
+ */
+export async function peekAuthOrganizationId(
+  ctx: QueryCtx | MutationCtx,
+  userId: string
+): Promise<Id<"organizations"> | undefined> {
+  const auth = authContextCache.get(ctx.db)?.get(userId as Id<"users">);
+  if (!auth) return undefined;
+  try {
+    return (await auth).organizationId;
+  } catch {
+    return undefined;
+  }
+}
+
+/**
+ * Validate that a userId corresponds to a real, active user with a valid organization.
+ * This is the core identity validation function - all auth flows should go through this.
+ *
+ * Checks:
+ * 1. User exists in the database
+ * 2. User is active (not disabled/deactivated)
+ * 3. User has an organizationId set (post-migration requirement)
+ * 4. Organization exists and is active
+ *
+ * Returns the full validated user document for further checks.
+ */
+export async function validateUserIdentity(
+  ctx: QueryCtx | MutationCtx,
+  userId: Id<"users">
+): Promise<Doc<"users">> {
+  return (await getAuthContext(ctx, userId)).user;
 }
 
 /**
@@ -213,16 +349,7 @@ export async function requireAuth(
   ctx: QueryCtx | MutationCtx,
   userId: Id<"users">
 ): Promise<AuthenticatedUser> {
-  const user = await validateUserIdentity(ctx, userId);
-
-  return {
-    _id: user._id,
-    email: user.email,
-    firstName: user.firstName,
-    lastName: user.lastName,
-    role: user.role as UserRole,
-    isActive: user.isActive,
-  };
+  return (await getAuthContext(ctx, userId)).authUser;
 }
 
 /**
@@ -246,27 +373,15 @@ export async function requireTenant(
   ctx: QueryCtx | MutationCtx,
   userId: Id<"users">
 ): Promise<{ organizationId: Id<"organizations">; user: AuthenticatedUser }> {
-  // validateUserIdentity (called inside requireAuth) already verifies:
+  // getAuthContext already verifies:
   // - user exists and is active
   // - user has an organizationId
   // - organization exists and is active
-  const user = await requireAuth(ctx, userId);
-
-  // Re-fetch user doc to get organizationId (requireAuth returns AuthenticatedUser without it)
-  const userDoc = await ctx.db.get(userId);
-  if (!userDoc) {
-    throw new Error("User not found");
-  }
-
-  // SECURITY: organizationId is now mandatory (migration complete).
-  // validateUserIdentity already checked this, but double-check here for defense-in-depth.
-  if (!userDoc.organizationId) {
-    throw new Error("Account configuration error. No organization assigned. Contact your administrator.");
-  }
+  const auth = await getAuthContext(ctx, userId);
 
   return {
-    organizationId: userDoc.organizationId,
-    user,
+    organizationId: auth.organizationId,
+    user: auth.authUser,
   };
 }
 
@@ -290,9 +405,53 @@ const PLAN_LIMITS: Record<PlanTier, PlanConfig> = {
 
 type PlanResource = "properties" | "users" | "dwellings";
 
+// organizationStats counter holding each resource's active count
+const PLAN_RESOURCE_COUNTERS = {
+  properties: "activePropertyCount",
+  dwellings: "activeDwellingCount",
+  users: "activeUserCount",
+} as const;
+
+/**
+ * Count an organization's active resources from source. Only used before the
+ * organization's first tracked write has created its organizationStats row.
+ */
+async function countActiveResources(
+  ctx: QueryCtx | MutationCtx,
+  organizationId: Id<"organizations">,
+  resource: PlanResource
+): Promise<number> {
+  switch (resource) {
+    case "properties": {
+      const items = await ctx.db
+        .query("properties")
+        .withIndex("by_organizationId", (q) => q.eq("organizationId", organizationId))
+        .collect();
+      return items.filter((p) => p.isActive).length;
+    }
+    case "dwellings": {
+      const items = await ctx.db
+        .query("dwellings")
+        .withIndex("by_organizationId", (q) => q.eq("organizationId", organizationId))
+        .collect();
+      return items.filter((d) => d.isActive).length;
+    }
+    case "users": {
+      const items = await ctx.db
+        .query("users")
+        .withIndex("by_organizationId", (q) => q.eq("organizationId", organizationId))
+        .collect();
+      return items.filter((u) => u.isActive).length;
+    }
+  }
+}
+
 /**
  * Enforce plan limits on resource creation (B2 FIX).
- * Checks the organization's plan tier and counts existing resources.
+ * Checks the organization's plan tier against its active-resource counters
+ * (organizationStats, kept current by trackOrgStats and repaired nightly),
+ * so a check is a single document read however large the organization is.
+ * Pass `count` to reserve capacity for a whole batch before inserting it.
  * Throws a clear, actionable error if the limit would be exceeded.
  * When auditUser is provided, logs plan_limit_exceeded to the audit trail.
  *
@@ -300,13 +459,17 @@ type PlanResource = "properties" | "users" | "dwellings";
  * ```
  * await enforcePlanLimit(ctx, organizationId, "properties", { userId: user._id, userEmail: user.email, userName: `${user.firstName} ${user.lastName}` });
  * // ... then proceed with insert
+ *
+ * await enforcePlanLimit(ctx, organizationId, "dwellings", auditUser, args.dwellings.length);
+ * // ... then insert the batch
  * ```
  */
 export async function enforcePlanLimit(
   ctx: QueryCtx | MutationCtx,
   organizationId: Id<"organizations">,
   resource: PlanResource,
-  auditUser?: AuditUserContext
+  auditUser?: AuditUserContext,
+  count = 1
 ): Promise<void> {
   // Defense-in-depth: requireTenant() now throws on missing orgId (B6 fix),
   // but guard here too in case this helper is called from a context that
@@ -315,7 +478,7 @@ export async function enforcePlanLimit(
     return;
   }
 
-  const org = await ctx.db.get(organizationId);
+  const org = await getOrganization(ctx, organizationId);
   if (!org) {
     throw new Error("Organization not found. Cannot verify plan limits.");
   }
@@ -328,45 +491,18 @@ export async function enforcePlanLimit(
     return;
   }
 
-  // Count current resources for this organization
-  let currentCount: number;
-  let limit: number;
-  let resourceLabel: string;
-
-  switch (resource) {
-    case "properties": {
-      const items = await ctx.db
-        .query("properties")
-        .withIndex("by_organizationId", (q) => q.eq("organizationId", organizationId))
-        .collect();
-      currentCount = items.filter((p) => p.isActive).length;
-      limit = limits.maxProperties;
-      resourceLabel = "properties";
-      break;
-    }
-    case "dwellings": {
-      const items = await ctx.db
-        .query("dwellings")
-        .withIndex("by_organizationId", (q) => q.eq("organizationId", organizationId))
-        .collect();
-      currentCount = items.filter((d) => d.isActive).length;
-      limit = limits.maxDwellings;
-      resourceLabel = "dwellings";
-      break;
-    }
-    case "users": {
-      const items = await ctx.db
-        .query("users")
-        .withIndex("by_organizationId", (q) => q.eq("organizationId", organizationId))
-        .collect();
-      currentCount = items.filter((u) => u.isActive).length;
-      limit = limits.maxUsers;
-      resourceLabel = "users";
-      break;
-    }
-  }
-
-  if (currentCount >= limit) {
+  // Read the active-resource counter for this organization
+  const stats = await getOrgStats(ctx, organizationId);
+  const currentCount = stats
+    ? stats[PLAN_RESOURCE_COUNTERS[resource]]
+    : await countActiveResources(ctx, organizationId, resource);
+  const limit = {
+    properties: limits.maxProperties,
+    dwellings: limits.maxDwellings,
+    users: limits.maxUsers,
+  }[resource];
+
+  if (currentCount + count > limit) {
     // Audit log: plan limit exceeded (before throwing)
     if (auditUser && isMutationCtx(ctx)) {
       await ctx.scheduler.runAfter(0, internal.auditLog.log, {
@@ -379,6 +515,7 @@ export async function enforcePlanLimit(
         metadata: JSON.stringify({
           resourceType: resource,
           currentCount,
+          requested: count,
           limit,
           plan,
         }),
@@ -386,8 +523,9 @@ export async function enforcePlanLimit(
     }
 
     throw new Error(
-      `Plan limit reached: Your ${plan} plan allows ${limit} ${resourceLabel}. ` +
-      `You currently have ${currentCount}. Please upgrade your plan to add more.`
+      `Plan limit reached: Your ${plan} plan allows ${limit} ${resource}. ` +
+      `You currently have ${currentCount}${count > 1 ? ` and are adding ${count}` : ""}. ` +
+      `Please upgrade your plan to add more.`
     );
   }
 }
@@ -416,7 +554,7 @@ export async function requireActiveSubscription(
     return;
   }
 
-  const org = await ctx.db.get(organizationId);
+  const org = await getOrganization(ctx, organizationId);
   if (!org) {
     throw new Error("Organization not found. Cannot verify subscription status.");
   }
@@ -539,11 +677,10 @@ export async function requireAdmin(
  */
 export function hasPermission(
   role: UserRole,
-  resource: keyof typeof rolePermissions.admin,
-  action: "view" | "create" | "update" | "delete" | "export"
+  resource: PermissionResource,
+  action: PermissionAction
 ): boolean {
-  const permissions = rolePermissions[role][resource];
-  return (permissions as Record<string, boolean>)[action] ?? false;
+  return permissionTable[role]?.has(`${resource}:${action}`) ?? false;
 }
 
 /**
@@ -552,18 +689,18 @@ export function hasPermission(
 export async function requirePermission(
   ctx: QueryCtx | MutationCtx,
   userId: Id<"users">,
-  resource: keyof typeof rolePermissions.admin,
-  action: "view" | "create" | "update" | "delete" | "export"
+  resource: PermissionResource,
+  action: PermissionAction
 ): Promise<AuthenticatedUser> {
-  const user = await requireAuth(ctx, userId);
+  const auth = await getAuthContext(ctx, userId);
 
-  if (!hasPermission(user.role, resource, action)) {
+  if (!auth.permissions.has(`${resource}:${action}`)) {
     throw new Error(
-      `Access denied. You don't have permission to ${action} ${resource}. Your role: ${user.role}`
+      `Access denied. You don't have permission to ${action} ${resource}. Your role: ${auth.role}`
     );
   }
 
-  return user;
+  return auth.authUser;
 }
 
 // Convenience functions for common permission checks
@@ -0,0 +1,479 @@
+import { internalMutation, MutationCtx } from "./_generated/server";
+import { v } from "convex/values";
+import { internal } from "./_generated/api";
+import { Id, Doc } from "./_generated/dataModel";
+
+// ============================================================================
+// UNIFIED CALENDAR INDEX
+// ============================================================================
+//
+// The calendar page used to collect ten whole org tables on every week/month
+// view and filter by date in JS. Instead, each owning mutation projects its
+// row into `calendarIndex` (one row per calendar day the entry is visible on),
+// so calendar.getCalendarEvents is a range read over
+// by_organizationId_date and costs only as much as the events on screen.
+//
+// Owning mutations call syncCalendarIndex() after every insert/patch/delete.
+// The projection re-reads the source document, so callers never pass fields
+// and a deleted or no-longer-visible row (completed task, received payment,
+// ...) simply removes its index rows. rebuildOrganization is the repair job.
+
+// Color mapping for calendar event types
+export const EVENT_COLORS: Record<string, string> = {
+  task: "#3b82f6",           // blue
+  maintenance: "#22c55e",     // green
+  preventative: "#14b8a6",    // teal
+  inspection: "#a855f7",      // purple
+  plan_expiry: "#ef4444",     // red
+  compliance: "#ef4444",      // red
+  cert_expiry: "#f97316",     // orange
+  doc_expiry: "#eab308",      // yellow
+  payment: "#10b981",         // emerald
+  appointment: "#0d9488",     // teal-600
+  external: "#6b7280",        // gray
+};
+
+// Source tables that feed the unified calendar
+export const CALENDAR_SOURCE_TABLES = [
+  "calendarEvents",
+  "tasks",
+  "maintenanceRequests",
+  "preventativeSchedule",
+  "inspections",
+  "participantPlans",
+  "complaints",
+  "complianceCertifications",
+  "documents",
+  "expectedPayments",
+] as const;
+
+export type CalendarSourceTable = (typeof CALENDAR_SOURCE_TABLES)[number];
+
+// Multi-day user events are bucketed onto every day they span. Longer entries
+// would write hundreds of index rows, so they get a single `longSpan` row on
+// their start day instead and getCalendarEvents reads those by overlap.
+export const MAX_SPAN_DAYS = 92;
+
+// A projected calendar entry, before it is bucketed into per-day index rows
+export interface CalendarIndexEntry {
+  entryKey: string; // Stable per-entry id (complaints emit `${id}_ack` / `${id}_res`)
+  startDate: string; // YYYY-MM-DD
+  endDate: string; // YYYY-MM-DD (same as startDate for all-day source rows)
+  title: string;
+  start: string;
+  end: string;
+  allDay: boolean;
+  eventType: string;
+  color: string;
+  propertyId?: Id<"properties">;
+  // Rows with no property of their own that the old feed showed under every
+  // property filter (plan expiries, org-wide certs/docs/payments)
+  matchesAllProperties?: boolean;
+  linkedEntityId: string | null;
+  linkedEntityType: string | null;
+  url: string | null;
+}
+
+/**
+ * Build an all-day entry for a single YYYY-MM-DD due date.
+ */
+function allDayEntry(
+  date: string,
+  fields: Omit<CalendarIndexEntry, "startDate" | "endDate" | "start" | "end" | "allDay">
+): CalendarIndexEntry {
+  const day = date.substring(0, 10);
+  return {
+    ...fields,
+    startDate: day,
+    endDate: day,
+    start: `${day}T00:00:00`,
+    end: `${day}T23:59:59`,
+    allDay: true,
+  };
+}
+
+/**
+ * Enumerate YYYY-MM-DD days from startDate to endDate inclusive (capped).
+ */
+export function expandDays(startDate: string, endDate: string): string[] {
+  const first = new Date(`${startDate.substring(0, 10)}T00:00:00Z`);
+  const last = new Date(`${endDate.substring(0, 10)}T00:00:00Z`);
+  if (isNaN(first.getTime())) return [];
+  if (isNaN(last.getTime()) || last < first) return [startDate.substring(0, 10)];
+
+  const days: string[] = [];
+  const cursor = new Date(first);
+  while (cursor <= last && days.length < MAX_SPAN_DAYS) {
+    days.push(cursor.toISOString().substring(0, 10));
+    cursor.setUTCDate(cursor.getUTCDate() + 1);
+  }
+  return days;
+}
+
+/**
+ * Project a source document into the calendar entries it should show as.
+ * Mirrors the visibility rules the old getCalendarEvents applied in JS.
+ */
+async function projectEntries(
+  ctx: MutationCtx,
+  sourceTable: CalendarSourceTable,
+  doc: Doc<CalendarSourceTable>
+): Promise<CalendarIndexEntry[]> {
+  switch (sourceTable) {
+    case "calendarEvents": {
+      const ce = doc as Doc<"calendarEvents">;
+      if (ce.isDeleted === true) return [];
+      const eventType = ce.eventType as string;
+      return [{
+        entryKey: ce._id as string,
+        startDate: ce.startTime.substring(0, 10),
+        endDate: ce.endTime.substring(0, 10),
+        title: ce.title,
+        start: ce.startTime,
+        end: ce.endTime,
+        allDay: ce.allDay,
+        eventType,
+        color: ce.color || EVENT_COLORS[eventType] || EVENT_COLORS.appointment,
+        propertyId: ce.linkedPropertyId,
+        linkedEntityId: ce._id as string,
+        linkedEntityType: "calendarEvent",
+        url: null,
+      }];
+    }
+
+    case "tasks": {
+      const task = doc as Doc<"tasks">;
+      if (task.status === "completed" || task.status === "cancelled") return [];
+      if (!task.dueDate) return [];
+      return [allDayEntry(task.dueDate, {
+        entryKey: task._id as string,
+        title: task.title,
+        eventType: "task",
+        color: EVENT_COLORS.task,
+        propertyId: task.linkedPropertyId,
+        linkedEntityId: task._id as string,
+        linkedEntityType: "task",
+        url: "/follow-ups",
+      })];
+    }
+
+    case "maintenanceRequests": {
+      const mr = doc as Doc<"maintenanceRequests">;
+      if (!mr.scheduledDate) return [];
+      if (mr.status === "completed" || mr.status === "cancelled") return [];
+      const dwelling = await ctx.db.get(mr.dwellingId);
+      return [allDayEntry(mr.scheduledDate, {
+        entryKey: mr._id as string,
+        title: `Maintenance: ${mr.title}`,
+        eventType: "maintenance",
+        color: EVENT_COLORS.maintenance,
+        propertyId: dwelling?.propertyId,
+        linkedEntityId: mr._id as string,
+        linkedEntityType: "maintenanceRequest",
+        url: `/operations/${mr._id as string}`,
+      })];
+    }
+
+    case "preventativeSchedule": {
+      const ps = doc as Doc<"preventativeSchedule">;
+      if (!ps.isActive) return [];
+      if (!ps.nextDueDate) return [];
+      return [allDayEntry(ps.nextDueDate, {
+        entryKey: ps._id as string,
+        title: `Preventative: ${ps.taskName}`,
+        eventType: "preventative",
+        color: EVENT_COLORS.preventative,
+        propertyId: ps.propertyId,
+        linkedEntityId: ps._id as string,
+        linkedEntityType: "preventativeSchedule",
+        url: "/preventative-schedule",
+      })];
+    }
+
+    case "inspections": {
+      const insp = doc as Doc<"inspections">;
+      if (insp.status === "completed" || insp.status === "cancelled") return [];
+      if (!insp.scheduledDate) return [];
+      return [allDayEntry(insp.scheduledDate, {
+        entryKey: insp._id as string,
+        title: `Inspection: ${insp.location || "Property Inspection"}`,
+        eventType: "inspection",
+        color: EVENT_COLORS.inspection,
+        propertyId: insp.propertyId,
+        linkedEntityId: insp._id as string,
+        linkedEntityType: "inspection",
+        url: `/inspections/${insp._id as string}`,
+      })];
+    }
+
+    case "participantPlans": {
+      const plan = doc as Doc<"participantPlans">;
+      if (plan.planStatus === "expired") return [];
+      if (!plan.planEndDate) return [];
+      // Plans don't have a direct propertyId, so they show under every property filter
+      return [allDayEntry(plan.planEndDate, {
+        entryKey: plan._id as string,
+        title: `Plan Expiry: Participant Plan`,
+        eventType: "plan_expiry",
+        color: EVENT_COLORS.plan_expiry,
+        matchesAllProperties: true,
+        linkedEntityId: plan.participantId as string,
+        linkedEntityType: "participant",
+        url: `/participants/${plan.participantId as string}`,
+      })];
+    }
+
+    case "complaints": {
+      const complaint = doc as Doc<"complaints">;
+      if (complaint.status === "closed" || complaint.status === "resolved") return [];
+      const entries: CalendarIndexEntry[] = [];
+
+      // Acknowledgment due date
+      if (complaint.acknowledgmentDueDate && complaint.status === "received") {
+        entries.push(allDayEntry(complaint.acknowledgmentDueDate, {
+          entryKey: `${complaint._id as string}_ack`,
+          title: `Complaint Ack Due: ${complaint.referenceNumber || "Complaint"}`,
+          eventType: "compliance",
+          color: EVENT_COLORS.compliance,
+          propertyId: complaint.propertyId,
+          linkedEntityId: complaint._id as string,
+          linkedEntityType: "complaint",
+          url: `/complaints/${complaint._id as string}`,
+        }));
+      }
+
+      // Resolution due date
+      if (complaint.resolutionDueDate) {
+        entries.push(allDayEntry(complaint.resolutionDueDate, {
+          entryKey: `${complaint._id as string}_res`,
+          title: `Complaint Resolution Due: ${complaint.referenceNumber || "Complaint"}`,
+          eventType: "compliance",
+          color: EVENT_COLORS.compliance,
+          propertyId: complaint.propertyId,
+          linkedEntityId: complaint._id as string,
+          linkedEntityType: "complaint",
+          url: `/complaints/${complaint._id as string}`,
+        }));
+      }
+      return entries;
+    }
+
+    case "complianceCertifications": {
+      const cert = doc as Doc<"complianceCertifications">;
+      if (cert.status === "expired") return [];
+      if (!cert.expiryDate) return [];
+      return [allDayEntry(cert.expiryDate, {
+        entryKey: cert._id as string,
+        title: `Cert Expiry: ${cert.certificationName}`,
+        eventType: "cert_expiry",
+        color: EVENT_COLORS.cert_expiry,
+        propertyId: cert.propertyId,
+        matchesAllProperties: !cert.propertyId,
+        linkedEntityId: cert._id as string,
+        linkedEntityType: "complianceCertification",
+        url: `/compliance/certifications/${cert._id as string}`,
+      })];
+    }
+
+    case "documents": {
+      const document = doc as Doc<"documents">;
+      if (!document.expiryDate) return [];
+      return [allDayEntry(document.expiryDate, {
+        entryKey: document._id as string,
+        title: `Doc Expiry: ${document.fileName}`,
+        eventType: "doc_expiry",
+        color: EVENT_COLORS.doc_expiry,
+        propertyId: document.linkedPropertyId,
+        matchesAllProperties: !document.linkedPropertyId,
+        linkedEntityId: document._id as string,
+        linkedEntityType: "document",
+        url: "/documents",
+      })];
+    }
+
+    case "expectedPayments": {
+      const ep = doc as Doc<"expectedPayments">;
+      if (ep.status === "received" || ep.status === "cancelled") return [];
+      if (!ep.expectedDate) return [];
+      return [allDayEntry(ep.expectedDate, {
+        entryKey: ep._id as string,
+        title: `Payment Due: $${ep.expectedAmount.toLocaleString()}`,
+        eventType: "payment",
+        color: EVENT_COLORS.payment,
+        propertyId: ep.propertyId,
+        matchesAllProperties: !ep.propertyId,
+        linkedEntityId: ep._id as string,
+        linkedEntityType: "expectedPayment",
+        url: "/payments",
+      })];
+    }
+  }
+}
+
+/**
+ * Write the projected entries for one source row, replacing whatever index
+ * rows it had before. Unchanged rows are left untouched so reactive calendar
+ * subscriptions are not invalidated by unrelated field edits.
+ */
+async function writeEntries(
+  ctx: MutationCtx,
+  organizationId: Id<"organizations"> | undefined,
+  sourceTable: CalendarSourceTable,
+  sourceId: string,
+  entries: CalendarIndexEntry[]
+): Promise<void> {
+  const existing = await ctx.db
+    .query("calendarIndex")
+    .withIndex("by_sourceId", (q) => q.eq("sourceId", sourceId))
+    .collect();
+
+  const desired = new Map<string, Omit<Doc<"calendarIndex">, "_id" | "_creationTime">>();
+  if (organizationId) {
+    for (const entry of entries) {
+      const { startDate, endDate, ...fields } = entry;
+      const days = expandDays(startDate, endDate);
+      // expandDays stops at MAX_SPAN_DAYS; anything longer is a long-span entry
+      const longSpan = days.length > 0 && days[days.length - 1] < endDate.substring(0, 10);
+      for (const date of longSpan ? [days[0]] : days) {
+        desired.set(`${entry.entryKey}|${date}`, {
+          ...fields,
+          ...(longSpan ? { longSpan: true } : {}),
+          organizationId,
+          sourceTable,
+          sourceId,
+          date,
+        });
+      }
+    }
+  }
+
+  for (const row of existing) {
+    const key = `${row.entryKey}|${row.date}`;
+    const next = desired.get(key);
+    if (!next) {
+      await ctx.db.delete(row._id);
+      continue;
+    }
+    desired.delete(key);
+    if (
+      row.title !== next.title ||
+      row.start !== next.start ||
+      row.end !== next.end ||
+      row.allDay !== next.allDay ||
+      row.eventType !== next.eventType ||
+      row.color !== next.color ||
+      row.propertyId !== next.propertyId ||
+      row.matchesAllProperties !== next.matchesAllProperties ||
+      row.linkedEntityId !== next.linkedEntityId ||
+      row.linkedEntityType !== next.linkedEntityType ||
+      row.url !== next.url ||
+      row.longSpan !== next.longSpan ||
+      row.organizationId !== next.organizationId
+    ) {
+      await ctx.db.replace(row._id, next);
+    }
+  }
+
+  for (const row of desired.values()) {
+    await ctx.db.insert("calendarIndex", row);
+  }
+}
+
+/**
+ * Re-project a single source row into the calendar index.
+ * Call from owning mutations after every insert, patch or delete of a row in
+ * one of CALENDAR_SOURCE_TABLES. Safe to call when nothing calendar-relevant
+ * changed (it becomes a single indexed read).
+ */
+export async function syncCalendarIndex<T extends CalendarSourceTable>(
+  ctx: MutationCtx,
+  sourceTable: T,
+  sourceId: Id<T>
+): Promise<void> {
+  const doc = (await ctx.db.get(sourceId)) as Doc<CalendarSourceTable> | null;
+  const entries = doc ? await projectEntries(ctx, sourceTable, doc) : [];
+  const organizationId = doc
+    ? (doc as { organizationId?: Id<"organizations"> }).organizationId
+    : undefined;
+  await writeEntries(ctx, organizationId, sourceTable, sourceId as string, entries);
+}
+
+// ============================================================================
+// REPAIR / BACKFILL
+// ============================================================================
+
+const sourceTableValidator = v.union(
+  v.literal("calendarEvents"), v.literal("tasks"), v.literal("maintenanceRequests"),
+  v.literal("preventativeSchedule"), v.literal("inspections"), v.literal("participantPlans"),
+  v.literal("complaints"), v.literal("complianceCertifications"), v.literal("documents"),
+  v.literal("expectedPayments")
+);
+
+/**
+ * Rebuild the index rows of one source table for one organization.
+ * Used for the initial backfill and as the drift-repair job; never on the
+ * read path.
+ */
+export const rebuildOrganization = internalMutation({
+  args: {
+    organizationId: v.id("organizations"),
+    sourceTable: sourceTableValidator,
+  },
+  handler: async (ctx, args) => {
+    const sourceTable: CalendarSourceTable = args.sourceTable;
+    // eslint-disable-next-line @typescript-eslint/no-explicit-any
+    const sources: Doc<CalendarSourceTable>[] = await (ctx.db as any)
+      .query(sourceTable)
+      .withIndex("by_organizationId", (q: { eq: (field: string, value: Id<"organizations">) => unknown }) =>
+        q.eq("organizationId", args.organizationId)
+      )
+      .collect();
+
+    const liveIds = new Set<string>();
+    for (const doc of sources) {
+      liveIds.add(doc._id as string);
+      const entries = await projectEntries(ctx, sourceTable, doc);
+      await writeEntries(ctx, args.organizationId, sourceTable, doc._id as string, entries);
+    }
+
+    // Drop rows whose source document no longer exists
+    const indexed = await ctx.db
+      .query("calendarIndex")
+      .withIndex("by_organizationId_sourceTable", (q) =>
+        q.eq("organizationId", args.organizationId).eq("sourceTable", sourceTable)
+      )
+      .collect();
+    let removed = 0;
+    for (const row of indexed) {
+      if (!liveIds.has(row.sourceId)) {
+        await ctx.db.delete(row._id);
+        removed++;
+      }
+    }
+
+    return { sources: sources.length, removed };
+  },
+});
+
+/**
+ * Schedule a rebuild of every (organization, source table) pair.
+ * Runs nightly from crons.ts to repair any drift from writes that bypassed
+ * syncCalendarIndex, and doubles as the one-off backfill.
+ */
+export const rebuildAll = internalMutation({
+  args: {},
+  handler: async (ctx) => {
+    const organizations = await ctx.db.query("organizations").collect();
+    let scheduled = 0;
+    for (const org of organizations) {
+      for (const sourceTable of CALENDAR_SOURCE_TABLES) {
+        await ctx.scheduler.runAfter(0, internal.calendarIndex.rebuildOrganization, {
+          organizationId: org._id,
+          sourceTable,
+        });
+        scheduled++;
+      }
+    }
+    return { organizations: organizations.length, scheduled };
+  },
+});
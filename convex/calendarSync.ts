@@ -0,0 +1,381 @@
+import { internalQuery, internalMutation, internalAction, MutationCtx } from "./_generated/server";
+import { v } from "convex/values";
+import { internal } from "./_generated/api";
+import { Id } from "./_generated/dataModel";
+import { syncCalendarIndex } from "./calendarIndex";
+import { runPool, staggerSlots } from "./lib/calendarSync";
+
+/**
+ * Unified Google + Outlook calendar sync scheduler.
+ *
+ * The cron tick spreads every enabled connection (stalest first) over
+ * SYNC_SLOTS scheduled syncConnections runs across SYNC_WINDOW_MS, and each
+ * run drains its slice through a SYNC_CONCURRENCY-wide pool. Provider actions
+ * write each page of changes with one applyExternalChanges mutation.
+ *
+ * Local edits go the other way through calendarPushQueue: calendar.ts
+ * mutations call queueCalendarPush, and the first queued change for a
+ * connection schedules flushPushQueue PUSH_DELAY_MS later, which sends
+ * everything queued by then in one provider batch (pushBatchToGoogle /
+ * pushBatchToOutlook).
+ */
+
+// Cron interval is 15 minutes; finish scheduling slices well before the next tick
+const SYNC_WINDOW_MS = 12 * 60 * 1000;
+const SYNC_SLOTS = 12;
+const SYNC_CONCURRENCY = 8;
+// Collect edits made in quick succession into one batched push
+const PUSH_DELAY_MS = 10_000;
+// Queued changes sent per flush; provider actions split these into batch requests
+const PUSH_FLUSH_LIMIT = 200;
+
+const providerValidator = v.union(v.literal("google"), v.literal("outlook"));
+
+const attendeesValidator = v.optional(
+  v.array(
+    v.object({
+      email: v.string(),
+      name: v.optional(v.string()),
+      status: v.optional(
+        v.union(
+          v.literal("accepted"),
+          v.literal("declined"),
+          v.literal("tentative"),
+          v.literal("pending")
+        )
+      ),
+    })
+  )
+);
+
+// ============================================
+// SCHEDULER
+// ============================================
+
+/**
+ * Cron target: stagger all enabled connections across the sync window.
+ */
+export const syncAllConnections = internalMutation({
+  args: {},
+  handler: async (ctx) => {
+    const connections = await ctx.db
+      .query("calendarConnections")
+      .withIndex("by_syncEnabled", (q) => q.eq("syncEnabled", true))
+      .collect();
+
+    // Connections that have waited longest go in the earliest slots
+    connections.sort((a, b) => (a.lastSyncAt ?? 0) - (b.lastSyncAt ?? 0));
+
+    const slots = staggerSlots(
+      connections.map((c) => ({ connectionId: c._id, provider: c.provider })),
+      SYNC_SLOTS,
+      SYNC_WINDOW_MS
+    );
+    for (const slot of slots) {
+      await ctx.scheduler.runAfter(slot.delayMs, internal.calendarSync.syncConnections, {
+        connections: slot.items,
+      });
+    }
+
+    return { total: connections.length, slots: slots.length };
+  },
+});
+
+/**
+ * Sync one slice of connections through a bounded work-stealing pool.
+ */
+export const syncConnections = internalAction({
+  args: {
+    connections: v.array(
+      v.object({
+        connectionId: v.id("calendarConnections"),
+        provider: providerValidator,
+      })
+    ),
+  },
+  handler: async (ctx, args): Promise<{ total: number; succeeded: number; failed: number }> => {
+    const results = await runPool(args.connections, SYNC_CONCURRENCY, (conn) =>
+      conn.provider === "google"
+        ? ctx.runAction(internal.googleCalendar.syncFromGoogle, { connectionId: conn.connectionId })
+        : ctx.runAction(internal.outlookCalendar.syncFromOutlook, { connectionId: conn.connectionId })
+    );
+
+    let failed = 0;
+    results.forEach((result, i) => {
+      if (result.status === "rejected") {
+        failed++;
+        const conn = args.connections[i];
+        console.error(`Calendar sync failed for ${conn.provider} connection ${conn.connectionId}:`, result.reason);
+      }
+    });
+
+    const succeeded = results.length - failed;
+    console.log(`Calendar sync slice: ${succeeded}/${results.length} succeeded, ${failed} failed`);
+    return { total: results.length, succeeded, failed };
+  },
+});
+
+// ============================================
+// SHARED DB ACCESS FOR PROVIDER ACTIONS
+// ============================================
+
+/**
+ * Apply one page of pulled provider changes in a single transaction.
+ * Upserts match on externalEventId + provider; deletes are soft and only touch
+ * events in the connection's organization.
+ */
+export const applyExternalChanges = internalMutation({
+  args: {
+    organizationId: v.optional(v.id("organizations")),
+    externalProvider: providerValidator,
+    externalCalendarId: v.optional(v.string()),
+    createdBy: v.optional(v.id("users")),
+    syncedAt: v.number(),
+    upserts: v.array(
+      v.object({
+        externalEventId: v.string(),
+        title: v.string(),
+        description: v.optional(v.string()),
+        startTime: v.string(),
+        endTime: v.string(),
+        allDay: v.boolean(),
+        location: v.optional(v.string()),
+        attendees: attendeesValidator,
+      })
+    ),
+    deletes: v.array(v.string()),
+  },
+  handler: async (ctx, args): Promise<{ upserted: number; deleted: number }> => {
+    const now = Date.now();
+    const findExisting = (externalEventId: string) =>
+      ctx.db
+        .query("calendarEvents")
+        .withIndex("by_externalEventId", (q) =>
+          q.eq("externalEventId", externalEventId).eq("externalProvider", args.externalProvider)
+        )
+        .first();
+
+    for (const event of args.upserts) {
+      const existing = await findExisting(event.externalEventId);
+      if (existing) {
+        await ctx.db.patch(existing._id, {
+          title: event.title,
+          description: event.description,
+          startTime: event.startTime,
+          endTime: event.endTime,
+          allDay: event.allDay,
+          location: event.location,
+          attendees: event.attendees,
+          syncedAt: args.syncedAt,
+          updatedAt: now,
+          isDeleted: false, // Un-delete if it was previously removed
+        });
+        await syncCalendarIndex(ctx, "calendarEvents", existing._id);
+      } else {
+        const eventId = await ctx.db.insert("calendarEvents", {
+          organizationId: args.organizationId,
+          title: event.title,
+          description: event.description,
+          startTime: event.startTime,
+          endTime: event.endTime,
+          allDay: event.allDay,
+          location: event.location,
+          eventType: "external",
+          color: "#6b7280", // gray for external events
+          externalEventId: event.externalEventId,
+          externalProvider: args.externalProvider,
+          externalCalendarId: args.externalCalendarId,
+          attendees: event.attendees,
+          syncedAt: args.syncedAt,
+          createdBy: args.createdBy,
+          createdAt: now,
+        });
+        await syncCalendarIndex(ctx, "calendarEvents", eventId);
+      }
+    }
+
+    let deleted = 0;
+    for (const externalEventId of args.deletes) {
+      const existing = await findExisting(externalEventId);
+      if (
+        existing &&
+        existing.isDeleted !== true &&
+        (!args.organizationId || existing.organizationId === args.organizationId)
+      ) {
+        await ctx.db.patch(existing._id, { isDeleted: true, updatedAt: now });
+        await syncCalendarIndex(ctx, "calendarEvents", existing._id);
+        deleted++;
+      }
+    }
+
+    return { upserted: args.upserts.length, deleted };
+  },
+});
+
+/**
+ * Read the local events a batched push is about to send.
+ */
+export const getEventsByIds = internalQuery({
+  args: { eventIds: v.array(v.id("calendarEvents")) },
+  handler: async (ctx, args) => {
+    const events = await Promise.all(args.eventIds.map((id) => ctx.db.get(id)));
+    return events.flatMap((e) => (e && e.isDeleted !== true ? [e] : []));
+  },
+});
+
+/**
+ * Record the provider IDs assigned by a batched push.
+ */
+export const setExternalEventIds = internalMutation({
+  args: {
+    externalProvider: providerValidator,
+    externalCalendarId: v.optional(v.string()),
+    syncedAt: v.number(),
+    events: v.array(
+      v.object({
+        eventId: v.id("calendarEvents"),
+        externalEventId: v.string(),
+      })
+    ),
+  },
+  handler: async (ctx, args): Promise<void> => {
+    const now = Date.now();
+    for (const event of args.events) {
+      await ctx.db.patch(event.eventId, {
+        externalEventId: event.externalEventId,
+        externalProvider: args.externalProvider,
+        ...(args.externalCalendarId !== undefined && { externalCalendarId: args.externalCalendarId }),
+        syncedAt: args.syncedAt,
+        updatedAt: now,
+      });
+    }
+  },
+});
+
+// ============================================
+// OUTBOUND PUSH QUEUE
+// ============================================
+
+/**
+ * Queue a local event change for the event owner's connected calendar.
+ * Call after creating, updating, moving or soft-deleting a calendarEvents row.
+ * An event row holds a single external ID, so it is pushed to the provider
+ * it already belongs to, or else to the owner's first synced connection.
+ */
+export async function queueCalendarPush(
+  ctx: MutationCtx,
+  eventId: Id<"calendarEvents">
+): Promise<void> {
+  const event = await ctx.db.get(eventId);
+  if (!event?.createdBy) return;
+
+  const connections = await ctx.db
+    .query("calendarConnections")
+    .withIndex("by_userId_provider", (q) => q.eq("userId", event.createdBy!))
+    .collect();
+  const connection = connections.find(
+    (c) => c.syncEnabled && (!event.externalProvider || c.provider === event.externalProvider)
+  );
+  if (!connection) return;
+
+  const queued = await ctx.db
+    .query("calendarPushQueue")
+    .withIndex("by_connectionId_eventId", (q) =>
+      q.eq("connectionId", connection._id).eq("eventId", eventId)
+    )
+    .first();
+  const isDelete = event.isDeleted === true;
+
+  if (isDelete && !event.externalEventId) {
+    // Never reached the provider; drop any pending create
+    if (queued) await ctx.db.delete(queued._id);
+    return;
+  }
+
+  const change = {
+    action: isDelete ? ("delete" as const) : ("upsert" as const),
+    externalEventId: isDelete ? event.externalEventId : undefined,
+  };
+  if (queued) {
+    await ctx.db.patch(queued._id, change);
+    return;
+  }
+
+  const flushPending = await ctx.db
+    .query("calendarPushQueue")
+    .withIndex("by_connectionId_eventId", (q) => q.eq("connectionId", connection._id))
+    .first();
+  await ctx.db.insert("calendarPushQueue", {
+    connectionId: connection._id,
+    eventId,
+    ...change,
+    queuedAt: Date.now(),
+  });
+  if (!flushPending) {
+    await ctx.scheduler.runAfter(PUSH_DELAY_MS, internal.calendarSync.flushPushQueue, {
+      connectionId: connection._id,
+    });
+  }
+}
+
+/**
+ * Take up to PUSH_FLUSH_LIMIT queued changes for a connection off the queue.
+ * Returns null (and discards the changes) if the connection was removed or
+ * its sync disabled.
+ */
+export const claimPushBatch = internalMutation({
+  args: { connectionId: v.id("calendarConnections") },
+  handler: async (ctx, args) => {
+    const rows = await ctx.db
+      .query("calendarPushQueue")
+      .withIndex("by_connectionId_eventId", (q) => q.eq("connectionId", args.connectionId))
+      .take(PUSH_FLUSH_LIMIT);
+    for (const row of rows) {
+      await ctx.db.delete(row._id);
+    }
+
+    const connection = await ctx.db.get(args.connectionId);
+    if (!connection || !connection.syncEnabled || rows.length === 0) return null;
+
+    return {
+      provider: connection.provider,
+      eventIds: rows.filter((row) => row.action === "upsert").map((row) => row.eventId),
+      deletes: rows.flatMap((row) =>
+        row.action === "delete" && row.externalEventId ? [row.externalEventId] : []
+      ),
+      hasMore: rows.length === PUSH_FLUSH_LIMIT,
+    };
+  },
+});
+
+/**
+ * Send a connection's queued changes in one batched push, then continue
+ * while more remain. A failed push is logged and not retried; the next
+ * pull reconciles the event from the provider side.
+ */
+export const flushPushQueue = internalAction({
+  args: { connectionId: v.id("calendarConnections") },
+  handler: async (ctx, args): Promise<void> => {
+    const batch = await ctx.runMutation(internal.calendarSync.claimPushBatch, {
+      connectionId: args.connectionId,
+    });
+    if (!batch) return;
+
+    const pushArgs = { connectionId: args.connectionId, eventIds: batch.eventIds, deletes: batch.deletes };
+    try {
+      if (batch.provider === "google") {
+        await ctx.runAction(internal.googleCalendar.pushBatchToGoogle, pushArgs);
+      } else {
+        await ctx.runAction(internal.outlookCalendar.pushBatchToOutlook, pushArgs);
+      }
+    } catch (err) {
+      console.error(`Calendar push failed for ${batch.provider} connection ${args.connectionId}:`, err);
+    }
+
+    if (batch.hasMore) {
+      await ctx.scheduler.runAfter(0, internal.calendarSync.flushPushQueue, {
+        connectionId: args.connectionId,
+      });
+    }
+  },
+});
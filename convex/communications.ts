@@ -1,7 +1,8 @@
-import { mutation, query, internalMutation } from "./_generated/server";
+import { mutation, query, internalMutation, MutationCtx } from "./_generated/server";
 import { v } from "convex/values";
 import { internal } from "./_generated/api";
-import { requirePermission, requireTenant } from "./authHelpers";
+import type { Doc } from "./_generated/dataModel";
+import { requirePermission, requireTenant, getAuthContext } from "./authHelpers";
 import {
   findOrCreateThread,
   THREADING_THRESHOLDS,
@@ -12,6 +13,16 @@ import {
   getGateTriggerSummary,
   type CommunicationForGate
 } from "./lib/consultationGate";
+import { trackOrgStats } from "./orgStats";
+import { instrumentedQuery } from "./functionMetrics";
+import {
+  messageState,
+  applyMessageChange,
+  countersFromMessages,
+  mergeCounters,
+  summaryFlags,
+  type ThreadCounters,
+} from "./lib/threadSummaryCounters";
 
 // Generate upload URL for attachments
 export const generateUploadUrl = mutation(async (ctx) => {
@@ -292,6 +303,7 @@ export const create = mutation({
           createdAt: now2,
           updatedAt: now2,
         });
+        await trackOrgStats(ctx, "participants", newParticipantId, null);
         resolvedParticipantId = newParticipantId;
         resolvedFreeTextName = undefined;
 
@@ -463,45 +475,10 @@ export const create = mutation({
     }
 
     // Update or create threadSummaries (for both participant-linked and contact-name threads)
-    const existingSummary = await ctx.db
-      .query("threadSummaries")
-      .withIndex("by_thread", (q) => q.eq("threadId", threadResult.threadId))
-      .first();
-
-    if (existingSummary) {
-      // Update existing thread summary
-      const updateFields: Record<string, any> = {
-        lastActivityAt: now,
-        messageCount: existingSummary.messageCount + 1,
-        hasUnread: true, // New message is unread
-        previewText: args.summary.substring(0, 100),
-      };
-      // Add contact name to participantNames if not already there
-      if (!existingSummary.participantNames.includes(args.contactName)) {
-        updateFields.participantNames = [...existingSummary.participantNames, args.contactName];
-      }
-      // Set participantId on summary if not already set and the new entry links one
-      if (!existingSummary.participantId && args.linkedParticipantId) {
-        updateFields.participantId = args.linkedParticipantId;
-      }
-      await ctx.db.patch(existingSummary._id, updateFields);
-    } else {
-      // Create new thread summary
-      await ctx.db.insert("threadSummaries", {
-        organizationId,
-        threadId: threadResult.threadId,
-        participantId: args.linkedParticipantId,
-        startedAt: now,
-        lastActivityAt: now,
-        messageCount: 1,
-        participantNames: [args.contactName],
-        subject: args.subject || `${args.communicationType} with ${args.contactName}`,
-        previewText: args.summary.substring(0, 100),
-        hasUnread: true,
-        complianceCategories: ["none"],
-        requiresAction: false,
-      });
-    }
+    await applyThreadSummaryChange(ctx, threadResult.threadId, null, {
+      ...createdCommunication,
+      requiresFollowUp: consultationGateTriggered || createdCommunication.requiresFollowUp,
+    });
 
     // Audit log for creation
     await ctx.runMutation(internal.auditLog.log, {
@@ -635,6 +612,7 @@ export const update = mutation({
           createdAt: now2,
           updatedAt: now2,
         });
+        await trackOrgStats(ctx, "participants", newParticipantId, null);
         updates.linkedParticipantId = newParticipantId;
         updates.freeTextParticipantName = undefined;
 
@@ -698,16 +676,20 @@ export const remove = mutation({
     }
 
     // Soft delete - mark as deleted but preserve data
-    await ctx.db.patch(args.id, {
+    const deletedFields = {
       isDeleted: true,
       deletedAt: Date.now(),
       deletedBy: args.userId,
       updatedAt: Date.now(),
-    });
+    };
+    await ctx.db.patch(args.id, deletedFields);
 
-    // Regenerate thread summary if part of a thread
+    // Update thread summary if part of a thread
     if (communication.threadId) {
-      await regenerateThreadSummary(ctx, communication.threadId);
+      await applyThreadSummaryChange(ctx, communication.threadId, communication, {
+        ...communication,
+        ...deletedFields,
+      });
     }
 
     // Audit log
@@ -734,25 +716,15 @@ export const markAsRead = mutation({
     const comm = await ctx.db.get(args.communicationId);
     if (!comm || comm.organizationId !== organizationId) return;
     if (comm.readAt) return; // Already read
-    await ctx.db.patch(args.communicationId, {
+    const readFields = {
       readAt: new Date().toISOString(),
       updatedAt: Date.now(),
-    });
+    };
+    await ctx.db.patch(args.communicationId, readFields);
 
-    // Recalculate thread summary hasUnread status
+    // Decrement the thread summary's unread count
     if (comm.threadId) {
-      const threadComms = await ctx.db
-        .query("communications")
-        .withIndex("by_thread", (q) => q.eq("threadId", comm.threadId!))
-        .collect();
-      const hasUnread = threadComms.some((c) => !c.readAt && !c.isDeleted);
-      const summary = await ctx.db
-        .query("threadSummaries")
-        .withIndex("by_thread", (q) => q.eq("threadId", comm.threadId!))
-        .first();
-      if (summary) {
-        await ctx.db.patch(summary._id, { hasUnread });
-      }
+      await applyThreadSummaryChange(ctx, comm.threadId, comm, { ...comm, ...readFields });
     }
   },
 });
@@ -762,8 +734,12 @@ export const markAsRead = mutation({
 /**
  * Helper: Regenerate thread summary from all communications in thread
  * Task 2.6: Regenerate Thread Summary
+ *
+ * Reads the whole thread, so it is only used for repair (see
+ * rebuildThreadSummaries) and to upgrade summaries written before the
+ * incremental counters existed. Routine changes use applyThreadSummaryChange.
  */
-async function regenerateThreadSummary(
+export async function regenerateThreadSummary(
   ctx: any,
   threadId: string
 ): Promise<void> {
@@ -795,15 +771,10 @@ async function regenerateThreadSummary(
   // Collect unique participant names
   const participantNames = [...new Set(activeThreadComms.map((c: any) => c.contactName))];
 
-  // Collect compliance categories
-  const complianceCategories = [...new Set(
-    activeThreadComms
-      .map((c: any) => c.complianceCategory)
-      .filter(Boolean)
-  )];
-
-  // Check if any communication requires action
-  const requiresAction = activeThreadComms.some((c: any) => c.requiresFollowUp === true);
+  // Unread, requires-action and per-category counters
+  const counters = countersFromMessages(
+    sortedComms.map((c: any) => messageState(c)!)
+  );
 
   // Update or create summary
   const existingSummary = await ctx.db
@@ -827,13 +798,11 @@ async function regenerateThreadSummary(
     participantId: threadParticipantId || undefined,
     startedAt: firstComm.createdAt,
     lastActivityAt: lastComm.createdAt,
-    messageCount: activeThreadComms.length,
     participantNames,
     subject: firstComm.subject || `${firstComm.communicationType} with ${firstComm.contactName}`,
     previewText: lastComm.summary.substring(0, 100),
-    hasUnread: activeThreadComms.some((c: any) => !c.readAt),
-    complianceCategories: complianceCategories.length > 0 ? complianceCategories : ["none"],
-    requiresAction,
+    ...counters,
+    ...summaryFlags(counters),
   };
 
   if (existingSummary) {
@@ -843,6 +812,174 @@ async function regenerateThreadSummary(
   }
 }
 
+function summaryCounters(summary: Doc<"threadSummaries">): ThreadCounters | null {
+  if (
+    summary.unreadCount === undefined ||
+    summary.requiresActionCount === undefined ||
+    summary.categoryCounts === undefined
+  ) {
+    return null;
+  }
+  return {
+    messageCount: summary.messageCount,
+    unreadCount: summary.unreadCount,
+    requiresActionCount: summary.requiresActionCount,
+    // Summaries written before "none" stopped being counted may still carry it
+    categoryCounts: summary.categoryCounts.filter((c) => c.category !== "none"),
+  };
+}
+
+/**
+ * Helper: Apply one communication's change to its thread summary.
+ *
+ * `before` is the communication as it was counted in this thread (null if it
+ * was just added), `after` is how it should count now (null if it left the
+ * thread). Call after writing the communication. Touches only the summary,
+ * plus one indexed lookup when the first or last message leaves the thread.
+ */
+export async function applyThreadSummaryChange(
+  ctx: MutationCtx,
+  threadId: string,
+  before: Doc<"communications"> | null,
+  after: Doc<"communications"> | null
+): Promise<void> {
+  const summary = await ctx.db
+    .query("threadSummaries")
+    .withIndex("by_thread", (q) => q.eq("threadId", threadId))
+    .first();
+  const counters = summary ? summaryCounters(summary) : null;
+  if (!summary || !counters) {
+    // New thread, or a summary from before the counters existed
+    await regenerateThreadSummary(ctx, threadId);
+    return;
+  }
+
+  const beforeState = messageState(before);
+  const afterState = messageState(after);
+  const nextCounters = applyMessageChange(counters, beforeState, afterState);
+  if (nextCounters.messageCount === 0) {
+    await ctx.db.delete(summary._id);
+    return;
+  }
+
+  const updates: Partial<Doc<"threadSummaries">> = {
+    ...nextCounters,
+    ...summaryFlags(nextCounters),
+  };
+
+  if (after && afterState && !beforeState) {
+    // Message joined the thread
+    if (after.createdAt < summary.startedAt) {
+      updates.startedAt = after.createdAt;
+    }
+    if (after.createdAt >= summary.lastActivityAt) {
+      updates.lastActivityAt = after.createdAt;
+      updates.previewText = after.summary.substring(0, 100);
+    }
+    if (!summary.participantNames.includes(after.contactName)) {
+      updates.participantNames = [...summary.participantNames, after.contactName];
+    }
+    const participantId = after.participantId || after.linkedParticipantId;
+    if (!summary.participantId && participantId) {
+      updates.participantId = participantId;
+    }
+  } else if (before && beforeState && !afterState) {
+    // Message left the thread; only the activity bounds it defined need a lookup
+    if (before.createdAt <= summary.startedAt) {
+      const first = await ctx.db
+        .query("communications")
+        .withIndex("by_thread", (q) => q.eq("threadId", threadId))
+        .filter((q) => q.neq(q.field("isDeleted"), true))
+        .first();
+      if (first) updates.startedAt = first.createdAt;
+    }
+    if (before.createdAt >= summary.lastActivityAt) {
+      const last = await ctx.db
+        .query("communications")
+        .withIndex("by_thread", (q) => q.eq("threadId", threadId))
+        .order("desc")
+        .filter((q) => q.neq(q.field("isDeleted"), true))
+        .first();
+      if (last) {
+        updates.lastActivityAt = last.createdAt;
+        updates.previewText = last.summary.substring(0, 100);
+      }
+    }
+  }
+
+  await ctx.db.patch(summary._id, updates);
+}
+
+/**
+ * Helper: Fold the source thread's summary into the target's after all of
+ * its communications moved there, then delete the source summary.
+ */
+async function mergeThreadSummaries(
+  ctx: MutationCtx,
+  sourceThreadId: string,
+  targetThreadId: string
+): Promise<void> {
+  const [sourceSummary, targetSummary] = await Promise.all(
+    [sourceThreadId, targetThreadId].map((threadId) =>
+      ctx.db
+        .query("threadSummaries")
+        .withIndex("by_thread", (q) => q.eq("threadId", threadId))
+        .first()
+    )
+  );
+  const sourceCounters = sourceSummary ? summaryCounters(sourceSummary) : null;
+  const targetCounters = targetSummary ? summaryCounters(targetSummary) : null;
+
+  if (sourceSummary && targetSummary && sourceCounters && targetCounters) {
+    const counters = mergeCounters(targetCounters, sourceCounters);
+    const sourceIsLater = sourceSummary.lastActivityAt > targetSummary.lastActivityAt;
+    await ctx.db.patch(targetSummary._id, {
+      ...counters,
+      ...summaryFlags(counters),
+      startedAt: Math.min(sourceSummary.startedAt, targetSummary.startedAt),
+      lastActivityAt: Math.max(sourceSummary.lastActivityAt, targetSummary.lastActivityAt),
+      previewText: sourceIsLater ? sourceSummary.previewText : targetSummary.previewText,
+      participantNames: [
+        ...new Set([...targetSummary.participantNames, ...sourceSummary.participantNames]),
+      ],
+      participantId: targetSummary.participantId ?? sourceSummary.participantId,
+    });
+  } else {
+    await regenerateThreadSummary(ctx, targetThreadId);
+  }
+
+  if (sourceSummary) {
+    await ctx.db.delete(sourceSummary._id);
+  }
+}
+
+/**
+ * Repair job: rebuild thread summaries from their communications, one page
+ * per run, rescheduling until every summary has been visited. Corrects any
+ * drift in the incremental counters and participant names.
+ */
+export const rebuildThreadSummaries = internalMutation({
+  args: {
+    cursor: v.optional(v.string()),
+  },
+  handler: async (ctx, args) => {
+    const page = await ctx.db
+      .query("threadSummaries")
+      .paginate({ cursor: args.cursor ?? null, numItems: 50 });
+
+    for (const summary of page.page) {
+      await regenerateThreadSummary(ctx, summary.threadId);
+    }
+
+    if (!page.isDone) {
+      await ctx.scheduler.runAfter(0, internal.communications.rebuildThreadSummaries, {
+        cursor: page.continueCursor,
+      });
+    }
+    return { rebuilt: page.page.length, isDone: page.isDone };
+  },
+});
+
 /**
  * Merge two threads - move all communications from source to target
  * Task 2.4: Manual Thread Management (Part 1)
@@ -900,18 +1037,8 @@ export const mergeThreads = mutation({
       movedCount++;
     }
 
-    // Regenerate target thread summary
-    await regenerateThreadSummary(ctx, args.targetThreadId);
-
-    // Delete source thread summary
-    const sourceSummary = await ctx.db
-      .query("threadSummaries")
-      .withIndex("by_thread", (q) => q.eq("threadId", args.sourceThreadId))
-      .first();
-
-    if (sourceSummary) {
-      await ctx.db.delete(sourceSummary._id);
-    }
+    // Fold the source thread summary into the target
+    await mergeThreadSummaries(ctx, args.sourceThreadId, args.targetThreadId);
 
     // Audit log
     await ctx.runMutation(internal.auditLog.log, {
@@ -972,33 +1099,17 @@ export const splitThread = mutation({
     const newThreadId = `thread_${Date.now()}_${crypto.randomUUID().substring(0, 8)}`;
 
     // Update communication - move to new thread and mark as thread starter
-    await ctx.db.patch(args.communicationId, {
+    const splitFields = {
       threadId: newThreadId,
       isThreadStarter: true,
       updatedAt: Date.now(),
-    });
-
-    // Create new thread summary for the split thread (skip if no participant)
-    const participantId = communication.participantId || communication.linkedParticipantId;
-    if (participantId) {
-      await ctx.db.insert("threadSummaries", {
-        threadId: newThreadId,
-        participantId,
-        startedAt: communication.createdAt,
-        lastActivityAt: communication.createdAt,
-        messageCount: 1,
-        participantNames: [communication.contactName],
-        subject: communication.subject || `${communication.communicationType} with ${communication.contactName}`,
-        previewText: communication.summary.substring(0, 100),
-        hasUnread: true,
-        complianceCategories: communication.complianceCategory ? [communication.complianceCategory] : ["none"],
-        requiresAction: communication.requiresFollowUp || false,
-      });
-    }
+    };
+    await ctx.db.patch(args.communicationId, splitFields);
 
-    // Regenerate old thread summary (if thread still has other communications)
+    // Create the new thread's summary and remove the message from the old one
+    await applyThreadSummaryChange(ctx, newThreadId, null, { ...communication, ...splitFields });
     if (oldThreadId) {
-      await regenerateThreadSummary(ctx, oldThreadId);
+      await applyThreadSummaryChange(ctx, oldThreadId, communication, null);
     }
 
     // Audit log
@@ -1078,37 +1189,18 @@ export const moveToThread = mutation({
     }
 
     // Move communication to target thread
-    await ctx.db.patch(args.communicationId, {
+    const moveFields = {
       threadId: args.targetThreadId,
       isThreadStarter: false,
       manuallyLinkedAt: Date.now(),
       updatedAt: Date.now(),
-    });
-
-    // Regenerate target thread summary
-    await regenerateThreadSummary(ctx, args.targetThreadId);
+    };
+    await ctx.db.patch(args.communicationId, moveFields);
 
-    // Handle old thread - regenerate or clean up if empty
+    // Add to the target thread summary; remove from the old one (deleted if now empty)
+    await applyThreadSummaryChange(ctx, args.targetThreadId, null, { ...communication, ...moveFields });
     if (oldThreadId) {
-      const remainingComms = await ctx.db
-        .query("communications")
-        .withIndex("by_thread", (q) => q.eq("threadId", oldThreadId))
-        .filter((q) => q.eq(q.field("organizationId"), organizationId))
-        .filter((q) => q.neq(q.field("isDeleted"), true))
-        .collect();
-
-      if (remainingComms.length === 0) {
-        // Delete empty thread summary
-        const oldSummary = await ctx.db
-          .query("threadSummaries")
-          .withIndex("by_thread", (q) => q.eq("threadId", oldThreadId))
-          .first();
-        if (oldSummary) {
-          await ctx.db.delete(oldSummary._id);
-        }
-      } else {
-        await regenerateThreadSummary(ctx, oldThreadId);
-      }
+      await applyThreadSummaryChange(ctx, oldThreadId, communication, null);
     }
 
     // Audit log
@@ -1645,7 +1737,7 @@ export const getStats = query({
  * Task 4B.1: Thread View Query
  * Paginated list of thread summaries for inbox-style view
  */
-export const getThreadedView = query({
+export const getThreadedView = instrumentedQuery({
   args: {
     userId: v.id("users"),
     limit: v.optional(v.number()),
@@ -2236,6 +2328,7 @@ export const markThreadRead = mutation({
     if (summary) {
       await ctx.db.patch(summary._id, {
         hasUnread: false,
+        ...(summary.unreadCount !== undefined && { unreadCount: 0 }),
       });
     }
 
@@ -2362,25 +2455,7 @@ export const bulkMarkAsRead = mutation({
 
       if (comm.threadId) {
         affectedThreadIds.add(comm.threadId);
-      }
-    }
-
-    // Update affected thread summaries - check if all comms in thread are now read
-    for (const threadId of affectedThreadIds) {
-      const threadComms = await ctx.db
-        .query("communications")
-        .withIndex("by_thread", (q: any) => q.eq("threadId", threadId))
-        .collect();
-
-      const hasUnread = threadComms.some((c: any) => !c.readAt);
-
-      const summary = await ctx.db
-        .query("threadSummaries")
-        .withIndex("by_thread", (q: any) => q.eq("threadId", threadId))
-        .first();
-
-      if (summary) {
-        await ctx.db.patch(summary._id, { hasUnread });
+        await applyThreadSummaryChange(ctx, comm.threadId, comm, { ...comm, readAt: now });
       }
     }
 
@@ -2464,12 +2539,9 @@ export const bulkUpdateCategory = mutation({
       });
       updatedCount++;
 
-      if (comm.threadId) {
-        affectedThreadIds.add(comm.threadId);
-      }
-
       // Re-evaluate consultation gate with new category
       const updatedComm = await ctx.db.get(commId);
+      let finalComm = updatedComm;
       if (updatedComm) {
         const commForGate: CommunicationForGate = {
           _id: updatedComm._id,
@@ -2506,6 +2578,7 @@ export const bulkUpdateCategory = mutation({
         const gateResult = checkConsultationGate(commForGate, threadCommsForGate);
         if (gateResult.triggered && !updatedComm.requiresFollowUp) {
           await ctx.db.patch(commId, { requiresFollowUp: true, updatedAt: now });
+          finalComm = { ...updatedComm, requiresFollowUp: true };
           gateTriggeredCount++;
 
           // Auto-create follow-up task
@@ -2522,11 +2595,12 @@ export const bulkUpdateCategory = mutation({
           });
         }
       }
-    }
 
-    // Regenerate affected thread summaries
-    for (const threadId of affectedThreadIds) {
-      await regenerateThreadSummary(ctx, threadId);
+      // Move the message between category counts (and count a new follow-up)
+      if (comm.threadId) {
+        affectedThreadIds.add(comm.threadId);
+        await applyThreadSummaryChange(ctx, comm.threadId, comm, finalComm);
+      }
     }
 
     // Audit log
@@ -2598,24 +2672,25 @@ export const bulkAddToThread = mutation({
         throw new Error(`Access denied: Communication ${commId} belongs to different organization`);
       }
 
-      // Track the source thread for summary regeneration
-      if (comm.threadId && comm.threadId !== args.targetThreadId) {
-        sourceThreadIds.add(comm.threadId);
-      }
-
       // Move to target thread
       await ctx.db.patch(commId, {
         threadId: args.targetThreadId,
         updatedAt: now,
       });
       movedCount++;
-    }
 
-    // Regenerate all affected thread summaries (sources + target)
-    for (const threadId of sourceThreadIds) {
-      await regenerateThreadSummary(ctx, threadId);
+      // Move the message's contribution from its source thread summary to the target
+      if (comm.threadId !== args.targetThreadId) {
+        if (comm.threadId) {
+          sourceThreadIds.add(comm.threadId);
+          await applyThreadSummaryChange(ctx, comm.threadId, comm, null);
+        }
+        await applyThreadSummaryChange(ctx, args.targetThreadId, null, {
+          ...comm,
+          threadId: args.targetThreadId,
+        });
+      }
     }
-    await regenerateThreadSummary(ctx, args.targetThreadId);
 
     // Audit log
     await ctx.runMutation(internal.auditLog.log, {
@@ -2737,6 +2812,15 @@ export const bulkAddFlags = mutation({
           await ctx.db.patch(commId, { requiresFollowUp: true, updatedAt: now });
           gateTriggeredCount++;
 
+          // The thread now requires action
+          if (comm.threadId) {
+            await applyThreadSummaryChange(ctx, comm.threadId, comm, {
+              ...comm,
+              complianceFlags: mergedFlags,
+              requiresFollowUp: true,
+            });
+          }
+
           await ctx.runMutation(internal.tasks.createFollowUpTask, {
             communicationId: commId,
             organizationId, // Pass org context
@@ -2808,16 +2892,20 @@ export const restore = mutation({
     }
 
     // Restore
-    await ctx.db.patch(args.id, {
+    const restoredFields = {
       isDeleted: undefined,
       deletedAt: undefined,
       deletedBy: undefined,
       updatedAt: Date.now(),
-    });
+    };
+    await ctx.db.patch(args.id, restoredFields);
 
-    // Regenerate thread summary
+    // Count the message in its thread summary again
     if (communication.threadId) {
-      await regenerateThreadSummary(ctx, communication.threadId);
+      await applyThreadSummaryChange(ctx, communication.threadId, communication, {
+        ...communication,
+        ...restoredFields,
+      });
     }
 
     // Audit log
@@ -2902,11 +2990,10 @@ export const getDeletedCommunications = query({
   },
   handler: async (ctx, args) => {
     await requirePermission(ctx, args.userId, "communications", "view");
-    const { organizationId } = await requireTenant(ctx, args.userId);
+    const { organizationId, user } = await getAuthContext(ctx, args.userId);
 
-    // Get user and check admin
-    const user = await ctx.db.get(args.userId);
-    if (!user || user.role !== "admin") {
+    // Admin only
+    if (user.role !== "admin") {
       return [];
     }
 
@@ -3038,9 +3125,8 @@ export const deleteByContactName = mutation({
     }
 
     const now = Date.now();
-    const threadIds = new Set<string>();
 
-    // Soft-delete each communication
+    // Soft-delete each communication and remove it from its thread summary
     for (const comm of targetComms) {
       await ctx.db.patch(comm._id, {
         isDeleted: true,
@@ -3049,15 +3135,10 @@ export const deleteByContactName = mutation({
         updatedAt: now,
       });
       if (comm.threadId) {
-        threadIds.add(comm.threadId);
+        await applyThreadSummaryChange(ctx, comm.threadId, comm, null);
       }
     }
 
-    // Regenerate thread summaries for affected threads
-    for (const threadId of threadIds) {
-      await regenerateThreadSummary(ctx, threadId);
-    }
-
     // Audit log
     await ctx.runMutation(internal.auditLog.log, {
       userId: user._id,
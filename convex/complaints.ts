@@ -1,7 +1,12 @@
 import { v } from "convex/values";
-import { mutation, query, internalMutation, internalAction } from "./_generated/server";
+import { mutation, query, internalMutation, internalAction, QueryCtx } from "./_generated/server";
+import { OrderedQuery, NamedTableInfo } from "convex/server";
+import { DataModel, Doc, Id, TableNames } from "./_generated/dataModel";
 import { internal } from "./_generated/api";
 import { requireAuth, requirePermission, getUserFullName, requireTenant } from "./authHelpers";
+import { syncCalendarIndex } from "./calendarIndex";
+import { paginationArgs } from "./paginationHelpers";
+import { filter } from "convex-helpers/server/filter";
 
 // Generate a unique reference number for complaints: CMP-YYYYMMDD-XXXX
 function generateReferenceNumber(): string {
@@ -17,49 +22,154 @@ function generateReferenceNumber(): string {
   return `CMP-${y}${m}${d}-${suffix}`;
 }
 
+type ComplaintFilters = {
+  status?: string;
+  category?: string;
+  severity?: string;
+  propertyId?: Id<"properties">;
+  participantId?: Id<"participants">;
+  source?: string;
+  search?: string; // Case-insensitive match on reference number, complainant or description
+};
+
+// Org-scoped complaints query, newest received first. Uses the composite
+// index for the most selective filter given; the rest are applied in the query,
+// so paginated reads return complete pages for the filters.
+function queryComplaints(
+  ctx: QueryCtx,
+  organizationId: Id<"organizations">,
+  filters: ComplaintFilters
+): OrderedQuery<NamedTableInfo<DataModel, "complaints">> {
+  let q: OrderedQuery<NamedTableInfo<DataModel, "complaints">>;
+  const { status, category, severity } = filters;
+
+  if (status) {
+    q = ctx.db
+      .query("complaints")
+      .withIndex("by_organizationId_status_receivedDate", (idx) =>
+        idx.eq("organizationId", organizationId).eq("status", status as Doc<"complaints">["status"])
+      )
+      .order("desc");
+  } else if (severity) {
+    q = ctx.db
+      .query("complaints")
+      .withIndex("by_organizationId_severity_receivedDate", (idx) =>
+        idx.eq("organizationId", organizationId).eq("severity", severity as Doc<"complaints">["severity"])
+      )
+      .order("desc");
+  } else if (category) {
+    q = ctx.db
+      .query("complaints")
+      .withIndex("by_organizationId_category_receivedDate", (idx) =>
+        idx.eq("organizationId", organizationId).eq("category", category as Doc<"complaints">["category"])
+      )
+      .order("desc");
+  } else {
+    q = ctx.db
+      .query("complaints")
+      .withIndex("by_organizationId_receivedDate", (idx) => idx.eq("organizationId", organizationId))
+      .order("desc");
+  }
+
+  if (status && severity) {
+    q = q.filter((f) => f.eq(f.field("severity"), severity));
+  }
+  if (category && (status || severity)) {
+    q = q.filter((f) => f.eq(f.field("category"), category));
+  }
+  if (filters.propertyId) {
+    const propertyId = filters.propertyId;
+    q = q.filter((f) => f.eq(f.field("propertyId"), propertyId));
+  }
+  if (filters.participantId) {
+    const participantId = filters.participantId;
+    q = q.filter((f) => f.eq(f.field("participantId"), participantId));
+  }
+  if (filters.source) {
+    const source = filters.source;
+    q = q.filter((f) => f.eq(f.field("source"), source));
+  }
+  const search = filters.search?.trim().toLowerCase();
+  if (search) {
+    q = filter(
+      q,
+      (c) =>
+        (c.referenceNumber || "").toLowerCase().includes(search) ||
+        (c.complainantName || "").toLowerCase().includes(search) ||
+        c.description.toLowerCase().includes(search)
+    );
+  }
+  return q;
+}
+
+// Attach participant, property and staff users to each complaint.
+// Each distinct related document is fetched once, however many complaints share it.
+async function enrichComplaints(
+  ctx: QueryCtx,
+  complaints: Doc<"complaints">[],
+  { includeStaff = true }: { includeStaff?: boolean } = {}
+) {
+  const loaded = new Map<string, Promise<unknown>>();
+  function load<T extends TableNames>(id: Id<T> | undefined): Promise<Doc<T> | null> {
+    if (!id) return Promise.resolve(null);
+    let pending = loaded.get(id);
+    if (!pending) {
+      pending = ctx.db.get(id);
+      loaded.set(id, pending);
+    }
+    return pending as Promise<Doc<T> | null>;
+  }
+
+  return Promise.all(
+    complaints.map(async (complaint) => {
+      const [participant, property, receivedByUser, assignedToUser] = await Promise.all([
+        load(complaint.participantId),
+        load(complaint.propertyId),
+        includeStaff ? load(complaint.receivedBy) : null,
+        includeStaff ? load(complaint.assignedTo) : null,
+      ]);
+      return { ...complaint, participant, property, receivedByUser, assignedToUser };
+    })
+  );
+}
+
+const complaintFilterArgs = {
+  status: v.optional(v.string()),
+  category: v.optional(v.string()),
+  severity: v.optional(v.string()),
+  propertyId: v.optional(v.id("properties")),
+  participantId: v.optional(v.id("participants")),
+  source: v.optional(v.string()),
+  search: v.optional(v.string()),
+};
+
 // Get all complaints with optional filters
 export const getAll = query({
   args: {
     userId: v.id("users"),
-    status: v.optional(v.string()),
-    category: v.optional(v.string()),
-    severity: v.optional(v.string()),
-    propertyId: v.optional(v.id("properties")),
-    participantId: v.optional(v.id("participants")),
+    ...complaintFilterArgs,
   },
   handler: async (ctx, args) => {
     const { organizationId } = await requireTenant(ctx, args.userId);
-    const allComplaints = await ctx.db.query("complaints").collect();
-    let complaints = allComplaints.filter(c => c.organizationId === organizationId);
-
-    if (args.status) {
-      complaints = complaints.filter(c => c.status === args.status);
-    }
-    if (args.category) {
-      complaints = complaints.filter(c => c.category === args.category);
-    }
-    if (args.severity) {
-      complaints = complaints.filter(c => c.severity === args.severity);
-    }
-    if (args.propertyId) {
-      complaints = complaints.filter(c => c.propertyId === args.propertyId);
-    }
-    if (args.participantId) {
-      complaints = complaints.filter(c => c.participantId === args.participantId);
-    }
-
-    // Enrich with related data
-    const enriched = await Promise.all(
-      complaints.map(async (complaint) => {
-        const participant = complaint.participantId ? await ctx.db.get(complaint.participantId) : null;
-        const property = complaint.propertyId ? await ctx.db.get(complaint.propertyId) : null;
-        const receivedByUser = await ctx.db.get(complaint.receivedBy);
-        const assignedToUser = complaint.assignedTo ? await ctx.db.get(complaint.assignedTo) : null;
-        return { ...complaint, participant, property, receivedByUser, assignedToUser };
-      })
-    );
+    const complaints = await queryComplaints(ctx, organizationId, args).collect();
+    return await enrichComplaints(ctx, complaints);
+  },
+});
 
-    return enriched.sort((a, b) => new Date(b.receivedDate).getTime() - new Date(a.receivedDate).getTime());
+// Get complaints one page at a time (newest received first) for the register list
+export const getAllPaginated = query({
+  args: {
+    userId: v.id("users"),
+    ...paginationArgs,
+    ...complaintFilterArgs,
+  },
+  handler: async (ctx, args) => {
+    const { organizationId } = await requireTenant(ctx, args.userId);
+    const result = await queryComplaints(ctx, organizationId, args).paginate(args.paginationOpts);
+    return {
+      ...result,
+      page: await enrichComplaints(ctx, result.page),
+    };
   },
 });
 
@@ -68,10 +178,7 @@ export const getPendingAcknowledgment = query({
   args: { userId: v.id("users") },
   handler: async (ctx, args) => {
     const { organizationId } = await requireTenant(ctx, args.userId);
-    const allComplaints = await ctx.db.query("complaints")
-      .filter(q => q.eq(q.field("status"), "received"))
-      .collect();
-    const complaints = allComplaints.filter(c => c.organizationId === organizationId);
+    const complaints = await queryComplaints(ctx, organizationId, { status: "received" }).collect();
 
     const today = new Date();
 
@@ -84,15 +191,7 @@ export const getPendingAcknowledgment = query({
     });
 
     // Enrich with related data
-    const enriched = await Promise.all(
-      needsAck.map(async (complaint) => {
-        const participant = complaint.participantId ? await ctx.db.get(complaint.participantId) : null;
-        const property = complaint.propertyId ? await ctx.db.get(complaint.propertyId) : null;
-        return { ...complaint, participant, property };
-      })
-    );
-
-    return enriched;
+    return await enrichComplaints(ctx, needsAck, { includeStaff: false });
   },
 });
 
@@ -191,6 +290,7 @@ export const create = mutation({
       createdAt: now,
       updatedAt: now,
     });
+    await syncCalendarIndex(ctx, "complaints", complaintId);
 
     // Audit log
     await ctx.runMutation(internal.auditLog.log, {
@@ -263,9 +363,20 @@ export const submitFromWebsite = mutation({
     const resolutionDue = new Date(now + 30 * 24 * 60 * 60 * 1000);
     const resolutionDueDate = resolutionDue.toISOString();
 
-    // Find first admin user to set as receivedBy
-    const users = await ctx.db.query("users").collect();
-    let adminUser = users.find(u => u.role === "admin");
+    // Find an admin user to set as receivedBy: an admin of the target org when
+    // one is given, otherwise the first admin (legacy single-tenant behaviour)
+    const adminUser = args.organizationId
+      ? await ctx.db
+          .query("users")
+          .withIndex("by_organizationId", (q) =>
+            q.eq("organizationId", args.organizationId as Id<"organizations">)
+          )
+          .filter((q) => q.eq(q.field("role"), "admin"))
+          .first()
+      : await ctx.db
+          .query("users")
+          .withIndex("by_role", (q) => q.eq("role", "admin"))
+          .first();
     if (!adminUser) throw new Error("No admin user found to receive complaint");
 
     // Use organizationId from args, or fall back to admin user's org
@@ -300,6 +411,7 @@ export const submitFromWebsite = mutation({
       createdAt: now,
       updatedAt: now,
     });
+    await syncCalendarIndex(ctx, "complaints", complaintId);
 
     // Auto-create communication entry
     await ctx.runMutation(internal.communications.autoCreateForComplaint, {
@@ -477,6 +589,7 @@ export const acknowledge = mutation({
       status: "acknowledged",
       updatedAt: Date.now(),
     });
+    await syncCalendarIndex(ctx, "complaints", args.complaintId);
 
     return { success: true };
   },
@@ -533,6 +646,7 @@ export const update = mutation({
     }
 
     await ctx.db.patch(complaintId, filteredUpdates);
+    await syncCalendarIndex(ctx, "complaints", complaintId);
     return { success: true };
   },
 });
@@ -569,6 +683,7 @@ export const resolve = mutation({
       status: "resolved",
       updatedAt: Date.now(),
     });
+    await syncCalendarIndex(ctx, "complaints", complaintId);
 
     return { success: true };
   },
@@ -604,6 +719,7 @@ export const escalate = mutation({
       status: "escalated",
       updatedAt: Date.now(),
     });
+    await syncCalendarIndex(ctx, "complaints", args.complaintId);
 
     // Audit log
     await ctx.runMutation(internal.auditLog.log, {
@@ -669,6 +785,7 @@ export const updateEscalationStatus = mutation({
     }
 
     await ctx.db.patch(args.complaintId, updates);
+    await syncCalendarIndex(ctx, "complaints", args.complaintId);
 
     // Audit log
     await ctx.runMutation(internal.auditLog.log, {
@@ -715,6 +832,7 @@ export const close = mutation({
       status: "closed",
       updatedAt: Date.now(),
     });
+    await syncCalendarIndex(ctx, "complaints", args.complaintId);
 
     return { success: true };
   },
@@ -730,6 +848,7 @@ export const remove = mutation({
     // Permission check - admin only
     await requirePermission(ctx, args.userId, "incidents", "delete");
     await ctx.db.delete(args.complaintId);
+    await syncCalendarIndex(ctx, "complaints", args.complaintId);
     return { success: true };
   },
 });
@@ -1030,44 +1149,34 @@ export const getChainOfCustody = query({
 
 // Get full complaints register data with enriched fields for reporting
 export const getComplaintsRegisterData = query({
-  args: { userId: v.id("users") },
+  args: {
+    userId: v.id("users"),
+    ...complaintFilterArgs,
+  },
   handler: async (ctx, args) => {
     const { organizationId } = await requireTenant(ctx, args.userId);
-    const allComplaints = await ctx.db.query("complaints").collect();
-    const complaints = allComplaints.filter(c => c.organizationId === organizationId);
+    const complaints = await queryComplaints(ctx, organizationId, args).collect();
     const now = new Date();
 
-    const enriched = await Promise.all(
-      complaints.map(async (complaint) => {
-        const participant = complaint.participantId ? await ctx.db.get(complaint.participantId) : null;
-        const property = complaint.propertyId ? await ctx.db.get(complaint.propertyId) : null;
-        const receivedByUser = await ctx.db.get(complaint.receivedBy);
-        const assignedToUser = complaint.assignedTo ? await ctx.db.get(complaint.assignedTo) : null;
-
-        // Calculate days
-        const receivedDate = new Date(complaint.receivedDate);
-        const daysOpen = Math.floor((now.getTime() - receivedDate.getTime()) / (1000 * 60 * 60 * 24));
-        const daysToAcknowledge = complaint.acknowledgedDate
-          ? Math.floor((new Date(complaint.acknowledgedDate).getTime() - receivedDate.getTime()) / (1000 * 60 * 60 * 24))
-          : null;
-        const daysToResolve = complaint.resolutionDate
-          ? Math.floor((new Date(complaint.resolutionDate).getTime() - receivedDate.getTime()) / (1000 * 60 * 60 * 24))
-          : null;
-
-        return {
-          ...complaint,
-          participant,
-          property,
-          receivedByUser,
-          assignedToUser,
-          daysOpen,
-          daysToAcknowledge,
-          daysToResolve,
-        };
-      })
-    );
-
-    return enriched.sort((a, b) => new Date(b.receivedDate).getTime() - new Date(a.receivedDate).getTime());
+    const enriched = await enrichComplaints(ctx, complaints);
+    return enriched.map((complaint) => {
+      // Calculate days
+      const receivedDate = new Date(complaint.receivedDate);
+      const daysOpen = Math.floor((now.getTime() - receivedDate.getTime()) / (1000 * 60 * 60 * 24));
+      const daysToAcknowledge = complaint.acknowledgedDate
+        ? Math.floor((new Date(complaint.acknowledgedDate).getTime() - receivedDate.getTime()) / (1000 * 60 * 60 * 24))
+        : null;
+      const daysToResolve = complaint.resolutionDate
+        ? Math.floor((new Date(complaint.resolutionDate).getTime() - receivedDate.getTime()) / (1000 * 60 * 60 * 24))
+        : null;
+
+      return {
+        ...complaint,
+        daysOpen,
+        daysToAcknowledge,
+        daysToResolve,
+      };
+    });
   },
 });
 
@@ -1076,8 +1185,7 @@ export const getStats = query({
   args: { userId: v.id("users") },
   handler: async (ctx, args) => {
     const { organizationId } = await requireTenant(ctx, args.userId);
-    const allComplaints = await ctx.db.query("complaints").collect();
-    const complaints = allComplaints.filter(c => c.organizationId === organizationId);
+    const complaints = await queryComplaints(ctx, organizationId, {}).collect();
 
     const stats = {
       total: complaints.length,
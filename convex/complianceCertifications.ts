@@ -1,6 +1,9 @@
 import { v } from "convex/values";
 import { internalMutation, mutation, query } from "./_generated/server";
+import { Id } from "./_generated/dataModel";
 import { requireAuth, requireTenant } from "./authHelpers";
+import { syncCalendarIndex } from "./calendarIndex";
+import { markDashboardStale } from "./dashboard";
 
 // Mapping: document type -> certification type
 const DOC_TO_CERT_TYPE: Record<string, string> = {
@@ -161,7 +164,7 @@ export const create = mutation({
       status = "expiring_soon";
     }
 
-    return await ctx.db.insert("complianceCertifications", {
+    const certificationId = await ctx.db.insert("complianceCertifications", {
       organizationId,
       ...certificationData,
       createdBy: userId,
@@ -169,6 +172,9 @@ export const create = mutation({
       createdAt: now,
       updatedAt: now,
     });
+    await syncCalendarIndex(ctx, "complianceCertifications", certificationId);
+    await markDashboardStale(ctx, organizationId);
+    return certificationId;
   },
 });
 
@@ -235,6 +241,8 @@ export const update = mutation({
     if (status) filteredUpdates.status = status;
 
     await ctx.db.patch(certificationId, filteredUpdates);
+    await syncCalendarIndex(ctx, "complianceCertifications", certificationId);
+    await markDashboardStale(ctx, organizationId);
     return { success: true };
   },
 });
@@ -255,6 +263,8 @@ export const remove = mutation({
     }
 
     await ctx.db.delete(args.certificationId);
+    await syncCalendarIndex(ctx, "complianceCertifications", args.certificationId);
+    await markDashboardStale(ctx, organizationId);
     return { success: true };
   },
 });
@@ -280,6 +290,8 @@ export const updateStatuses = internalMutation({
 
       if (newStatus !== cert.status) {
         await ctx.db.patch(cert._id, { status: newStatus, updatedAt: Date.now() });
+        await syncCalendarIndex(ctx, "complianceCertifications", cert._id);
+        await markDashboardStale(ctx, cert.organizationId);
         updated++;
       }
     }
@@ -340,6 +352,8 @@ export const createFromDocument = internalMutation({
       if (expiryDate < today) status = "expired";
       else if (expiryDate <= ninetyDaysFromNow) status = "expiring_soon";
       await ctx.db.patch(duplicate._id, { status });
+      await syncCalendarIndex(ctx, "complianceCertifications", duplicate._id);
+      await markDashboardStale(ctx, duplicate.organizationId);
 
       return duplicate._id;
     }
@@ -372,6 +386,8 @@ export const createFromDocument = internalMutation({
       createdAt: now,
       updatedAt: now,
     });
+    await syncCalendarIndex(ctx, "complianceCertifications", certId);
+    await markDashboardStale(ctx, args.organizationId as Id<"organizations">);
 
     return certId;
   },
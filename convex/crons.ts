@@ -122,6 +122,27 @@ crons.daily(
   internal.stripe.cleanupOldWebhookEvents
 );
 
+// Dispatch due webhook deliveries every minute (safety net for scheduled retries)
+crons.interval(
+  "dispatch-webhook-queue",
+  { minutes: 1 },
+  internal.webhooks.dispatchDue
+);
+
+// Purge offline sync idempotency receipts older than 7 days
+crons.daily(
+  "cleanup-offline-sync-receipts",
+  { hourUTC: 17, minuteUTC: 30 },
+  internal.offlineSync.cleanupReceipts
+);
+
+// Purge expired rate limit counter rows every 15 minutes
+crons.interval(
+  "cleanup-rate-limit-shards",
+  { minutes: 15 },
+  internal.rateLimits.cleanupExpired
+);
+
 // Check for expired trial periods and update subscription status
 // Scans for orgs where trialEndsAt < now AND status is still "trialing"
 crons.daily(
@@ -134,20 +155,51 @@ crons.daily(
 // CALENDAR SYNC CRON JOBS
 // ============================================
 
-// Sync Google Calendar events every 15 minutes
-// Pulls new/updated/deleted events from connected Google Calendars
+// Sync Google and Outlook calendars every 15 minutes
+// Staggers connections across the interval and pulls new/updated/deleted events
 crons.interval(
-  "sync-google-calendars",
+  "sync-calendars",
   { minutes: 15 },
-  internal.googleCalendar.syncAllGoogleConnections
+  internal.calendarSync.syncAllConnections
 );
 
-// Sync Outlook Calendar events every 15 minutes
-// Pulls new/updated/deleted events from connected Outlook/Microsoft 365 Calendars
+// Rebuild the unified calendar index nightly at 5:30 AM UTC
+// Owning mutations keep it current; this repairs drift from writes that bypass them
+crons.daily(
+  "reconcile-calendar-index",
+  { hourUTC: 5, minuteUTC: 30 },
+  internal.calendarIndex.rebuildAll
+);
+
+// Recount per-org usage counters (organizationStats) to repair any drift
+crons.daily(
+  "reconcile-organization-stats",
+  { hourUTC: 0, minuteUTC: 15 },
+  internal.orgStats.reconcileAll
+);
+
+// Refresh today's platformMetricsDaily row for the super-admin dashboard and trends
+crons.hourly(
+  "rollup-platform-metrics",
+  { minuteUTC: 45 },
+  internal.orgStats.rollupPlatformDaily
+);
+
+// Rebuild materialized dashboards hourly so date-based counts (overdue,
+// expiring soon) roll over and writes that don't mark them stale catch up
 crons.interval(
-  "sync-outlook-calendars",
-  { minutes: 15 },
-  internal.outlookCalendar.syncAllOutlookConnections
+  "reconcile-dashboard-summaries",
+  { hours: 1 },
+  internal.dashboard.reconcileAll
+);
+
+// Roll the previous hour's sampled function calls into functionMetrics
+// (p50/p95 per function) for the super-admin hotspots view; runs a few
+// minutes past the hour so late log stream batches are included
+crons.hourly(
+  "rollup-function-metrics",
+  { minuteUTC: 10 },
+  internal.functionMetrics.rollupHourly
 );
 
 // ============================================
@@ -162,6 +214,43 @@ crons.daily(
   internal.participants.cleanupExpiredArchives
 );
 
+// Purge cached report PDFs past their retention period
+crons.daily(
+  "cleanup-pdf-cache",
+  { hourUTC: 17, minuteUTC: 45 },
+  internal.pdfCache.cleanupExpired
+);
+
+// Purge expired AI assistant cache entries, old turn metrics and orphaned drafts
+crons.interval(
+  "cleanup-ai-cache",
+  { hours: 1 },
+  internal.aiCache.cleanupExpired
+);
+
+// Rebuild thread summaries from their communications to correct any drift in
+// the incrementally maintained counters (pages through all summaries)
+crons.weekly(
+  "rebuild-thread-summaries",
+  { dayOfWeek: "sunday", hourUTC: 16, minuteUTC: 30 },
+  internal.communications.rebuildThreadSummaries,
+  {}
+);
+
+// Restart inbound email queue processing if a batch chain stopped early
+crons.interval(
+  "kick-inbound-email-queue",
+  { minutes: 5 },
+  internal.inboundEmailQueue.kickQueue
+);
+
+// Purge processed and failed inbound email queue entries
+crons.daily(
+  "cleanup-inbound-email-queue",
+  { hourUTC: 18, minuteUTC: 0 },
+  internal.inboundEmailQueue.cleanupQueue
+);
+
 // Check for overdue NDIS incident notifications hourly
 crons.interval(
   "check-overdue-ndis-notifications",
@@ -0,0 +1,438 @@
+import { v } from "convex/values";
+import { mutation, internalMutation, MutationCtx, QueryCtx } from "./_generated/server";
+import { internal } from "./_generated/api";
+import { Doc, Id } from "./_generated/dataModel";
+import { requireTenant, hasPermission } from "./authHelpers";
+import { MANDATORY_TRAINING } from "./staffTraining";
+import { instrumentedQuery } from "./functionMetrics";
+import {
+  isoDate,
+  daysUntil,
+  portfolioStats,
+  scheduleStats,
+  taskStats,
+  consentStats,
+} from "./lib/dashboardSummary";
+
+/**
+ * Materialized Dashboard Summary
+ *
+ * The dashboard used to subscribe to twelve queries, each collecting a whole
+ * table for the organization (properties plus every active dwelling on the
+ * platform, alerts, tasks, schedules, participants, certifications,
+ * restrictive practices and training records). Every write to any of those
+ * tables re-ran its query for every open dashboard.
+ *
+ * Instead each organization has one `dashboardSummaries` row holding exactly
+ * what the cards and lists render, served by getSummary:
+ *
+ *   1. Owning mutations call markDashboardStale after a write. The first
+ *      write records a `dashboardRebuilds` request and schedules
+ *      rebuildSummary a few seconds out; further writes before it runs only
+ *      read the request, so bulk edits and alert generation cost one rebuild
+ *      and writers never touch the summary row itself.
+ *   2. rebuildSummary clears the request, then recounts one section per
+ *      mutation (SUMMARY_SECTIONS), patching the row as it goes, so no single
+ *      transaction reads every source table.
+ *   3. An hourly reconcile rebuilds every summary so date-based counts
+ *      (overdue, expiring within N days) roll over, and so writers that
+ *      don't mark the row (background alert jobs, seed data) catch up.
+ *
+ * Rows are created the first time an organization opens the dashboard
+ * (ensureSummary); organizations that never do are never rebuilt.
+ */
+
+// Coalesce bursts of writes into one rebuild
+const REBUILD_DELAY_MS = 5_000;
+const RECENT_ALERT_LIMIT = 5;
+const UPCOMING_TASK_LIMIT = 15;
+const UPCOMING_TASK_DAYS = 30;
+const UPCOMING_SCHEDULE_LIMIT = 5;
+
+type SummaryFields = Omit<Doc<"dashboardSummaries">, "_id" | "_creationTime" | "staleSince">;
+
+async function getDashboardSummary(
+  ctx: QueryCtx | MutationCtx,
+  organizationId: Id<"organizations">
+): Promise<Doc<"dashboardSummaries"> | null> {
+  return await ctx.db
+    .query("dashboardSummaries")
+    .withIndex("by_organizationId", (q) => q.eq("organizationId", organizationId))
+    .first();
+}
+
+async function getRebuildRequest(
+  ctx: MutationCtx,
+  organizationId: Id<"organizations">
+): Promise<Doc<"dashboardRebuilds"> | null> {
+  return await ctx.db
+    .query("dashboardRebuilds")
+    .withIndex("by_organizationId", (q) => q.eq("organizationId", organizationId))
+    .first();
+}
+
+/**
+ * A summary with every count at zero, stored until the first rebuild
+ * finishes (getSummary treats computedAt 0 as not built yet).
+ */
+function emptySummary(organizationId: Id<"organizations">): SummaryFields {
+  return {
+    organizationId,
+    portfolio: portfolioStats([], []),
+    alerts: { active: 0, critical: 0 },
+    recentAlerts: [],
+    tasks: taskStats([], ""),
+    upcomingTaskCount: 0,
+    upcomingTasks: [],
+    schedules: scheduleStats([], 0),
+    upcomingSchedules: [],
+    consent: consentStats([], "", ""),
+    certifications: { total: 0, expired: 0, expiringSoon: 0 },
+    restrictivePractices: {
+      activeCount: 0,
+      reviewsOverdue: 0,
+      authorisationsExpiring: 0,
+      unauthorised: 0,
+      unreported: 0,
+      totalRecords: 0,
+    },
+    training: {
+      totalRecords: 0,
+      expired: 0,
+      expiring: 0,
+      staffCount: 0,
+      compliantStaff: 0,
+      compliancePercentage: 0,
+    },
+    computedAt: 0,
+  };
+}
+
+// ============================================
+// SUMMARY SECTIONS (one rebuild step each)
+// ============================================
+
+type SummarySection = (
+  ctx: MutationCtx,
+  organizationId: Id<"organizations">,
+  now: number
+) => Promise<Partial<SummaryFields>>;
+
+const portfolioSection: SummarySection = async (ctx, organizationId) => {
+  const [properties, dwellings] = await Promise.all([
+    ctx.db.query("properties").withIndex("by_organizationId", (q) => q.eq("organizationId", organizationId)).collect(),
+    ctx.db.query("dwellings").withIndex("by_organizationId", (q) => q.eq("organizationId", organizationId)).collect(),
+  ]);
+  return {
+    portfolio: portfolioStats(
+      properties.filter((p) => p.isActive === true),
+      dwellings.filter((d) => d.isActive)
+    ),
+  };
+};
+
+const alertSection: SummarySection = async (ctx, organizationId) => {
+  const alerts = await ctx.db
+    .query("alerts")
+    .withIndex("by_organizationId_status", (q) =>
+      q.eq("organizationId", organizationId).eq("status", "active")
+    )
+    .collect();
+
+  // Most severe first, newest first within a severity
+  const severityOrder: Record<string, number> = { critical: 0, warning: 1, info: 2 };
+  alerts.sort(
+    (a, b) => (severityOrder[a.severity] ?? 3) - (severityOrder[b.severity] ?? 3) || b.createdAt - a.createdAt
+  );
+  return {
+    alerts: {
+      active: alerts.length,
+      critical: alerts.filter((a) => a.severity === "critical").length,
+    },
+    recentAlerts: alerts.slice(0, RECENT_ALERT_LIMIT).map((a) => ({
+      alertId: a._id,
+      severity: a.severity,
+      title: a.title,
+      message: a.message,
+    })),
+  };
+};
+
+const taskSection: SummarySection = async (ctx, organizationId, now) => {
+  const today = isoDate(now);
+  const tasks = await ctx.db
+    .query("tasks")
+    .withIndex("by_organizationId", (q) => q.eq("organizationId", organizationId))
+    .collect();
+
+  // Tasks due in the next 30 days
+  const dueSoonEnd = isoDate(now, UPCOMING_TASK_DAYS);
+  const upcomingTasks = tasks
+    .filter(
+      (t) =>
+        (t.status === "pending" || t.status === "in_progress") &&
+        t.dueDate >= today &&
+        t.dueDate <= dueSoonEnd
+    )
+    .sort((a, b) => a.dueDate.localeCompare(b.dueDate));
+  const listedTasks = upcomingTasks.slice(0, UPCOMING_TASK_LIMIT);
+  const participants = await Promise.all(
+    listedTasks.map((t) => (t.linkedParticipantId ? ctx.db.get(t.linkedParticipantId) : null))
+  );
+
+  return {
+    tasks: taskStats(tasks, today),
+    upcomingTaskCount: upcomingTasks.length,
+    upcomingTasks: listedTasks.map((t, i) => {
+      const participant = participants[i];
+      return {
+        taskId: t._id,
+        title: t.title,
+        priority: t.priority,
+        category: t.category,
+        dueDate: t.dueDate,
+        participantName: participant ? `${participant.firstName} ${participant.lastName}` : undefined,
+      };
+    }),
+  };
+};
+
+const scheduleSection: SummarySection = async (ctx, organizationId, now) => {
+  const schedules = await ctx.db
+    .query("preventativeSchedule")
+    .withIndex("by_organizationId", (q) => q.eq("organizationId", organizationId))
+    .collect();
+
+  // Soonest (including overdue) first
+  const activeSchedules = schedules.filter((s) => s.isActive);
+  const listedSchedules = [...activeSchedules]
+    .sort((a, b) => new Date(a.nextDueDate).getTime() - new Date(b.nextDueDate).getTime())
+    .slice(0, UPCOMING_SCHEDULE_LIMIT);
+  const properties = await Promise.all(listedSchedules.map((s) => ctx.db.get(s.propertyId)));
+
+  return {
+    schedules: scheduleStats(activeSchedules, now),
+    upcomingSchedules: listedSchedules.map((s, i) => {
+      const property = properties[i];
+      return {
+        scheduleId: s._id,
+        taskName: s.taskName,
+        propertyName: property?.propertyName || property?.addressLine1,
+        nextDueDate: s.nextDueDate,
+        estimatedCost: s.estimatedCost,
+      };
+    }),
+  };
+};
+
+const complianceSection: SummarySection = async (ctx, organizationId, now) => {
+  const [participants, certifications] = await Promise.all([
+    ctx.db.query("participants").withIndex("by_organizationId", (q) => q.eq("organizationId", organizationId)).collect(),
+    ctx.db.query("complianceCertifications").withIndex("by_organizationId", (q) => q.eq("organizationId", organizationId)).collect(),
+  ]);
+  const in30DaysMs = now + 30 * 24 * 60 * 60 * 1000;
+
+  return {
+    consent: consentStats(participants, isoDate(now), isoDate(now, 30)),
+    certifications: {
+      total: certifications.length,
+      expired: certifications.filter((c) => c.status === "expired").length,
+      expiringSoon: certifications.filter((c) => {
+        const expiry = new Date(c.expiryDate).getTime();
+        return expiry > now && expiry <= in30DaysMs;
+      }).length,
+    },
+  };
+};
+
+const practiceSection: SummarySection = async (ctx, organizationId, now) => {
+  const today = isoDate(now);
+  const in14Days = isoDate(now, 14);
+  const practices = await ctx.db
+    .query("restrictivePractices")
+    .withIndex("by_organizationId", (q) => q.eq("organizationId", organizationId))
+    .collect();
+
+  // Soft-deleted records excluded
+  const currentPractices = practices.filter((p) => !p.isDeleted);
+  const activePractices = currentPractices.filter((p) => p.status === "active");
+  return {
+    restrictivePractices: {
+      activeCount: activePractices.length,
+      reviewsOverdue: activePractices.filter((p) => p.nextReviewDate < today).length,
+      authorisationsExpiring: activePractices.filter(
+        (p) => p.authorisationExpiry >= today && p.authorisationExpiry <= in14Days
+      ).length,
+      unauthorised: activePractices.filter((p) => !p.isAuthorised).length,
+      unreported: currentPractices.filter((p) => p.ndisReportable && !p.ndisReportedDate).length,
+      totalRecords: currentPractices.length,
+    },
+  };
+};
+
+const trainingSection: SummarySection = async (ctx, organizationId, now) => {
+  const today = isoDate(now);
+  const in30Days = isoDate(now, 30);
+  const [trainingRecords, users] = await Promise.all([
+    ctx.db.query("staffTraining").withIndex("by_organizationId", (q) => q.eq("organizationId", organizationId)).collect(),
+    ctx.db.query("users").withIndex("by_organizationId", (q) => q.eq("organizationId", organizationId)).collect(),
+  ]);
+
+  // Staff with every mandatory category completed and current
+  const activeStaff = users.filter((u) => u.isActive && u.role !== "sil_provider");
+  let compliantStaff = 0;
+  for (const staff of activeStaff) {
+    const staffRecords = trainingRecords.filter((r) => r.staffId === staff._id);
+    const allMandatoryComplete = MANDATORY_TRAINING.every((cat) => {
+      const record = staffRecords.find((r) => r.category === cat && r.status === "completed");
+      return !!record && !(record.expiryDate && record.expiryDate < today);
+    });
+    if (allMandatoryComplete) compliantStaff++;
+  }
+
+  return {
+    training: {
+      totalRecords: trainingRecords.length,
+      expired: trainingRecords.filter(
+        (r) => r.status === "expired" || (r.expiryDate && r.expiryDate < today && r.status === "completed")
+      ).length,
+      expiring: trainingRecords.filter(
+        (r) => r.status === "completed" && r.expiryDate && r.expiryDate >= today && r.expiryDate <= in30Days
+      ).length,
+      staffCount: activeStaff.length,
+      compliantStaff,
+      compliancePercentage:
+        activeStaff.length > 0 ? Math.round((compliantStaff / activeStaff.length) * 100) : 0,
+    },
+  };
+};
+
+// Rebuild order; each entry runs in its own mutation
+const SUMMARY_SECTIONS: SummarySection[] = [
+  portfolioSection,
+  alertSection,
+  taskSection,
+  scheduleSection,
+  complianceSection,
+  practiceSection,
+  trainingSection,
+];
+
+/**
+ * Request a rebuild of an organization's dashboard after a write, unless
+ * one is already pending.
+ *
+ * Usage:
+ * ```
+ * await ctx.db.patch(args.id, { status: "completed" });
+ * await markDashboardStale(ctx, task.organizationId);
+ * ```
+ */
+export async function markDashboardStale(
+  ctx: MutationCtx,
+  organizationId: Id<"organizations"> | undefined
+): Promise<void> {
+  if (!organizationId) return;
+  if (await getRebuildRequest(ctx, organizationId)) return;
+
+  await ctx.db.insert("dashboardRebuilds", { organizationId, requestedAt: Date.now() });
+  await ctx.scheduler.runAfter(REBUILD_DELAY_MS, internal.dashboard.rebuildSummary, {
+    organizationId,
+  });
+}
+
+/**
+ * The caller's dashboard, or null until ensureSummary has created it.
+ * Restricted sections are omitted for roles that can't view them.
+ */
+export const getSummary = instrumentedQuery({
+  args: { userId: v.id("users") },
+  handler: async (ctx, args) => {
+    const { organizationId, user } = await requireTenant(ctx, args.userId);
+    const summary = await getDashboardSummary(ctx, organizationId);
+    if (!summary || summary.computedAt === 0) return null;
+
+    const now = Date.now();
+    const today = isoDate(now);
+    return {
+      ...summary,
+      upcomingTasks: summary.upcomingTasks.map((t) => ({ ...t, isOverdue: t.dueDate < today })),
+      upcomingSchedules: summary.upcomingSchedules.map((s) => ({
+        ...s,
+        daysUntilDue: daysUntil(s.nextDueDate, now),
+      })),
+      restrictivePractices: hasPermission(user.role, "restrictivePractices", "view")
+        ? summary.restrictivePractices
+        : null,
+      training: hasPermission(user.role, "staffTraining", "view") ? summary.training : null,
+    };
+  },
+});
+
+/**
+ * Create the caller's dashboard summary if it doesn't exist yet.
+ * Called by the dashboard page when getSummary returns null; the counts
+ * appear once the first rebuild finishes.
+ */
+export const ensureSummary = mutation({
+  args: { userId: v.id("users") },
+  handler: async (ctx, args) => {
+    const { organizationId } = await requireTenant(ctx, args.userId);
+    if (await getDashboardSummary(ctx, organizationId)) return;
+    await ctx.db.insert("dashboardSummaries", emptySummary(organizationId));
+    await ctx.scheduler.runAfter(0, internal.dashboard.rebuildSummary, { organizationId });
+  },
+});
+
+/**
+ * Recount one section of the summary, then schedule the next. All steps of
+ * a rebuild share the first step's clock, and the last one stamps
+ * computedAt.
+ */
+export const rebuildSummary = internalMutation({
+  args: {
+    organizationId: v.id("organizations"),
+    step: v.optional(v.number()),
+    startedAt: v.optional(v.number()),
+  },
+  handler: async (ctx, args) => {
+    const step = args.step ?? 0;
+    if (step === 0) {
+      // Writes from here on request another rebuild
+      const request = await getRebuildRequest(ctx, args.organizationId);
+      if (request) await ctx.db.delete(request._id);
+    }
+
+    const summary = await getDashboardSummary(ctx, args.organizationId);
+    if (!summary) return;
+
+    const now = args.startedAt ?? Date.now();
+    const fields = await SUMMARY_SECTIONS[step](ctx, args.organizationId, now);
+    if (step < SUMMARY_SECTIONS.length - 1) {
+      await ctx.db.patch(summary._id, fields);
+      await ctx.scheduler.runAfter(0, internal.dashboard.rebuildSummary, {
+        organizationId: args.organizationId,
+        step: step + 1,
+        startedAt: now,
+      });
+    } else {
+      await ctx.db.patch(summary._id, { ...fields, computedAt: now, staleSince: undefined });
+    }
+  },
+});
+
+/**
+ * Schedule a rebuild for every organization that has a dashboard summary.
+ */
+export const reconcileAll = internalMutation({
+  args: {},
+  handler: async (ctx) => {
+    const summaries = await ctx.db.query("dashboardSummaries").collect();
+    for (const summary of summaries) {
+      await ctx.scheduler.runAfter(0, internal.dashboard.rebuildSummary, {
+        organizationId: summary.organizationId,
+      });
+    }
+    return { scheduled: summaries.length };
+  },
+});
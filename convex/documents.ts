@@ -2,6 +2,7 @@ import { v } from "convex/values";
 import { mutation, query, internalMutation } from "./_generated/server";
 import { internal } from "./_generated/api";
 import { requireTenant } from "./authHelpers";
+import { syncCalendarIndex } from "./calendarIndex";
 import { validateFileUpload, sanitizeFileName } from "./lib/fileValidation";
 
 // Generate upload URL for file storage
@@ -55,6 +56,7 @@ export const create = mutation({
       createdAt: now,
       updatedAt: now,
     });
+    await syncCalendarIndex(ctx, "documents", documentId);
 
     // If this is a certification document with an expiry date, auto-create/update compliance certification
     const certificationTypes = [
@@ -346,6 +348,7 @@ export const update = mutation({
       ...updates,
       updatedAt: Date.now(),
     });
+    await syncCalendarIndex(ctx, "documents", id);
   },
 });
 
@@ -367,6 +370,7 @@ export const remove = mutation({
 
     // Delete from database
     await ctx.db.delete(args.id);
+    await syncCalendarIndex(ctx, "documents", args.id);
   },
 });
 
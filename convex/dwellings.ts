@@ -1,36 +1,83 @@
-import { mutation, query } from "./_generated/server";
-import { v } from "convex/values";
+import { mutation, query, MutationCtx } from "./_generated/server";
+import { v, Infer } from "convex/values";
 import { internal } from "./_generated/api";
-import { requirePermission, requireAuth, getUserFullName, requireTenant, enforcePlanLimit, requireActiveSubscription } from "./authHelpers";
+import { requirePermission, requireAuth, getUserFullName, requireTenant, enforcePlanLimit, requireActiveSubscription, AuthenticatedUser } from "./authHelpers";
 import { formatChanges } from "./auditLog";
 import { decryptField } from "./lib/encryption";
+import { trackOrgStats } from "./orgStats";
+import { markDashboardStale } from "./dashboard";
+import { Id } from "./_generated/dataModel";
+
+const dwellingFields = {
+  dwellingName: v.string(),
+  dwellingType: v.union(
+    v.literal("house"),
+    v.literal("villa"),
+    v.literal("apartment"),
+    v.literal("unit")
+  ),
+  bedrooms: v.number(),
+  bathrooms: v.optional(v.number()),
+  sdaDesignCategory: v.union(
+    v.literal("improved_liveability"),
+    v.literal("fully_accessible"),
+    v.literal("robust"),
+    v.literal("high_physical_support")
+  ),
+  sdaBuildingType: v.union(v.literal("new_build"), v.literal("existing")),
+  registrationDate: v.optional(v.string()), // Date when dwelling was registered for SDA
+  sdaRegisteredAmount: v.optional(v.number()), // Annual SDA funding amount
+  maxParticipants: v.number(),
+  weeklyRentAmount: v.optional(v.number()),
+  notes: v.optional(v.string()),
+};
+
+const dwellingValidator = v.object(dwellingFields);
+
+/**
+ * Insert a new, vacant dwelling and record its org stats and audit entry.
+ * Callers check permissions, plan limits and the subscription first.
+ */
+async function insertDwelling(
+  ctx: MutationCtx,
+  user: AuthenticatedUser,
+  organizationId: Id<"organizations">,
+  propertyId: Id<"properties">,
+  dwelling: Infer<typeof dwellingValidator>,
+  now: number
+): Promise<Id<"dwellings">> {
+  const dwellingId = await ctx.db.insert("dwellings", {
+    ...dwelling,
+    propertyId,
+    organizationId,
+    currentOccupancy: 0,
+    occupancyStatus: "vacant",
+    isActive: true,
+    createdAt: now,
+    updatedAt: now,
+  });
+  await trackOrgStats(ctx, "dwellings", dwellingId, null);
+
+  // Audit log
+  await ctx.runMutation(internal.auditLog.log, {
+    userId: user._id,
+    userEmail: user.email,
+    userName: getUserFullName(user),
+    action: "create",
+    entityType: "dwelling",
+    entityId: dwellingId,
+    entityName: dwelling.dwellingName,
+  });
+
+  return dwellingId;
+}
 
 // Create a new dwelling
 export const create = mutation({
   args: {
     userId: v.id("users"),
     propertyId: v.id("properties"),
-    dwellingName: v.string(),
-    dwellingType: v.union(
-      v.literal("house"),
-      v.literal("villa"),
-      v.literal("apartment"),
-      v.literal("unit")
-    ),
-    bedrooms: v.number(),
-    bathrooms: v.optional(v.number()),
-    sdaDesignCategory: v.union(
-      v.literal("improved_liveability"),
-      v.literal("fully_accessible"),
-      v.literal("robust"),
-      v.literal("high_physical_support")
-    ),
-    sdaBuildingType: v.union(v.literal("new_build"), v.literal("existing")),
-    registrationDate: v.optional(v.string()), // Date when dwelling was registered for SDA
-    sdaRegisteredAmount: v.optional(v.number()), // Annual SDA funding amount
-    maxParticipants: v.number(),
-    weeklyRentAmount: v.optional(v.number()),
-    notes: v.optional(v.string()),
+    ...dwellingFields,
   },
   handler: async (ctx, args) => {
     // Permission check + tenant context
@@ -41,30 +88,40 @@ export const create = mutation({
     await enforcePlanLimit(ctx, organizationId, "dwellings", auditUser);
     // B5 FIX: Require active subscription for write operations
     await requireActiveSubscription(ctx, organizationId, auditUser);
-    const { userId, ...dwellingData } = args;
-    const now = Date.now();
-    const dwellingId = await ctx.db.insert("dwellings", {
-      ...dwellingData,
-      organizationId,
-      currentOccupancy: 0,
-      occupancyStatus: "vacant",
-      isActive: true,
-      createdAt: now,
-      updatedAt: now,
-    });
+    const { userId, propertyId, ...dwellingData } = args;
+    return await insertDwelling(ctx, user, organizationId, propertyId, dwellingData, Date.now());
+  },
+});
 
-    // Audit log
-    await ctx.runMutation(internal.auditLog.log, {
-      userId: args.userId,
-      userEmail: user.email,
-      userName: getUserFullName(user),
-      action: "create",
-      entityType: "dwelling",
-      entityId: dwellingId,
-      entityName: args.dwellingName,
-    });
+// Create several dwellings for a property at once (new property wizard).
+// Plan capacity is reserved for the whole batch up front, so either every
+// dwelling is created or none are.
+export const createBatch = mutation({
+  args: {
+    userId: v.id("users"),
+    propertyId: v.id("properties"),
+    dwellings: v.array(dwellingValidator),
+  },
+  handler: async (ctx, args) => {
+    const user = await requirePermission(ctx, args.userId, "properties", "create");
+    const { organizationId } = await requireTenant(ctx, args.userId);
+
+    const property = await ctx.db.get(args.propertyId);
+    if (!property || property.organizationId !== organizationId) {
+      throw new Error("Property not found");
+    }
+
+    const auditUser = { userId: user._id, userEmail: user.email, userName: `${user.firstName} ${user.lastName}` };
+    await enforcePlanLimit(ctx, organizationId, "dwellings", auditUser, args.dwellings.length);
+    await requireActiveSubscription(ctx, organizationId, auditUser);
+
+    const now = Date.now();
+    const dwellingIds: Id<"dwellings">[] = [];
+    for (const dwelling of args.dwellings) {
+      dwellingIds.push(await insertDwelling(ctx, user, organizationId, args.propertyId, dwelling, now));
+    }
 
-    return dwellingId;
+    return dwellingIds;
   },
 });
 
@@ -196,6 +253,7 @@ export const update = mutation({
     }
 
     await ctx.db.patch(dwellingId, filteredUpdates);
+    await markDashboardStale(ctx, organizationId);
 
     // Audit log with previousValues
     const { changes, previousValues } = formatChanges(
@@ -266,6 +324,7 @@ export const updateOccupancy = mutation({
       occupancyStatus,
       updatedAt: Date.now(),
     });
+    await markDashboardStale(ctx, organizationId);
 
     // Audit log occupancy changes (triggers NDIA notifications)
     // This is critical for compliance - NDIA must be notified of vacancy/occupancy changes
@@ -325,6 +384,7 @@ export const remove = mutation({
       isActive: false,
       updatedAt: Date.now(),
     });
+    await trackOrgStats(ctx, "dwellings", args.dwellingId, dwelling);
 
     // Audit log the deletion
     await ctx.runMutation(internal.auditLog.log, {
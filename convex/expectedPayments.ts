@@ -1,6 +1,16 @@
 import { v } from "convex/values";
-import { mutation, query, internalMutation } from "./_generated/server";
+import { mutation, query, internalMutation, MutationCtx } from "./_generated/server";
+import { internal } from "./_generated/api";
+import { Id } from "./_generated/dataModel";
 import { requireTenant } from "./authHelpers";
+import { syncCalendarIndex } from "./calendarIndex";
+import { trackOrgStats } from "./orgStats";
+import {
+  buildExpectedPayments,
+  currentPeriodMonth,
+  existingPaymentKey,
+  GeneratedPaymentType,
+} from "./lib/expectedPaymentGeneration";
 
 // Create an expected payment
 export const create = mutation({
@@ -44,6 +54,7 @@ export const create = mutation({
       createdAt: now,
       updatedAt: now,
     });
+    await syncCalendarIndex(ctx, "expectedPayments", id);
 
     return id;
   },
@@ -185,6 +196,7 @@ export const markReceived = mutation({
       notes: args.notes,
       updatedAt: Date.now(),
     });
+    await syncCalendarIndex(ctx, "expectedPayments", args.id);
 
     // If matched to a transaction, update the transaction too
     if (args.matchedTransactionId) {
@@ -199,6 +211,177 @@ export const markReceived = mutation({
   },
 });
 
+type GenerationCounts = Record<GeneratedPaymentType, number>;
+
+/**
+ * Upsert one organization's auto-generated expected payments for a month.
+ *
+ * Reads participants, current plans, dwellings, properties and the month's
+ * existing expected payments once each through org-scoped indexes, then
+ * inserts what's missing keyed by (participant or property, type, period).
+ * Pending auto-generated rows whose amount or date drifted (e.g. a plan
+ * change) are patched; anything received, cancelled or manual is left alone,
+ * so re-running a month is safe.
+ */
+async function generateForOrganization(
+  ctx: MutationCtx,
+  organizationId: Id<"organizations">,
+  periodMonth: string,
+  options: { paymentDay?: number; types?: GeneratedPaymentType[] } = {}
+) {
+  const now = Date.now();
+  const [
+    orgParticipants,
+    legacyParticipants,
+    orgPlans,
+    dwellings,
+    properties,
+    existingPayments,
+    legacyPayments,
+  ] = await Promise.all([
+    ctx.db
+      .query("participants")
+      .withIndex("by_organizationId_status", (q) =>
+        q.eq("organizationId", organizationId).eq("status", "active")
+      )
+      .collect(),
+    // Participants created before organizationId was set on every insert
+    // (see participants:backfillOrganizationIds)
+    ctx.db
+      .query("participants")
+      .withIndex("by_organizationId_status", (q) =>
+        q.eq("organizationId", undefined).eq("status", "active")
+      )
+      .collect(),
+    ctx.db
+      .query("participantPlans")
+      .withIndex("by_organizationId_planStatus", (q) =>
+        q.eq("organizationId", organizationId).eq("planStatus", "current")
+      )
+      .collect(),
+    ctx.db
+      .query("dwellings")
+      .withIndex("by_organizationId", (q) => q.eq("organizationId", organizationId))
+      .collect(),
+    ctx.db
+      .query("properties")
+      .withIndex("by_organizationId", (q) => q.eq("organizationId", organizationId))
+      .collect(),
+    ctx.db
+      .query("expectedPayments")
+      .withIndex("by_organizationId_periodMonth", (q) =>
+        q.eq("organizationId", organizationId).eq("periodMonth", periodMonth)
+      )
+      .collect(),
+    // Rows from the old platform-wide cron were written without an organizationId
+    ctx.db
+      .query("expectedPayments")
+      .withIndex("by_organizationId_periodMonth", (q) =>
+        q.eq("organizationId", undefined).eq("periodMonth", periodMonth)
+      )
+      .collect(),
+  ]);
+
+  // Adopt legacy participants housed in this organization's dwellings
+  const orgDwellingIds = new Set<string>(dwellings.map((d) => d._id));
+  const participants = [...orgParticipants];
+  for (const participant of legacyParticipants) {
+    if (!participant.dwellingId || !orgDwellingIds.has(participant.dwellingId)) continue;
+    await ctx.db.patch(participant._id, { organizationId });
+    await trackOrgStats(ctx, "participants", participant._id, null);
+    participants.push(participant);
+  }
+
+  // Current plans without an organizationId are only reachable by participant
+  const plans = [...orgPlans];
+  const planned = new Set<string>(orgPlans.map((plan) => plan.participantId));
+  for (const participant of participants) {
+    if (planned.has(participant._id)) continue;
+    const legacyPlans = await ctx.db
+      .query("participantPlans")
+      .withIndex("by_participant_status", (q) =>
+        q.eq("participantId", participant._id).eq("planStatus", "current")
+      )
+      .collect();
+    for (const plan of legacyPlans) {
+      if (plan.organizationId) continue;
+      await ctx.db.patch(plan._id, { organizationId });
+      plans.push(plan);
+    }
+  }
+
+  const existingByKey = new Map(existingPayments.map((p) => [existingPaymentKey(p), p]));
+  const orgSubjects = new Set<string>([
+    ...participants.map((p) => p._id),
+    ...properties.map((p) => p._id),
+  ]);
+  for (const payment of legacyPayments) {
+    const subjectId =
+      payment.paymentType === "owner_disbursement" ? payment.propertyId : payment.participantId;
+    const key = existingPaymentKey(payment);
+    if (!subjectId || !orgSubjects.has(subjectId) || existingByKey.has(key)) continue;
+    await ctx.db.patch(payment._id, { organizationId });
+    existingByKey.set(key, payment);
+  }
+
+  const drafts = buildExpectedPayments({
+    periodMonth,
+    paymentDay: options.paymentDay || 5,
+    participants,
+    plans,
+    dwellings,
+    properties,
+    types: options.types,
+  });
+
+  const created: GenerationCounts = { sda_income: 0, rrc_income: 0, owner_disbursement: 0 };
+  let updated = 0;
+
+  for (const draft of drafts) {
+    const existing = existingByKey.get(draft.key);
+    if (existing) {
+      if (
+        existing.sourceType === "auto_generated" &&
+        existing.status === "pending" &&
+        (existing.expectedAmount !== draft.expectedAmount ||
+          existing.expectedDate !== draft.expectedDate)
+      ) {
+        await ctx.db.patch(existing._id, {
+          planId: draft.plan?._id,
+          expectedAmount: draft.expectedAmount,
+          expectedDate: draft.expectedDate,
+          updatedAt: now,
+        });
+        await syncCalendarIndex(ctx, "expectedPayments", existing._id);
+        updated++;
+      }
+      continue;
+    }
+
+    const expectedPaymentId = await ctx.db.insert("expectedPayments", {
+      organizationId,
+      paymentType: draft.paymentType,
+      participantId: draft.participant?._id,
+      planId: draft.plan?._id,
+      propertyId: draft.property?._id,
+      ownerId: draft.paymentType === "owner_disbursement" ? draft.property?.ownerId : undefined,
+      expectedAmount: draft.expectedAmount,
+      expectedDate: draft.expectedDate,
+      periodMonth,
+      periodStart: draft.periodStart,
+      periodEnd: draft.periodEnd,
+      status: "pending",
+      sourceType: "auto_generated",
+      createdAt: now,
+      updatedAt: now,
+    });
+    await syncCalendarIndex(ctx, "expectedPayments", expectedPaymentId);
+    created[draft.paymentType]++;
+  }
+
+  return { created, updated };
+}
+
 // Generate expected SDA income payments for a month
 export const generateSdaExpected = mutation({
   args: {
@@ -207,78 +390,10 @@ export const generateSdaExpected = mutation({
   },
   handler: async (ctx, args) => {
     const { organizationId } = await requireTenant(ctx, args.userId);
-    const now = Date.now();
-    let created = 0;
-
-    // Get all active participants for this organization
-    const allParticipants = await ctx.db
-      .query("participants")
-      .withIndex("by_organizationId", (q) => q.eq("organizationId", organizationId))
-      .collect();
-    const participants = allParticipants.filter((p) => p.status === "active");
-
-    for (const participant of participants) {
-      // Get current plan
-      const plan = await ctx.db
-        .query("participantPlans")
-        .withIndex("by_participant", (q) => q.eq("participantId", participant._id))
-        .filter((q) => q.eq(q.field("planStatus"), "current"))
-        .first();
-
-      if (!plan) continue;
-
-      const monthlySdaAmount = plan.monthlySdaAmount || plan.annualSdaBudget / 12;
-      if (!monthlySdaAmount) continue;
-
-      // Check if expected payment already exists
-      const existing = await ctx.db
-        .query("expectedPayments")
-        .withIndex("by_participant", (q) => q.eq("participantId", participant._id))
-        .filter((q) =>
-          q.and(
-            q.eq(q.field("periodMonth"), args.periodMonth),
-            q.eq(q.field("paymentType"), "sda_income")
-          )
-        )
-        .first();
-
-      if (existing) continue;
-
-      // Get dwelling and property info
-      const dwelling = participant.dwellingId ? await ctx.db.get(participant.dwellingId) : null;
-      const propertyId = dwelling?.propertyId;
-
-      // Calculate expected date (claim day or end of month)
-      const claimDay = plan.claimDay || 15;
-      const [year, month] = args.periodMonth.split("-").map(Number);
-      const expectedDate = `${args.periodMonth}-${String(claimDay).padStart(2, "0")}`;
-
-      // Calculate period dates
-      const periodStart = `${args.periodMonth}-01`;
-      const lastDay = new Date(year, month, 0).getDate();
-      const periodEnd = `${args.periodMonth}-${String(lastDay).padStart(2, "0")}`;
-
-      await ctx.db.insert("expectedPayments", {
-        organizationId,
-        paymentType: "sda_income",
-        participantId: participant._id,
-        planId: plan._id,
-        propertyId,
-        expectedAmount: monthlySdaAmount,
-        expectedDate,
-        periodMonth: args.periodMonth,
-        periodStart,
-        periodEnd,
-        status: "pending",
-        sourceType: "auto_generated",
-        createdAt: now,
-        updatedAt: now,
-      });
-
-      created++;
-    }
-
-    return { created };
+    const { created, updated } = await generateForOrganization(ctx, organizationId, args.periodMonth, {
+      types: ["sda_income"],
+    });
+    return { created: created.sda_income, updated };
   },
 });
 
@@ -290,79 +405,10 @@ export const generateRrcExpected = mutation({
   },
   handler: async (ctx, args) => {
     const { organizationId } = await requireTenant(ctx, args.userId);
-    const now = Date.now();
-    let created = 0;
-
-    // Get all active participants for this organization
-    const allParticipants = await ctx.db
-      .query("participants")
-      .withIndex("by_organizationId", (q) => q.eq("organizationId", organizationId))
-      .collect();
-    const participants = allParticipants.filter((p) => p.status === "active");
-
-    for (const participant of participants) {
-      // Get current plan
-      const plan = await ctx.db
-        .query("participantPlans")
-        .withIndex("by_participant", (q) => q.eq("participantId", participant._id))
-        .filter((q) => q.eq(q.field("planStatus"), "current"))
-        .first();
-
-      if (!plan || !plan.reasonableRentContribution) continue;
-
-      // Check if expected payment already exists
-      const existing = await ctx.db
-        .query("expectedPayments")
-        .withIndex("by_participant", (q) => q.eq("participantId", participant._id))
-        .filter((q) =>
-          q.and(
-            q.eq(q.field("periodMonth"), args.periodMonth),
-            q.eq(q.field("paymentType"), "rrc_income")
-          )
-        )
-        .first();
-
-      if (existing) continue;
-
-      // Convert RRC to monthly
-      let monthlyRrc = plan.reasonableRentContribution;
-      if (plan.rentContributionFrequency === "fortnightly") {
-        monthlyRrc = (plan.reasonableRentContribution * 26) / 12;
-      } else if (plan.rentContributionFrequency === "weekly") {
-        monthlyRrc = (plan.reasonableRentContribution * 52) / 12;
-      }
-
-      // Get dwelling and property
-      const dwelling = participant.dwellingId ? await ctx.db.get(participant.dwellingId) : null;
-      const propertyId = dwelling?.propertyId;
-
-      // RRC typically comes throughout the month (Centrepay)
-      const [year, month] = args.periodMonth.split("-").map(Number);
-      const lastDay = new Date(year, month, 0).getDate();
-      const periodStart = `${args.periodMonth}-01`;
-      const periodEnd = `${args.periodMonth}-${String(lastDay).padStart(2, "0")}`;
-
-      await ctx.db.insert("expectedPayments", {
-        organizationId,
-        paymentType: "rrc_income",
-        participantId: participant._id,
-        planId: plan._id,
-        propertyId,
-        expectedAmount: monthlyRrc,
-        expectedDate: periodEnd, // End of month
-        periodMonth: args.periodMonth,
-        periodStart,
-        periodEnd,
-        status: "pending",
-        sourceType: "auto_generated",
-        createdAt: now,
-        updatedAt: now,
-      });
-
-      created++;
-    }
-
-    return { created };
+    const { created, updated } = await generateForOrganization(ctx, organizationId, args.periodMonth, {
+      types: ["rrc_income"],
+    });
+    return { created: created.rrc_income, updated };
   },
 });
 
@@ -375,98 +421,11 @@ export const generateOwnerExpected = mutation({
   },
   handler: async (ctx, args) => {
     const { organizationId } = await requireTenant(ctx, args.userId);
-    const now = Date.now();
-    const paymentDay = args.paymentDay || 5;
-    let created = 0;
-
-    // Get all active properties for this organization
-    const allProperties = await ctx.db
-      .query("properties")
-      .withIndex("by_organizationId", (q) => q.eq("organizationId", organizationId))
-      .collect();
-    const properties = allProperties.filter((p) => p.isActive === true);
-
-    for (const property of properties) {
-      // Check if expected payment already exists
-      const existing = await ctx.db
-        .query("expectedPayments")
-        .withIndex("by_property", (q) => q.eq("propertyId", property._id))
-        .filter((q) =>
-          q.and(
-            q.eq(q.field("periodMonth"), args.periodMonth),
-            q.eq(q.field("paymentType"), "owner_disbursement")
-          )
-        )
-        .first();
-
-      if (existing) continue;
-
-      // Get all participants at this property
-      const dwellings = await ctx.db
-        .query("dwellings")
-        .withIndex("by_property", (q) => q.eq("propertyId", property._id))
-        .collect();
-
-      let totalOwnerPayment = 0;
-
-      for (const dwelling of dwellings) {
-        const participants = await ctx.db
-          .query("participants")
-          .withIndex("by_dwelling", (q) => q.eq("dwellingId", dwelling._id))
-          .filter((q) => q.eq(q.field("status"), "active"))
-          .collect();
-
-        for (const participant of participants) {
-          const plan = await ctx.db
-            .query("participantPlans")
-            .withIndex("by_participant", (q) => q.eq("participantId", participant._id))
-            .filter((q) => q.eq(q.field("planStatus"), "current"))
-            .first();
-
-          if (!plan) continue;
-
-          const monthlySda = plan.monthlySdaAmount || plan.annualSdaBudget / 12 || 0;
-
-          // Convert RRC to monthly
-          let monthlyRrc = plan.reasonableRentContribution || 0;
-          if (plan.rentContributionFrequency === "fortnightly") {
-            monthlyRrc = (monthlyRrc * 26) / 12;
-          } else if (plan.rentContributionFrequency === "weekly") {
-            monthlyRrc = (monthlyRrc * 52) / 12;
-          }
-
-          const totalIncome = monthlySda + monthlyRrc;
-          const managementFeePercent = property.managementFeePercent || 0;
-          const managementFee = totalIncome * (managementFeePercent / 100);
-          const ownerPayment = totalIncome - managementFee;
-
-          totalOwnerPayment += ownerPayment;
-        }
-      }
-
-      if (totalOwnerPayment <= 0) continue;
-
-      // Expected payment date (5th of month)
-      const expectedDate = `${args.periodMonth}-${String(paymentDay).padStart(2, "0")}`;
-
-      await ctx.db.insert("expectedPayments", {
-        organizationId,
-        paymentType: "owner_disbursement",
-        propertyId: property._id,
-        ownerId: property.ownerId,
-        expectedAmount: totalOwnerPayment,
-        expectedDate,
-        periodMonth: args.periodMonth,
-        status: "pending",
-        sourceType: "auto_generated",
-        createdAt: now,
-        updatedAt: now,
-      });
-
-      created++;
-    }
-
-    return { created };
+    const { created, updated } = await generateForOrganization(ctx, organizationId, args.periodMonth, {
+      paymentDay: args.paymentDay,
+      types: ["owner_disbursement"],
+    });
+    return { created: created.owner_disbursement, updated };
   },
 });
 
@@ -479,422 +438,50 @@ export const generateForMonth = mutation({
   },
   handler: async (ctx, args) => {
     const { organizationId } = await requireTenant(ctx, args.userId);
-    const now = Date.now();
-    const paymentDay = args.paymentDay || 5;
-    let sdaCreated = 0;
-    let rrcCreated = 0;
-    let ownerCreated = 0;
-
-    // Get all active participants for this organization
-    const allParticipants = await ctx.db
-      .query("participants")
-      .withIndex("by_organizationId", (q) => q.eq("organizationId", organizationId))
-      .collect();
-    const participants = allParticipants.filter((p) => p.status === "active");
-
-    // 1. Generate SDA expected payments
-    for (const participant of participants) {
-      const plan = await ctx.db
-        .query("participantPlans")
-        .withIndex("by_participant", (q) => q.eq("participantId", participant._id))
-        .filter((q) => q.eq(q.field("planStatus"), "current"))
-        .first();
-
-      if (!plan) continue;
-
-      const monthlySdaAmount = plan.monthlySdaAmount || plan.annualSdaBudget / 12;
-      if (monthlySdaAmount) {
-        const existingSda = await ctx.db
-          .query("expectedPayments")
-          .withIndex("by_participant", (q) => q.eq("participantId", participant._id))
-          .filter((q) =>
-            q.and(
-              q.eq(q.field("periodMonth"), args.periodMonth),
-              q.eq(q.field("paymentType"), "sda_income")
-            )
-          )
-          .first();
-
-        if (!existingSda) {
-          const dwelling = participant.dwellingId ? await ctx.db.get(participant.dwellingId) : null;
-          const propertyId = dwelling?.propertyId;
-          const claimDay = plan.claimDay || 15;
-          const expectedDate = `${args.periodMonth}-${String(claimDay).padStart(2, "0")}`;
-          const [year, month] = args.periodMonth.split("-").map(Number);
-          const periodStart = `${args.periodMonth}-01`;
-          const lastDay = new Date(year, month, 0).getDate();
-          const periodEnd = `${args.periodMonth}-${String(lastDay).padStart(2, "0")}`;
-
-          await ctx.db.insert("expectedPayments", {
-            organizationId,
-            paymentType: "sda_income",
-            participantId: participant._id,
-            planId: plan._id,
-            propertyId,
-            expectedAmount: monthlySdaAmount,
-            expectedDate,
-            periodMonth: args.periodMonth,
-            periodStart,
-            periodEnd,
-            status: "pending",
-            sourceType: "auto_generated",
-            createdAt: now,
-            updatedAt: now,
-          });
-
-          sdaCreated++;
-        }
-      }
-
-      // 2. Generate RRC expected payments
-      if (plan.reasonableRentContribution) {
-        const existingRrc = await ctx.db
-          .query("expectedPayments")
-          .withIndex("by_participant", (q) => q.eq("participantId", participant._id))
-          .filter((q) =>
-            q.and(
-              q.eq(q.field("periodMonth"), args.periodMonth),
-              q.eq(q.field("paymentType"), "rrc_income")
-            )
-          )
-          .first();
-
-        if (!existingRrc) {
-          let monthlyRrc = plan.reasonableRentContribution;
-          if (plan.rentContributionFrequency === "fortnightly") {
-            monthlyRrc = (plan.reasonableRentContribution * 26) / 12;
-          } else if (plan.rentContributionFrequency === "weekly") {
-            monthlyRrc = (plan.reasonableRentContribution * 52) / 12;
-          }
-
-          const dwelling = participant.dwellingId ? await ctx.db.get(participant.dwellingId) : null;
-          const propertyId = dwelling?.propertyId;
-          const [year, month] = args.periodMonth.split("-").map(Number);
-          const lastDay = new Date(year, month, 0).getDate();
-          const periodStart = `${args.periodMonth}-01`;
-          const periodEnd = `${args.periodMonth}-${String(lastDay).padStart(2, "0")}`;
-
-          await ctx.db.insert("expectedPayments", {
-            organizationId,
-            paymentType: "rrc_income",
-            participantId: participant._id,
-            planId: plan._id,
-            propertyId,
-            expectedAmount: monthlyRrc,
-            expectedDate: periodEnd,
-            periodMonth: args.periodMonth,
-            periodStart,
-            periodEnd,
-            status: "pending",
-            sourceType: "auto_generated",
-            createdAt: now,
-            updatedAt: now,
-          });
-
-          rrcCreated++;
-        }
-      }
-    }
-
-    // 3. Generate owner expected payments
-    const allOrgProperties = await ctx.db
-      .query("properties")
-      .withIndex("by_organizationId", (q) => q.eq("organizationId", organizationId))
-      .collect();
-    const orgProperties = allOrgProperties.filter((p) => p.isActive === true);
-
-    for (const property of orgProperties) {
-      const existingOwner = await ctx.db
-        .query("expectedPayments")
-        .withIndex("by_property", (q) => q.eq("propertyId", property._id))
-        .filter((q) =>
-          q.and(
-            q.eq(q.field("periodMonth"), args.periodMonth),
-            q.eq(q.field("paymentType"), "owner_disbursement")
-          )
-        )
-        .first();
-
-      if (existingOwner) continue;
-
-      const dwellings = await ctx.db
-        .query("dwellings")
-        .withIndex("by_property", (q) => q.eq("propertyId", property._id))
-        .collect();
-
-      let totalOwnerPayment = 0;
-
-      for (const dwelling of dwellings) {
-        const dwellingParticipants = await ctx.db
-          .query("participants")
-          .withIndex("by_dwelling", (q) => q.eq("dwellingId", dwelling._id))
-          .filter((q) => q.eq(q.field("status"), "active"))
-          .collect();
-
-        for (const p of dwellingParticipants) {
-          const pPlan = await ctx.db
-            .query("participantPlans")
-            .withIndex("by_participant", (q) => q.eq("participantId", p._id))
-            .filter((q) => q.eq(q.field("planStatus"), "current"))
-            .first();
-
-          if (!pPlan) continue;
-
-          const monthlySda = pPlan.monthlySdaAmount || pPlan.annualSdaBudget / 12 || 0;
-          let monthlyRrc = pPlan.reasonableRentContribution || 0;
-          if (pPlan.rentContributionFrequency === "fortnightly") {
-            monthlyRrc = (monthlyRrc * 26) / 12;
-          } else if (pPlan.rentContributionFrequency === "weekly") {
-            monthlyRrc = (monthlyRrc * 52) / 12;
-          }
-
-          const totalIncome = monthlySda + monthlyRrc;
-          const managementFeePercent = property.managementFeePercent || 0;
-          const managementFee = totalIncome * (managementFeePercent / 100);
-          const ownerPayment = totalIncome - managementFee;
-
-          totalOwnerPayment += ownerPayment;
-        }
-      }
-
-      if (totalOwnerPayment > 0) {
-        const expectedDate = `${args.periodMonth}-${String(paymentDay).padStart(2, "0")}`;
-
-        await ctx.db.insert("expectedPayments", {
-          organizationId,
-          paymentType: "owner_disbursement",
-          propertyId: property._id,
-          ownerId: property.ownerId,
-          expectedAmount: totalOwnerPayment,
-          expectedDate,
-          periodMonth: args.periodMonth,
-          status: "pending",
-          sourceType: "auto_generated",
-          createdAt: now,
-          updatedAt: now,
-        });
-
-        ownerCreated++;
-      }
-    }
-
+    const { created, updated } = await generateForOrganization(ctx, organizationId, args.periodMonth, {
+      paymentDay: args.paymentDay,
+    });
     return {
-      sdaCreated,
-      rrcCreated,
-      ownerCreated,
-      totalCreated: sdaCreated + rrcCreated + ownerCreated,
+      sdaCreated: created.sda_income,
+      rrcCreated: created.rrc_income,
+      ownerCreated: created.owner_disbursement,
+      totalCreated: created.sda_income + created.rrc_income + created.owner_disbursement,
+      updated,
     };
   },
 });
 
-// Internal mutation to generate expected payments for current month (called by cron)
+// Generate the current month's expected payments (called by cron).
+// Fans out one generateForOrganizationInternal batch per organization so each
+// tenant runs in its own transaction.
 export const generateMonthlyExpectedInternal = internalMutation({
   args: {},
   handler: async (ctx) => {
-    const now = new Date();
-    const periodMonth = `${now.getFullYear()}-${String(now.getMonth() + 1).padStart(2, "0")}`;
-    const paymentDay = 5; // Default owner payment day
-
-    let sdaCreated = 0;
-    let rrcCreated = 0;
-    let ownerCreated = 0;
-    const dbNow = Date.now();
-
-    // Get all active participants with current plans
-    const participants = await ctx.db
-      .query("participants")
-      .filter((q) => q.eq(q.field("status"), "active"))
-      .collect();
-
-    // 1. Generate SDA expected payments
-    for (const participant of participants) {
-      const plan = await ctx.db
-        .query("participantPlans")
-        .withIndex("by_participant", (q) => q.eq("participantId", participant._id))
-        .filter((q) => q.eq(q.field("planStatus"), "current"))
-        .first();
-
-      if (!plan) continue;
-
-      const monthlySdaAmount = plan.monthlySdaAmount || plan.annualSdaBudget / 12;
-      if (monthlySdaAmount) {
-        const existingSda = await ctx.db
-          .query("expectedPayments")
-          .withIndex("by_participant", (q) => q.eq("participantId", participant._id))
-          .filter((q) =>
-            q.and(
-              q.eq(q.field("periodMonth"), periodMonth),
-              q.eq(q.field("paymentType"), "sda_income")
-            )
-          )
-          .first();
-
-        if (!existingSda) {
-          const dwelling = participant.dwellingId ? await ctx.db.get(participant.dwellingId) : null;
-          const propertyId = dwelling?.propertyId;
-          const claimDay = plan.claimDay || 15;
-          const expectedDate = `${periodMonth}-${String(claimDay).padStart(2, "0")}`;
-          const [year, month] = periodMonth.split("-").map(Number);
-          const periodStart = `${periodMonth}-01`;
-          const lastDay = new Date(year, month, 0).getDate();
-          const periodEnd = `${periodMonth}-${String(lastDay).padStart(2, "0")}`;
-
-          await ctx.db.insert("expectedPayments", {
-            paymentType: "sda_income",
-            participantId: participant._id,
-            planId: plan._id,
-            propertyId,
-            expectedAmount: monthlySdaAmount,
-            expectedDate,
-            periodMonth,
-            periodStart,
-            periodEnd,
-            status: "pending",
-            sourceType: "auto_generated",
-            createdAt: dbNow,
-            updatedAt: dbNow,
-          });
-
-          sdaCreated++;
-        }
-      }
-
-      // 2. Generate RRC expected payments
-      if (plan.reasonableRentContribution) {
-        const existingRrc = await ctx.db
-          .query("expectedPayments")
-          .withIndex("by_participant", (q) => q.eq("participantId", participant._id))
-          .filter((q) =>
-            q.and(
-              q.eq(q.field("periodMonth"), periodMonth),
-              q.eq(q.field("paymentType"), "rrc_income")
-            )
-          )
-          .first();
-
-        if (!existingRrc) {
-          let monthlyRrc = plan.reasonableRentContribution;
-          if (plan.rentContributionFrequency === "fortnightly") {
-            monthlyRrc = (plan.reasonableRentContribution * 26) / 12;
-          } else if (plan.rentContributionFrequency === "weekly") {
-            monthlyRrc = (plan.reasonableRentContribution * 52) / 12;
-          }
-
-          const dwelling = participant.dwellingId ? await ctx.db.get(participant.dwellingId) : null;
-          const propertyId = dwelling?.propertyId;
-          const [year, month] = periodMonth.split("-").map(Number);
-          const lastDay = new Date(year, month, 0).getDate();
-          const periodStart = `${periodMonth}-01`;
-          const periodEnd = `${periodMonth}-${String(lastDay).padStart(2, "0")}`;
-
-          await ctx.db.insert("expectedPayments", {
-            paymentType: "rrc_income",
-            participantId: participant._id,
-            planId: plan._id,
-            propertyId,
-            expectedAmount: monthlyRrc,
-            expectedDate: periodEnd,
-            periodMonth,
-            periodStart,
-            periodEnd,
-            status: "pending",
-            sourceType: "auto_generated",
-            createdAt: dbNow,
-            updatedAt: dbNow,
-          });
-
-          rrcCreated++;
-        }
-      }
-    }
-
-    // 3. Generate owner expected payments
-    const properties = await ctx.db
-      .query("properties")
-      .filter((q) => q.eq(q.field("isActive"), true))
-      .collect();
-
-    for (const property of properties) {
-      const existingOwner = await ctx.db
-        .query("expectedPayments")
-        .withIndex("by_property", (q) => q.eq("propertyId", property._id))
-        .filter((q) =>
-          q.and(
-            q.eq(q.field("periodMonth"), periodMonth),
-            q.eq(q.field("paymentType"), "owner_disbursement")
-          )
-        )
-        .first();
-
-      if (existingOwner) continue;
-
-      const dwellings = await ctx.db
-        .query("dwellings")
-        .withIndex("by_property", (q) => q.eq("propertyId", property._id))
-        .collect();
-
-      let totalOwnerPayment = 0;
-
-      for (const dwelling of dwellings) {
-        const dwellingParticipants = await ctx.db
-          .query("participants")
-          .withIndex("by_dwelling", (q) => q.eq("dwellingId", dwelling._id))
-          .filter((q) => q.eq(q.field("status"), "active"))
-          .collect();
-
-        for (const p of dwellingParticipants) {
-          const pPlan = await ctx.db
-            .query("participantPlans")
-            .withIndex("by_participant", (q) => q.eq("participantId", p._id))
-            .filter((q) => q.eq(q.field("planStatus"), "current"))
-            .first();
-
-          if (!pPlan) continue;
-
-          const monthlySda = pPlan.monthlySdaAmount || pPlan.annualSdaBudget / 12 || 0;
-          let monthlyRrc = pPlan.reasonableRentContribution || 0;
-          if (pPlan.rentContributionFrequency === "fortnightly") {
-            monthlyRrc = (monthlyRrc * 26) / 12;
-          } else if (pPlan.rentContributionFrequency === "weekly") {
-            monthlyRrc = (monthlyRrc * 52) / 12;
-          }
-
-          const totalIncome = monthlySda + monthlyRrc;
-          const managementFeePercent = property.managementFeePercent || 0;
-          const managementFee = totalIncome * (managementFeePercent / 100);
-          const ownerPayment = totalIncome - managementFee;
-
-          totalOwnerPayment += ownerPayment;
-        }
-      }
-
-      if (totalOwnerPayment > 0) {
-        const expectedDate = `${periodMonth}-${String(paymentDay).padStart(2, "0")}`;
-
-        await ctx.db.insert("expectedPayments", {
-          paymentType: "owner_disbursement",
-          propertyId: property._id,
-          ownerId: property.ownerId,
-          expectedAmount: totalOwnerPayment,
-          expectedDate,
-          periodMonth,
-          status: "pending",
-          sourceType: "auto_generated",
-          createdAt: dbNow,
-          updatedAt: dbNow,
-        });
-
-        ownerCreated++;
-      }
+    const periodMonth = currentPeriodMonth(Date.now());
+    const organizations = await ctx.db.query("organizations").collect();
+    for (const org of organizations) {
+      await ctx.scheduler.runAfter(0, internal.expectedPayments.generateForOrganizationInternal, {
+        organizationId: org._id,
+        periodMonth,
+      });
     }
+    return { periodMonth, scheduled: organizations.length };
+  },
+});
 
-    return {
-      periodMonth,
-      sdaCreated,
-      rrcCreated,
-      ownerCreated,
-      totalCreated: sdaCreated + rrcCreated + ownerCreated,
-    };
+// Generate one organization's expected payments for a month (scheduled by the monthly cron)
+export const generateForOrganizationInternal = internalMutation({
+  args: {
+    organizationId: v.id("organizations"),
+    periodMonth: v.string(),
+  },
+  handler: async (ctx, args) => {
+    const { created, updated } = await generateForOrganization(
+      ctx,
+      args.organizationId,
+      args.periodMonth
+    );
+    return { periodMonth: args.periodMonth, ...created, updated };
   },
 });
 
@@ -993,6 +580,7 @@ export const cancel = mutation({
       notes: args.reason,
       updatedAt: Date.now(),
     });
+    await syncCalendarIndex(ctx, "expectedPayments", args.id);
 
     return args.id;
   },
@@ -0,0 +1,219 @@
+import { v } from "convex/values";
+import {
+  query,
+  mutation,
+  action,
+  internalMutation,
+  QueryCtx,
+  MutationCtx,
+} from "./_generated/server";
+import { customQuery, customMutation, customAction } from "convex-helpers/server/customFunctions";
+import {
+  METRICS_LOG_PREFIX,
+  ROLLUP_WINDOW_MS,
+  MetricsLogLine,
+  describeArgShape,
+  jsonSize,
+  rollupSamples,
+} from "./lib/functionMetrics";
+import { peekAuthOrganizationId } from "./authHelpers";
+
+/**
+ * Production function instrumentation.
+ *
+ * Timing and documents read for every function come from the deployment's
+ * webhook log stream, posted to the Next.js /api/function-metrics route and
+ * sampled by request ID into functionMetricSamples. Functions defined
+ * with instrumentedQuery / instrumentedMutation / instrumentedAction also log
+ * their organization, argument shape and result size, which is joined onto
+ * the same sample. An hourly cron rolls samples up into functionMetrics
+ * (p50/p95 per function), read by superAdmin.getFunctionHotspots.
+ *
+ * Setup: add a webhook log stream in the Convex dashboard pointing at
+ * https://<app>/api/function-metrics?token=<FUNCTION_METRICS_TOKEN>.
+ * recordSamples is public (called via ConvexHttpClient) and gated by its own
+ * FUNCTION_METRICS_INGEST_SECRET, set on both the Convex deployment and the
+ * Next.js app, so it does not share the Stripe webhook secret.
+ */
+
+// Raw samples only need to outlive the rollup; rollups back the super-admin view
+const SAMPLE_RETENTION_MS = 2 * 24 * 60 * 60 * 1000;
+const ROLLUP_RETENTION_MS = 14 * 24 * 60 * 60 * 1000;
+// Per-run caps keep the rollup and cleanup mutations within read limits
+const MAX_ROLLUP_SAMPLES = 8000;
+const CLEANUP_BATCH = 1000;
+
+function verifySecret(providedSecret: string): void {
+  const expectedSecret = process.env.FUNCTION_METRICS_INGEST_SECRET;
+  if (!expectedSecret) {
+    throw new Error("FUNCTION_METRICS_INGEST_SECRET environment variable is not configured");
+  }
+  if (providedSecret !== expectedSecret) {
+    throw new Error("Invalid ingest secret - unauthorized access");
+  }
+}
+
+// ============================================
+// INSTRUMENTED FUNCTION BUILDERS
+// ============================================
+
+/**
+ * Organization a call was made for: an explicit organizationId argument, or
+ * the calling user's organization when the handler resolved it through the
+ * auth helpers. Adds no reads to the call.
+ */
+async function resolveOrganization(
+  ctx: QueryCtx | MutationCtx | undefined,
+  args: Record<string, unknown>
+): Promise<string | undefined> {
+  if (typeof args.organizationId === "string") return args.organizationId;
+  if (!ctx || typeof args.userId !== "string") return undefined;
+  return await peekAuthOrganizationId(ctx, args.userId);
+}
+
+async function logCall(
+  ctx: QueryCtx | MutationCtx | undefined,
+  args: Record<string, unknown>,
+  result: unknown
+): Promise<void> {
+  try {
+    const line: MetricsLogLine = {
+      organizationId: await resolveOrganization(ctx, args),
+      argShape: describeArgShape(args),
+      resultBytes: jsonSize(result),
+    };
+    console.log(METRICS_LOG_PREFIX + JSON.stringify(line));
+  } catch {
+    // Instrumentation must never fail the call
+  }
+}
+
+/** Drop-in replacement for `query` that reports organization, argument shape and result size. */
+export const instrumentedQuery = customQuery(query, {
+  args: {},
+  input: async (ctx) => ({
+    ctx: {},
+    args: {},
+    onSuccess: ({ args, result }) => logCall(ctx, args, result),
+  }),
+});
+
+/** Drop-in replacement for `mutation`; see instrumentedQuery. */
+export const instrumentedMutation = customMutation(mutation, {
+  args: {},
+  input: async (ctx) => ({
+    ctx: {},
+    args: {},
+    onSuccess: ({ args, result }) => logCall(ctx, args, result),
+  }),
+});
+
+/** Drop-in replacement for `action`; organization comes from an organizationId argument only. */
+export const instrumentedAction = customAction(action, {
+  args: {},
+  input: async () => ({
+    ctx: {},
+    args: {},
+    onSuccess: ({ args, result }) => logCall(undefined, args, result),
+  }),
+});
+
+// ============================================
+// INGESTION
+// ============================================
+
+const sampleValidator = v.object({
+  requestId: v.string(),
+  functionName: v.string(),
+  kind: v.optional(v.string()),
+  timestamp: v.number(),
+  durationMs: v.optional(v.number()),
+  docsRead: v.optional(v.number()),
+  readBytes: v.optional(v.number()),
+  failed: v.optional(v.boolean()),
+  organizationId: v.optional(v.string()),
+  argShape: v.optional(v.string()),
+  resultBytes: v.optional(v.number()),
+});
+
+/**
+ * Store sampled calls. A request's execution event and metrics line can
+ * arrive in different log stream batches, so samples merge on requestId.
+ */
+export const recordSamples = mutation({
+  args: {
+    webhookSecret: v.string(),
+    samples: v.array(sampleValidator),
+  },
+  handler: async (ctx, args): Promise<{ inserted: number; merged: number }> => {
+    verifySecret(args.webhookSecret);
+    if (args.samples.length > 500) {
+      throw new Error("Too many samples in one batch (max 500)");
+    }
+
+    let inserted = 0;
+    let merged = 0;
+    for (const sample of args.samples) {
+      const existing = await ctx.db
+        .query("functionMetricSamples")
+        .withIndex("by_requestId", (q) => q.eq("requestId", sample.requestId))
+        .first();
+      if (existing) {
+        const { timestamp: _timestamp, ...fields } = sample;
+        await ctx.db.patch(existing._id, fields);
+        merged++;
+      } else {
+        await ctx.db.insert("functionMetricSamples", sample);
+        inserted++;
+      }
+    }
+    return { inserted, merged };
+  },
+});
+
+// ============================================
+// ROLLUP AND RETENTION
+// ============================================
+
+/**
+ * Cron target: roll the last completed hour of samples into functionMetrics
+ * (replacing any earlier rollup of that hour), then trim old samples and
+ * rollups.
+ */
+export const rollupHourly = internalMutation({
+  args: { windowStart: v.optional(v.number()) },
+  handler: async (ctx, args): Promise<{ functions: number; samples: number }> => {
+    const now = Date.now();
+    const windowStart =
+      args.windowStart ?? Math.floor(now / ROLLUP_WINDOW_MS) * ROLLUP_WINDOW_MS - ROLLUP_WINDOW_MS;
+    const windowEnd = windowStart + ROLLUP_WINDOW_MS;
+
+    const samples = await ctx.db
+      .query("functionMetricSamples")
+      .withIndex("by_timestamp", (q) => q.gte("timestamp", windowStart).lt("timestamp", windowEnd))
+      .take(MAX_ROLLUP_SAMPLES);
+
+    const previous = await ctx.db
+      .query("functionMetrics")
+      .withIndex("by_windowStart", (q) => q.eq("windowStart", windowStart))
+      .collect();
+    await Promise.all(previous.map((row) => ctx.db.delete(row._id)));
+
+    const rollups = rollupSamples(samples);
+    for (const rollup of rollups) {
+      await ctx.db.insert("functionMetrics", { ...rollup, windowStart, createdAt: now });
+    }
+
+    const staleSamples = await ctx.db
+      .query("functionMetricSamples")
+      .withIndex("by_timestamp", (q) => q.lt("timestamp", now - SAMPLE_RETENTION_MS))
+      .take(CLEANUP_BATCH);
+    const staleRollups = await ctx.db
+      .query("functionMetrics")
+      .withIndex("by_windowStart", (q) => q.lt("windowStart", now - ROLLUP_RETENTION_MS))
+      .take(CLEANUP_BATCH);
+    await Promise.all([...staleSamples, ...staleRollups].map((row) => ctx.db.delete(row._id)));
+
+    return { functions: rollups.length, samples: samples.length };
+  },
+});
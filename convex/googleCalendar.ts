@@ -3,9 +3,22 @@
 import { internalAction } from "./_generated/server";
 import { v } from "convex/values";
 import { internal } from "./_generated/api";
-
-// Google Calendar API base URL
-const GOOGLE_CALENDAR_API = "https://www.googleapis.com/calendar/v3";
+import { Id } from "./_generated/dataModel";
+import {
+  ExternalEventUpsert,
+  GOOGLE_BATCH_LIMIT,
+  ProviderRequest,
+  ProviderResponse,
+  buildGoogleBatchBody,
+  chunk,
+  parseGoogleBatchResponse,
+} from "./lib/calendarSync";
+
+// GOOGLE_API_URL points calls at a local fake Google server for testing
+const GOOGLE_API_ROOT = process.env.GOOGLE_API_URL || "https://www.googleapis.com";
+const GOOGLE_CALENDAR_PATH = "/calendar/v3";
+const GOOGLE_CALENDAR_API = `${GOOGLE_API_ROOT}${GOOGLE_CALENDAR_PATH}`;
+const GOOGLE_BATCH_URL = `${GOOGLE_API_ROOT}/batch/calendar/v3`;
 const GOOGLE_TOKEN_URL = "https://oauth2.googleapis.com/token";
 
 // ============================================
@@ -167,18 +180,14 @@ export const syncFromGoogle = internalAction({
 
       const data = await response.json();
 
-      // Process each event
+      // Collect the page's changes and write them in one mutation
       const items: GoogleCalendarEvent[] = data.items || [];
+      const upserts: ExternalEventUpsert[] = [];
+      const deletes: string[] = [];
       for (const item of items) {
         if (item.status === "cancelled") {
           // Event was deleted on Google - soft delete locally
-          if (item.id) {
-            await ctx.runMutation(internal.googleCalendarHelpers.softDeleteByExternalId, {
-              externalEventId: item.id,
-              externalProvider: "google",
-            });
-            deleted++;
-          }
+          if (item.id) deletes.push(item.id);
           continue;
         }
 
@@ -198,11 +207,8 @@ export const syncFromGoogle = internalAction({
           status: mapAttendeeStatus(a.responseStatus),
         }));
 
-        await ctx.runMutation(internal.googleCalendarHelpers.upsertExternalEvent, {
-          organizationId: connection.organizationId || undefined,
+        upserts.push({
           externalEventId: item.id || "",
-          externalProvider: "google",
-          externalCalendarId: calendarId,
           title: item.summary || "(No title)",
           description: item.description,
           startTime,
@@ -210,10 +216,21 @@ export const syncFromGoogle = internalAction({
           allDay,
           location: item.location,
           attendees,
-          syncedAt: Date.now(),
+        });
+      }
+
+      if (upserts.length > 0 || deletes.length > 0) {
+        const applied = await ctx.runMutation(internal.calendarSync.applyExternalChanges, {
+          organizationId: connection.organizationId || undefined,
+          externalProvider: "google",
+          externalCalendarId: calendarId,
           createdBy: connection.userId,
+          syncedAt: Date.now(),
+          upserts,
+          deletes,
         });
-        synced++;
+        synced += applied.upserted;
+        deleted += applied.deleted;
       }
 
       // Pagination
@@ -275,33 +292,7 @@ export const pushToGoogle = internalAction({
 
     const calendarId = connection.calendarId || "primary";
 
-    // Build Google Calendar event body
-    const googleEvent: GoogleCalendarEventBody = {
-      summary: event.title,
-      description: event.description || undefined,
-      location: event.location || undefined,
-    };
-
-    if (event.allDay) {
-      // All-day events use date (YYYY-MM-DD) format
-      const startDate = event.startTime.substring(0, 10);
-      const endDate = event.endTime.substring(0, 10);
-      // Google all-day end dates are exclusive, so add one day
-      const endDateExclusive = addOneDay(endDate);
-      googleEvent.start = { date: startDate };
-      googleEvent.end = { date: endDateExclusive };
-    } else {
-      // Timed events use dateTime (ISO 8601)
-      googleEvent.start = { dateTime: event.startTime };
-      googleEvent.end = { dateTime: event.endTime };
-    }
-
-    if (event.attendees && event.attendees.length > 0) {
-      googleEvent.attendees = event.attendees.map((a) => ({
-        email: a.email,
-        displayName: a.name,
-      }));
-    }
+    const googleEvent = buildGoogleEventBody(event);
 
     let method: string;
     let url: string;
@@ -397,45 +388,92 @@ export const deleteFromGoogle = internalAction({
 });
 
 /**
- * Sync all enabled Google Calendar connections.
- * Called by the cron job. Processes connections in batches of 5.
+ * Push several local events to Google Calendar in batch requests.
+ * Creates or updates each event like pushToGoogle and deletes the given
+ * Google event IDs, GOOGLE_BATCH_LIMIT calls per HTTP request. Failures are
+ * reported per event instead of failing the batch.
+ * Called by calendarSync.flushPushQueue.
  */
-export const syncAllGoogleConnections = internalAction({
-  args: {},
-  handler: async (ctx): Promise<{ total: number; succeeded: number; failed: number }> => {
-    // Get all enabled Google connections
-    const connections = await ctx.runQuery(
-      internal.googleCalendarHelpers.getEnabledGoogleConnections,
-      {}
+export const pushBatchToGoogle = internalAction({
+  args: {
+    connectionId: v.id("calendarConnections"),
+    eventIds: v.array(v.id("calendarEvents")),
+    deletes: v.optional(v.array(v.string())),
+  },
+  handler: async (
+    ctx,
+    args
+  ): Promise<Array<{ eventId: Id<"calendarEvents">; externalEventId?: string; error?: string }>> => {
+    const connection = await ctx.runQuery(
+      internal.googleCalendarHelpers.getConnectionById,
+      { connectionId: args.connectionId }
+    );
+
+    if (!connection) {
+      throw new Error(`Calendar connection ${args.connectionId} not found`);
+    }
+
+    let accessToken = connection.accessToken;
+    if (connection.expiresAt < Date.now()) {
+      accessToken = await ctx.runAction(internal.googleCalendar.refreshGoogleToken, {
+        connectionId: args.connectionId,
+      });
+    }
+
+    const events = await ctx.runQuery(internal.calendarSync.getEventsByIds, {
+      eventIds: args.eventIds,
+    });
+    const calendarId = connection.calendarId || "primary";
+    const eventsPath = `/calendars/${encodeURIComponent(calendarId)}/events`;
+    const deletes = args.deletes ?? [];
+
+    const requests: ProviderRequest[] = events.map((event) =>
+      event.externalEventId
+        ? {
+            method: "PATCH",
+            path: `${eventsPath}/${encodeURIComponent(event.externalEventId)}`,
+            body: buildGoogleEventBody(event),
+          }
+        : { method: "POST", path: eventsPath, body: buildGoogleEventBody(event) }
     );
+    for (const externalEventId of deletes) {
+      requests.push({ method: "DELETE", path: `${eventsPath}/${encodeURIComponent(externalEventId)}` });
+    }
+    const responses = await sendGoogleBatch(accessToken, requests);
 
-    let succeeded = 0;
-    let failed = 0;
-    const batchSize = 5;
-
-    // Process in batches to avoid overwhelming the API
-    for (let i = 0; i < connections.length; i += batchSize) {
-      const batch = connections.slice(i, i + batchSize);
-      const results = await Promise.allSettled(
-        batch.map((conn) =>
-          ctx.runAction(internal.googleCalendar.syncFromGoogle, {
-            connectionId: conn._id,
-          })
-        )
-      );
-
-      for (const result of results) {
-        if (result.status === "fulfilled") {
-          succeeded++;
-        } else {
-          failed++;
-          console.error("Google Calendar sync failed for a connection:", result.reason);
+    // 410 Gone = already deleted
+    deletes.forEach((externalEventId, i) => {
+      const response = responses[events.length + i];
+      if (response.status >= 300 && response.status !== 410) {
+        console.error("Google Calendar batch delete error:", externalEventId, response.status, response.body);
+      }
+    });
+
+    const results: Array<{ eventId: Id<"calendarEvents">; externalEventId?: string; error?: string }> = [];
+    const created: Array<{ eventId: Id<"calendarEvents">; externalEventId: string }> = [];
+    events.forEach((event, i) => {
+      const response = responses[i];
+      if (response.status >= 200 && response.status < 300 && response.body?.id) {
+        results.push({ eventId: event._id, externalEventId: response.body.id });
+        if (!event.externalEventId) {
+          created.push({ eventId: event._id, externalEventId: response.body.id });
         }
+      } else {
+        console.error("Google Calendar batch push error:", event._id, response.status, response.body);
+        results.push({ eventId: event._id, error: `Google Calendar error: ${response.status}` });
       }
+    });
+
+    if (created.length > 0) {
+      await ctx.runMutation(internal.calendarSync.setExternalEventIds, {
+        externalProvider: "google",
+        externalCalendarId: calendarId,
+        syncedAt: Date.now(),
+        events: created,
+      });
     }
 
-    console.log(`Google Calendar sync all: ${succeeded}/${connections.length} succeeded, ${failed} failed`);
-    return { total: connections.length, succeeded, failed };
+    return results;
   },
 });
 
@@ -477,6 +515,86 @@ interface GoogleCalendarEventBody {
   attendees?: Array<{ email: string; displayName?: string }>;
 }
 
+/**
+ * Build the Google Calendar request body for a local event.
+ */
+function buildGoogleEventBody(event: {
+  title: string;
+  description?: string;
+  location?: string;
+  startTime: string;
+  endTime: string;
+  allDay?: boolean;
+  attendees?: Array<{ email: string; name?: string }>;
+}): GoogleCalendarEventBody {
+  const googleEvent: GoogleCalendarEventBody = {
+    summary: event.title,
+    description: event.description || undefined,
+    location: event.location || undefined,
+  };
+
+  if (event.allDay) {
+    // All-day events use date (YYYY-MM-DD) format
+    const startDate = event.startTime.substring(0, 10);
+    const endDate = event.endTime.substring(0, 10);
+    // Google all-day end dates are exclusive, so add one day
+    googleEvent.start = { date: startDate };
+    googleEvent.end = { date: addOneDay(endDate) };
+  } else {
+    // Timed events use dateTime (ISO 8601)
+    googleEvent.start = { dateTime: event.startTime };
+    googleEvent.end = { dateTime: event.endTime };
+  }
+
+  if (event.attendees && event.attendees.length > 0) {
+    googleEvent.attendees = event.attendees.map((a) => ({
+      email: a.email,
+      displayName: a.name,
+    }));
+  }
+
+  return googleEvent;
+}
+
+/**
+ * Send Calendar API calls through the Google batch endpoint, GOOGLE_BATCH_LIMIT
+ * per request. Responses come back in request order.
+ */
+async function sendGoogleBatch(
+  accessToken: string,
+  requests: ProviderRequest[]
+): Promise<ProviderResponse[]> {
+  const responses: ProviderResponse[] = [];
+
+  for (const batch of chunk(requests, GOOGLE_BATCH_LIMIT)) {
+    const boundary = `batch_${Date.now()}_${Math.random().toString(36).slice(2)}`;
+    const response = await fetch(GOOGLE_BATCH_URL, {
+      method: "POST",
+      headers: {
+        Authorization: `Bearer ${accessToken}`,
+        "Content-Type": `multipart/mixed; boundary=${boundary}`,
+      },
+      body: buildGoogleBatchBody(boundary, GOOGLE_CALENDAR_PATH, batch),
+    });
+
+    if (!response.ok) {
+      const errorText = await response.text();
+      console.error("Google Calendar batch error:", response.status, errorText);
+      throw new Error(`Google Calendar batch error: ${response.status}`);
+    }
+
+    responses.push(
+      ...parseGoogleBatchResponse(
+        response.headers.get("content-type") || "",
+        await response.text(),
+        batch.length
+      )
+    );
+  }
+
+  return responses;
+}
+
 /**
  * Map Google attendee response status to our enum.
  */
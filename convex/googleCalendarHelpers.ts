@@ -1,6 +1,5 @@
 import { internalQuery, internalMutation } from "./_generated/server";
 import { v } from "convex/values";
-import { Id } from "./_generated/dataModel";
 import { encryptField, decryptField } from "./lib/encryption";
 
 /**
@@ -52,23 +51,6 @@ export const getEventById = internalQuery({
   },
 });
 
-/**
- * Get all enabled Google calendar connections for the sync-all cron.
- * Note: Does NOT decrypt tokens here (each sync call reads via getConnectionById which decrypts).
- */
-export const getEnabledGoogleConnections = internalQuery({
-  args: {},
-  handler: async (ctx) => {
-    return await ctx.db
-      .query("calendarConnections")
-      .withIndex("by_syncEnabled", (q) => q.eq("syncEnabled", true))
-      .collect()
-      .then((connections) =>
-        connections.filter((c) => c.provider === "google")
-      );
-  },
-});
-
 // ============================================
 // INTERNAL MUTATIONS
 // ============================================
@@ -114,122 +96,6 @@ export const updateConnectionSync = internalMutation({
   },
 });
 
-/**
- * Upsert an external calendar event from Google into the calendarEvents table.
- * If an event with the same externalEventId + externalProvider already exists, update it.
- * Otherwise, insert a new record.
- */
-export const upsertExternalEvent = internalMutation({
-  args: {
-    organizationId: v.optional(v.id("organizations")),
-    externalEventId: v.string(),
-    externalProvider: v.union(v.literal("google"), v.literal("outlook")),
-    externalCalendarId: v.string(),
-    title: v.string(),
-    description: v.optional(v.string()),
-    startTime: v.string(),
-    endTime: v.string(),
-    allDay: v.boolean(),
-    location: v.optional(v.string()),
-    attendees: v.optional(
-      v.array(
-        v.object({
-          email: v.string(),
-          name: v.optional(v.string()),
-          status: v.optional(
-            v.union(
-              v.literal("accepted"),
-              v.literal("declined"),
-              v.literal("tentative"),
-              v.literal("pending")
-            )
-          ),
-        })
-      )
-    ),
-    syncedAt: v.number(),
-    createdBy: v.optional(v.id("users")),
-  },
-  handler: async (ctx, args): Promise<Id<"calendarEvents">> => {
-    // Check if this external event already exists
-    const existing = await ctx.db
-      .query("calendarEvents")
-      .withIndex("by_externalEventId", (q) =>
-        q
-          .eq("externalEventId", args.externalEventId)
-          .eq("externalProvider", args.externalProvider)
-      )
-      .first();
-
-    if (existing) {
-      // Update existing event
-      await ctx.db.patch(existing._id, {
-        title: args.title,
-        description: args.description,
-        startTime: args.startTime,
-        endTime: args.endTime,
-        allDay: args.allDay,
-        location: args.location,
-        attendees: args.attendees,
-        syncedAt: args.syncedAt,
-        updatedAt: Date.now(),
-        isDeleted: false, // Un-delete if it was previously soft-deleted
-      });
-      return existing._id;
-    }
-
-    // Insert new event
-    const eventId = await ctx.db.insert("calendarEvents", {
-      organizationId: args.organizationId,
-      title: args.title,
-      description: args.description,
-      startTime: args.startTime,
-      endTime: args.endTime,
-      allDay: args.allDay,
-      location: args.location,
-      eventType: "external",
-      color: "#6b7280", // gray for external events
-      externalEventId: args.externalEventId,
-      externalProvider: args.externalProvider,
-      externalCalendarId: args.externalCalendarId,
-      attendees: args.attendees,
-      syncedAt: args.syncedAt,
-      createdBy: args.createdBy,
-      createdAt: Date.now(),
-    });
-
-    return eventId;
-  },
-});
-
-/**
- * Soft-delete a local calendar event by its external event ID.
- * Used when Google reports an event as cancelled.
- */
-export const softDeleteByExternalId = internalMutation({
-  args: {
-    externalEventId: v.string(),
-    externalProvider: v.union(v.literal("google"), v.literal("outlook")),
-  },
-  handler: async (ctx, args): Promise<void> => {
-    const existing = await ctx.db
-      .query("calendarEvents")
-      .withIndex("by_externalEventId", (q) =>
-        q
-          .eq("externalEventId", args.externalEventId)
-          .eq("externalProvider", args.externalProvider)
-      )
-      .first();
-
-    if (existing && existing.isDeleted !== true) {
-      await ctx.db.patch(existing._id, {
-        isDeleted: true,
-        updatedAt: Date.now(),
-      });
-    }
-  },
-});
-
 /**
  * Update a calendar event's externalEventId after pushing to Google.
  */
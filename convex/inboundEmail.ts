@@ -7,7 +7,9 @@
  *   bls-abc123@inbound.mysdamanager.com
  *
  * Postmark parses the raw email and POSTs structured JSON to our
- * Next.js API route, which calls this mutation via ConvexHttpClient.
+ * Next.js API route, which hands it to the ingestion queue
+ * (inboundEmailQueue.ts) via ConvexHttpClient. The queue processes emails
+ * in batches through prepareInboundEmail and storeInboundCommunication below.
  *
  * Supports three major forwarding patterns:
  *   1. Gmail:    "---------- Forwarded message ---------"
@@ -17,13 +19,16 @@
  * @module inboundEmail
  */
 
-import { mutation, action } from "./_generated/server";
+import { mutation, action, MutationCtx } from "./_generated/server";
 import { v } from "convex/values";
+import type { WithoutSystemFields } from "convex/server";
 import { api } from "./_generated/api";
+import type { Doc, Id } from "./_generated/dataModel";
 import {
   findOrCreateThread,
   type CommunicationForThreading,
 } from "./lib/threadingEngine";
+import { applyThreadSummaryChange } from "./communications";
 
 // ---------------------------------------------------------------------------
 // Pure helper functions (no DB access)
@@ -350,261 +355,343 @@ export function cleanEmailBody(body: string): string {
 }
 
 // ---------------------------------------------------------------------------
-// Mutation: processInboundEmail
+// Shared ingestion (used by processInboundEmail and the ingestion queue)
 // ---------------------------------------------------------------------------
 
 /**
- * Process an inbound email forwarded via Postmark webhook.
- *
- * Called from the Next.js API route `/api/mail` using
- * ConvexHttpClient (not useQuery/useMutation). This is a regular
- * mutation, not an internal mutation, so the API route can invoke it.
+ * One inbound email as received from Postmark.
+ */
+export interface InboundEmailInput {
+  fromEmail: string;
+  fromName: string;
+  toAddress: string;
+  subject: string;
+  textBody: string;
+  strippedReply?: string;
+  emailDate?: string;
+  postmarkMessageId?: string;
+  /** Attachments already in file storage (see inboundEmailQueue.ts) */
+  attachmentStorageIds?: string[];
+  attachmentMetadata?: Array<{
+    fileName: string;
+    fileSize: number;
+    fileType: string;
+    uploadedAt: number;
+  }>;
+}
+
+/**
+ * Lookups shared by every email ingested in one mutation.
  *
- * Flow:
- *   1. Verify webhook secret
- *   2. Resolve organization by inbound email address
- *   3. Resolve the forwarding user
- *   4. Parse forwarded email to extract original sender
- *   5. Detect contact type from sender email
- *   6. Auto-thread with existing communications
- *   7. Insert communication record
- *   8. Return result
+ * A batch forwarded to the same inbox resolves its organization, forwarding
+ * users, sender contacts and thread candidates once,
+ * instead of repeating the same index scans for every email. Emails
+ * inserted earlier in the batch are added to the thread candidates so
+ * later replies in the same batch join their thread.
  */
-export const processInboundEmail = mutation({
-  args: {
-    webhookSecret: v.string(),
-    fromEmail: v.string(),
-    fromName: v.string(),
-    toAddress: v.string(),
-    subject: v.string(),
-    textBody: v.string(),
-    strippedReply: v.optional(v.string()),
-    emailDate: v.optional(v.string()),
-    postmarkMessageId: v.optional(v.string()),
-  },
-  handler: async (ctx, args) => {
-    // -----------------------------------------------------------------------
-    // 1. Verify webhook secret
-    // -----------------------------------------------------------------------
-    const expectedSecret = process.env.INBOUND_EMAIL_WEBHOOK_SECRET;
-    if (!expectedSecret || args.webhookSecret !== expectedSecret) {
-      throw new Error("Unauthorized: invalid webhook secret");
-    }
+export interface InboundIngestCache {
+  orgsByAddress: Map<string, Doc<"organizations">>;
+  forwardersByEmail: Map<string, Id<"users">>;
+  contactsByEmail: Map<string, ContactDetectionResult>;
+  threadCandidatesByOrg: Map<string, CommunicationForThreading[]>;
+}
 
-    // -----------------------------------------------------------------------
-    // 2. Resolve organization by inbound email address
-    // -----------------------------------------------------------------------
-    const toAddr = args.toAddress.toLowerCase().trim();
+export function createIngestCache(): InboundIngestCache {
+  return {
+    orgsByAddress: new Map(),
+    forwardersByEmail: new Map(),
+    contactsByEmail: new Map(),
+    threadCandidatesByOrg: new Map(),
+  };
+}
 
-    // Try custom domain address first, then fallback to Postmark hash address
-    let org = await ctx.db
+/**
+ * Resolve the organization that owns an inbound address.
+ * Tries the custom domain address first, then the Postmark hash address.
+ */
+async function resolveInboundOrganization(
+  ctx: MutationCtx,
+  toAddress: string,
+  cache: InboundIngestCache
+): Promise<Doc<"organizations">> {
+  const toAddr = toAddress.toLowerCase().trim();
+  const cached = cache.orgsByAddress.get(toAddr);
+  if (cached) return cached;
+
+  let org = await ctx.db
+    .query("organizations")
+    .withIndex("by_inboundEmailAddress", (q) =>
+      q.eq("inboundEmailAddress", toAddr)
+    )
+    .first();
+
+  if (!org) {
+    org = await ctx.db
       .query("organizations")
-      .withIndex("by_inboundEmailAddress", (q) =>
-        q.eq("inboundEmailAddress", toAddr)
+      .withIndex("by_postmarkHashAddress", (q) =>
+        q.eq("postmarkHashAddress", toAddr)
       )
       .first();
+  }
 
-    if (!org) {
-      org = await ctx.db
-        .query("organizations")
-        .withIndex("by_postmarkHashAddress", (q) =>
-          q.eq("postmarkHashAddress", toAddr)
-        )
-        .first();
-    }
+  if (!org) {
+    throw new Error(
+      `No organization found for inbound address: ${toAddress}`
+    );
+  }
+  if (!org.inboundEmailEnabled) {
+    throw new Error(
+      `Inbound email is disabled for organization: ${org.name}`
+    );
+  }
 
-    if (!org) {
-      throw new Error(
-        `No organization found for inbound address: ${args.toAddress}`
-      );
-    }
-    if (!org.inboundEmailEnabled) {
-      throw new Error(
-        `Inbound email is disabled for organization: ${org.name}`
-      );
-    }
+  cache.orgsByAddress.set(toAddr, org);
+  return org;
+}
 
-    const organizationId = org._id;
+/**
+ * Resolve the user an inbound email is attributed to.
+ *
+ * Priority order:
+ *   1. emailForwarders mapping (explicit)
+ *   2. Active user in the organization with the forwarder's email
+ *   3. First active admin in the organization
+ *   4. Any active user in the organization
+ */
+async function resolveForwarderUser(
+  ctx: MutationCtx,
+  fromEmail: string,
+  org: Doc<"organizations">,
+  cache: InboundIngestCache
+): Promise<Id<"users">> {
+  const organizationId = org._id;
+  const forwarderEmail = fromEmail.toLowerCase().trim();
+  const cacheKey = `${organizationId}:${forwarderEmail}`;
+  const cached = cache.forwardersByEmail.get(cacheKey);
+  if (cached) return cached;
+
+  let forwarderUserId: Id<"users"> | null = null;
+
+  // 1. Check emailForwarders table first (explicit mapping)
+  const forwarder = await ctx.db
+    .query("emailForwarders")
+    .withIndex("by_email", (q) => q.eq("email", forwarderEmail))
+    .first();
 
-    // -----------------------------------------------------------------------
-    // 3. Resolve the forwarding user
-    // -----------------------------------------------------------------------
-    const forwarderEmail = args.fromEmail.toLowerCase().trim();
-    let forwarderUserId: string | null = null;
+  if (forwarder && forwarder.isActive) {
+    forwarderUserId = forwarder.userId;
+  }
 
-    // 3a. Check emailForwarders table first (explicit mapping)
-    const forwarder = await ctx.db
-      .query("emailForwarders")
+  // 2. Fall back to users table (match by email within org)
+  if (!forwarderUserId) {
+    const users = await ctx.db
+      .query("users")
       .withIndex("by_email", (q) => q.eq("email", forwarderEmail))
-      .first();
+      .collect();
 
-    if (forwarder && forwarder.isActive) {
-      forwarderUserId = forwarder.userId;
+    const orgUser = users.find(
+      (u) =>
+        u.organizationId !== undefined &&
+        u.organizationId === organizationId &&
+        u.isActive
+    );
+    if (orgUser) {
+      forwarderUserId = orgUser._id;
     }
+  }
 
-    // 3b. Fall back to users table (match by email within org)
-    if (!forwarderUserId) {
-      const users = await ctx.db
-        .query("users")
-        .withIndex("by_email", (q) => q.eq("email", forwarderEmail))
-        .collect();
-
-      const orgUser = users.find(
-        (u) =>
-          u.organizationId !== undefined &&
-          u.organizationId === organizationId &&
-          u.isActive
-      );
-      if (orgUser) {
-        forwarderUserId = orgUser._id;
+  // 3. Fall back to first active admin in the organization
+  if (!forwarderUserId) {
+    const orgUsers = await ctx.db
+      .query("users")
+      .withIndex("by_organizationId", (q) =>
+        q.eq("organizationId", organizationId)
+      )
+      .collect();
+
+    const admin = orgUsers.find(
+      (u) => u.role === "admin" && u.isActive
+    );
+    if (admin) {
+      forwarderUserId = admin._id;
+    } else {
+      // 4. Absolute fallback: any active user in the org
+      const anyUser = orgUsers.find((u) => u.isActive);
+      if (anyUser) {
+        forwarderUserId = anyUser._id;
       }
     }
+  }
 
-    // 3c. Fall back to first active admin in the organization
-    if (!forwarderUserId) {
-      const orgUsers = await ctx.db
-        .query("users")
-        .withIndex("by_organizationId", (q) =>
-          q.eq("organizationId", organizationId)
-        )
-        .collect();
+  if (!forwarderUserId) {
+    throw new Error(
+      `No active user found in organization ${org.name} to attribute this email to`
+    );
+  }
 
-      const admin = orgUsers.find(
-        (u) => u.role === "admin" && u.isActive
-      );
-      if (admin) {
-        forwarderUserId = admin._id;
-      } else {
-        // Absolute fallback: any active user in the org
-        const anyUser = orgUsers.find((u) => u.isActive);
-        if (anyUser) {
-          forwarderUserId = anyUser._id;
-        }
-      }
-    }
+  cache.forwardersByEmail.set(cacheKey, forwarderUserId);
+  return forwarderUserId;
+}
 
-    if (!forwarderUserId) {
-      throw new Error(
-        `No active user found in organization ${org.name} to attribute this email to`
-      );
-    }
+/**
+ * Recent non-deleted communications in the organization (last 200),
+ * used as auto-threading candidates.
+ */
+async function getThreadCandidates(
+  ctx: MutationCtx,
+  organizationId: Id<"organizations">,
+  cache: InboundIngestCache
+): Promise<CommunicationForThreading[]> {
+  const cached = cache.threadCandidatesByOrg.get(organizationId);
+  if (cached) return cached;
+
+  const recentComms = await ctx.db
+    .query("communications")
+    .withIndex("by_organizationId", (q) =>
+      q.eq("organizationId", organizationId)
+    )
+    .order("desc")
+    .filter((q) => q.neq(q.field("isDeleted"), true))
+    .take(200);
+
+  const candidates: CommunicationForThreading[] = recentComms.map((comm) => ({
+    _id: comm._id as string,
+    contactName: comm.contactName,
+    subject: comm.subject,
+    communicationType: comm.communicationType,
+    communicationDate: comm.communicationDate,
+    communicationTime: comm.communicationTime,
+    createdAt: comm.createdAt,
+    threadId: comm.threadId,
+  }));
+  cache.threadCandidatesByOrg.set(organizationId, candidates);
+  return candidates;
+}
 
-    // -----------------------------------------------------------------------
-    // 4. Parse forwarded email to extract original sender
-    // -----------------------------------------------------------------------
-    const parsed = parseForwardedEmail(args.textBody);
-
-    let contactName: string;
-    let contactEmail: string;
-    let subject: string;
-    let bodyText: string;
-
-    if (parsed.isForwarded) {
-      // Use original sender info from the forwarded content
-      contactName =
-        parsed.originalFrom || extractDisplayName(args.fromName) || "Unknown";
-      contactEmail =
-        parsed.originalEmail || args.fromEmail;
-      subject = parsed.originalSubject || args.subject || "(No subject)";
-      // Prefer the parsed original body; fall back to strippedReply
-      bodyText = parsed.originalBody || args.strippedReply || args.textBody;
-    } else {
-      // Direct email (not forwarded) -- use the actual sender
-      contactName =
-        args.fromName || extractDisplayName(args.fromEmail) || "Unknown";
-      contactEmail = args.fromEmail;
-      subject = args.subject || "(No subject)";
-      bodyText = args.strippedReply || args.textBody;
-    }
+/** A communications row ready to insert. */
+export type InboundCommunication = WithoutSystemFields<Doc<"communications">>;
 
-    const cleanedBody = cleanEmailBody(bodyText);
+/**
+ * Everything needed to store an inbound email, worked out by
+ * prepareInboundEmail without writing anything.
+ */
+export interface PreparedInboundEmail {
+  /** Already imported under the same Postmark MessageID */
+  existing: Doc<"communications"> | null;
+  communication: InboundCommunication;
+  details: {
+    contactName: string;
+    contactEmail: string;
+    contactType: ContactDetectionResult["contactType"];
+    stakeholderEntityType: ContactDetectionResult["stakeholderEntityType"];
+    stakeholderEntityId: ContactDetectionResult["stakeholderEntityId"];
+    linkedParticipantId: ContactDetectionResult["linkedParticipantId"];
+    subject: string;
+    isForwarded: boolean;
+    isNewThread: boolean;
+  };
+}
 
-    // -----------------------------------------------------------------------
-    // 5. Detect contact type and entity from sender's email
-    // -----------------------------------------------------------------------
-    const detection = await detectContactAndEntity(
-      ctx,
-      contactEmail,
-      organizationId
-    );
+/**
+ * Resolve the organization and forwarding user, parse forwarded content,
+ * detect the contact and auto-thread one inbound email. Reads only, so an
+ * email that cannot be ingested throws before anything is written.
+ */
+export async function prepareInboundEmail(
+  ctx: MutationCtx,
+  email: InboundEmailInput,
+  cache: InboundIngestCache
+): Promise<PreparedInboundEmail> {
+  // -------------------------------------------------------------------------
+  // 1. Resolve organization and forwarding user
+  // -------------------------------------------------------------------------
+  const org = await resolveInboundOrganization(ctx, email.toAddress, cache);
+  const organizationId = org._id;
+  const forwarderUserId = await resolveForwarderUser(
+    ctx,
+    email.fromEmail,
+    org,
+    cache
+  );
 
-    // -----------------------------------------------------------------------
-    // 6. Auto-thread with existing communications
-    // -----------------------------------------------------------------------
-    // Fetch recent org communications for threading (last 200, non-deleted)
-    const recentComms = await ctx.db
-      .query("communications")
-      .withIndex("by_organizationId", (q) =>
-        q.eq("organizationId", organizationId)
-      )
-      .order("desc")
-      .filter((q) => q.neq(q.field("isDeleted"), true))
-      .take(200);
+  // -------------------------------------------------------------------------
+  // 2. Parse forwarded email to extract original sender
+  // -------------------------------------------------------------------------
+  const parsed = parseForwardedEmail(email.textBody);
+
+  let contactName: string;
+  let contactEmail: string;
+  let subject: string;
+  let bodyText: string;
+
+  if (parsed.isForwarded) {
+    // Use original sender info from the forwarded content
+    contactName =
+      parsed.originalFrom || extractDisplayName(email.fromName) || "Unknown";
+    contactEmail =
+      parsed.originalEmail || email.fromEmail;
+    subject = parsed.originalSubject || email.subject || "(No subject)";
+    // Prefer the parsed original body; fall back to strippedReply
+    bodyText = parsed.originalBody || email.strippedReply || email.textBody;
+  } else {
+    // Direct email (not forwarded) -- use the actual sender
+    contactName =
+      email.fromName || extractDisplayName(email.fromEmail) || "Unknown";
+    contactEmail = email.fromEmail;
+    subject = email.subject || "(No subject)";
+    bodyText = email.strippedReply || email.textBody;
+  }
 
-    const now = Date.now();
+  const cleanedBody = cleanEmailBody(bodyText);
 
-    // Build the new communication object for threading
-    const newCommForThreading: CommunicationForThreading = {
+  // -------------------------------------------------------------------------
+  // 3. Detect contact type and entity from sender's email
+  // -------------------------------------------------------------------------
+  const contactKey = `${organizationId}:${contactEmail.toLowerCase().trim()}`;
+  let detection = cache.contactsByEmail.get(contactKey);
+  if (!detection) {
+    detection = await detectContactAndEntity(ctx, contactEmail, organizationId);
+    cache.contactsByEmail.set(contactKey, detection);
+  }
+
+  // -------------------------------------------------------------------------
+  // 4. Deduplicate by Postmark MessageID
+  // -------------------------------------------------------------------------
+  const existing = email.postmarkMessageId
+    ? await ctx.db
+        .query("communications")
+        .withIndex("by_postmarkMessageId", (q) =>
+          q.eq("postmarkMessageId", email.postmarkMessageId)
+        )
+        .first()
+    : null;
+
+  // -------------------------------------------------------------------------
+  // 5. Auto-thread with existing communications
+  // -------------------------------------------------------------------------
+  const candidates = await getThreadCandidates(ctx, organizationId, cache);
+  const now = Date.now();
+  const communicationDate = resolveCommunicationDate(email.emailDate);
+
+  const threadResult = findOrCreateThread(
+    {
       _id: "", // Not created yet
       contactName: contactName,
       subject: subject,
       communicationType: "email",
-      communicationDate: resolveCommunicationDate(args.emailDate),
+      communicationDate,
       createdAt: now,
-    };
-
-    // Map existing communications for threading comparison
-    const recentCommForThreading: CommunicationForThreading[] =
-      recentComms.map((comm) => ({
-        _id: comm._id as string,
-        contactName: comm.contactName,
-        subject: comm.subject,
-        communicationType: comm.communicationType,
-        communicationDate: comm.communicationDate,
-        communicationTime: comm.communicationTime,
-        createdAt: comm.createdAt,
-        threadId: comm.threadId,
-      }));
-
-    const threadResult = findOrCreateThread(
-      newCommForThreading,
-      recentCommForThreading
-    );
-
-    // -----------------------------------------------------------------------
-    // 6b. Deduplicate by Postmark MessageID
-    // -----------------------------------------------------------------------
-    if (args.postmarkMessageId) {
-      const existing = await ctx.db
-        .query("communications")
-        .withIndex("by_postmarkMessageId", (q) =>
-          q.eq("postmarkMessageId", args.postmarkMessageId)
-        )
-        .first();
-      if (existing) return {
-        communicationId: existing._id,
-        threadId: existing.threadId || threadResult.threadId,
-        contactName,
-        contactEmail,
-        contactType: detection.contactType,
-        stakeholderEntityType: detection.stakeholderEntityType,
-        stakeholderEntityId: detection.stakeholderEntityId,
-        linkedParticipantId: detection.linkedParticipantId,
-        subject,
-        isForwarded: parsed.isForwarded,
-        isNewThread: false,
-        isNew: false,
-      };
-    }
+    },
+    candidates
+  );
 
-    // -----------------------------------------------------------------------
-    // 7. Insert communication record
-    // -----------------------------------------------------------------------
-    const communicationId = await ctx.db.insert("communications", {
+  return {
+    existing,
+    communication: {
       organizationId: organizationId,
       communicationType: "email" as const,
       direction: "received" as const,
-      communicationDate: resolveCommunicationDate(args.emailDate),
+      communicationDate,
       contactType: detection.contactType,
       contactName: contactName,
       contactEmail: contactEmail || undefined,
@@ -617,57 +704,14 @@ export const processInboundEmail = mutation({
       stakeholderEntityId: detection.stakeholderEntityId,
       // Auto-linked participant from SC/SIL relationship tables
       linkedParticipantId: detection.linkedParticipantId as any, // Schema: v.optional(v.id("participants"))
-      postmarkMessageId: args.postmarkMessageId,
-      createdBy: forwarderUserId as any, // Typed as Id<"users"> in schema
+      attachmentStorageIds: email.attachmentStorageIds,
+      attachmentMetadata: email.attachmentMetadata,
+      postmarkMessageId: email.postmarkMessageId,
+      createdBy: forwarderUserId,
       createdAt: now,
       updatedAt: now,
-    });
-
-    // -----------------------------------------------------------------------
-    // 7b. Update or create threadSummary for unread tracking
-    // -----------------------------------------------------------------------
-    const existingSummary = await ctx.db
-      .query("threadSummaries")
-      .withIndex("by_thread", (q) => q.eq("threadId", threadResult.threadId))
-      .first();
-
-    if (existingSummary) {
-      const updateFields: Record<string, any> = {
-        lastActivityAt: now,
-        messageCount: existingSummary.messageCount + 1,
-        hasUnread: true,
-        previewText: (cleanedBody || "(Empty email body)").substring(0, 100),
-      };
-      if (!existingSummary.participantNames.includes(contactName)) {
-        updateFields.participantNames = [...existingSummary.participantNames, contactName];
-      }
-      if (!existingSummary.participantId && detection.linkedParticipantId) {
-        updateFields.participantId = detection.linkedParticipantId;
-      }
-      await ctx.db.patch(existingSummary._id, updateFields);
-    } else {
-      await ctx.db.insert("threadSummaries", {
-        organizationId,
-        threadId: threadResult.threadId,
-        participantId: detection.linkedParticipantId as any,
-        startedAt: now,
-        lastActivityAt: now,
-        messageCount: 1,
-        participantNames: [contactName],
-        subject: subject || `Email from ${contactName}`,
-        previewText: (cleanedBody || "(Empty email body)").substring(0, 100),
-        hasUnread: true,
-        complianceCategories: ["none"],
-        requiresAction: false,
-      });
-    }
-
-    // -----------------------------------------------------------------------
-    // 8. Return result
-    // -----------------------------------------------------------------------
-    return {
-      communicationId,
-      threadId: threadResult.threadId,
+    },
+    details: {
       contactName,
       contactEmail,
       contactType: detection.contactType,
@@ -677,11 +721,126 @@ export const processInboundEmail = mutation({
       subject,
       isForwarded: parsed.isForwarded,
       isNewThread: threadResult.isNewThread,
-      isNew: true,
+    },
+  };
+}
+
+/**
+ * Insert a prepared communication and its thread summary.
+ */
+export async function storeInboundCommunication(
+  ctx: MutationCtx,
+  communication: InboundCommunication
+): Promise<Id<"communications">> {
+  const communicationId = await ctx.db.insert("communications", communication);
+  await applyThreadSummaryChange(
+    ctx,
+    communication.threadId!,
+    null,
+    await ctx.db.get(communicationId)
+  );
+  return communicationId;
+}
+
+/**
+ * Let later emails in the same batch thread onto a stored one.
+ */
+export function rememberInboundCommunication(
+  cache: InboundIngestCache,
+  communication: InboundCommunication,
+  communicationId: Id<"communications">
+): void {
+  if (!communication.organizationId) return;
+  cache.threadCandidatesByOrg.get(communication.organizationId)?.unshift({
+    _id: communicationId as string,
+    contactName: communication.contactName,
+    subject: communication.subject,
+    communicationType: communication.communicationType,
+    communicationDate: communication.communicationDate,
+    createdAt: communication.createdAt,
+    threadId: communication.threadId,
+  });
+}
+
+/**
+ * Ingest one inbound email: prepare it (prepareInboundEmail), then insert
+ * the communication and its thread summary.
+ *
+ * All lookups that can fail run before the first write, so a thrown error
+ * never leaves a partially ingested email behind.
+ */
+export async function ingestInboundEmail(
+  ctx: MutationCtx,
+  email: InboundEmailInput,
+  cache: InboundIngestCache
+) {
+  const { existing, communication, details } = await prepareInboundEmail(ctx, email, cache);
+  if (existing) {
+    return {
+      communicationId: existing._id,
+      threadId: existing.threadId,
+      ...details,
+      isNewThread: false,
+      isNew: false,
     };
+  }
+
+  const communicationId = await storeInboundCommunication(ctx, communication);
+  rememberInboundCommunication(cache, communication, communicationId);
+
+  return {
+    communicationId,
+    threadId: communication.threadId,
+    ...details,
+    isNew: true,
+  };
+}
+
+// ---------------------------------------------------------------------------
+// Mutation: processInboundEmail
+// ---------------------------------------------------------------------------
+
+/**
+ * Process a single inbound email synchronously.
+ *
+ * The Postmark webhook and manual sync now go through the batched
+ * ingestion queue (inboundEmailQueue.enqueue); this mutation remains for
+ * callers that need the created communication immediately.
+ *
+ * Flow:
+ *   1. Verify webhook secret
+ *   2. Ingest the email (see ingestInboundEmail)
+ *   3. Return result
+ */
+export const processInboundEmail = mutation({
+  args: {
+    webhookSecret: v.string(),
+    fromEmail: v.string(),
+    fromName: v.string(),
+    toAddress: v.string(),
+    subject: v.string(),
+    textBody: v.string(),
+    strippedReply: v.optional(v.string()),
+    emailDate: v.optional(v.string()),
+    postmarkMessageId: v.optional(v.string()),
+  },
+  handler: async (ctx, args) => {
+    const { webhookSecret, ...email } = args;
+    verifyWebhookSecret(webhookSecret);
+    return await ingestInboundEmail(ctx, email, createIngestCache());
   },
 });
 
+/**
+ * Reject calls that don't carry the Postmark webhook secret.
+ */
+export function verifyWebhookSecret(webhookSecret: string): void {
+  const expectedSecret = process.env.INBOUND_EMAIL_WEBHOOK_SECRET;
+  if (!expectedSecret || webhookSecret !== expectedSecret) {
+    throw new Error("Unauthorized: invalid webhook secret");
+  }
+}
+
 // ---------------------------------------------------------------------------
 // Internal helpers (DB access)
 // ---------------------------------------------------------------------------
@@ -689,7 +848,7 @@ export const processInboundEmail = mutation({
 /**
  * Result of detecting contact type and associated entity from a sender email.
  */
-interface ContactDetectionResult {
+export interface ContactDetectionResult {
   contactType: "ndia" | "support_coordinator" | "sil_provider" | "ot" | "contractor" | "other";
   stakeholderEntityType?: "support_coordinator" | "sil_provider" | "occupational_therapist" | "contractor";
   stakeholderEntityId?: string;
@@ -839,10 +998,32 @@ function resolveCommunicationDate(emailDate?: string): string {
 // Action: syncInboundEmails
 // ---------------------------------------------------------------------------
 
+// Parallel Postmark detail requests while building a sync batch
+const SYNC_DETAIL_CONCURRENCY = 10;
+
+/**
+ * Strip tags and common entities from an HTML-only email body.
+ */
+function stripHtml(html: string): string {
+  return html
+    .replace(/<style[^>]*>[\s\S]*?<\/style>/gi, "")
+    .replace(/<script[^>]*>[\s\S]*?<\/script>/gi, "")
+    .replace(/<[^>]+>/g, " ")
+    .replace(/&nbsp;/g, " ")
+    .replace(/&amp;/g, "&")
+    .replace(/&lt;/g, "<")
+    .replace(/&gt;/g, ">")
+    .replace(/&quot;/g, '"')
+    .replace(/\s+/g, " ")
+    .trim();
+}
+
 /**
  * Manually sync inbound emails from Postmark's Messages API.
- * Fetches recent inbound messages and processes any that weren't
- * already captured by the webhook (e.g., if the webhook was down).
+ * Fetches recent inbound messages and enqueues any that weren't already
+ * captured by the webhook (e.g., if the webhook was down). The ingestion
+ * queue drops messages it has already seen by Message-ID and processes the
+ * rest in batches.
  *
  * Requires POSTMARK_SERVER_TOKEN env var.
  */
@@ -884,23 +1065,21 @@ export const syncInboundEmails = action({
     const data = await response.json();
     const messages = data.InboundMessages || [];
 
-    let synced = 0;
-    let existing = 0;
     let skipped = 0;
     let errors = 0;
 
-    for (const msg of messages) {
+    // Build the email payload for one listed message, fetching full details
+    // (TextBody / HtmlBody) when the list entry has no text body
+    const buildEmail = async (msg: any): Promise<InboundEmailInput | null> => {
       const fromEmail = msg.FromFull?.Email || msg.From || "";
       const toAddress = msg.ToFull?.[0]?.Email || msg.To || "";
-      const subject = msg.Subject || "(No Subject)";
       const messageId = msg.MessageID || "";
 
       if (!fromEmail || !toAddress) {
         skipped++;
-        continue;
+        return null;
       }
 
-      // Fetch full message details (includes TextBody and HtmlBody)
       let textBody = msg.TextBody || "";
       if (!textBody && messageId) {
         try {
@@ -918,17 +1097,7 @@ export const syncInboundEmails = action({
             textBody = detail.TextBody || "";
             // Fallback: strip HTML tags from HtmlBody for HTML-only emails
             if (!textBody && detail.HtmlBody) {
-              textBody = detail.HtmlBody
-                .replace(/<style[^>]*>[\s\S]*?<\/style>/gi, "")
-                .replace(/<script[^>]*>[\s\S]*?<\/script>/gi, "")
-                .replace(/<[^>]+>/g, " ")
-                .replace(/&nbsp;/g, " ")
-                .replace(/&amp;/g, "&")
-                .replace(/&lt;/g, "<")
-                .replace(/&gt;/g, ">")
-                .replace(/&quot;/g, '"')
-                .replace(/\s+/g, " ")
-                .trim();
+              textBody = stripHtml(detail.HtmlBody);
             }
           }
         } catch {
@@ -938,54 +1107,50 @@ export const syncInboundEmails = action({
 
       // Fallback: strip HTML from list-level HtmlBody for HTML-only emails
       if (!textBody && msg.HtmlBody) {
-        textBody = msg.HtmlBody
-          .replace(/<style[^>]*>[\s\S]*?<\/style>/gi, "")
-          .replace(/<script[^>]*>[\s\S]*?<\/script>/gi, "")
-          .replace(/<[^>]+>/g, " ")
-          .replace(/&nbsp;/g, " ")
-          .replace(/&amp;/g, "&")
-          .replace(/&lt;/g, "<")
-          .replace(/&gt;/g, ">")
-          .replace(/&quot;/g, '"')
-          .replace(/\s+/g, " ")
-          .trim();
+        textBody = stripHtml(msg.HtmlBody);
       }
 
       if (!textBody) {
         skipped++;
-        continue;
+        return null;
       }
 
-      try {
-        const result = await ctx.runMutation(api.inboundEmail.processInboundEmail, {
-          webhookSecret,
-          fromEmail,
-          fromName: msg.FromFull?.Name || msg.FromName || fromEmail,
-          toAddress,
-          subject,
-          textBody,
-          strippedReply: undefined,
-          emailDate: msg.Date || undefined,
-          postmarkMessageId: messageId || undefined,
-        });
-        if (result.isNew) {
-          synced++;
-        } else {
-          existing++;
-        }
-      } catch (err) {
-        const errMsg = err instanceof Error ? err.message : String(err);
-        // Duplicates will naturally be handled by threading - they'll join existing threads
-        // But if the org isn't found or other config errors, count as skipped
-        if (errMsg.includes("No organization found") || errMsg.includes("Unauthorized")) {
-          skipped++;
-        } else {
-          console.error(`[Email Sync] Failed to process message ${messageId}: ${errMsg}`);
-          errors++;
-        }
+      return {
+        fromEmail,
+        fromName: msg.FromFull?.Name || msg.FromName || fromEmail,
+        toAddress,
+        subject: msg.Subject || "(No Subject)",
+        textBody,
+        emailDate: msg.Date || undefined,
+        postmarkMessageId: messageId || undefined,
+      };
+    };
+
+    const emails: InboundEmailInput[] = [];
+    for (let i = 0; i < messages.length; i += SYNC_DETAIL_CONCURRENCY) {
+      const built = await Promise.all(
+        messages.slice(i, i + SYNC_DETAIL_CONCURRENCY).map(buildEmail)
+      );
+      for (const email of built) {
+        if (email) emails.push(email);
       }
     }
 
-    return { synced, existing, skipped, errors };
+    if (emails.length === 0) {
+      return { synced: 0, existing: 0, skipped, errors };
+    }
+
+    try {
+      const result = await ctx.runMutation(api.inboundEmailQueue.enqueue, {
+        webhookSecret,
+        emails,
+      });
+      return { synced: result.queued, existing: result.duplicates, skipped, errors };
+    } catch (err) {
+      const errMsg = err instanceof Error ? err.message : String(err);
+      console.error(`[Email Sync] Failed to enqueue ${emails.length} messages: ${errMsg}`);
+      errors += emails.length;
+      return { synced: 0, existing: 0, skipped, errors };
+    }
   },
 });
@@ -0,0 +1,362 @@
+import { v, Infer } from "convex/values";
+import { mutation, internalMutation, MutationCtx } from "./_generated/server";
+import { Id } from "./_generated/dataModel";
+import { internal } from "./_generated/api";
+import {
+  createIngestCache,
+  prepareInboundEmail,
+  rememberInboundCommunication,
+  storeInboundCommunication,
+  verifyWebhookSecret,
+} from "./inboundEmail";
+import { validateFileUpload, sanitizeFileName } from "./lib/fileValidation";
+import schema from "./schema";
+
+/**
+ * Inbound Email Ingestion Queue
+ *
+ * The Postmark webhook (/api/mail) and manual sync (syncInboundEmails)
+ * enqueue raw payloads here instead of processing them inline:
+ *
+ *   1. enqueue drops payloads whose Message-ID was already queued or
+ *      imported, stores the rest as "pending" and returns immediately.
+ *   2. Attachments are uploaded to file storage by the caller first
+ *      (generateAttachmentUploadUrl), so only storage IDs pass through
+ *      mutation arguments and queued documents stay small.
+ *   3. processBatch ingests up to BATCH_SIZE pending emails per mutation
+ *      with a shared lookup cache (organization, forwarders, contacts,
+ *      thread candidates), then reschedules itself until the queue drains.
+ *      Each email is prepared with reads only; its writes run in a nested
+ *      storeEntry mutation, so an email that fails is rolled back and
+ *      marked failed without leaving a partial communication behind.
+ *
+ * Only one processBatch chain runs at a time. The chain holds the
+ * inboundEmailQueueLease row until the queue drains; enqueue and the cron
+ * (kickQueue) start a chain only when no unexpired lease exists, so a
+ * shared inbox replaying hundreds of emails after an outage drains in
+ * sequence without conflicting writes to the same thread summaries.
+ */
+
+const BATCH_SIZE = 25;
+// Payloads accepted per enqueue call
+const MAX_ENQUEUE_BATCH = 100;
+// Keep queued documents well under the 1 MB document limit
+const MAX_QUEUED_TEXT_LENGTH = 200_000;
+// A chain renews its lease as it runs; an abandoned lease lapses after this
+const LEASE_MS = 5 * 60 * 1000;
+const PROCESSED_RETENTION_DAYS = 7;
+const FAILED_RETENTION_DAYS = 30;
+
+const attachmentValidator = v.object({
+  storageId: v.id("_storage"), // Uploaded via generateAttachmentUploadUrl
+  fileName: v.string(),
+  fileType: v.string(),
+});
+
+const inboundEmailValidator = v.object({
+  fromEmail: v.string(),
+  fromName: v.string(),
+  toAddress: v.string(),
+  subject: v.string(),
+  textBody: v.string(),
+  strippedReply: v.optional(v.string()),
+  emailDate: v.optional(v.string()),
+  postmarkMessageId: v.optional(v.string()),
+  attachments: v.optional(v.array(attachmentValidator)),
+});
+
+/**
+ * Upload URL for one inbound attachment. The webhook stores attachments
+ * before enqueueing so base64 content never travels in mutation arguments.
+ */
+export const generateAttachmentUploadUrl = mutation({
+  args: { webhookSecret: v.string() },
+  handler: async (ctx, args): Promise<string> => {
+    verifyWebhookSecret(args.webhookSecret);
+    return await ctx.storage.generateUploadUrl();
+  },
+});
+
+async function deleteAttachments(
+  ctx: MutationCtx,
+  attachments: Array<{ storageId: Id<"_storage"> }> | undefined
+): Promise<void> {
+  for (const attachment of attachments ?? []) {
+    await ctx.storage.delete(attachment.storageId);
+  }
+}
+
+/**
+ * Check uploaded attachments against the file upload rules, using the
+ * stored size rather than the caller's. Rejected files are deleted.
+ */
+async function validateAttachments(
+  ctx: MutationCtx,
+  attachments: Array<Infer<typeof attachmentValidator>>,
+  uploadedAt: number
+): Promise<
+  Array<{ storageId: Id<"_storage">; fileName: string; fileSize: number; fileType: string; uploadedAt: number }>
+> {
+  const stored = [];
+  for (const attachment of attachments) {
+    const file = await ctx.db.system.get(attachment.storageId);
+    if (!file) continue;
+    const validation = validateFileUpload(attachment.fileName, attachment.fileType, file.size);
+    if (!validation.valid) {
+      console.warn(`[Inbound Email] Skipped attachment "${attachment.fileName}": ${validation.error}`);
+      await ctx.storage.delete(attachment.storageId);
+      continue;
+    }
+    stored.push({
+      storageId: attachment.storageId,
+      fileName: sanitizeFileName(attachment.fileName),
+      fileSize: file.size,
+      fileType: attachment.fileType,
+      uploadedAt,
+    });
+  }
+  return stored;
+}
+
+/**
+ * Start a processBatch chain unless one already holds an unexpired lease.
+ */
+async function startChain(ctx: MutationCtx): Promise<boolean> {
+  const now = Date.now();
+  const lease = await ctx.db.query("inboundEmailQueueLease").first();
+  if (lease && lease.expiresAt > now) return false;
+
+  if (lease) {
+    await ctx.db.patch(lease._id, { expiresAt: now + LEASE_MS });
+  } else {
+    await ctx.db.insert("inboundEmailQueueLease", { expiresAt: now + LEASE_MS });
+  }
+  await ctx.scheduler.runAfter(0, internal.inboundEmailQueue.processBatch, {});
+  return true;
+}
+
+/**
+ * Accept raw inbound emails for asynchronous processing.
+ * Called from the Next.js API route `/api/mail` and from syncInboundEmails.
+ */
+export const enqueue = mutation({
+  args: {
+    webhookSecret: v.string(),
+    emails: v.array(inboundEmailValidator),
+  },
+  handler: async (ctx, args): Promise<{ queued: number; duplicates: number }> => {
+    verifyWebhookSecret(args.webhookSecret);
+    if (args.emails.length > MAX_ENQUEUE_BATCH) {
+      throw new Error(`Cannot enqueue more than ${MAX_ENQUEUE_BATCH} emails at once`);
+    }
+
+    const now = Date.now();
+    const seen = new Set<string>();
+    let queued = 0;
+    let duplicates = 0;
+
+    for (const email of args.emails) {
+      const messageId = email.postmarkMessageId?.trim() || undefined;
+      if (messageId) {
+        if (seen.has(messageId)) {
+          await deleteAttachments(ctx, email.attachments);
+          duplicates++;
+          continue;
+        }
+        seen.add(messageId);
+
+        const alreadyQueued = await ctx.db
+          .query("inboundEmailQueue")
+          .withIndex("by_postmarkMessageId", (q) => q.eq("postmarkMessageId", messageId))
+          .first();
+        const alreadyImported =
+          alreadyQueued ??
+          (await ctx.db
+            .query("communications")
+            .withIndex("by_postmarkMessageId", (q) => q.eq("postmarkMessageId", messageId))
+            .first());
+        if (alreadyImported) {
+          await deleteAttachments(ctx, email.attachments);
+          duplicates++;
+          continue;
+        }
+      }
+
+      const { attachments, ...fields } = email;
+      const stored = await validateAttachments(ctx, attachments ?? [], now);
+      await ctx.db.insert("inboundEmailQueue", {
+        ...fields,
+        textBody: fields.textBody.slice(0, MAX_QUEUED_TEXT_LENGTH),
+        postmarkMessageId: messageId,
+        status: "pending",
+        attachmentCount: attachments?.length ?? 0,
+        attachmentStorageIds: stored.length > 0 ? stored.map((file) => file.storageId) : undefined,
+        attachmentMetadata:
+          stored.length > 0 ? stored.map(({ storageId: _storageId, ...file }) => file) : undefined,
+        receivedAt: now,
+      });
+      queued++;
+    }
+
+    if (queued > 0) {
+      await startChain(ctx);
+    }
+
+    return { queued, duplicates };
+  },
+});
+
+/**
+ * Store one prepared email and mark its queue entry processed. Called as a
+ * nested mutation from processBatch, so a failure rolls back only this
+ * email's writes.
+ */
+export const storeEntry = internalMutation({
+  args: {
+    entryId: v.id("inboundEmailQueue"),
+    communication: schema.tables.communications.validator,
+  },
+  handler: async (ctx, args): Promise<Id<"communications">> => {
+    const communicationId = await storeInboundCommunication(ctx, args.communication);
+    await ctx.db.patch(args.entryId, {
+      status: "processed",
+      communicationId,
+      processedAt: Date.now(),
+    });
+    return communicationId;
+  },
+});
+
+/**
+ * Ingest the oldest pending emails, then reschedule while more remain.
+ * Releases the chain's lease once the queue is drained.
+ */
+export const processBatch = internalMutation({
+  args: {},
+  handler: async (ctx): Promise<{ processed: number; failed: number }> => {
+    const now = Date.now();
+    const lease = await ctx.db.query("inboundEmailQueueLease").first();
+    if (!lease) {
+      await ctx.db.insert("inboundEmailQueueLease", { expiresAt: now + LEASE_MS });
+    } else if (lease.expiresAt - now < LEASE_MS / 2) {
+      await ctx.db.patch(lease._id, { expiresAt: now + LEASE_MS });
+    }
+
+    const entries = await ctx.db
+      .query("inboundEmailQueue")
+      .withIndex("by_status_receivedAt", (q) => q.eq("status", "pending"))
+      .take(BATCH_SIZE);
+
+    const cache = createIngestCache();
+    let processed = 0;
+    let failed = 0;
+
+    for (const entry of entries) {
+      try {
+        const { existing, communication } = await prepareInboundEmail(
+          ctx,
+          {
+            fromEmail: entry.fromEmail,
+            fromName: entry.fromName,
+            toAddress: entry.toAddress,
+            subject: entry.subject,
+            textBody: entry.textBody,
+            strippedReply: entry.strippedReply,
+            emailDate: entry.emailDate,
+            postmarkMessageId: entry.postmarkMessageId,
+            attachmentStorageIds: entry.attachmentStorageIds,
+            attachmentMetadata: entry.attachmentMetadata,
+          },
+          cache
+        );
+        if (existing) {
+          await ctx.db.patch(entry._id, {
+            status: "processed",
+            communicationId: existing._id,
+            processedAt: Date.now(),
+          });
+        } else {
+          const communicationId = await ctx.runMutation(internal.inboundEmailQueue.storeEntry, {
+            entryId: entry._id,
+            communication,
+          });
+          rememberInboundCommunication(cache, communication, communicationId);
+        }
+        processed++;
+      } catch (err) {
+        const message = err instanceof Error ? err.message : String(err);
+        console.error(`[Inbound Email] Failed to ingest queued email ${entry._id}: ${message}`);
+        await ctx.db.patch(entry._id, {
+          status: "failed",
+          error: message,
+          processedAt: Date.now(),
+        });
+        failed++;
+      }
+    }
+
+    if (entries.length === BATCH_SIZE) {
+      await ctx.scheduler.runAfter(0, internal.inboundEmailQueue.processBatch, {});
+    } else {
+      const current = await ctx.db.query("inboundEmailQueueLease").first();
+      if (current) await ctx.db.delete(current._id);
+    }
+
+    return { processed, failed };
+  },
+});
+
+/**
+ * Start a processing chain if emails are waiting and no chain holds the
+ * lease (cron safety net for chains that stopped early).
+ */
+export const kickQueue = internalMutation({
+  args: {},
+  handler: async (ctx) => {
+    const pending = await ctx.db
+      .query("inboundEmailQueue")
+      .withIndex("by_status_receivedAt", (q) => q.eq("status", "pending"))
+      .first();
+    if (pending) {
+      await startChain(ctx);
+    }
+  },
+});
+
+/**
+ * Delete processed and failed queue entries past their retention period.
+ * Attachments of failed entries were never linked to a communication, so
+ * their files are deleted too.
+ */
+export const cleanupQueue = internalMutation({
+  args: {},
+  handler: async (ctx): Promise<number> => {
+    const now = Date.now();
+    const day = 24 * 60 * 60 * 1000;
+
+    const processed = await ctx.db
+      .query("inboundEmailQueue")
+      .withIndex("by_status_receivedAt", (q) =>
+        q.eq("status", "processed").lt("receivedAt", now - PROCESSED_RETENTION_DAYS * day)
+      )
+      .take(500);
+    for (const entry of processed) {
+      await ctx.db.delete(entry._id);
+    }
+
+    const failed = await ctx.db
+      .query("inboundEmailQueue")
+      .withIndex("by_status_receivedAt", (q) =>
+        q.eq("status", "failed").lt("receivedAt", now - FAILED_RETENTION_DAYS * day)
+      )
+      .take(500);
+    for (const entry of failed) {
+      for (const storageId of entry.attachmentStorageIds ?? []) {
+        await ctx.storage.delete(storageId as any);
+      }
+      await ctx.db.delete(entry._id);
+    }
+
+    return processed.length + failed.length;
+  },
+});
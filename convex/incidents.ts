@@ -1,8 +1,12 @@
 import { mutation, query, internalQuery, internalMutation } from "./_generated/server";
 import { v } from "convex/values";
+import { Id } from "./_generated/dataModel";
 import { internal } from "./_generated/api";
 import { requirePermission, requireAuth, requireTenant, requireActiveSubscription } from "./authHelpers";
 import { encryptField, decryptField, isEncrypted } from "./lib/encryption";
+import { trackOrgStats } from "./orgStats";
+import { deletePhotoDerivatives, scheduleDerivatives, withPhotoUrls } from "./photoDerivativesHelpers";
+import { findReceipt } from "./offlineSync";
 
 // Decrypt sensitive incident fields (handles both encrypted and plaintext for migration)
 async function decryptIncidentFields<T extends Record<string, any>>(i: T): Promise<T> {
@@ -106,9 +110,14 @@ export const create = mutation({
     reportedToNdis: v.optional(v.boolean()),
     ndisReportDate: v.optional(v.string()),
     reportedBy: v.id("users"),
+    // Set by the offline sync engine so a replay after a dropped response
+    // returns the incident created the first time instead of a duplicate
+    idempotencyKey: v.optional(v.string()),
   },
   handler: async (ctx, args) => {
     try {
+      const { idempotencyKey, ...incident } = args;
+
       // Verify user has permission and get organizationId
       const user = await requirePermission(ctx, args.reportedBy, "incidents", "create");
       const { organizationId } = await requireTenant(ctx, args.reportedBy);
@@ -116,6 +125,11 @@ export const create = mutation({
       const auditUser = { userId: user._id, userEmail: user.email, userName: `${user.firstName} ${user.lastName}` };
       await requireActiveSubscription(ctx, organizationId, auditUser);
 
+      if (idempotencyKey) {
+        const receipt = await findReceipt(ctx, organizationId, idempotencyKey);
+        if (receipt?.entityId) return receipt.entityId as Id<"incidents">;
+      }
+
       const now = Date.now();
 
       // Determine if this is an NDIS reportable incident
@@ -132,7 +146,7 @@ export const create = mutation({
 
       // Build base incident data with encrypted fields
       const baseData = {
-        ...args,
+        ...incident,
         organizationId,
         description: encDescription ?? args.description,
         witnessNames: encWitnessNames ?? args.witnessNames,
@@ -162,6 +176,16 @@ export const create = mutation({
           ndisNotificationStatus: "not_required",
         });
       }
+      await trackOrgStats(ctx, "incidents", incidentId, null);
+
+      if (idempotencyKey) {
+        await ctx.db.insert("offlineSyncReceipts", {
+          organizationId,
+          key: idempotencyKey,
+          entityId: incidentId,
+          createdAt: now,
+        });
+      }
 
       // Audit log
       await ctx.runMutation(internal.auditLog.log, {
@@ -348,10 +372,7 @@ export const getById = query({
       .collect();
 
     const photosWithUrls = await Promise.all(
-      photos.map(async (photo) => {
-        const url = await ctx.storage.getUrl(photo.storageId);
-        return { ...photo, url };
-      })
+      photos.map((photo) => withPhotoUrls(ctx, photo))
     );
 
     return {
@@ -953,6 +974,7 @@ export const addPhoto = mutation({
       ...args,
       createdAt: Date.now(),
     });
+    await scheduleDerivatives(ctx, "incidentPhotos", photoId, args.fileType);
     return photoId;
   },
 });
@@ -969,6 +991,7 @@ export const deletePhoto = mutation({
     const photo = await ctx.db.get(args.photoId);
     if (photo) {
       await ctx.storage.delete(photo.storageId);
+      await deletePhotoDerivatives(ctx, photo);
       await ctx.db.delete(args.photoId);
     }
     return { success: true };
@@ -1,7 +1,18 @@
 import { v } from "convex/values";
-import { query, mutation } from "./_generated/server";
+import { query, mutation, MutationCtx } from "./_generated/server";
 import { internal } from "./_generated/api";
+import { Id } from "./_generated/dataModel";
 import { requireAuth, requireTenant } from "./authHelpers";
+import { syncCalendarIndex } from "./calendarIndex";
+import { deletePhotoDerivatives, scheduleDerivatives, withPhotoUrls } from "./photoDerivativesHelpers";
+import { createMaintenanceRequestsFromInspection } from "./maintenanceRequests";
+import {
+  statusTransitionDelta,
+  applyCounterDelta,
+  isZeroDelta,
+  InspectionCounters,
+  InspectionItemStatus,
+} from "./lib/inspectionCounters";
 
 // ============================================
 // DWELLING TEMPLATE MERGE HELPER
@@ -299,10 +310,7 @@ export const getInspectionById = query({
 
     // Get photo URLs
     const photosWithUrls = await Promise.all(
-      photos.map(async (photo) => {
-        const url = await ctx.storage.getUrl(photo.storageId);
-        return { ...photo, url };
-      })
+      photos.map((photo) => withPhotoUrls(ctx, photo))
     );
 
     // Group items by category
@@ -397,6 +405,7 @@ export const createInspection = mutation({
       createdAt: now,
       updatedAt: now,
     });
+    await syncCalendarIndex(ctx, "inspections", inspectionId);
 
     // Create inspection items from merged template
     let itemOrder = 0;
@@ -451,10 +460,11 @@ export const updateInspection = mutation({
     const cleanUpdates = Object.fromEntries(
       Object.entries(updates).filter(([_, v]) => v !== undefined)
     );
-    return await ctx.db.patch(inspectionId, {
+    await ctx.db.patch(inspectionId, {
       ...cleanUpdates,
       updatedAt: Date.now(),
     });
+    await syncCalendarIndex(ctx, "inspections", inspectionId);
   },
 });
 
@@ -521,55 +531,60 @@ export const completeInspection = mutation({
     }
 
     const today = new Date().toISOString().split("T")[0];
+    // Completion is idempotent: a retry after a dropped connection resumes
+    // maintenance request creation without re-completing or re-scheduling
+    const alreadyCompleted = inspection.status === "completed";
+    const completedDate = inspection.completedDate || today;
 
     // 1. Mark inspection as completed
-    await ctx.db.patch(args.inspectionId, {
-      status: "completed",
-      completedDate: today,
-      additionalComments: args.additionalComments,
-      updatedAt: Date.now(),
-    });
+    if (!alreadyCompleted) {
+      await ctx.db.patch(args.inspectionId, {
+        status: "completed",
+        completedDate: today,
+        additionalComments: args.additionalComments,
+        updatedAt: Date.now(),
+      });
+      await syncCalendarIndex(ctx, "inspections", args.inspectionId);
 
-    // Trigger webhook
-    await ctx.scheduler.runAfter(0, internal.webhooks.triggerWebhook, {
-      organizationId,
-      event: "inspection.completed",
-      payload: JSON.stringify({ inspectionId: args.inspectionId }),
-    });
+      // Trigger webhook
+      await ctx.scheduler.runAfter(0, internal.webhooks.triggerWebhook, {
+        organizationId,
+        event: "inspection.completed",
+        payload: JSON.stringify({ inspectionId: args.inspectionId }),
+      });
+    }
 
-    // 2. Get all inspection items
-    const allItems = await ctx.db
+    // 2. Collect failed items
+    const failedItems = await ctx.db
       .query("inspectionItems")
-      .withIndex("by_inspection", (q) => q.eq("inspectionId", args.inspectionId))
+      .withIndex("by_inspection_status", (q) =>
+        q.eq("inspectionId", args.inspectionId).eq("status", "fail")
+      )
       .collect();
 
-    // 3. Collect failed items
-    const failedItems = allItems.filter((item) => item.status === "fail");
-
-    // 4. Auto-create maintenance requests for failed items
+    // 3. Auto-create maintenance requests for failed items in one batched
+    // call; large inspections continue in scheduled batches
     let maintenanceRequestsCreated = 0;
     const skippedNoDwelling = !inspection.dwellingId;
     const shouldCreateMRs = args.createMaintenanceRequests !== false;
 
     if (inspection.dwellingId && shouldCreateMRs && failedItems.length > 0) {
-      for (const item of failedItems) {
-        const mappedCategory = INSPECTION_CATEGORY_MAP[item.category] || "general";
-        const description = `Failed during inspection on ${today}. ${item.condition || ""} ${item.remarks || ""}`.trim();
-
-        await ctx.runMutation(internal.maintenanceRequests.createFromInspection, {
-          dwellingId: inspection.dwellingId,
-          organizationId,
-          title: `[Inspection] ${item.itemName}`,
-          description,
-          category: mappedCategory as "plumbing" | "electrical" | "appliances" | "building" | "grounds" | "safety" | "general",
-          priority: "medium",
-          inspectionId: args.inspectionId,
+      const { created, queued } = await createMaintenanceRequestsFromInspection(ctx, {
+        dwellingId: inspection.dwellingId,
+        organizationId,
+        inspectionId: args.inspectionId,
+        priority: "medium",
+        createdBy: args.userId,
+        reportedDate: completedDate,
+        items: failedItems.map((item) => ({
           inspectionItemId: item._id,
-          createdBy: args.userId,
-          reportedDate: today,
-        });
-        maintenanceRequestsCreated++;
-      }
+          title: `[Inspection] ${item.itemName}`,
+          description: `Failed during inspection on ${completedDate}. ${item.condition || ""} ${item.remarks || ""}`.trim(),
+          category: (INSPECTION_CATEGORY_MAP[item.category] || "general") as
+            "plumbing" | "electrical" | "appliances" | "building" | "grounds" | "safety" | "general",
+        })),
+      });
+      maintenanceRequestsCreated = created + queued;
     }
 
     // 5. Auto-reschedule: check if a future scheduled inspection already exists
@@ -578,7 +593,14 @@ export const completeInspection = mutation({
     let alreadyScheduled = false;
     const shouldScheduleNext = args.scheduleNext !== false;
 
-    if (shouldScheduleNext) {
+    if (alreadyCompleted && inspection.nextInspectionId) {
+      const next = await ctx.db.get(inspection.nextInspectionId);
+      if (next) {
+        alreadyScheduled = true;
+        nextInspectionId = next._id;
+        nextInspectionDate = next.scheduledDate;
+      }
+    } else if (shouldScheduleNext) {
       // Check for existing future scheduled inspection for same property+dwelling
       const existingScheduled = await ctx.db
         .query("inspections")
@@ -705,6 +727,7 @@ export const completeInspection = mutation({
           createdAt: now,
           updatedAt: now,
         });
+        await syncCalendarIndex(ctx, "inspections", newInspectionId);
 
         // Create inspection items from template categories
         let itemOrder = 0;
@@ -906,6 +929,7 @@ export const deleteInspection = mutation({
 
     for (const photo of photos) {
       await ctx.storage.delete(photo.storageId);
+      await deletePhotoDerivatives(ctx, photo);
       await ctx.db.delete(photo._id);
     }
 
@@ -921,6 +945,7 @@ export const deleteInspection = mutation({
 
     // Delete the inspection
     await ctx.db.delete(args.inspectionId);
+    await syncCalendarIndex(ctx, "inspections", args.inspectionId);
   },
 });
 
@@ -951,10 +976,7 @@ export const getItemsByInspection = query({
           .collect();
 
         const photosWithUrls = await Promise.all(
-          photos.map(async (photo) => {
-            const url = await ctx.storage.getUrl(photo.storageId);
-            return { ...photo, url };
-          })
+          photos.map((photo) => withPhotoUrls(ctx, photo))
         );
 
         return { ...item, photos: photosWithUrls };
@@ -996,43 +1018,96 @@ export const updateItemStatus = mutation({
       updatedAt: Date.now(),
     });
 
-    // Update inspection counts
-    const inspection = await ctx.db.get(item.inspectionId);
-    if (inspection) {
-      const allItems = await ctx.db
-        .query("inspectionItems")
-        .withIndex("by_inspection", (q) =>
-          q.eq("inspectionId", item.inspectionId)
-        )
-        .collect();
-
-      // Recalculate counts
-      let completedItems = 0;
-      let passedItems = 0;
-      let failedItems = 0;
-
-      allItems.forEach((i) => {
-        // Use updated status for the current item
-        const status = i._id === args.itemId ? args.status : i.status;
-        if (status !== "pending") {
-          completedItems++;
-          if (status === "pass") passedItems++;
-          if (status === "fail") failedItems++;
-        }
-      });
-
-      await ctx.db.patch(item.inspectionId, {
-        completedItems,
-        passedItems,
-        failedItems,
-        updatedAt: Date.now(),
-      });
+    // Update inspection counts from the status transition
+    const delta = statusTransitionDelta(item.status, args.status);
+    if (!isZeroDelta(delta)) {
+      const inspection = await ctx.db.get(item.inspectionId);
+      if (inspection) {
+        await ctx.db.patch(item.inspectionId, {
+          ...applyCounterDelta(inspection, delta),
+          updatedAt: Date.now(),
+        });
+      }
     }
 
     return args.itemId;
   },
 });
 
+export interface InspectionItemUpdate {
+  itemId: Id<"inspectionItems">;
+  status: InspectionItemStatus;
+  condition?: string;
+  remarks?: string;
+}
+
+/**
+ * Apply a batch of item status updates, adjusting each affected inspection's
+ * counters once. When organizationId is given, items from other
+ * organizations are skipped. Returns the ids of the items updated.
+ */
+export async function applyInspectionItemUpdates(
+  ctx: MutationCtx,
+  updates: InspectionItemUpdate[],
+  updatedBy: Id<"users">,
+  organizationId?: Id<"organizations">
+): Promise<Id<"inspectionItems">[]> {
+  const now = Date.now();
+
+  // Last update wins if an item appears more than once in the batch
+  const latest = new Map<Id<"inspectionItems">, InspectionItemUpdate>();
+  for (const update of updates) {
+    latest.set(update.itemId, update);
+  }
+
+  const items = await Promise.all(
+    Array.from(latest.keys()).map((itemId) => ctx.db.get(itemId))
+  );
+
+  // Accumulate counter deltas per inspection, then write each inspection once
+  const updated: Id<"inspectionItems">[] = [];
+  const deltas = new Map<Id<"inspections">, InspectionCounters>();
+  for (const item of items) {
+    if (!item) continue;
+    if (organizationId && item.organizationId !== organizationId) continue;
+    const update = latest.get(item._id)!;
+
+    await ctx.db.patch(item._id, {
+      status: update.status,
+      condition: update.condition,
+      remarks: update.remarks,
+      hasIssue: update.status === "fail",
+      updatedBy,
+      updatedAt: now,
+    });
+    updated.push(item._id);
+
+    const delta = statusTransitionDelta(item.status, update.status);
+    const total = deltas.get(item.inspectionId) ?? {
+      completedItems: 0,
+      passedItems: 0,
+      failedItems: 0,
+    };
+    deltas.set(item.inspectionId, {
+      completedItems: total.completedItems + delta.completedItems,
+      passedItems: total.passedItems + delta.passedItems,
+      failedItems: total.failedItems + delta.failedItems,
+    });
+  }
+
+  for (const [inspectionId, delta] of deltas) {
+    if (isZeroDelta(delta)) continue;
+    const inspection = await ctx.db.get(inspectionId);
+    if (!inspection) continue;
+    await ctx.db.patch(inspectionId, {
+      ...applyCounterDelta(inspection, delta),
+      updatedAt: now,
+    });
+  }
+
+  return updated;
+}
+
 // Bulk update multiple items at once
 export const bulkUpdateItems = mutation({
   args: {
@@ -1053,52 +1128,7 @@ export const bulkUpdateItems = mutation({
   },
   handler: async (ctx, args) => {
     await requireAuth(ctx, args.updatedBy);
-    const now = Date.now();
-    let inspectionId: any = null;
-
-    for (const update of args.updates) {
-      const item = await ctx.db.get(update.itemId);
-      if (!item) continue;
-
-      inspectionId = item.inspectionId;
-      const hasIssue = update.status === "fail";
-
-      await ctx.db.patch(update.itemId, {
-        status: update.status,
-        condition: update.condition,
-        remarks: update.remarks,
-        hasIssue,
-        updatedBy: args.updatedBy,
-        updatedAt: now,
-      });
-    }
-
-    // Update inspection counts if we have an inspection
-    if (inspectionId) {
-      const allItems = await ctx.db
-        .query("inspectionItems")
-        .withIndex("by_inspection", (q) => q.eq("inspectionId", inspectionId))
-        .collect();
-
-      let completedItems = 0;
-      let passedItems = 0;
-      let failedItems = 0;
-
-      allItems.forEach((item) => {
-        if (item.status !== "pending") {
-          completedItems++;
-          if (item.status === "pass") passedItems++;
-          if (item.status === "fail") failedItems++;
-        }
-      });
-
-      await ctx.db.patch(inspectionId, {
-        completedItems,
-        passedItems,
-        failedItems,
-        updatedAt: now,
-      });
-    }
+    await applyInspectionItemUpdates(ctx, args.updates, args.updatedBy);
   },
 });
 
@@ -1116,10 +1146,7 @@ export const getPhotosByItem = query({
       .collect();
 
     return await Promise.all(
-      photos.map(async (photo) => {
-        const url = await ctx.storage.getUrl(photo.storageId);
-        return { ...photo, url };
-      })
+      photos.map((photo) => withPhotoUrls(ctx, photo))
     );
   },
 });
@@ -1149,7 +1176,7 @@ export const saveInspectionPhoto = mutation({
   },
   handler: async (ctx, args) => {
     const { organizationId } = await requireTenant(ctx, args.uploadedBy);
-    return await ctx.db.insert("inspectionPhotos", {
+    const photoId = await ctx.db.insert("inspectionPhotos", {
       organizationId,
       inspectionId: args.inspectionId,
       inspectionItemId: args.inspectionItemId,
@@ -1161,6 +1188,8 @@ export const saveInspectionPhoto = mutation({
       uploadedBy: args.uploadedBy,
       createdAt: Date.now(),
     });
+    await scheduleDerivatives(ctx, "inspectionPhotos", photoId, args.fileType);
+    return photoId;
   },
 });
 
@@ -1175,6 +1204,7 @@ export const deleteInspectionPhoto = mutation({
     const photo = await ctx.db.get(args.photoId);
     if (photo) {
       await ctx.storage.delete(photo.storageId);
+      await deletePhotoDerivatives(ctx, photo);
       await ctx.db.delete(args.photoId);
     }
   },
@@ -1193,7 +1223,7 @@ export const saveGeneralPhoto = mutation({
   },
   handler: async (ctx, args) => {
     const { organizationId } = await requireTenant(ctx, args.uploadedBy);
-    return await ctx.db.insert("inspectionPhotos", {
+    const photoId = await ctx.db.insert("inspectionPhotos", {
       organizationId,
       inspectionId: args.inspectionId,
       inspectionItemId: undefined,
@@ -1206,6 +1236,8 @@ export const saveGeneralPhoto = mutation({
       uploadedBy: args.uploadedBy,
       createdAt: Date.now(),
     });
+    await scheduleDerivatives(ctx, "inspectionPhotos", photoId, args.fileType);
+    return photoId;
   },
 });
 
@@ -1222,10 +1254,7 @@ export const getGeneralPhotos = query({
     const generalPhotos = photos.filter((p) => !p.inspectionItemId || p.isGeneralPhoto);
 
     return await Promise.all(
-      generalPhotos.map(async (photo) => {
-        const url = await ctx.storage.getUrl(photo.storageId);
-        return { ...photo, url };
-      })
+      generalPhotos.map((photo) => withPhotoUrls(ctx, photo))
     );
   },
 });
@@ -1366,6 +1395,7 @@ export const deleteCustomItem = mutation({
 
     for (const photo of photos) {
       await ctx.storage.delete(photo.storageId);
+      await deletePhotoDerivatives(ctx, photo);
       await ctx.db.delete(photo._id);
     }
 
@@ -1487,6 +1517,7 @@ export const deleteCategoryItems = mutation({
         .collect();
       for (const photo of photos) {
         await ctx.storage.delete(photo.storageId);
+        await deletePhotoDerivatives(ctx, photo);
         await ctx.db.delete(photo._id);
       }
 
@@ -1610,10 +1641,7 @@ export const getInspectionReport = query({
 
     // Get photo URLs
     const photosWithUrls = await Promise.all(
-      photos.map(async (photo) => ({
-        ...photo,
-        url: await ctx.storage.getUrl(photo.storageId),
-      }))
+      photos.map((photo) => withPhotoUrls(ctx, photo))
     );
 
     // Build photo lookup by item ID
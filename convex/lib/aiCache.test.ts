@@ -0,0 +1,59 @@
+import { describe, it, expect } from "vitest";
+import {
+  AI_CACHE_TTL_MS,
+  MAX_CACHEABLE_QUESTION_LENGTH,
+  normalizeQuestion,
+  responseCacheKey,
+  toolCacheKey,
+  isCacheEntryFresh,
+} from "./aiCache";
+
+describe("normalizeQuestion", () => {
+  it("ignores case, spacing and trailing punctuation", () => {
+    expect(normalizeQuestion("  What's OVERDUE   this week?? ")).toBe("what's overdue this week");
+    expect(normalizeQuestion("what's overdue this week")).toBe("what's overdue this week");
+  });
+});
+
+describe("responseCacheKey", () => {
+  it("maps equivalent questions to the same key", () => {
+    expect(responseCacheKey("Show vacancies.")).toBe(responseCacheKey("show   vacancies"));
+  });
+
+  it("does not cache empty or very long questions", () => {
+    expect(responseCacheKey(" ?? ")).toBeNull();
+    expect(responseCacheKey("a".repeat(MAX_CACHEABLE_QUESTION_LENGTH + 1))).toBeNull();
+  });
+});
+
+describe("toolCacheKey", () => {
+  it("ignores input key order and undefined values", () => {
+    expect(toolCacheKey("get_overdue_maintenance", { priority: "high", property_name: "Elm" })).toBe(
+      toolCacheKey("get_overdue_maintenance", { property_name: "Elm", priority: "high", suburb: undefined })
+    );
+  });
+
+  it("separates tools and inputs", () => {
+    expect(toolCacheKey("get_vacancies", {})).not.toBe(toolCacheKey("get_expiring_plans", {}));
+    expect(toolCacheKey("get_expiring_plans", { days_ahead: 30 })).not.toBe(
+      toolCacheKey("get_expiring_plans", { days_ahead: 60 })
+    );
+  });
+});
+
+describe("isCacheEntryFresh", () => {
+  const now = 1_000_000;
+  const entry = { dataVersion: 5, expiresAt: now + AI_CACHE_TTL_MS };
+
+  it("serves entries for the same data version within the TTL", () => {
+    expect(isCacheEntryFresh(entry, 5, now)).toBe(true);
+  });
+
+  it("rejects entries after the data version changes", () => {
+    expect(isCacheEntryFresh(entry, 6, now)).toBe(false);
+  });
+
+  it("rejects expired entries", () => {
+    expect(isCacheEntryFresh(entry, 5, now + AI_CACHE_TTL_MS)).toBe(false);
+  });
+});
@@ -0,0 +1,58 @@
+/**
+ * Cache keys and freshness rules for the AI assistant caches (aiCache.ts).
+ *
+ * Entries are scoped to an organization and tagged with the organization's
+ * data version (organizationStats.updatedAt) when written. An entry is only
+ * served while that version is unchanged and its short TTL has not passed,
+ * so writes to tracked tables invalidate immediately and anything else
+ * ages out within AI_CACHE_TTL_MS.
+ */
+
+import { stableStringify } from "./stableHash";
+
+export const AI_CACHE_TTL_MS = 60_000;
+
+// Longer questions are unlikely to repeat verbatim; do not cache them
+export const MAX_CACHEABLE_QUESTION_LENGTH = 300;
+
+export interface AiCacheEntry {
+  dataVersion: number;
+  expiresAt: number;
+}
+
+/**
+ * Normalize a question so trivial differences (case, spacing, trailing
+ * punctuation) hit the same cache entry.
+ */
+export function normalizeQuestion(message: string): string {
+  return message
+    .toLowerCase()
+    .replace(/\s+/g, " ")
+    .trim()
+    .replace(/[\s?.!]+$/, "");
+}
+
+/**
+ * Cache key for a whole assistant reply, or null if the question should not
+ * be cached.
+ */
+export function responseCacheKey(message: string): string | null {
+  const normalized = normalizeQuestion(message);
+  if (!normalized || normalized.length > MAX_CACHEABLE_QUESTION_LENGTH) return null;
+  return `response:${normalized}`;
+}
+
+/**
+ * Cache key for a tool call's formatted result.
+ */
+export function toolCacheKey(toolName: string, input: Record<string, unknown>): string {
+  return `tool:${toolName}:${stableStringify(input)}`;
+}
+
+export function isCacheEntryFresh(
+  entry: AiCacheEntry,
+  dataVersion: number,
+  now: number
+): boolean {
+  return entry.dataVersion === dataVersion && entry.expiresAt > now;
+}
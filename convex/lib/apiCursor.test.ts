@@ -0,0 +1,62 @@
+import { describe, it, expect } from "vitest";
+import { ConvexError } from "convex/values";
+import {
+  filterSignature,
+  encodeApiCursor,
+  decodeApiCursor,
+  CURSOR_ERROR_CODE,
+} from "./apiCursor";
+
+// ---------------------------------------------------------------------------
+// filterSignature
+// ---------------------------------------------------------------------------
+describe("filterSignature", () => {
+  it("is independent of key order", () => {
+    expect(filterSignature({ status: "open", priority: "high" })).toBe(
+      filterSignature({ priority: "high", status: "open" })
+    );
+  });
+
+  it("ignores undefined filters", () => {
+    expect(filterSignature({ status: "open", search: undefined })).toBe(
+      filterSignature({ status: "open" })
+    );
+  });
+});
+
+// ---------------------------------------------------------------------------
+// encodeApiCursor / decodeApiCursor
+// ---------------------------------------------------------------------------
+describe("encodeApiCursor / decodeApiCursor", () => {
+  it("round-trips a Convex cursor", () => {
+    const sig = filterSignature({ status: "open" });
+    const token = encodeApiCursor("abc+/=123", sig);
+    expect(token).not.toMatch(/[+/=]/);
+    expect(decodeApiCursor(token, sig)).toBe("abc+/=123");
+  });
+
+  it("returns null when no cursor is given", () => {
+    expect(decodeApiCursor(undefined, "")).toBeNull();
+  });
+
+  it("rejects a cursor issued for different filters", () => {
+    const token = encodeApiCursor("abc", filterSignature({ status: "open" }));
+    expect(() => decodeApiCursor(token, filterSignature({ status: "closed" }))).toThrow(
+      "Cursor does not match the current filters"
+    );
+  });
+
+  it("rejects malformed cursors", () => {
+    expect(() => decodeApiCursor("not-a-cursor", "")).toThrow("Invalid cursor");
+  });
+
+  it("throws a ConvexError with the cursor error code", () => {
+    try {
+      decodeApiCursor("not-a-cursor", "");
+      expect.unreachable();
+    } catch (err) {
+      expect(err).toBeInstanceOf(ConvexError);
+      expect((err as ConvexError<{ code: string }>).data.code).toBe(CURSOR_ERROR_CODE);
+    }
+  });
+});
@@ -0,0 +1,82 @@
+import { ConvexError } from "convex/values";
+
+/**
+ * Opaque continuation tokens for REST API list endpoints.
+ *
+ * Wraps a Convex pagination cursor together with a signature of the filters
+ * that produced it, so a token replayed against a different query is
+ * rejected with a clear error instead of returning an inconsistent page.
+ * Rejections are ConvexErrors carrying CURSOR_ERROR_CODE, because plain
+ * error messages are redacted in production and callers must still be able
+ * to tell a bad cursor (400) from a server failure (500).
+ */
+
+const CURSOR_VERSION = 1;
+
+export const CURSOR_ERROR_CODE = "INVALID_CURSOR";
+
+function cursorError(message: string): ConvexError<{ code: string; message: string }> {
+  return new ConvexError({ code: CURSOR_ERROR_CODE, message });
+}
+
+interface CursorPayload {
+  v: number;
+  c: string; // Convex continueCursor
+  s: string; // Filter signature
+}
+
+/**
+ * Build a stable signature for a set of list filters.
+ * Undefined values are ignored so optional params do not change the signature.
+ */
+export function filterSignature(filters: Record<string, unknown>): string {
+  return Object.keys(filters)
+    .filter((k) => filters[k] !== undefined && filters[k] !== null)
+    .sort()
+    .map((k) => `${k}=${String(filters[k])}`)
+    .join("&");
+}
+
+function toBase64Url(input: string): string {
+  return btoa(input).replace(/\+/g, "-").replace(/\//g, "_").replace(/=+$/, "");
+}
+
+function fromBase64Url(input: string): string {
+  const base64 = input.replace(/-/g, "+").replace(/_/g, "/");
+  return atob(base64 + "=".repeat((4 - (base64.length % 4)) % 4));
+}
+
+/**
+ * Encode a Convex continueCursor into an opaque API cursor.
+ */
+export function encodeApiCursor(continueCursor: string, signature: string): string {
+  const payload: CursorPayload = { v: CURSOR_VERSION, c: continueCursor, s: signature };
+  return toBase64Url(JSON.stringify(payload));
+}
+
+/**
+ * Decode an API cursor back into a Convex cursor.
+ * Returns null for a missing cursor (first page); throws if the cursor is
+ * malformed or was issued for different filters.
+ */
+export function decodeApiCursor(
+  cursor: string | undefined,
+  signature: string
+): string | null {
+  if (!cursor) return null;
+
+  let payload: CursorPayload;
+  try {
+    payload = JSON.parse(fromBase64Url(cursor));
+  } catch {
+    throw cursorError("Invalid cursor");
+  }
+
+  if (payload?.v !== CURSOR_VERSION || typeof payload.c !== "string") {
+    throw cursorError("Invalid cursor");
+  }
+  if (payload.s !== signature) {
+    throw cursorError("Cursor does not match the current filters");
+  }
+  return payload.c;
+}
@@ -0,0 +1,121 @@
+import { describe, it, expect } from "vitest";
+import {
+  staggerSlots,
+  runPool,
+  buildGoogleBatchBody,
+  parseGoogleBatchResponse,
+  buildGraphBatchBody,
+  parseGraphBatchResponse,
+} from "./calendarSync";
+
+const sleep = (ms: number) => new Promise((resolve) => setTimeout(resolve, ms));
+
+describe("staggerSlots", () => {
+  it("spreads items evenly over the window in order", () => {
+    const slots = staggerSlots([1, 2, 3, 4, 5], 3, 600);
+    expect(slots).toEqual([
+      { delayMs: 0, items: [1, 2] },
+      { delayMs: 200, items: [3, 4] },
+      { delayMs: 400, items: [5] },
+    ]);
+  });
+
+  it("uses fewer slots than the maximum for small inputs", () => {
+    expect(staggerSlots(["a"], 12, 60_000)).toEqual([{ delayMs: 0, items: ["a"] }]);
+    expect(staggerSlots([], 12, 60_000)).toEqual([]);
+  });
+});
+
+describe("runPool", () => {
+  it("keeps workers busy past a slow item and preserves result order", async () => {
+    const started: number[] = [];
+    const results = await runPool([50, 1, 1, 1, 1], 2, async (ms, i) => {
+      started.push(i);
+      await sleep(ms);
+      if (i === 3) throw new Error("boom");
+      return i;
+    });
+
+    // Items 1-4 all start on the second worker while item 0 is still running
+    expect(started).toEqual([0, 1, 2, 3, 4]);
+    expect(results.map((r) => r.status)).toEqual(["fulfilled", "fulfilled", "fulfilled", "rejected", "fulfilled"]);
+    expect(results[4]).toEqual({ status: "fulfilled", value: 4 });
+  });
+
+  it("never exceeds the concurrency limit", async () => {
+    let inFlight = 0;
+    let peak = 0;
+    await runPool(Array.from({ length: 20 }, (_, i) => i), 4, async () => {
+      peak = Math.max(peak, ++inFlight);
+      await sleep(1);
+      inFlight--;
+    });
+    expect(peak).toBe(4);
+  });
+});
+
+describe("Google batch", () => {
+  it("builds one application/http part per call", () => {
+    const body = buildGoogleBatchBody("b1", "/calendar/v3", [
+      { method: "POST", path: "/calendars/primary/events", body: { summary: "A" } },
+      { method: "DELETE", path: "/calendars/primary/events/x" },
+    ]);
+    expect(body).toContain("Content-ID: <item0>\r\n\r\nPOST /calendar/v3/calendars/primary/events HTTP/1.1");
+    expect(body).toContain('{"summary":"A"}');
+    expect(body).toContain("DELETE /calendar/v3/calendars/primary/events/x HTTP/1.1");
+    expect(body.endsWith("--b1--\r\n")).toBe(true);
+  });
+
+  it("parses responses back into request order", () => {
+    const text = [
+      "--resp",
+      "Content-Type: application/http",
+      "Content-ID: <response-item1>",
+      "",
+      "HTTP/1.1 404 Not Found",
+      "Content-Type: application/json",
+      "",
+      '{"error":{"code":404}}',
+      "--resp",
+      "Content-Type: application/http",
+      "Content-ID: <response-item0>",
+      "",
+      "HTTP/1.1 200 OK",
+      "Content-Type: application/json; charset=UTF-8",
+      "",
+      '{"id":"evt1"}',
+      "--resp--",
+    ].join("\r\n");
+
+    expect(parseGoogleBatchResponse('multipart/mixed; boundary="resp"', text, 2)).toEqual([
+      { status: 200, body: { id: "evt1" } },
+      { status: 404, body: { error: { code: 404 } } },
+    ]);
+  });
+});
+
+describe("Graph batch", () => {
+  it("numbers requests and reorders responses", () => {
+    const batch = buildGraphBatchBody([
+      { method: "POST", path: "/me/events", body: { subject: "A" } },
+      { method: "DELETE", path: "/me/events/x" },
+    ]);
+    expect(batch.requests[0]).toEqual({
+      id: "0",
+      method: "POST",
+      url: "/me/events",
+      headers: { "Content-Type": "application/json" },
+      body: { subject: "A" },
+    });
+    expect(batch.requests[1]).toEqual({ id: "1", method: "DELETE", url: "/me/events/x" });
+
+    const responses = parseGraphBatchResponse(
+      { responses: [{ id: "1", status: 204 }, { id: "0", status: 201, body: { id: "evt1" } }] },
+      2
+    );
+    expect(responses).toEqual([
+      { status: 201, body: { id: "evt1" } },
+      { status: 204, body: null },
+    ]);
+  });
+});
@@ -0,0 +1,207 @@
+/**
+ * Calendar sync scheduling and provider batch helpers.
+ *
+ * Used by calendarSync.ts (scheduler), googleCalendar.ts and outlookCalendar.ts.
+ * Kept free of Convex and Node imports so the slotting, pool and batch wire
+ * formats can be unit tested and pointed at local fake provider servers.
+ */
+
+// Google accepts up to 1000 calls per batch but recommends keeping them small
+export const GOOGLE_BATCH_LIMIT = 50;
+// Microsoft Graph JSON batching hard limit
+export const GRAPH_BATCH_LIMIT = 20;
+
+export interface ProviderRequest {
+  method: "GET" | "POST" | "PATCH" | "DELETE";
+  path: string; // Relative to the API root, e.g. "/calendars/primary/events"
+  body?: unknown;
+}
+
+export interface ProviderResponse {
+  status: number;
+  body: any;
+}
+
+/** One pulled provider event, as written by calendarSync.applyExternalChanges */
+export interface ExternalEventUpsert {
+  externalEventId: string;
+  title: string;
+  description?: string;
+  startTime: string;
+  endTime: string;
+  allDay: boolean;
+  location?: string;
+  attendees?: Array<{
+    email: string;
+    name?: string;
+    status?: "accepted" | "declined" | "tentative" | "pending";
+  }>;
+}
+
+/**
+ * Split items into consecutive groups spread evenly over a window, so a cron
+ * tick starts a slice of the work every `windowMs / slots` instead of all at
+ * once. Order is preserved (callers put the stalest items first).
+ */
+export function staggerSlots<T>(
+  items: T[],
+  maxSlots: number,
+  windowMs: number
+): Array<{ delayMs: number; items: T[] }> {
+  if (items.length === 0) return [];
+  const perSlot = Math.ceil(items.length / Math.max(1, maxSlots));
+  const slotCount = Math.ceil(items.length / perSlot);
+  const slots: Array<{ delayMs: number; items: T[] }> = [];
+  for (let i = 0; i < slotCount; i++) {
+    slots.push({
+      delayMs: Math.round((i * windowMs) / slotCount),
+      items: items.slice(i * perSlot, (i + 1) * perSlot),
+    });
+  }
+  return slots;
+}
+
+/**
+ * Run `worker` over items with at most `concurrency` in flight. Each worker
+ * takes the next item as soon as it finishes, so one slow item never holds up
+ * a whole batch. Results come back in input order, settled like Promise.allSettled.
+ */
+export async function runPool<T, R>(
+  items: T[],
+  concurrency: number,
+  worker: (item: T, index: number) => Promise<R>
+): Promise<PromiseSettledResult<R>[]> {
+  const results: PromiseSettledResult<R>[] = new Array(items.length);
+  let next = 0;
+
+  const runWorker = async () => {
+    while (next < items.length) {
+      const index = next++;
+      try {
+        results[index] = { status: "fulfilled", value: await worker(items[index], index) };
+      } catch (reason) {
+        results[index] = { status: "rejected", reason };
+      }
+    }
+  };
+
+  const workers = Math.max(1, Math.min(concurrency, items.length));
+  await Promise.all(Array.from({ length: workers }, runWorker));
+  return results;
+}
+
+export function chunk<T>(items: T[], size: number): T[][] {
+  const chunks: T[][] = [];
+  for (let i = 0; i < items.length; i += size) {
+    chunks.push(items.slice(i, i + size));
+  }
+  return chunks;
+}
+
+/**
+ * Build a Google API multipart/mixed batch body. `pathPrefix` is the API path
+ * the batched calls live under (e.g. "/calendar/v3").
+ */
+export function buildGoogleBatchBody(
+  boundary: string,
+  pathPrefix: string,
+  requests: ProviderRequest[]
+): string {
+  const parts = requests.map((request, i) => {
+    const lines = [
+      `--${boundary}`,
+      "Content-Type: application/http",
+      `Content-ID: <item${i}>`,
+      "",
+      `${request.method} ${pathPrefix}${request.path} HTTP/1.1`,
+    ];
+    if (request.body !== undefined) {
+      lines.push("Content-Type: application/json", "", JSON.stringify(request.body));
+    } else {
+      lines.push("");
+    }
+    return lines.join("\r\n");
+  });
+  return `${parts.join("\r\n")}\r\n--${boundary}--\r\n`;
+}
+
+/**
+ * Parse a Google multipart/mixed batch response into one response per
+ * request, in request order (matched on Content-ID).
+ */
+export function parseGoogleBatchResponse(
+  contentType: string,
+  text: string,
+  requestCount: number
+): ProviderResponse[] {
+  const boundary = contentType.match(/boundary="?([^";]+)"?/)?.[1];
+  if (!boundary) {
+    throw new Error("Google batch response has no multipart boundary");
+  }
+
+  const responses: ProviderResponse[] = Array.from({ length: requestCount }, () => ({
+    status: 0,
+    body: null,
+  }));
+
+  for (const part of text.split(`--${boundary}`)) {
+    const id = part.match(/Content-ID:\s*<response-item(\d+)>/i);
+    const statusLine = part.match(/HTTP\/[\d.]+ (\d{3})/);
+    if (!id || !statusLine) continue;
+
+    const index = Number(id[1]);
+    if (index >= requestCount) continue;
+
+    // Body follows the blank line that ends the inner response headers
+    const afterStatus = part.slice(statusLine.index! + statusLine[0].length);
+    const bodyStart = afterStatus.search(/\r?\n\r?\n/);
+    const rawBody = bodyStart === -1 ? "" : afterStatus.slice(bodyStart).trim();
+    let body: any = null;
+    if (rawBody) {
+      try {
+        body = JSON.parse(rawBody);
+      } catch {
+        body = rawBody;
+      }
+    }
+    responses[index] = { status: Number(statusLine[1]), body };
+  }
+
+  return responses;
+}
+
+/**
+ * Build a Microsoft Graph JSON $batch payload (ids are request indexes).
+ */
+export function buildGraphBatchBody(requests: ProviderRequest[]) {
+  return {
+    requests: requests.map((request, i) => ({
+      id: String(i),
+      method: request.method,
+      url: request.path,
+      ...(request.body !== undefined
+        ? { headers: { "Content-Type": "application/json" }, body: request.body }
+        : {}),
+    })),
+  };
+}
+
+/**
+ * Order a Graph $batch response (which may arrive in any order) by request index.
+ */
+export function parseGraphBatchResponse(
+  data: { responses?: Array<{ id: string; status: number; body?: any }> },
+  requestCount: number
+): ProviderResponse[] {
+  const responses: ProviderResponse[] = Array.from({ length: requestCount }, () => ({
+    status: 0,
+    body: null,
+  }));
+  for (const response of data.responses ?? []) {
+    const index = Number(response.id);
+    if (index >= 0 && index < requestCount) {
+      responses[index] = { status: response.status, body: response.body ?? null };
+    }
+  }
+  return responses;
+}
@@ -0,0 +1,107 @@
+import { describe, it, expect } from "vitest";
+import {
+  iterateCsvRows,
+  detectClaimColumns,
+  normalizeClaimDate,
+  parseClaimCsv,
+  chunkCsvRows,
+} from "./claimCsv";
+
+const NDIA_HEADER =
+  "RegistrationNumber,NDISNumber,SupportsDeliveredFrom,SupportsDeliveredTo,SupportNumber,ClaimReference,Quantity,Hours,UnitPrice,GSTCode,AuthorisedBy,ParticipantApproved,InKindFundingProgram,ClaimType,CancellationReason,ABN of Support Provider";
+
+describe("iterateCsvRows", () => {
+  it("handles quotes, escaped quotes, CRLF and quoted newlines", () => {
+    const rows = [...iterateCsvRows('﻿a,"b,c"\r\n"say ""hi""","line\nbreak"\n\n')];
+    expect(rows).toEqual([
+      ["a", "b,c"],
+      ['say "hi"', "line\nbreak"],
+    ]);
+  });
+});
+
+describe("detectClaimColumns", () => {
+  it("recognises the NDIA bulk-claim header", () => {
+    const columns = detectClaimColumns(NDIA_HEADER.split(","));
+    expect(columns).toMatchObject({ ndisNumber: 1, supportsDeliveredFrom: 2, unitPrice: 8, quantity: 6 });
+  });
+
+  it("returns null for unrelated layouts", () => {
+    expect(detectClaimColumns(["Date", "Description", "Debit", "Credit"])).toBeNull();
+  });
+});
+
+describe("normalizeClaimDate", () => {
+  it("accepts ISO and Australian day-first dates", () => {
+    expect(normalizeClaimDate("2026-03-01")).toBe("2026-03-01");
+    expect(normalizeClaimDate("1/3/2026")).toBe("2026-03-01");
+    expect(normalizeClaimDate("31-01-26")).toBe("2026-01-31");
+    expect(normalizeClaimDate("31/02/2026")).toBeNull();
+    expect(normalizeClaimDate("")).toBeNull();
+  });
+});
+
+describe("parseClaimCsv", () => {
+  it("parses NDIA rows after a title line and skips incomplete rows", () => {
+    const csv = [
+      "Bulk claim export",
+      NDIA_HEADER,
+      '4050052336,430 123 456,01/03/2026,31/03/2026,06_431_0131_2_2,ABC-001,1,,"1,234.50",P2,,,,,,87630237277',
+      "4050052336,430123457,2026-03-01,,06_431_0131_2_2,ABC-002,2,,100,P2,,,,,,87630237277",
+      "4050052336,,2026-03-01,2026-03-31,06_431_0131_2_2,ABC-003,1,,100,P2,,,,,,87630237277",
+    ].join("\r\n");
+
+    expect(parseClaimCsv(csv)).toEqual({
+      records: [
+        {
+          ndisNumber: "430123456",
+          supportsDeliveredFrom: "2026-03-01",
+          supportsDeliveredTo: "2026-03-31",
+          claimReference: "ABC-001",
+          amount: 1234.5,
+          supportNumber: "06_431_0131_2_2",
+        },
+        {
+          ndisNumber: "430123457",
+          supportsDeliveredFrom: "2026-03-01",
+          supportsDeliveredTo: "2026-03-01",
+          claimReference: "ABC-002",
+          amount: 200,
+          supportNumber: "06_431_0131_2_2",
+        },
+      ],
+      skippedRows: [5],
+    });
+  });
+
+  it("uses an amount column as the line total instead of a unit price", () => {
+    const csv = [
+      "NDIS Number,Start Date,Quantity,Claim Amount",
+      "430123456,2026-03-01,4,400",
+      "430123457,2026-03-01,2,",
+    ].join("\n");
+
+    expect(parseClaimCsv(csv)).toMatchObject({
+      records: [{ ndisNumber: "430123456", amount: 400 }],
+      skippedRows: [3],
+    });
+  });
+
+  it("returns null when no claim header is found", () => {
+    expect(parseClaimCsv("Participant,Total\nJane,100")).toBeNull();
+  });
+
+  it("parses a thousand-row file", () => {
+    const rows = Array.from({ length: 1000 }, (_, i) => `4050052336,430${String(i).padStart(6, "0")},2026-03-01,2026-03-31,06_431_0131_2_2,REF-${i},1,,500.00,P2,,,,,,1`);
+    const result = parseClaimCsv([NDIA_HEADER, ...rows].join("\n"));
+    expect(result?.records).toHaveLength(1000);
+    expect(result?.skippedRows).toEqual([]);
+  });
+});
+
+describe("chunkCsvRows", () => {
+  it("repeats the header in each chunk", () => {
+    const chunks = chunkCsvRows('h1,h2\n1,"a,b"\n2,b\n3,c', 2);
+    expect(chunks).toEqual(['h1,h2\n1,"a,b"\n2,b', "h1,h2\n3,c"]);
+  });
+});
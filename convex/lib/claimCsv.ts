@@ -0,0 +1,254 @@
+/**
+ * NDIS claim CSV parsing.
+ *
+ * Deterministic fast path for aiDocuments.parseCsvClaims. Rows are read one
+ * record at a time (RFC 4180 quoting, CRLF/LF, quoted newlines) and mapped
+ * through a header detected from the standard NDIA bulk-claim columns, so a
+ * thousand-row file parses locally instead of round-tripping through the
+ * model. Layouts that can't be recognised return null and are sent to the
+ * model in row chunks via chunkCsvRows.
+ */
+
+export interface ParsedClaimRecord {
+  ndisNumber: string;
+  supportsDeliveredFrom: string;
+  supportsDeliveredTo: string;
+  claimReference: string;
+  amount: number;
+  supportNumber: string;
+}
+
+type ClaimColumn =
+  | "ndisNumber"
+  | "supportsDeliveredFrom"
+  | "supportsDeliveredTo"
+  | "claimReference"
+  | "unitPrice"
+  | "total"
+  | "quantity"
+  | "supportNumber";
+
+// Header aliases, compared after lower-casing and stripping non-alphanumerics.
+// The first entry is the NDIA bulk-claim column name (see ndisClaimExport.ts).
+const COLUMN_ALIASES: Record<ClaimColumn, string[]> = {
+  ndisNumber: ["ndisnumber", "participantndisnumber", "ndisno", "participantnumber"],
+  supportsDeliveredFrom: ["supportsdeliveredfrom", "deliveredfrom", "startdate", "servicestartdate", "fromdate"],
+  supportsDeliveredTo: ["supportsdeliveredto", "deliveredto", "enddate", "serviceenddate", "todate"],
+  claimReference: ["claimreference", "claimref", "reference"],
+  unitPrice: ["unitprice", "price"],
+  // A line total, used as-is rather than multiplied by quantity
+  total: ["amount", "claimamount", "claimedamount", "totalamount"],
+  quantity: ["quantity", "qty"],
+  supportNumber: ["supportnumber", "supportitemnumber", "supportitem", "itemnumber"],
+};
+
+const REQUIRED_COLUMNS: ClaimColumn[] = ["ndisNumber", "supportsDeliveredFrom"];
+
+// How many leading records to search for the header row (some exports add a title line)
+const HEADER_SCAN_ROWS = 5;
+
+export type ClaimColumnMap = Partial<Record<ClaimColumn, number>>;
+
+/**
+ * Yield each CSV record as an array of fields without splitting the whole
+ * file up front. Blank lines are skipped.
+ */
+export function* iterateCsvRows(text: string): Generator<string[]> {
+  let i = text.charCodeAt(0) === 0xfeff ? 1 : 0;
+  let field = "";
+  let row: string[] = [];
+  let inQuotes = false;
+
+  const endRow = function* () {
+    row.push(field);
+    field = "";
+    if (row.length > 1 || row[0].trim() !== "") yield row;
+    row = [];
+  };
+
+  for (; i < text.length; i++) {
+    const ch = text[i];
+    if (inQuotes) {
+      if (ch === '"') {
+        if (text[i + 1] === '"') {
+          field += '"';
+          i++;
+        } else {
+          inQuotes = false;
+        }
+      } else {
+        field += ch;
+      }
+    } else if (ch === '"') {
+      inQuotes = true;
+    } else if (ch === ",") {
+      row.push(field);
+      field = "";
+    } else if (ch === "\n" || ch === "\r") {
+      if (ch === "\r" && text[i + 1] === "\n") i++;
+      yield* endRow();
+    } else {
+      field += ch;
+    }
+  }
+
+  if (field !== "" || row.length > 0) yield* endRow();
+}
+
+function normalizeHeader(value: string): string {
+  return value.toLowerCase().replace(/[^a-z0-9]/g, "");
+}
+
+/**
+ * Map a header row to claim columns, or null if the required NDIA columns
+ * (NDISNumber, SupportsDeliveredFrom, and UnitPrice or an amount column) are
+ * missing.
+ */
+export function detectClaimColumns(header: string[]): ClaimColumnMap | null {
+  const normalized = header.map(normalizeHeader);
+  const columns: ClaimColumnMap = {};
+
+  for (const [column, aliases] of Object.entries(COLUMN_ALIASES) as [ClaimColumn, string[]][]) {
+    for (const alias of aliases) {
+      const index = normalized.indexOf(alias);
+      if (index !== -1) {
+        columns[column] = index;
+        break;
+      }
+    }
+  }
+
+  const hasAmount = columns.unitPrice !== undefined || columns.total !== undefined;
+  return hasAmount && REQUIRED_COLUMNS.every((c) => columns[c] !== undefined) ? columns : null;
+}
+
+/**
+ * Convert YYYY-MM-DD, YYYY/MM/DD, DD/MM/YYYY, DD-MM-YYYY or DD/MM/YY
+ * (Australian day-first order) to YYYY-MM-DD. Returns null if unparseable.
+ */
+export function normalizeClaimDate(value: string): string | null {
+  const trimmed = value.trim().split(/[ T]/)[0];
+  let year: number, month: number, day: number;
+
+  let match = trimmed.match(/^(\d{4})[-/.](\d{1,2})[-/.](\d{1,2})$/);
+  if (match) {
+    [year, month, day] = [Number(match[1]), Number(match[2]), Number(match[3])];
+  } else {
+    match = trimmed.match(/^(\d{1,2})[-/.](\d{1,2})[-/.](\d{2}|\d{4})$/);
+    if (!match) return null;
+    [day, month, year] = [Number(match[1]), Number(match[2]), Number(match[3])];
+    if (year < 100) year += 2000;
+  }
+
+  const date = new Date(Date.UTC(year, month - 1, day));
+  if (date.getUTCFullYear() !== year || date.getUTCMonth() !== month - 1 || date.getUTCDate() !== day) {
+    return null;
+  }
+  return date.toISOString().split("T")[0];
+}
+
+function parseNumber(value: string | undefined): number | null {
+  if (value === undefined) return null;
+  const cleaned = value.replace(/[$,\s]/g, "");
+  if (cleaned === "") return null;
+  const number = Number(cleaned);
+  return Number.isFinite(number) ? number : null;
+}
+
+/**
+ * Claim amount for a row: an amount/total column as-is, otherwise
+ * UnitPrice x Quantity (quantity defaults to 1).
+ */
+function rowAmount(total: number | null, unitPrice: number | null, quantity: number | null): number | null {
+  if (total !== null) return total;
+  if (unitPrice === null) return null;
+  return Math.round(unitPrice * (quantity ?? 1) * 100) / 100;
+}
+
+/**
+ * Parse a claim CSV with a recognised header. Returns null when no header in
+ * the first few rows matches, so the caller can fall back to the model.
+ * Rows without an NDIS number, a valid start date or an amount are listed
+ * in `skippedRows` (1-based record numbers, counting the header and any
+ * title lines but not blank lines) rather than guessed at.
+ */
+export function parseClaimCsv(
+  text: string
+): { records: ParsedClaimRecord[]; skippedRows: number[] } | null {
+  const rows = iterateCsvRows(text);
+  let columns: ClaimColumnMap | null = null;
+  let rowNumber = 0;
+
+  while (rowNumber < HEADER_SCAN_ROWS && !columns) {
+    const next = rows.next();
+    if (next.done) return null;
+    rowNumber++;
+    columns = detectClaimColumns(next.value);
+  }
+  if (!columns) return null;
+
+  const cell = (row: string[], column: ClaimColumn) => {
+    const index = columns![column];
+    return index === undefined ? "" : (row[index] ?? "").trim();
+  };
+
+  const records: ParsedClaimRecord[] = [];
+  const skippedRows: number[] = [];
+
+  for (const row of rows) {
+    rowNumber++;
+    const ndisNumber = cell(row, "ndisNumber").replace(/\D/g, "");
+    const from = normalizeClaimDate(cell(row, "supportsDeliveredFrom"));
+    const amount = rowAmount(
+      parseNumber(cell(row, "total")),
+      parseNumber(cell(row, "unitPrice")),
+      parseNumber(cell(row, "quantity"))
+    );
+    if (!ndisNumber || !from || amount === null) {
+      skippedRows.push(rowNumber);
+      continue;
+    }
+
+    records.push({
+      ndisNumber,
+      supportsDeliveredFrom: from,
+      supportsDeliveredTo: normalizeClaimDate(cell(row, "supportsDeliveredTo")) ?? from,
+      claimReference: cell(row, "claimReference"),
+      amount,
+      supportNumber: cell(row, "supportNumber"),
+    });
+  }
+
+  return { records, skippedRows };
+}
+
+function toCsvLine(fields: string[]): string {
+  return fields.map((f) => (/[",\r\n]/.test(f) ? `"${f.replace(/"/g, '""')}"` : f)).join(",");
+}
+
+/**
+ * Split a CSV into chunks of at most `rowsPerChunk` records, each repeating
+ * the first record (assumed header) so it can be parsed on its own.
+ */
+export function chunkCsvRows(text: string, rowsPerChunk: number): string[] {
+  const rows = iterateCsvRows(text);
+  const first = rows.next();
+  if (first.done) return [];
+
+  const header = toCsvLine(first.value);
+  const chunks: string[] = [];
+  let current: string[] = [];
+
+  for (const row of rows) {
+    current.push(toCsvLine(row));
+    if (current.length === rowsPerChunk) {
+      chunks.push([header, ...current].join("\n"));
+      current = [];
+    }
+  }
+  if (current.length > 0 || chunks.length === 0) {
+    chunks.push([header, ...current].join("\n"));
+  }
+
+  return chunks;
+}
@@ -0,0 +1,95 @@
+import { describe, it, expect } from "vitest";
+import {
+  isoDate,
+  portfolioStats,
+  daysUntil,
+  scheduleStats,
+  taskStats,
+  consentStats,
+} from "./dashboardSummary";
+
+const now = Date.parse("2026-03-10T00:00:00.000Z");
+
+describe("portfolioStats", () => {
+  it("counts occupancy and vacancies for active SDA properties only", () => {
+    const stats = portfolioStats(
+      [
+        { _id: "p1" },
+        { _id: "p2", propertyStatus: "active" },
+        { _id: "p3", propertyStatus: "sil_property" },
+        { _id: "p4", propertyStatus: "planning" },
+      ],
+      [
+        { propertyId: "p1", maxParticipants: 3, currentOccupancy: 2 },
+        { propertyId: "p2", maxParticipants: 2, currentOccupancy: 2 },
+        { propertyId: "p3", maxParticipants: 4, currentOccupancy: 1 },
+      ]
+    );
+    expect(stats).toEqual({
+      totalProperties: 4,
+      totalDwellings: 3,
+      totalParticipants: 4,
+      totalVacancies: 1,
+      activeSdaCount: 2,
+      underConstructionCount: 0,
+      planningCount: 1,
+      silPropertyCount: 1,
+    });
+  });
+});
+
+describe("scheduleStats", () => {
+  it("splits overdue and upcoming schedules and sums 30-day costs", () => {
+    const stats = scheduleStats(
+      [
+        { nextDueDate: "2026-03-01", estimatedCost: 500 },
+        { nextDueDate: "2026-03-15", estimatedCost: 200 },
+        { nextDueDate: "2026-04-01", estimatedCost: 300 },
+        { nextDueDate: "2026-06-01", estimatedCost: 1000 },
+      ],
+      now
+    );
+    expect(stats).toEqual({
+      overdue: 1,
+      dueWithin7Days: 1,
+      dueWithin30Days: 2,
+      estimatedCost30Days: 500,
+    });
+  });
+
+  it("reports days until due", () => {
+    expect(daysUntil("2026-03-17", now)).toBe(7);
+    expect(daysUntil("2026-03-08", now)).toBe(-2);
+  });
+});
+
+describe("taskStats", () => {
+  it("only counts open tasks", () => {
+    const stats = taskStats(
+      [
+        { status: "pending", dueDate: "2026-03-01", priority: "urgent", category: "funding" },
+        { status: "in_progress", dueDate: "2026-03-20", priority: "low", category: "general" },
+        { status: "completed", dueDate: "2026-03-01", priority: "urgent", category: "funding" },
+      ],
+      isoDate(now)
+    );
+    expect(stats).toEqual({ open: 2, overdue: 1, urgent: 1, funding: 1 });
+  });
+});
+
+describe("consentStats", () => {
+  it("classifies consent for participants who haven't moved out", () => {
+    const stats = consentStats(
+      [
+        { status: "active" },
+        { status: "active", consentStatus: "active", consentExpiryDate: "2026-03-01" },
+        { status: "active", consentStatus: "active", consentExpiryDate: "2026-03-20" },
+        { status: "active", consentStatus: "active", consentExpiryDate: "2027-01-01" },
+        { status: "moved_out", consentStatus: "expired" },
+      ],
+      isoDate(now),
+      isoDate(now, 30)
+    );
+    expect(stats).toEqual({ active: 1, expiringSoon: 1, expired: 1, missing: 1, total: 4 });
+  });
+});
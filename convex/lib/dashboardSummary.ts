@@ -0,0 +1,183 @@
+/**
+ * Dashboard summary calculations.
+ *
+ * Pure versions of the stat rules behind the dashboard cards, shared by
+ * rebuildSummary (dashboard.ts) so the materialized dashboardSummaries row
+ * counts exactly what the per-module stats queries count.
+ * Dates are compared as YYYY-MM-DD strings, like the queries they replace.
+ */
+
+const DAY_MS = 24 * 60 * 60 * 1000;
+
+/**
+ * YYYY-MM-DD (UTC) for a timestamp plus an optional number of days.
+ */
+export function isoDate(now: number, addDays = 0): string {
+  return new Date(now + addDays * DAY_MS).toISOString().split("T")[0];
+}
+
+export interface PortfolioStats {
+  totalProperties: number;
+  totalDwellings: number;
+  totalParticipants: number;
+  totalVacancies: number;
+  activeSdaCount: number;
+  underConstructionCount: number;
+  planningCount: number;
+  silPropertyCount: number;
+}
+
+/**
+ * Property portfolio cards. Only active properties and dwellings should be
+ * passed in; occupancy and vacancies count operational (active SDA) properties.
+ */
+export function portfolioStats(
+  properties: Array<{ _id: string; propertyStatus?: string }>,
+  dwellings: Array<{ propertyId: string; maxParticipants: number; currentOccupancy: number }>
+): PortfolioStats {
+  const byProperty = new Map<string, { count: number; capacity: number; occupancy: number }>();
+  for (const dwelling of dwellings) {
+    const entry = byProperty.get(dwelling.propertyId) ?? { count: 0, capacity: 0, occupancy: 0 };
+    entry.count++;
+    entry.capacity += dwelling.maxParticipants;
+    entry.occupancy += dwelling.currentOccupancy;
+    byProperty.set(dwelling.propertyId, entry);
+  }
+
+  const stats: PortfolioStats = {
+    totalProperties: properties.length,
+    totalDwellings: 0,
+    totalParticipants: 0,
+    totalVacancies: 0,
+    activeSdaCount: 0,
+    underConstructionCount: 0,
+    planningCount: 0,
+    silPropertyCount: 0,
+  };
+
+  for (const property of properties) {
+    const entry = byProperty.get(property._id);
+    stats.totalDwellings += entry?.count ?? 0;
+
+    switch (property.propertyStatus) {
+      case undefined:
+      case "active":
+        stats.activeSdaCount++;
+        stats.totalParticipants += entry?.occupancy ?? 0;
+        stats.totalVacancies += (entry?.capacity ?? 0) - (entry?.occupancy ?? 0);
+        break;
+      case "under_construction":
+        stats.underConstructionCount++;
+        break;
+      case "planning":
+        stats.planningCount++;
+        break;
+      case "sil_property":
+        stats.silPropertyCount++;
+        break;
+    }
+  }
+
+  return stats;
+}
+
+/**
+ * Whole days until a YYYY-MM-DD due date (negative when overdue).
+ */
+export function daysUntil(dueDate: string, now: number): number {
+  return Math.ceil((new Date(dueDate).getTime() - now) / DAY_MS);
+}
+
+export interface ScheduleStats {
+  overdue: number;
+  dueWithin7Days: number;
+  dueWithin30Days: number;
+  estimatedCost30Days: number;
+}
+
+/**
+ * Preventative maintenance cards, over active schedules only.
+ */
+export function scheduleStats(
+  schedules: Array<{ nextDueDate: string; estimatedCost?: number }>,
+  now: number
+): ScheduleStats {
+  const stats: ScheduleStats = { overdue: 0, dueWithin7Days: 0, dueWithin30Days: 0, estimatedCost30Days: 0 };
+  const in30Days = now + 30 * DAY_MS;
+
+  for (const schedule of schedules) {
+    const due = new Date(schedule.nextDueDate).getTime();
+    if (due < now) {
+      stats.overdue++;
+    } else if (due <= in30Days) {
+      stats.dueWithin30Days++;
+    }
+
+    const days = daysUntil(schedule.nextDueDate, now);
+    if (days >= 0 && days <= 7) stats.dueWithin7Days++;
+    if (days >= 0 && days <= 30) stats.estimatedCost30Days += schedule.estimatedCost || 0;
+  }
+
+  return stats;
+}
+
+export interface TaskStats {
+  open: number;
+  overdue: number;
+  urgent: number;
+  funding: number;
+}
+
+/**
+ * Task cards: open (pending / in progress) tasks by due date, priority and category.
+ */
+export function taskStats(
+  tasks: Array<{ status: string; dueDate: string; priority: string; category: string }>,
+  today: string
+): TaskStats {
+  const open = tasks.filter((t) => t.status === "pending" || t.status === "in_progress");
+  return {
+    open: open.length,
+    overdue: open.filter((t) => t.dueDate < today).length,
+    urgent: open.filter((t) => t.priority === "urgent").length,
+    funding: open.filter((t) => t.category === "funding").length,
+  };
+}
+
+export interface ConsentStats {
+  active: number;
+  expiringSoon: number;
+  expired: number;
+  missing: number;
+  total: number;
+}
+
+/**
+ * Consent status of participants who haven't moved out.
+ */
+export function consentStats(
+  participants: Array<{ status: string; consentStatus?: string; consentExpiryDate?: string }>,
+  today: string,
+  in30Days: string
+): ConsentStats {
+  const current = participants.filter((p) => p.status !== "moved_out");
+  const stats: ConsentStats = { active: 0, expiringSoon: 0, expired: 0, missing: 0, total: current.length };
+
+  for (const p of current) {
+    if (!p.consentStatus || p.consentStatus === "pending") {
+      stats.missing++;
+    } else if (p.consentStatus === "active") {
+      if (p.consentExpiryDate && p.consentExpiryDate < today) {
+        stats.expired++;
+      } else if (p.consentExpiryDate && p.consentExpiryDate <= in30Days) {
+        stats.expiringSoon++;
+      } else {
+        stats.active++;
+      }
+    } else if (p.consentStatus === "expired") {
+      stats.expired++;
+    }
+  }
+
+  return stats;
+}
@@ -0,0 +1,97 @@
+import { describe, it, expect } from "vitest";
+import {
+  periodBounds,
+  monthlyRrc,
+  existingPaymentKey,
+  buildExpectedPayments,
+} from "./expectedPaymentGeneration";
+
+const participants = [
+  { _id: "pa1", status: "active", dwellingId: "d1" },
+  { _id: "pa2", status: "active", dwellingId: "d1" },
+  { _id: "pa3", status: "moved_out", dwellingId: "d1" },
+  { _id: "pa4", status: "active" },
+];
+const plans = [
+  { _id: "pl1", participantId: "pa1", annualSdaBudget: 12000, claimDay: 3 },
+  { _id: "pl1b", participantId: "pa1", annualSdaBudget: 99999 },
+  {
+    _id: "pl2",
+    participantId: "pa2",
+    annualSdaBudget: 0,
+    reasonableRentContribution: 300,
+    rentContributionFrequency: "fortnightly",
+  },
+  { _id: "pl3", participantId: "pa3", annualSdaBudget: 24000 },
+];
+const dwellings = [{ _id: "d1", propertyId: "pr1" }];
+const properties = [
+  { _id: "pr1", isActive: true, ownerId: "o1", managementFeePercent: 10 },
+  { _id: "pr2", isActive: true, ownerId: "o2" },
+];
+
+describe("periodBounds", () => {
+  it("handles short months and leap years", () => {
+    expect(periodBounds("2028-02")).toEqual({ periodStart: "2028-02-01", periodEnd: "2028-02-29" });
+    expect(periodBounds("2026-04").periodEnd).toBe("2026-04-30");
+  });
+});
+
+describe("monthlyRrc", () => {
+  it("converts weekly and fortnightly contributions", () => {
+    expect(monthlyRrc({ reasonableRentContribution: 120, rentContributionFrequency: "weekly" })).toBe(520);
+    expect(monthlyRrc({ reasonableRentContribution: 120, rentContributionFrequency: "fortnightly" })).toBe(260);
+    expect(monthlyRrc({})).toBe(0);
+  });
+});
+
+describe("buildExpectedPayments", () => {
+  const drafts = buildExpectedPayments({
+    periodMonth: "2026-03",
+    paymentDay: 5,
+    participants,
+    plans,
+    dwellings,
+    properties,
+  });
+
+  it("creates SDA and RRC payments for active participants with a current plan", () => {
+    const summary = drafts
+      .filter((d) => d.paymentType !== "owner_disbursement")
+      .map((d) => [d.key, d.expectedAmount, d.expectedDate, d.plan?._id]);
+    expect(summary).toEqual([
+      ["sda_income:pa1:2026-03", 1000, "2026-03-03", "pl1"],
+      ["rrc_income:pa2:2026-03", 650, "2026-03-31", "pl2"],
+    ]);
+  });
+
+  it("sums owner disbursements per active property less the management fee", () => {
+    const owner = drafts.filter((d) => d.paymentType === "owner_disbursement");
+    expect(owner).toHaveLength(1);
+    expect(owner[0].key).toBe("owner_disbursement:pr1:2026-03");
+    expect(owner[0].expectedAmount).toBeCloseTo((1000 + 650) * 0.9);
+    expect(owner[0].expectedDate).toBe("2026-03-05");
+  });
+
+  it("only builds the requested types", () => {
+    const sdaOnly = buildExpectedPayments({
+      periodMonth: "2026-03",
+      paymentDay: 5,
+      participants,
+      plans,
+      dwellings,
+      properties,
+      types: ["sda_income"],
+    });
+    expect(sdaOnly.map((d) => d.paymentType)).toEqual(["sda_income"]);
+  });
+
+  it("keys drafts the same way as stored rows", () => {
+    expect(
+      existingPaymentKey({ paymentType: "owner_disbursement", propertyId: "pr1", periodMonth: "2026-03" })
+    ).toBe("owner_disbursement:pr1:2026-03");
+    expect(
+      existingPaymentKey({ paymentType: "rrc_income", participantId: "pa2", propertyId: "pr1", periodMonth: "2026-03" })
+    ).toBe("rrc_income:pa2:2026-03");
+  });
+});
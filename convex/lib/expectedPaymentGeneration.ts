@@ -0,0 +1,217 @@
+/**
+ * Expected payment generation.
+ *
+ * Pure rules behind the monthly SDA, RRC and owner disbursement records.
+ * expectedPayments.ts loads one organization's participants, current plans,
+ * dwellings and properties up front and passes them in here, so generating a
+ * month costs a fixed number of reads per organization instead of a plan
+ * lookup per participant.
+ */
+
+export type GeneratedPaymentType = "sda_income" | "rrc_income" | "owner_disbursement";
+
+export const ALL_GENERATED_TYPES: GeneratedPaymentType[] = [
+  "sda_income",
+  "rrc_income",
+  "owner_disbursement",
+];
+
+interface ParticipantInput {
+  _id: string;
+  status: string;
+  dwellingId?: string;
+}
+
+interface PlanInput {
+  _id: string;
+  participantId: string;
+  monthlySdaAmount?: number;
+  annualSdaBudget: number;
+  reasonableRentContribution?: number;
+  rentContributionFrequency?: string;
+  claimDay?: number;
+}
+
+interface DwellingInput {
+  _id: string;
+  propertyId: string;
+}
+
+interface PropertyInput {
+  _id: string;
+  isActive: boolean;
+  ownerId?: string;
+  managementFeePercent?: number;
+}
+
+export interface ExpectedPaymentDraft<Participant, Plan, Property> {
+  key: string;
+  paymentType: GeneratedPaymentType;
+  participant?: Participant;
+  plan?: Plan;
+  property?: Property;
+  expectedAmount: number;
+  expectedDate: string;
+  periodStart?: string;
+  periodEnd?: string;
+}
+
+/**
+ * First and last day (YYYY-MM-DD) of a YYYY-MM period.
+ */
+export function periodBounds(periodMonth: string): { periodStart: string; periodEnd: string } {
+  const [year, month] = periodMonth.split("-").map(Number);
+  const lastDay = new Date(year, month, 0).getDate();
+  return {
+    periodStart: `${periodMonth}-01`,
+    periodEnd: `${periodMonth}-${String(lastDay).padStart(2, "0")}`,
+  };
+}
+
+/**
+ * YYYY-MM for a timestamp (server local time, as the cron always used).
+ */
+export function currentPeriodMonth(now: number): string {
+  const date = new Date(now);
+  return `${date.getFullYear()}-${String(date.getMonth() + 1).padStart(2, "0")}`;
+}
+
+export function monthlySda(plan: Pick<PlanInput, "monthlySdaAmount" | "annualSdaBudget">): number {
+  return plan.monthlySdaAmount || plan.annualSdaBudget / 12 || 0;
+}
+
+export function monthlyRrc(
+  plan: Pick<PlanInput, "reasonableRentContribution" | "rentContributionFrequency">
+): number {
+  const amount = plan.reasonableRentContribution || 0;
+  if (plan.rentContributionFrequency === "fortnightly") return (amount * 26) / 12;
+  if (plan.rentContributionFrequency === "weekly") return (amount * 52) / 12;
+  return amount;
+}
+
+/**
+ * Identity of a generated payment: one per (participant or property, type, period).
+ */
+export function expectedPaymentKey(
+  paymentType: string,
+  subjectId: string | undefined,
+  periodMonth: string
+): string {
+  return `${paymentType}:${subjectId ?? ""}:${periodMonth}`;
+}
+
+/**
+ * Subject of an existing expected payment row, matching expectedPaymentKey.
+ */
+export function existingPaymentKey(payment: {
+  paymentType: string;
+  participantId?: string;
+  propertyId?: string;
+  periodMonth: string;
+}): string {
+  const subjectId =
+    payment.paymentType === "owner_disbursement" ? payment.propertyId : payment.participantId;
+  return expectedPaymentKey(payment.paymentType, subjectId, payment.periodMonth);
+}
+
+/**
+ * Build the expected payments one organization should have for a month.
+ *
+ * `plans` are the organization's current plans; when a participant has more
+ * than one, the first wins (index order), as with `.first()` per participant.
+ * Owner disbursements sum SDA + RRC less the management fee across active
+ * participants housed at each active property.
+ */
+export function buildExpectedPayments<
+  Participant extends ParticipantInput,
+  Plan extends PlanInput,
+  Dwelling extends DwellingInput,
+  Property extends PropertyInput,
+>(input: {
+  periodMonth: string;
+  paymentDay: number;
+  participants: Participant[];
+  plans: Plan[];
+  dwellings: Dwelling[];
+  properties: Property[];
+  types?: GeneratedPaymentType[];
+}): ExpectedPaymentDraft<Participant, Plan, Property>[] {
+  const { periodMonth, paymentDay } = input;
+  const types = new Set(input.types ?? ALL_GENERATED_TYPES);
+  const { periodStart, periodEnd } = periodBounds(periodMonth);
+
+  const planByParticipant = new Map<string, Plan>();
+  for (const plan of input.plans) {
+    if (!planByParticipant.has(plan.participantId)) {
+      planByParticipant.set(plan.participantId, plan);
+    }
+  }
+  const propertyIdByDwelling = new Map(input.dwellings.map((d) => [d._id, d.propertyId]));
+  const propertyById = new Map(input.properties.map((p) => [p._id, p]));
+
+  const drafts: ExpectedPaymentDraft<Participant, Plan, Property>[] = [];
+  const ownerTotals = new Map<string, number>();
+
+  for (const participant of input.participants) {
+    if (participant.status !== "active") continue;
+    const plan = planByParticipant.get(participant._id);
+    if (!plan) continue;
+
+    const propertyId = participant.dwellingId
+      ? propertyIdByDwelling.get(participant.dwellingId)
+      : undefined;
+    const property = propertyId ? propertyById.get(propertyId) : undefined;
+    const sda = monthlySda(plan);
+    const rrc = monthlyRrc(plan);
+
+    if (types.has("sda_income") && sda) {
+      drafts.push({
+        key: expectedPaymentKey("sda_income", participant._id, periodMonth),
+        paymentType: "sda_income",
+        participant,
+        plan,
+        property,
+        expectedAmount: sda,
+        expectedDate: `${periodMonth}-${String(plan.claimDay || 15).padStart(2, "0")}`,
+        periodStart,
+        periodEnd,
+      });
+    }
+
+    if (types.has("rrc_income") && plan.reasonableRentContribution) {
+      drafts.push({
+        key: expectedPaymentKey("rrc_income", participant._id, periodMonth),
+        paymentType: "rrc_income",
+        participant,
+        plan,
+        property,
+        expectedAmount: rrc,
+        expectedDate: periodEnd, // RRC arrives through the month (Centrepay)
+        periodStart,
+        periodEnd,
+      });
+    }
+
+    if (property?.isActive) {
+      const totalIncome = sda + rrc;
+      const managementFee = totalIncome * ((property.managementFeePercent || 0) / 100);
+      ownerTotals.set(property._id, (ownerTotals.get(property._id) ?? 0) + totalIncome - managementFee);
+    }
+  }
+
+  if (types.has("owner_disbursement")) {
+    for (const property of input.properties) {
+      const total = ownerTotals.get(property._id) ?? 0;
+      if (!property.isActive || total <= 0) continue;
+      drafts.push({
+        key: expectedPaymentKey("owner_disbursement", property._id, periodMonth),
+        paymentType: "owner_disbursement",
+        property,
+        expectedAmount: total,
+        expectedDate: `${periodMonth}-${String(paymentDay).padStart(2, "0")}`,
+      });
+    }
+  }
+
+  return drafts;
+}
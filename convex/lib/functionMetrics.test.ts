@@ -0,0 +1,185 @@
+import { describe, it, expect } from "vitest";
+import {
+  METRICS_LOG_PREFIX,
+  describeArgShape,
+  isSampled,
+  percentile,
+  samplesFromLogEvents,
+  rollupSamples,
+  rankHotspots,
+} from "./functionMetrics";
+
+describe("describeArgShape", () => {
+  it("records types and sorted keys, never values", () => {
+    expect(describeArgShape({ userId: "abc", limit: 20, filterUnread: true })).toBe(
+      "{filterUnread:boolean,limit:number,userId:string}"
+    );
+  });
+
+  it("describes arrays by their first element and skips undefined fields", () => {
+    expect(describeArgShape({ ids: ["a", "b"], cursor: undefined, tags: [] })).toBe(
+      "{ids:string[],tags:[]}"
+    );
+  });
+
+  it("stops descending past three levels", () => {
+    expect(describeArgShape({ a: { b: { c: { d: 1 } } } })).toBe("{a:{b:{c:object}}}");
+  });
+});
+
+describe("isSampled", () => {
+  it("is deterministic per request ID", () => {
+    expect(isSampled("req-123", 0.5)).toBe(isSampled("req-123", 0.5));
+  });
+
+  it("keeps everything at rate 1 and nothing at rate 0", () => {
+    expect(isSampled("req-1", 1)).toBe(true);
+    expect(isSampled("req-1", 0)).toBe(false);
+  });
+
+  it("keeps roughly the requested fraction", () => {
+    const kept = Array.from({ length: 2000 }, (_, i) => `request-${i}`).filter((id) =>
+      isSampled(id, 0.1)
+    ).length;
+    expect(kept).toBeGreaterThan(120);
+    expect(kept).toBeLessThan(280);
+  });
+});
+
+describe("percentile", () => {
+  it("uses nearest rank", () => {
+    const values = [5, 1, 4, 2, 3, 6, 7, 8, 9, 10];
+    expect(percentile(values, 50)).toBe(5);
+    expect(percentile(values, 95)).toBe(10);
+  });
+
+  it("is zero for no values", () => {
+    expect(percentile([], 95)).toBe(0);
+  });
+});
+
+describe("samplesFromLogEvents", () => {
+  const fn = (requestId: string) => ({
+    path: "communications:getThreadedView",
+    type: "query",
+    request_id: requestId,
+  });
+
+  it("joins the execution event and the metrics line of a request", () => {
+    const samples = samplesFromLogEvents(
+      [
+        {
+          topic: "console",
+          timestamp: 100,
+          function: fn("r1"),
+          message: `'${METRICS_LOG_PREFIX}${JSON.stringify({
+            organizationId: "org1",
+            argShape: "{userId:string}",
+            resultBytes: 2048,
+          })}'`,
+        },
+        {
+          topic: "function_execution",
+          timestamp: 120,
+          function: fn("r1"),
+          execution_time_ms: 340,
+          status: "success",
+          usage: { database_read_documents: 5200, database_read_bytes: 1000000 },
+        },
+      ],
+      1
+    );
+
+    expect(samples).toEqual([
+      {
+        requestId: "r1",
+        functionName: "communications:getThreadedView",
+        timestamp: 100,
+        organizationId: "org1",
+        argShape: "{userId:string}",
+        resultBytes: 2048,
+        kind: "query",
+        durationMs: 340,
+        docsRead: 5200,
+        readBytes: 1000000,
+        failed: false,
+      },
+    ]);
+  });
+
+  it("ignores other console output and events without a request", () => {
+    const samples = samplesFromLogEvents(
+      [
+        { topic: "console", function: fn("r2"), message: "'Sending email'" },
+        { topic: "verification", timestamp: 1 },
+      ],
+      1
+    );
+    expect(samples).toEqual([]);
+  });
+});
+
+describe("rollupSamples", () => {
+  it("computes percentiles and top breakdowns per function", () => {
+    const samples = Array.from({ length: 20 }, (_, i) => ({
+      requestId: `r${i}`,
+      functionName: "dashboard:get",
+      timestamp: i,
+      durationMs: (i + 1) * 10,
+      docsRead: i < 19 ? 10 : 900,
+      organizationId: i < 15 ? "orgA" : "orgB",
+      argShape: "{userId:string}",
+      failed: i === 0,
+    }));
+
+    const [rollup] = rollupSamples(samples);
+    expect(rollup.calls).toBe(20);
+    expect(rollup.failures).toBe(1);
+    expect(rollup.p50Ms).toBe(100);
+    expect(rollup.p95Ms).toBe(190);
+    expect(rollup.maxMs).toBe(200);
+    expect(rollup.p95DocsRead).toBe(10);
+    expect(rollup.maxDocsRead).toBe(900);
+    expect(rollup.topOrganizations).toEqual([
+      { organizationId: "orgA", calls: 15 },
+      { organizationId: "orgB", calls: 5 },
+    ]);
+    expect(rollup.topArgShapes).toEqual([{ shape: "{userId:string}", calls: 20 }]);
+  });
+});
+
+describe("rankHotspots", () => {
+  const rollup = (functionName: string, calls: number, p50Ms: number, p95Ms: number) => ({
+    functionName,
+    calls,
+    failures: 0,
+    p50Ms,
+    p95Ms,
+    maxMs: p95Ms,
+    p95DocsRead: 0,
+    maxDocsRead: 0,
+    p95ResultBytes: 0,
+    topOrganizations: [{ organizationId: "orgA", calls }],
+    topArgShapes: [],
+  });
+
+  it("merges windows with call-weighted p50 and worst p95", () => {
+    const [hotspot] = rankHotspots(
+      [rollup("a:f", 10, 10, 50), rollup("a:f", 30, 50, 200)],
+      "p95",
+      10
+    );
+    expect(hotspot.sampledCalls).toBe(40);
+    expect(hotspot.p50Ms).toBe(40);
+    expect(hotspot.p95Ms).toBe(200);
+    expect(hotspot.estimatedTotalMs).toBe(1600);
+    expect(hotspot.topOrganizations).toEqual([{ organizationId: "orgA", calls: 40 }]);
+  });
+
+  it("ranks by the requested measure", () => {
+    const rollups = [rollup("slow:rare", 2, 900, 1200), rollup("fast:hot", 500, 20, 60)];
+    expect(rankHotspots(rollups, "p95", 10)[0].functionName).toBe("slow:rare");
+    expect(rankHotspots(rollups, "totalTime", 10)[0].functionName).toBe("fast:hot");
+    expect(rankHotspots(rollups, "calls", 1)).toHaveLength(1);
+  });
+});
@@ -0,0 +1,341 @@
+/**
+ * Function metrics.
+ *
+ * Pure helpers behind production function instrumentation (functionMetrics.ts).
+ * Convex freezes Date.now() inside queries and mutations and queries cannot
+ * write, so timings and documents read come from the deployment's log stream
+ * (function_execution events). Instrumented functions add what those events
+ * lack (organization, argument shape, result size) as a tagged console line
+ * on the same request, and both are joined on request ID at ingestion.
+ */
+
+// Prefix of the console line written by instrumented functions
+export const METRICS_LOG_PREFIX = "[fn-metrics] ";
+
+// Fraction of requests kept. Sampling hashes the request ID, so a request's
+// execution event and its metrics line are kept or dropped together.
+export const DEFAULT_SAMPLE_RATE = 0.1;
+
+// Samples are rolled up per function per hour
+export const ROLLUP_WINDOW_MS = 60 * 60 * 1000;
+
+// How many organizations / argument shapes each rollup row keeps
+const TOP_BREAKDOWN = 5;
+
+export interface MetricsLogLine {
+  organizationId?: string;
+  argShape: string;
+  resultBytes: number;
+}
+
+export interface FunctionSample {
+  requestId: string;
+  functionName: string;
+  kind?: string; // query | mutation | action | http_action
+  timestamp: number;
+  durationMs?: number;
+  docsRead?: number;
+  readBytes?: number;
+  failed?: boolean;
+  organizationId?: string;
+  argShape?: string;
+  resultBytes?: number;
+}
+
+export interface FunctionRollup {
+  functionName: string;
+  kind?: string;
+  calls: number;
+  failures: number;
+  p50Ms: number;
+  p95Ms: number;
+  maxMs: number;
+  p95DocsRead: number;
+  maxDocsRead: number;
+  p95ResultBytes: number;
+  topOrganizations: Array<{ organizationId: string; calls: number }>;
+  topArgShapes: Array<{ shape: string; calls: number }>;
+}
+
+/**
+ * Describe the shape of a function's arguments without any values, e.g.
+ * `{limit:number,statusFilter:string,userId:string}`. Keys are sorted so the
+ * same call pattern always produces the same shape.
+ */
+export function describeArgShape(value: unknown, depth = 0): string {
+  if (value === null) return "null";
+  if (Array.isArray(value)) {
+    if (value.length === 0) return "[]";
+    return depth >= 3 ? "array" : `${describeArgShape(value[0], depth + 1)}[]`;
+  }
+  if (value instanceof ArrayBuffer) return "bytes";
+  if (typeof value === "object") {
+    if (depth >= 3) return "object";
+    const entries = Object.entries(value as Record<string, unknown>)
+      .filter(([, v]) => v !== undefined)
+      .sort(([a], [b]) => (a < b ? -1 : a > b ? 1 : 0))
+      .map(([k, v]) => `${k}:${describeArgShape(v, depth + 1)}`);
+    return `{${entries.join(",")}}`;
+  }
+  return typeof value;
+}
+
+/**
+ * Approximate serialized size of a function result in bytes (UTF-16 length of
+ * its JSON, which is what the client downloads before compression).
+ */
+export function jsonSize(value: unknown): number {
+  if (value === undefined) return 0;
+  try {
+    return JSON.stringify(value)?.length ?? 0;
+  } catch {
+    return 0;
+  }
+}
+
+/**
+ * Deterministic sampling on a request ID (FNV-1a hash).
+ */
+export function isSampled(requestId: string, rate: number): boolean {
+  if (rate >= 1) return true;
+  if (rate <= 0) return false;
+  let hash = 0x811c9dc5;
+  for (let i = 0; i < requestId.length; i++) {
+    hash ^= requestId.charCodeAt(i);
+    hash = Math.imul(hash, 0x01000193);
+  }
+  return (hash >>> 0) / 0x100000000 < rate;
+}
+
+/**
+ * Nearest-rank percentile (p in 0..100) of unsorted values; 0 when empty.
+ */
+export function percentile(values: number[], p: number): number {
+  if (values.length === 0) return 0;
+  const sorted = [...values].sort((a, b) => a - b);
+  const rank = Math.ceil((p / 100) * sorted.length);
+  return sorted[Math.min(sorted.length, Math.max(1, rank)) - 1];
+}
+
+/**
+ * Extract sampled function samples from a batch of Convex log stream events
+ * (console and function_execution topics). Events of one request are merged.
+ */
+export function samplesFromLogEvents(events: unknown[], sampleRate: number): FunctionSample[] {
+  const byRequest = new Map<string, FunctionSample>();
+
+  for (const raw of events) {
+    const event = raw as {
+      topic?: string;
+      timestamp?: number;
+      function?: { path?: string; type?: string; request_id?: string };
+      message?: string;
+      execution_time_ms?: number;
+      status?: string;
+      usage?: { database_read_documents?: number; database_read_bytes?: number };
+    };
+    const requestId = event.function?.request_id;
+    const functionName = event.function?.path;
+    if (!requestId || !functionName || !isSampled(requestId, sampleRate)) continue;
+
+    let fields: Partial<FunctionSample>;
+    if (event.topic === "function_execution") {
+      fields = {
+        kind: event.function?.type,
+        durationMs: event.execution_time_ms,
+        docsRead: event.usage?.database_read_documents,
+        readBytes: event.usage?.database_read_bytes,
+        failed: event.status === "failure",
+      };
+    } else if (event.topic === "console" && event.message) {
+      const line = parseMetricsLine(event.message);
+      if (!line) continue;
+      fields = line;
+    } else {
+      continue;
+    }
+
+    const sample = byRequest.get(requestId) ?? {
+      requestId,
+      functionName,
+      timestamp: event.timestamp ?? 0,
+    };
+    byRequest.set(requestId, { ...sample, ...withoutUndefined(fields) });
+  }
+
+  return Array.from(byRequest.values());
+}
+
+/**
+ * Parse an instrumented function's console line; null for any other log message.
+ */
+export function parseMetricsLine(message: string): MetricsLogLine | null {
+  // String arguments may arrive wrapped in single quotes
+  const text = message.replace(/^'|'$/g, "");
+  if (!text.startsWith(METRICS_LOG_PREFIX)) return null;
+  try {
+    const line = JSON.parse(text.slice(METRICS_LOG_PREFIX.length));
+    return typeof line?.argShape === "string" ? line : null;
+  } catch {
+    return null;
+  }
+}
+
+function withoutUndefined<T extends object>(value: T): Partial<T> {
+  return Object.fromEntries(Object.entries(value).filter(([, v]) => v !== undefined)) as Partial<T>;
+}
+
+function topCounts(values: Array<string | undefined>): Array<{ key: string; calls: number }> {
+  const counts = new Map<string, number>();
+  for (const value of values) {
+    if (value) counts.set(value, (counts.get(value) ?? 0) + 1);
+  }
+  return topOf(counts);
+}
+
+/**
+ * Roll samples up to one row per function with latency, read and payload
+ * percentiles plus the busiest organizations and argument shapes.
+ */
+export function rollupSamples(samples: FunctionSample[]): FunctionRollup[] {
+  const byFunction = new Map<string, FunctionSample[]>();
+  for (const sample of samples) {
+    const group = byFunction.get(sample.functionName);
+    if (group) group.push(sample);
+    else byFunction.set(sample.functionName, [sample]);
+  }
+
+  return Array.from(byFunction, ([functionName, group]) => {
+    const durations = group.flatMap((s) => (s.durationMs !== undefined ? [s.durationMs] : []));
+    const docsRead = group.flatMap((s) => (s.docsRead !== undefined ? [s.docsRead] : []));
+    const resultBytes = group.flatMap((s) => (s.resultBytes !== undefined ? [s.resultBytes] : []));
+    return {
+      functionName,
+      kind: group.find((s) => s.kind)?.kind,
+      calls: group.length,
+      failures: group.filter((s) => s.failed).length,
+      p50Ms: percentile(durations, 50),
+      p95Ms: percentile(durations, 95),
+      maxMs: durations.length ? Math.max(...durations) : 0,
+      p95DocsRead: percentile(docsRead, 95),
+      maxDocsRead: docsRead.length ? Math.max(...docsRead) : 0,
+      p95ResultBytes: percentile(resultBytes, 95),
+      topOrganizations: topCounts(group.map((s) => s.organizationId)).map(({ key, calls }) => ({
+        organizationId: key,
+        calls,
+      })),
+      topArgShapes: topCounts(group.map((s) => s.argShape)).map(({ key, calls }) => ({
+        shape: key,
+        calls,
+      })),
+    };
+  });
+}
+
+export type HotspotSort = "totalTime" | "p95" | "docsRead" | "calls";
+
+export interface FunctionHotspot {
+  functionName: string;
+  kind?: string;
+  sampledCalls: number;
+  failures: number;
+  p50Ms: number; // Call-weighted across windows
+  p95Ms: number; // Worst hourly p95 in the range
+  maxMs: number;
+  p95DocsRead: number; // Worst hourly p95 in the range
+  maxDocsRead: number;
+  p95ResultBytes: number;
+  estimatedTotalMs: number; // sampledCalls x p50, for ranking overall load
+  topOrganizations: Array<{ organizationId: string; calls: number }>;
+  topArgShapes: Array<{ shape: string; calls: number }>;
+}
+
+function addCounts(target: Map<string, number>, entries: Array<{ key: string; calls: number }>) {
+  for (const { key, calls } of entries) {
+    target.set(key, (target.get(key) ?? 0) + calls);
+  }
+}
+
+function topOf(counts: Map<string, number>): Array<{ key: string; calls: number }> {
+  return Array.from(counts, ([key, calls]) => ({ key, calls }))
+    .sort((a, b) => b.calls - a.calls)
+    .slice(0, TOP_BREAKDOWN);
+}
+
+/**
+ * Combine hourly rollups over a time range into one row per function,
+ * ranked by `sortBy` (highest first).
+ */
+export function rankHotspots(
+  rollups: FunctionRollup[],
+  sortBy: HotspotSort,
+  limit: number
+): FunctionHotspot[] {
+  type Accumulator = Omit<FunctionHotspot, "topOrganizations" | "topArgShapes"> & {
+    weightedP50: number;
+    organizations: Map<string, number>;
+    argShapes: Map<string, number>;
+  };
+  const byFunction = new Map<string, Accumulator>();
+
+  for (const rollup of rollups) {
+    let current = byFunction.get(rollup.functionName);
+    if (!current) {
+      current = {
+        functionName: rollup.functionName,
+        kind: rollup.kind,
+        sampledCalls: 0,
+        failures: 0,
+        p50Ms: 0,
+        weightedP50: 0,
+        p95Ms: 0,
+        maxMs: 0,
+        p95DocsRead: 0,
+        maxDocsRead: 0,
+        p95ResultBytes: 0,
+        estimatedTotalMs: 0,
+        organizations: new Map(),
+        argShapes: new Map(),
+      };
+      byFunction.set(rollup.functionName, current);
+    }
+    current.kind = current.kind ?? rollup.kind;
+    current.sampledCalls += rollup.calls;
+    current.failures += rollup.failures;
+    current.weightedP50 += rollup.p50Ms * rollup.calls;
+    current.p95Ms = Math.max(current.p95Ms, rollup.p95Ms);
+    current.maxMs = Math.max(current.maxMs, rollup.maxMs);
+    current.p95DocsRead = Math.max(current.p95DocsRead, rollup.p95DocsRead);
+    current.maxDocsRead = Math.max(current.maxDocsRead, rollup.maxDocsRead);
+    current.p95ResultBytes = Math.max(current.p95ResultBytes, rollup.p95ResultBytes);
+    addCounts(
+      current.organizations,
+      rollup.topOrganizations.map((o) => ({ key: o.organizationId, calls: o.calls }))
+    );
+    addCounts(
+      current.argShapes,
+      rollup.topArgShapes.map((a) => ({ key: a.shape, calls: a.calls }))
+    );
+  }
+
+  const sortKey: Record<HotspotSort, (h: FunctionHotspot) => number> = {
+    totalTime: (h) => h.estimatedTotalMs,
+    p95: (h) => h.p95Ms,
+    docsRead: (h) => h.p95DocsRead,
+    calls: (h) => h.sampledCalls,
+  };
+
+  return Array.from(byFunction.values())
+    .map(({ weightedP50, organizations, argShapes, ...hotspot }) => {
+      const p50Ms = hotspot.sampledCalls ? Math.round(weightedP50 / hotspot.sampledCalls) : 0;
+      return {
+        ...hotspot,
+        p50Ms,
+        estimatedTotalMs: p50Ms * hotspot.sampledCalls,
+        topOrganizations: topOf(organizations).map(({ key, calls }) => ({ organizationId: key, calls })),
+        topArgShapes: topOf(argShapes).map(({ key, calls }) => ({ shape: key, calls })),
+      };
+    })
+    .sort((a, b) => sortKey[sortBy](b) - sortKey[sortBy](a))
+    .slice(0, limit);
+}
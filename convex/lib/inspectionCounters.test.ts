@@ -0,0 +1,65 @@
+import { describe, it, expect } from "vitest";
+import {
+  statusTransitionDelta,
+  applyCounterDelta,
+  isZeroDelta,
+} from "./inspectionCounters";
+
+describe("statusTransitionDelta", () => {
+  it("counts a pending item being passed", () => {
+    expect(statusTransitionDelta("pending", "pass")).toEqual({
+      completedItems: 1,
+      passedItems: 1,
+      failedItems: 0,
+    });
+  });
+
+  it("moves a completed item from pass to fail without changing completed", () => {
+    expect(statusTransitionDelta("pass", "fail")).toEqual({
+      completedItems: 0,
+      passedItems: -1,
+      failedItems: 1,
+    });
+  });
+
+  it("uncounts an item reset to pending", () => {
+    expect(statusTransitionDelta("fail", "pending")).toEqual({
+      completedItems: -1,
+      passedItems: 0,
+      failedItems: -1,
+    });
+  });
+
+  it("counts N/A as completed only", () => {
+    expect(statusTransitionDelta("pending", "na")).toEqual({
+      completedItems: 1,
+      passedItems: 0,
+      failedItems: 0,
+    });
+  });
+
+  it("is zero for a no-op transition", () => {
+    expect(isZeroDelta(statusTransitionDelta("pass", "pass"))).toBe(true);
+    expect(isZeroDelta(statusTransitionDelta("pass", "na"))).toBe(false);
+  });
+});
+
+describe("applyCounterDelta", () => {
+  it("adds deltas to counters", () => {
+    const counters = { completedItems: 3, passedItems: 2, failedItems: 1 };
+    expect(applyCounterDelta(counters, statusTransitionDelta("pending", "fail"))).toEqual({
+      completedItems: 4,
+      passedItems: 2,
+      failedItems: 2,
+    });
+  });
+
+  it("never goes below zero", () => {
+    const counters = { completedItems: 0, passedItems: 0, failedItems: 0 };
+    expect(applyCounterDelta(counters, statusTransitionDelta("fail", "pending"))).toEqual({
+      completedItems: 0,
+      passedItems: 0,
+      failedItems: 0,
+    });
+  });
+});
@@ -0,0 +1,61 @@
+/**
+ * Incremental inspection progress counters.
+ *
+ * inspections.completedItems / passedItems / failedItems are maintained by
+ * applying the delta of each item status transition, so updating one item
+ * never has to re-read every item of a 200+ item inspection.
+ */
+
+export type InspectionItemStatus = "pending" | "pass" | "fail" | "na";
+
+export interface InspectionCounters {
+  completedItems: number;
+  passedItems: number;
+  failedItems: number;
+}
+
+function countsFor(status: InspectionItemStatus): InspectionCounters {
+  return {
+    completedItems: status === "pending" ? 0 : 1,
+    passedItems: status === "pass" ? 1 : 0,
+    failedItems: status === "fail" ? 1 : 0,
+  };
+}
+
+/**
+ * Counter change caused by an item moving from one status to another.
+ */
+export function statusTransitionDelta(
+  from: InspectionItemStatus,
+  to: InspectionItemStatus
+): InspectionCounters {
+  const before = countsFor(from);
+  const after = countsFor(to);
+  return {
+    completedItems: after.completedItems - before.completedItems,
+    passedItems: after.passedItems - before.passedItems,
+    failedItems: after.failedItems - before.failedItems,
+  };
+}
+
+/**
+ * Add a delta to existing counters, clamping at zero so counters drifted by
+ * legacy data can never go negative.
+ */
+export function applyCounterDelta(
+  counters: InspectionCounters,
+  delta: InspectionCounters
+): InspectionCounters {
+  return {
+    completedItems: Math.max(0, counters.completedItems + delta.completedItems),
+    passedItems: Math.max(0, counters.passedItems + delta.passedItems),
+    failedItems: Math.max(0, counters.failedItems + delta.failedItems),
+  };
+}
+
+/**
+ * True when the delta changes nothing (e.g. pass -> pass).
+ */
+export function isZeroDelta(delta: InspectionCounters): boolean {
+  return delta.completedItems === 0 && delta.passedItems === 0 && delta.failedItems === 0;
+}
@@ -0,0 +1,33 @@
+import { describe, it, expect } from "vitest";
+import { stableStringify, sha256Hex } from "./stableHash";
+
+// ---------------------------------------------------------------------------
+// stableStringify
+// ---------------------------------------------------------------------------
+describe("stableStringify", () => {
+  it("ignores object key order", () => {
+    expect(stableStringify({ b: 1, a: { d: 2, c: 3 } })).toBe(
+      stableStringify({ a: { c: 3, d: 2 }, b: 1 })
+    );
+  });
+
+  it("keeps array order", () => {
+    expect(stableStringify([1, 2])).not.toBe(stableStringify([2, 1]));
+  });
+
+  it("matches JSON.stringify for undefined values", () => {
+    const value = { a: undefined, b: [undefined, "x"], c: null };
+    expect(stableStringify(value)).toBe(JSON.stringify(value));
+  });
+});
+
+// ---------------------------------------------------------------------------
+// sha256Hex
+// ---------------------------------------------------------------------------
+describe("sha256Hex", () => {
+  it("produces the standard SHA-256 digest", async () => {
+    expect(await sha256Hex("abc")).toBe(
+      "ba7816bf8f01cfea414140de5dae2223b00361a396177a9cb410ff61f20015ad"
+    );
+  });
+});
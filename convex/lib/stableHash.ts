@@ -0,0 +1,36 @@
+/**
+ * Deterministic serialization and hashing for cache keys.
+ *
+ * Shared by Convex functions (aiCache.ts) and the browser (PDF cache in
+ * src/lib/pdfExport.ts, offline cache in src/lib/offlineStorage.ts), so it
+ * only uses APIs available in both runtimes.
+ */
+
+/**
+ * JSON.stringify with object keys sorted, so equal data always produces
+ * the same string regardless of property order.
+ */
+export function stableStringify(value: unknown): string {
+  if (value === null || typeof value !== "object") {
+    return JSON.stringify(value) ?? "null";
+  }
+  if (Array.isArray(value)) {
+    return `[${value.map((item) => (item === undefined ? "null" : stableStringify(item))).join(",")}]`;
+  }
+  const entries = Object.keys(value as Record<string, unknown>)
+    .sort()
+    .filter((key) => (value as Record<string, unknown>)[key] !== undefined)
+    .map((key) => `${JSON.stringify(key)}:${stableStringify((value as Record<string, unknown>)[key])}`);
+  return `{${entries.join(",")}}`;
+}
+
+/**
+ * SHA-256 hex digest of a string.
+ */
+export async function sha256Hex(text: string): Promise<string> {
+  const data = new TextEncoder().encode(text);
+  const hashBuffer = await crypto.subtle.digest("SHA-256", data);
+  return Array.from(new Uint8Array(hashBuffer))
+    .map((b) => b.toString(16).padStart(2, "0"))
+    .join("");
+}
@@ -0,0 +1,97 @@
+import { describe, it, expect } from "vitest";
+import {
+  messageState,
+  emptyCounters,
+  applyMessageChange,
+  countersFromMessages,
+  mergeCounters,
+  summaryFlags,
+} from "./threadSummaryCounters";
+
+const unreadRoutine = { unread: true, requiresAction: false, category: "routine" };
+const readComplaint = { unread: false, requiresAction: true, category: "complaint" };
+
+describe("messageState", () => {
+  it("does not count deleted or missing communications", () => {
+    expect(messageState(null)).toBeNull();
+    expect(messageState({ isDeleted: true })).toBeNull();
+  });
+
+  it("leaves unset and none categories uncounted", () => {
+    expect(messageState({ readAt: "2026-02-10T00:00:00.000Z" })).toEqual({
+      unread: false,
+      requiresAction: false,
+      category: undefined,
+    });
+    expect(messageState({ complianceCategory: "none" })?.category).toBeUndefined();
+  });
+});
+
+describe("applyMessageChange", () => {
+  it("counts an added message", () => {
+    expect(applyMessageChange(emptyCounters(), null, unreadRoutine)).toEqual({
+      messageCount: 1,
+      unreadCount: 1,
+      requiresActionCount: 0,
+      categoryCounts: [{ category: "routine", count: 1 }],
+    });
+  });
+
+  it("marks a message read without changing the message count", () => {
+    const counters = countersFromMessages([unreadRoutine, unreadRoutine]);
+    const next = applyMessageChange(counters, unreadRoutine, { ...unreadRoutine, unread: false });
+    expect(next.messageCount).toBe(2);
+    expect(next.unreadCount).toBe(1);
+  });
+
+  it("moves a message between categories and drops empty ones", () => {
+    const counters = countersFromMessages([unreadRoutine]);
+    const next = applyMessageChange(counters, unreadRoutine, { ...unreadRoutine, category: "complaint" });
+    expect(next.categoryCounts).toEqual([{ category: "complaint", count: 1 }]);
+  });
+
+  it("never goes negative on drifted counters", () => {
+    const next = applyMessageChange(emptyCounters(), readComplaint, null);
+    expect(next).toEqual(emptyCounters());
+  });
+});
+
+describe("mergeCounters", () => {
+  it("adds counts and combines categories", () => {
+    const merged = mergeCounters(
+      countersFromMessages([unreadRoutine]),
+      countersFromMessages([unreadRoutine, readComplaint])
+    );
+    expect(merged).toEqual({
+      messageCount: 3,
+      unreadCount: 2,
+      requiresActionCount: 1,
+      categoryCounts: [
+        { category: "routine", count: 2 },
+        { category: "complaint", count: 1 },
+      ],
+    });
+  });
+});
+
+describe("summaryFlags", () => {
+  it("derives flags from counters", () => {
+    expect(summaryFlags(countersFromMessages([readComplaint]))).toEqual({
+      hasUnread: false,
+      requiresAction: true,
+      complianceCategories: ["complaint"],
+    });
+  });
+
+  it("ignores uncategorised messages next to categorised ones", () => {
+    const uncategorised = messageState({ complianceCategory: "none" })!;
+    const counters = countersFromMessages([readComplaint, uncategorised]);
+    expect(counters.messageCount).toBe(2);
+    expect(summaryFlags(counters).complianceCategories).toEqual(["complaint"]);
+    expect(summaryFlags(countersFromMessages([uncategorised])).complianceCategories).toEqual(["none"]);
+  });
+
+  it("reports none for an empty thread", () => {
+    expect(summaryFlags(emptyCounters()).complianceCategories).toEqual(["none"]);
+  });
+});
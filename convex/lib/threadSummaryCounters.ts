@@ -0,0 +1,140 @@
+/**
+ * Incremental thread summary counters.
+ *
+ * threadSummaries.messageCount / unreadCount / requiresActionCount /
+ * categoryCounts are maintained by applying each message change (added,
+ * removed, read, re-categorised, flagged), so a read receipt on a thread
+ * with hundreds of entries never has to re-read the thread.
+ * regenerateThreadSummary (communications.ts) rebuilds the same fields from
+ * scratch and is only used for repair.
+ */
+
+export interface CategoryCount {
+  category: string;
+  count: number;
+}
+
+export interface ThreadCounters {
+  messageCount: number;
+  unreadCount: number;
+  requiresActionCount: number;
+  categoryCounts: CategoryCount[];
+}
+
+/**
+ * The parts of a communication that contribute to its thread's counters.
+ */
+export interface ThreadMessageState {
+  unread: boolean;
+  requiresAction: boolean;
+  /** Unset for uncategorised ("none") messages, which are not counted */
+  category?: string;
+}
+
+/**
+ * Counter contribution of a communication, or null when it doesn't count
+ * (soft-deleted, or not in the thread at all).
+ */
+export function messageState(
+  comm: {
+    isDeleted?: boolean;
+    readAt?: string;
+    requiresFollowUp?: boolean;
+    complianceCategory?: string;
+  } | null
+): ThreadMessageState | null {
+  if (!comm || comm.isDeleted) return null;
+  return {
+    unread: !comm.readAt,
+    requiresAction: comm.requiresFollowUp === true,
+    category:
+      comm.complianceCategory && comm.complianceCategory !== "none"
+        ? comm.complianceCategory
+        : undefined,
+  };
+}
+
+export function emptyCounters(): ThreadCounters {
+  return { messageCount: 0, unreadCount: 0, requiresActionCount: 0, categoryCounts: [] };
+}
+
+function addState(counters: ThreadCounters, state: ThreadMessageState, sign: 1 | -1): ThreadCounters {
+  const categoryCounts = counters.categoryCounts.map((c) => ({ ...c }));
+  if (state.category) {
+    const entry = categoryCounts.find((c) => c.category === state.category);
+    if (entry) {
+      entry.count += sign;
+    } else if (sign > 0) {
+      categoryCounts.push({ category: state.category, count: 1 });
+    }
+  }
+
+  // Clamp at zero so counters drifted by legacy data can never go negative
+  return {
+    messageCount: Math.max(0, counters.messageCount + sign),
+    unreadCount: Math.max(0, counters.unreadCount + (state.unread ? sign : 0)),
+    requiresActionCount: Math.max(
+      0,
+      counters.requiresActionCount + (state.requiresAction ? sign : 0)
+    ),
+    categoryCounts: categoryCounts.filter((c) => c.count > 0),
+  };
+}
+
+/**
+ * Apply one message changing from `before` to `after` (null = not counted).
+ */
+export function applyMessageChange(
+  counters: ThreadCounters,
+  before: ThreadMessageState | null,
+  after: ThreadMessageState | null
+): ThreadCounters {
+  let next = counters;
+  if (before) next = addState(next, before, -1);
+  if (after) next = addState(next, after, 1);
+  return next;
+}
+
+/**
+ * Counters for a whole thread (used by regeneration and repair).
+ */
+export function countersFromMessages(states: ThreadMessageState[]): ThreadCounters {
+  return states.reduce((counters, state) => addState(counters, state, 1), emptyCounters());
+}
+
+/**
+ * Counters for two threads combined into one (thread merge).
+ */
+export function mergeCounters(a: ThreadCounters, b: ThreadCounters): ThreadCounters {
+  const categoryCounts = a.categoryCounts.map((c) => ({ ...c }));
+  for (const { category, count } of b.categoryCounts) {
+    const entry = categoryCounts.find((c) => c.category === category);
+    if (entry) {
+      entry.count += count;
+    } else {
+      categoryCounts.push({ category, count });
+    }
+  }
+  return {
+    messageCount: a.messageCount + b.messageCount,
+    unreadCount: a.unreadCount + b.unreadCount,
+    requiresActionCount: a.requiresActionCount + b.requiresActionCount,
+    categoryCounts,
+  };
+}
+
+/**
+ * The summary flags read by the thread list, derived from the counters.
+ */
+export function summaryFlags(counters: ThreadCounters): {
+  hasUnread: boolean;
+  requiresAction: boolean;
+  complianceCategories: string[];
+} {
+  const categories = counters.categoryCounts.map((c) => c.category);
+  return {
+    hasUnread: counters.unreadCount > 0,
+    requiresAction: counters.requiresActionCount > 0,
+    complianceCategories: categories.length > 0 ? categories : ["none"],
+  };
+}
@@ -1,6 +1,7 @@
 import { mutation, query } from "./_generated/server";
 import { v } from "convex/values";
 import { requireAuth, requireTenant } from "./authHelpers";
+import { deletePhotoDerivatives, scheduleDerivatives, withPhotoUrls } from "./photoDerivativesHelpers";
 
 // Generate upload URL for file storage
 export const generateUploadUrl = mutation({
@@ -47,6 +48,7 @@ export const addPhoto = mutation({
       organizationId,  // Inherit from parent
       createdAt: Date.now(),
     });
+    await scheduleDerivatives(ctx, "maintenancePhotos", photoId, args.fileType);
     return photoId;
   },
 });
@@ -73,15 +75,9 @@ export const getByMaintenanceRequest = query({
       )
       .collect();
 
-    // Get URLs for each photo
+    // Get original, thumbnail and medium URLs for each photo
     const photosWithUrls = await Promise.all(
-      photos.map(async (photo) => {
-        const url = await ctx.storage.getUrl(photo.storageId);
-        return {
-          ...photo,
-          url,
-        };
-      })
+      photos.map((photo) => withPhotoUrls(ctx, photo))
     );
 
     return photosWithUrls;
@@ -127,6 +123,7 @@ export const deletePhoto = mutation({
       }
       // Delete from storage
       await ctx.storage.delete(photo.storageId);
+      await deletePhotoDerivatives(ctx, photo);
       // Delete record
       await ctx.db.delete(args.photoId);
     }
@@ -1,8 +1,12 @@
-import { mutation, query, internalMutation } from "./_generated/server";
+import { mutation, query, internalMutation, MutationCtx } from "./_generated/server";
 import { v } from "convex/values";
 import { internal } from "./_generated/api";
+import { Doc, Id } from "./_generated/dataModel";
 import { requirePermission, requireAuth, requireTenant, requireActiveSubscription } from "./authHelpers";
+import { syncCalendarIndex } from "./calendarIndex";
+import { trackOrgStats } from "./orgStats";
 import { paginationArgs } from "./paginationHelpers";
+import { insertPhotoCopy } from "./photoDerivativesHelpers";
 
 // Create a new maintenance request
 export const create = mutation({
@@ -63,6 +67,8 @@ export const create = mutation({
       createdAt: now,
       updatedAt: now,
     });
+    await trackOrgStats(ctx, "maintenanceRequests", requestId, null);
+    await syncCalendarIndex(ctx, "maintenanceRequests", requestId);
 
     // Audit log
     await ctx.runMutation(internal.auditLog.log, {
@@ -349,6 +355,8 @@ export const update = mutation({
     }
 
     await ctx.db.patch(requestId, filteredUpdates);
+    await trackOrgStats(ctx, "maintenanceRequests", requestId, request);
+    await syncCalendarIndex(ctx, "maintenanceRequests", requestId);
 
     // Audit log if userId provided
     if (userId) {
@@ -418,6 +426,8 @@ export const completeRequest = mutation({
       warrantyExpiryDate,
       updatedAt: Date.now(),
     });
+    await trackOrgStats(ctx, "maintenanceRequests", args.requestId, request);
+    await syncCalendarIndex(ctx, "maintenanceRequests", args.requestId);
 
     // Trigger webhook
     await ctx.scheduler.runAfter(0, internal.webhooks.triggerWebhook, {
@@ -448,6 +458,8 @@ export const remove = mutation({
     }
 
     await ctx.db.delete(args.requestId);
+    await trackOrgStats(ctx, "maintenanceRequests", args.requestId, request);
+    await syncCalendarIndex(ctx, "maintenanceRequests", args.requestId);
     return { success: true };
   },
 });
@@ -875,6 +887,169 @@ export const getAllPaginated = query({
   },
 });
 
+const maintenanceCategoryValidator = v.union(
+  v.literal("plumbing"),
+  v.literal("electrical"),
+  v.literal("appliances"),
+  v.literal("building"),
+  v.literal("grounds"),
+  v.literal("safety"),
+  v.literal("general")
+);
+
+const maintenancePriorityValidator = v.union(
+  v.literal("urgent"),
+  v.literal("high"),
+  v.literal("medium"),
+  v.literal("low")
+);
+
+type MaintenanceCategory = "plumbing" | "electrical" | "appliances" | "building" | "grounds" | "safety" | "general";
+type MaintenancePriority = "urgent" | "high" | "medium" | "low";
+
+// Failed items turned into maintenance requests per mutation; the rest are
+// continued in a scheduled mutation so completing a large inspection stays short
+export const INSPECTION_MR_BATCH_SIZE = 50;
+
+interface InspectionMaintenanceItem {
+  inspectionItemId: Id<"inspectionItems">;
+  title: string;
+  description: string;
+  category: MaintenanceCategory;
+}
+
+interface InspectionMaintenanceBatch {
+  dwellingId: Id<"dwellings">;
+  organizationId: Id<"organizations">;
+  inspectionId: Id<"inspections">;
+  priority: MaintenancePriority;
+  createdBy: Id<"users">;
+  reportedDate: string;
+  items: InspectionMaintenanceItem[];
+}
+
+// Insert one inspection-sourced request, copy the item's photos, write its
+// audit entry and fire the webhook
+async function insertFromInspectionItem(
+  ctx: MutationCtx,
+  batch: Omit<InspectionMaintenanceBatch, "items">,
+  item: InspectionMaintenanceItem,
+  creator: Doc<"users"> | null,
+  now: number
+): Promise<Id<"maintenanceRequests">> {
+  const requestId = await ctx.db.insert("maintenanceRequests", {
+    dwellingId: batch.dwellingId,
+    organizationId: batch.organizationId,
+    requestType: "reactive",
+    category: item.category,
+    priority: batch.priority,
+    title: item.title,
+    description: item.description,
+    reportedBy: "Inspection System",
+    reportedDate: batch.reportedDate,
+    status: "reported",
+    inspectionId: batch.inspectionId,
+    inspectionItemId: item.inspectionItemId,
+    createdBy: batch.createdBy,
+    createdAt: now,
+    updatedAt: now,
+  });
+  await trackOrgStats(ctx, "maintenanceRequests", requestId, null);
+  await syncCalendarIndex(ctx, "maintenanceRequests", requestId);
+
+  // Copy inspection item photos to maintenance request
+  const inspectionPhotos = await ctx.db
+    .query("inspectionPhotos")
+    .withIndex("by_item", (q) => q.eq("inspectionItemId", item.inspectionItemId))
+    .collect();
+
+  for (const photo of inspectionPhotos) {
+    await insertPhotoCopy(ctx, "maintenancePhotos", photo, {
+      maintenanceRequestId: requestId,
+      organizationId: batch.organizationId,
+      storageId: photo.storageId,
+      fileName: photo.fileName,
+      fileSize: photo.fileSize,
+      fileType: photo.fileType,
+      description: photo.description,
+      photoType: "issue",
+      uploadedBy: photo.uploadedBy,
+      createdAt: now,
+    });
+  }
+
+  // Audit log
+  if (creator) {
+    await ctx.runMutation(internal.auditLog.log, {
+      organizationId: batch.organizationId,
+      userId: creator._id,
+      userEmail: creator.email,
+      userName: `${creator.firstName} ${creator.lastName}`,
+      action: "create",
+      entityType: "maintenanceRequest",
+      entityId: requestId,
+      entityName: item.title,
+      metadata: JSON.stringify({
+        category: item.category,
+        priority: batch.priority,
+        requestType: "reactive",
+        source: "inspection",
+        inspectionId: batch.inspectionId,
+        inspectionItemId: item.inspectionItemId,
+      }),
+    });
+  }
+
+  // Trigger webhook
+  await ctx.scheduler.runAfter(0, internal.webhooks.triggerWebhook, {
+    organizationId: batch.organizationId,
+    event: "maintenance.created",
+    payload: JSON.stringify({ requestId, title: item.title, priority: batch.priority }),
+  });
+
+  return requestId;
+}
+
+/**
+ * Create maintenance requests for failed inspection items in batches.
+ *
+ * Idempotent: items that already have a request for this inspection are
+ * skipped, so a retried or resumed completion never creates duplicates.
+ * Creates up to INSPECTION_MR_BATCH_SIZE requests (each with its own audit
+ * entry) and schedules createBatchFromInspection for whatever is left.
+ */
+export async function createMaintenanceRequestsFromInspection(
+  ctx: MutationCtx,
+  batch: InspectionMaintenanceBatch
+): Promise<{ created: number; queued: number }> {
+  const existing = await ctx.db
+    .query("maintenanceRequests")
+    .withIndex("by_inspection", (q) => q.eq("inspectionId", batch.inspectionId))
+    .collect();
+  const alreadyCreated = new Set(
+    existing.map((r) => r.inspectionItemId).filter((id) => id !== undefined)
+  );
+
+  const todo = batch.items.filter((item) => !alreadyCreated.has(item.inspectionItemId));
+  const current = todo.slice(0, INSPECTION_MR_BATCH_SIZE);
+  const rest = todo.slice(INSPECTION_MR_BATCH_SIZE);
+
+  const now = Date.now();
+  const creator = current.length > 0 ? await ctx.db.get(batch.createdBy) : null;
+  for (const item of current) {
+    await insertFromInspectionItem(ctx, batch, item, creator, now);
+  }
+
+  if (rest.length > 0) {
+    await ctx.scheduler.runAfter(0, internal.maintenanceRequests.createBatchFromInspection, {
+      ...batch,
+      items: rest,
+    });
+  }
+
+  return { created: current.length, queued: rest.length };
+}
+
 // Create a maintenance request from a failed inspection item (server-to-server, no auth check)
 export const createFromInspection = internalMutation({
   args: {
@@ -882,96 +1057,46 @@ export const createFromInspection = internalMutation({
     organizationId: v.id("organizations"),
     title: v.string(),
     description: v.string(),
-    category: v.union(
-      v.literal("plumbing"),
-      v.literal("electrical"),
-      v.literal("appliances"),
-      v.literal("building"),
-      v.literal("grounds"),
-      v.literal("safety"),
-      v.literal("general")
-    ),
-    priority: v.union(
-      v.literal("urgent"),
-      v.literal("high"),
-      v.literal("medium"),
-      v.literal("low")
-    ),
+    category: maintenanceCategoryValidator,
+    priority: maintenancePriorityValidator,
     inspectionId: v.id("inspections"),
     inspectionItemId: v.id("inspectionItems"),
     createdBy: v.id("users"),
     reportedDate: v.string(),
   },
   handler: async (ctx, args) => {
-    const now = Date.now();
-    const requestId = await ctx.db.insert("maintenanceRequests", {
-      dwellingId: args.dwellingId,
-      organizationId: args.organizationId,
-      requestType: "reactive",
-      category: args.category,
-      priority: args.priority,
-      title: args.title,
-      description: args.description,
-      reportedBy: "Inspection System",
-      reportedDate: args.reportedDate,
-      status: "reported",
-      inspectionId: args.inspectionId,
-      inspectionItemId: args.inspectionItemId,
-      createdBy: args.createdBy,
-      createdAt: now,
-      updatedAt: now,
-    });
-
-    // Copy inspection item photos to maintenance request
-    const inspectionPhotos = await ctx.db
-      .query("inspectionPhotos")
-      .withIndex("by_item", (q) => q.eq("inspectionItemId", args.inspectionItemId))
-      .collect();
-
-    for (const photo of inspectionPhotos) {
-      await ctx.db.insert("maintenancePhotos", {
-        maintenanceRequestId: requestId,
-        organizationId: args.organizationId,
-        storageId: photo.storageId,
-        fileName: photo.fileName,
-        fileSize: photo.fileSize,
-        fileType: photo.fileType,
-        description: photo.description,
-        photoType: "issue",
-        uploadedBy: photo.uploadedBy,
-        createdAt: now,
-      });
-    }
-
-    // Audit log
-    const user = await ctx.db.get(args.createdBy);
-    if (user) {
-      await ctx.runMutation(internal.auditLog.log, {
-        userId: user._id,
-        userEmail: user.email,
-        userName: `${user.firstName} ${user.lastName}`,
-        action: "create",
-        entityType: "maintenanceRequest",
-        entityId: requestId,
-        entityName: args.title,
-        metadata: JSON.stringify({
-          category: args.category,
-          priority: args.priority,
-          requestType: "reactive",
-          source: "inspection",
-          inspectionId: args.inspectionId,
-          inspectionItemId: args.inspectionItemId,
-        }),
-      });
-    }
-
-    // Trigger webhook
-    await ctx.scheduler.runAfter(0, internal.webhooks.triggerWebhook, {
-      organizationId: args.organizationId,
-      event: "maintenance.created",
-      payload: JSON.stringify({ requestId, title: args.title, priority: args.priority }),
-    });
+    const { title, description, category, inspectionItemId, ...batch } = args;
+    const requestId = await insertFromInspectionItem(
+      ctx,
+      batch,
+      { inspectionItemId, title, description, category },
+      await ctx.db.get(args.createdBy),
+      Date.now()
+    );
 
     return requestId;
   },
 });
+
+// Continue creating maintenance requests for a completed inspection (scheduled, resumable)
+export const createBatchFromInspection = internalMutation({
+  args: {
+    dwellingId: v.id("dwellings"),
+    organizationId: v.id("organizations"),
+    inspectionId: v.id("inspections"),
+    priority: maintenancePriorityValidator,
+    createdBy: v.id("users"),
+    reportedDate: v.string(),
+    items: v.array(
+      v.object({
+        inspectionItemId: v.id("inspectionItems"),
+        title: v.string(),
+        description: v.string(),
+        category: maintenanceCategoryValidator,
+      })
+    ),
+  },
+  handler: async (ctx, args) => {
+    return await createMaintenanceRequestsFromInspection(ctx, args);
+  },
+});
@@ -0,0 +1,273 @@
+import { v } from "convex/values";
+import { mutation, internalMutation, MutationCtx } from "./_generated/server";
+import { Doc, Id } from "./_generated/dataModel";
+import { requireAuth, requireTenant, requirePermission } from "./authHelpers";
+import { applyInspectionItemUpdates } from "./inspections";
+import { scheduleDerivatives } from "./photoDerivativesHelpers";
+
+/**
+ * Offline Sync - batched replay of changes queued while offline
+ *
+ * The client sync engine (src/lib/offlineSyncEngine.ts) coalesces queued
+ * inspection item edits and uploads queued photos in parallel, then records
+ * everything here in a few batched mutations instead of one round-trip per
+ * change.
+ *
+ * Every entry carries a client-generated idempotency key. Applied keys are
+ * stored in offlineSyncReceipts, so a batch retried after a dropped
+ * response is skipped instead of applied twice. incidents.create checks the
+ * same receipts for replayed offline incidents. Receipts are purged after
+ * RECEIPT_RETENTION_DAYS by a daily cron.
+ */
+
+// Largest batch accepted by applyBatch (entries across all lists)
+export const MAX_BATCH_ENTRIES = 100;
+// Largest number of upload URLs handed out per call
+const MAX_UPLOAD_URLS = 20;
+const RECEIPT_RETENTION_DAYS = 7;
+
+const inspectionItemStatus = v.union(
+  v.literal("pending"),
+  v.literal("pass"),
+  v.literal("fail"),
+  v.literal("na")
+);
+
+/**
+ * Receipt for an idempotency key, if a change with that key was applied.
+ */
+export async function findReceipt(
+  ctx: MutationCtx,
+  organizationId: Id<"organizations">,
+  key: string
+): Promise<Doc<"offlineSyncReceipts"> | null> {
+  return await ctx.db
+    .query("offlineSyncReceipts")
+    .withIndex("by_organizationId_key", (q) =>
+      q.eq("organizationId", organizationId).eq("key", key)
+    )
+    .first();
+}
+
+async function hasReceipt(
+  ctx: MutationCtx,
+  organizationId: Id<"organizations">,
+  key: string
+): Promise<boolean> {
+  return (await findReceipt(ctx, organizationId, key)) !== null;
+}
+
+/**
+ * Issue several storage upload URLs in one round-trip.
+ */
+export const generateUploadUrls = mutation({
+  args: {
+    userId: v.id("users"),
+    count: v.number(),
+  },
+  handler: async (ctx, args): Promise<string[]> => {
+    await requireAuth(ctx, args.userId);
+    const count = Math.min(Math.max(Math.floor(args.count), 0), MAX_UPLOAD_URLS);
+    const urls: string[] = [];
+    for (let i = 0; i < count; i++) {
+      urls.push(await ctx.storage.generateUploadUrl());
+    }
+    return urls;
+  },
+});
+
+/**
+ * Apply a batch of offline changes for one user.
+ * Returns the keys that were applied now and those already applied earlier.
+ */
+export const applyBatch = mutation({
+  args: {
+    userId: v.id("users"),
+    itemUpdates: v.optional(
+      v.array(
+        v.object({
+          key: v.string(),
+          itemId: v.id("inspectionItems"),
+          status: inspectionItemStatus,
+          condition: v.optional(v.string()),
+          remarks: v.optional(v.string()),
+        })
+      )
+    ),
+    inspectionPhotos: v.optional(
+      v.array(
+        v.object({
+          key: v.string(),
+          inspectionId: v.id("inspections"),
+          inspectionItemId: v.optional(v.id("inspectionItems")),
+          storageId: v.id("_storage"),
+          fileName: v.string(),
+          fileSize: v.number(),
+          fileType: v.string(),
+          description: v.optional(v.string()),
+        })
+      )
+    ),
+    maintenancePhotos: v.optional(
+      v.array(
+        v.object({
+          key: v.string(),
+          maintenanceRequestId: v.id("maintenanceRequests"),
+          storageId: v.id("_storage"),
+          fileName: v.string(),
+          fileSize: v.number(),
+          fileType: v.string(),
+          description: v.optional(v.string()),
+          photoType: v.union(
+            v.literal("before"),
+            v.literal("during"),
+            v.literal("after"),
+            v.literal("issue")
+          ),
+        })
+      )
+    ),
+    incidentPhotos: v.optional(
+      v.array(
+        v.object({
+          key: v.string(),
+          incidentId: v.id("incidents"),
+          storageId: v.id("_storage"),
+          fileName: v.string(),
+          fileSize: v.number(),
+          fileType: v.string(),
+          description: v.optional(v.string()),
+        })
+      )
+    ),
+  },
+  handler: async (ctx, args): Promise<{ applied: string[]; skipped: string[] }> => {
+    const { organizationId } = await requireTenant(ctx, args.userId);
+    const itemUpdates = args.itemUpdates ?? [];
+    const inspectionPhotos = args.inspectionPhotos ?? [];
+    const maintenancePhotos = args.maintenancePhotos ?? [];
+    const incidentPhotos = args.incidentPhotos ?? [];
+
+    const total =
+      itemUpdates.length + inspectionPhotos.length + maintenancePhotos.length + incidentPhotos.length;
+    if (total > MAX_BATCH_ENTRIES) {
+      throw new Error(`Batch too large: ${total} entries (max ${MAX_BATCH_ENTRIES})`);
+    }
+    if (incidentPhotos.length > 0) {
+      await requirePermission(ctx, args.userId, "incidents", "update");
+    }
+
+    const now = Date.now();
+    const applied: string[] = [];
+    const skipped: string[] = [];
+
+    // Drop entries that were applied by an earlier attempt of this batch
+    const seen = new Set<string>();
+    const isNew = async (key: string): Promise<boolean> => {
+      if (seen.has(key) || (await hasReceipt(ctx, organizationId, key))) {
+        skipped.push(key);
+        return false;
+      }
+      seen.add(key);
+      return true;
+    };
+
+    // 1. Item status updates (counters adjusted once per inspection)
+    const freshUpdates = [];
+    for (const update of itemUpdates) {
+      if (await isNew(update.key)) freshUpdates.push(update);
+    }
+    if (freshUpdates.length > 0) {
+      await applyInspectionItemUpdates(
+        ctx,
+        freshUpdates.map(({ key: _key, ...update }) => update),
+        args.userId,
+        organizationId
+      );
+      applied.push(...freshUpdates.map((u) => u.key));
+    }
+
+    // 2. Photo records for files already uploaded to storage
+    const parents = new Map<string, Id<"organizations"> | undefined | null>();
+    const parentOrg = async (
+      id: Id<"inspections"> | Id<"maintenanceRequests"> | Id<"incidents">
+    ) => {
+      if (!parents.has(id)) {
+        const doc = await ctx.db.get(id);
+        parents.set(id, doc ? doc.organizationId : null);
+      }
+      return parents.get(id);
+    };
+
+    for (const { key, ...photo } of inspectionPhotos) {
+      if (!(await isNew(key))) continue;
+      if ((await parentOrg(photo.inspectionId)) !== organizationId) {
+        throw new Error("Access denied: Inspection belongs to different organization");
+      }
+      const photoId = await ctx.db.insert("inspectionPhotos", {
+        ...photo,
+        organizationId,
+        uploadedBy: args.userId,
+        createdAt: now,
+      });
+      await scheduleDerivatives(ctx, "inspectionPhotos", photoId, photo.fileType);
+      applied.push(key);
+    }
+
+    for (const { key, ...photo } of maintenancePhotos) {
+      if (!(await isNew(key))) continue;
+      if ((await parentOrg(photo.maintenanceRequestId)) !== organizationId) {
+        throw new Error("Access denied: maintenance request belongs to different organization");
+      }
+      const photoId = await ctx.db.insert("maintenancePhotos", {
+        ...photo,
+        organizationId,
+        uploadedBy: args.userId,
+        createdAt: now,
+      });
+      await scheduleDerivatives(ctx, "maintenancePhotos", photoId, photo.fileType);
+      applied.push(key);
+    }
+
+    for (const { key, ...photo } of incidentPhotos) {
+      if (!(await isNew(key))) continue;
+      if ((await parentOrg(photo.incidentId)) !== organizationId) {
+        throw new Error("Access denied: Incident belongs to different organization");
+      }
+      const photoId = await ctx.db.insert("incidentPhotos", {
+        ...photo,
+        organizationId,
+        uploadedBy: args.userId,
+        createdAt: now,
+      });
+      await scheduleDerivatives(ctx, "incidentPhotos", photoId, photo.fileType);
+      applied.push(key);
+    }
+
+    for (const key of applied) {
+      await ctx.db.insert("offlineSyncReceipts", { organizationId, key, createdAt: now });
+    }
+
+    return { applied, skipped };
+  },
+});
+
+/**
+ * Purge idempotency receipts older than the retention window.
+ */
+export const cleanupReceipts = internalMutation({
+  args: {},
+  handler: async (ctx): Promise<number> => {
+    const cutoff = Date.now() - RECEIPT_RETENTION_DAYS * 24 * 60 * 60 * 1000;
+    const expired = await ctx.db
+      .query("offlineSyncReceipts")
+      .withIndex("by_createdAt", (q) => q.lt("createdAt", cutoff))
+      .take(1000);
+
+    for (const receipt of expired) {
+      await ctx.db.delete(receipt._id);
+    }
+
+    return expired.length;
+  },
+});
@@ -0,0 +1,428 @@
+import { internalMutation, MutationCtx, QueryCtx } from "./_generated/server";
+import { v, Infer } from "convex/values";
+import { internal } from "./_generated/api";
+import { Id, Doc } from "./_generated/dataModel";
+import { markDashboardStale } from "./dashboard";
+
+/**
+ * Per-Organization Stats & Platform Rollup
+ *
+ * The super-admin console used to collect users, properties, dwellings,
+ * participants, maintenance requests and incidents for every organization on
+ * each load. Instead, each organization has one `organizationStats` counter
+ * row that the owning mutations adjust on insert/delete/status transitions
+ * (trackOrgStats), and a `platformMetricsDaily` row per day (refreshed
+ * hourly, a page of orgs at a time) captures platform-wide totals so the
+ * dashboard is a single read and growth trends come for free.
+ *
+ * Counters are derived from a per-table contribution function, so callers
+ * only pass the document before and after a write. reconcileOrganization
+ * recounts from source and runs nightly ahead of the rollup to repair drift.
+ */
+
+// ============================================================================
+// COUNTERS
+// ============================================================================
+
+export type OrgStatField =
+  | "userCount"
+  | "activeUserCount"
+  | "propertyCount"
+  | "activePropertyCount"
+  | "dwellingCount"
+  | "activeDwellingCount"
+  | "participantCount"
+  | "activeParticipantCount"
+  | "maintenanceCount"
+  | "activeMaintenanceCount"
+  | "incidentCount";
+
+export type OrgStatTable =
+  | "users"
+  | "properties"
+  | "dwellings"
+  | "participants"
+  | "maintenanceRequests"
+  | "incidents";
+
+export type OrgStatCounts = Record<OrgStatField, number>;
+
+export const EMPTY_ORG_STATS: OrgStatCounts = {
+  userCount: 0,
+  activeUserCount: 0,
+  propertyCount: 0,
+  activePropertyCount: 0,
+  dwellingCount: 0,
+  activeDwellingCount: 0,
+  participantCount: 0,
+  activeParticipantCount: 0,
+  maintenanceCount: 0,
+  activeMaintenanceCount: 0,
+  incidentCount: 0,
+};
+
+/**
+ * How much a single document contributes to its organization's counters.
+ * Keep these rules in sync with what the super-admin console labels "active".
+ */
+function contribution(
+  table: OrgStatTable,
+  doc: Doc<OrgStatTable>
+): Partial<OrgStatCounts> {
+  switch (table) {
+    case "users": {
+      const user = doc as Doc<"users">;
+      return { userCount: 1, activeUserCount: user.isActive ? 1 : 0 };
+    }
+    case "properties": {
+      const property = doc as Doc<"properties">;
+      return { propertyCount: 1, activePropertyCount: property.isActive !== false ? 1 : 0 };
+    }
+    case "dwellings": {
+      const dwelling = doc as Doc<"dwellings">;
+      return { dwellingCount: 1, activeDwellingCount: dwelling.isActive ? 1 : 0 };
+    }
+    case "participants": {
+      const participant = doc as Doc<"participants">;
+      const isActive = participant.status === "active" || participant.status === "pending_move_in";
+      return { participantCount: 1, activeParticipantCount: isActive ? 1 : 0 };
+    }
+    case "maintenanceRequests": {
+      const request = doc as Doc<"maintenanceRequests">;
+      const isOpen = request.status !== "completed" && request.status !== "cancelled";
+      return { maintenanceCount: 1, activeMaintenanceCount: isOpen ? 1 : 0 };
+    }
+    case "incidents":
+      return { incidentCount: 1 };
+  }
+}
+
+/**
+ * Read an organization's counters (zeros if the row hasn't been created yet).
+ */
+export async function getOrgStats(
+  ctx: QueryCtx | MutationCtx,
+  organizationId: Id<"organizations">
+): Promise<Doc<"organizationStats"> | null> {
+  return await ctx.db
+    .query("organizationStats")
+    .withIndex("by_organizationId", (q) => q.eq("organizationId", organizationId))
+    .first();
+}
+
+/**
+ * Apply counter deltas to an organization's stats row, creating it on first use.
+ * Counters never go below zero; drift is repaired by reconcileOrganization.
+ */
+export async function adjustOrgStats(
+  ctx: MutationCtx,
+  organizationId: Id<"organizations">,
+  deltas: Partial<OrgStatCounts>,
+  extra?: { lastLoginAt?: number }
+): Promise<void> {
+  const hasDelta = Object.values(deltas).some((d) => d !== 0);
+  if (!hasDelta && !extra) return;
+
+  const existing = await getOrgStats(ctx, organizationId);
+  const now = Date.now();
+
+  if (!existing) {
+    const counts: OrgStatCounts = { ...EMPTY_ORG_STATS };
+    for (const [field, delta] of Object.entries(deltas) as [OrgStatField, number][]) {
+      counts[field] = Math.max(0, delta);
+    }
+    await ctx.db.insert("organizationStats", {
+      organizationId,
+      ...counts,
+      lastLoginAt: extra?.lastLoginAt,
+      updatedAt: now,
+    });
+    return;
+  }
+
+  const patch: Partial<OrgStatCounts> & { lastLoginAt?: number; updatedAt: number } = {
+    updatedAt: now,
+  };
+  for (const [field, delta] of Object.entries(deltas) as [OrgStatField, number][]) {
+    if (delta !== 0) patch[field] = Math.max(0, existing[field] + delta);
+  }
+  if (extra?.lastLoginAt && (!existing.lastLoginAt || extra.lastLoginAt > existing.lastLoginAt)) {
+    patch.lastLoginAt = extra.lastLoginAt;
+  }
+  await ctx.db.patch(existing._id, patch);
+}
+
+/**
+ * Record a write to a counted table. Pass the document as it was before the
+ * write (null for inserts) and the id that was written; the post-write state
+ * is re-read (null after a delete) and the counter delta derived from both.
+ *
+ * Usage:
+ * ```
+ * const propertyId = await ctx.db.insert("properties", {...});
+ * await trackOrgStats(ctx, "properties", propertyId, null);
+ *
+ * await ctx.db.patch(args.propertyId, { isActive: false });
+ * await trackOrgStats(ctx, "properties", args.propertyId, property);
+ * ```
+ */
+export async function trackOrgStats<T extends OrgStatTable>(
+  ctx: MutationCtx,
+  table: T,
+  id: Id<T>,
+  before: Doc<T> | null
+): Promise<void> {
+  const after = (await ctx.db.get(id)) as Doc<T> | null;
+  const organizationId =
+    (after as { organizationId?: Id<"organizations"> } | null)?.organizationId ??
+    (before as { organizationId?: Id<"organizations"> } | null)?.organizationId;
+  if (!organizationId) return;
+
+  const deltas: Partial<OrgStatCounts> = {};
+  const add = (doc: Doc<T> | null, sign: 1 | -1) => {
+    if (!doc) return;
+    for (const [field, value] of Object.entries(contribution(table, doc)) as [OrgStatField, number][]) {
+      deltas[field] = (deltas[field] ?? 0) + sign * value;
+    }
+  };
+  add(after, 1);
+  add(before, -1);
+
+  await adjustOrgStats(ctx, organizationId, deltas);
+  await markDashboardStale(ctx, organizationId);
+}
+
+/**
+ * Record a successful login against the user's organization.
+ */
+export async function recordOrgLogin(
+  ctx: MutationCtx,
+  organizationId: Id<"organizations"> | undefined,
+  at: number
+): Promise<void> {
+  if (!organizationId) return;
+  await adjustOrgStats(ctx, organizationId, {}, { lastLoginAt: at });
+}
+
+// ============================================================================
+// RECONCILE & DAILY ROLLUP
+// ============================================================================
+
+/**
+ * Recount one organization's stats from source tables and overwrite its row.
+ * Drift-repair job (and initial backfill); never on a request path.
+ */
+export const reconcileOrganization = internalMutation({
+  args: { organizationId: v.id("organizations") },
+  handler: async (ctx, args) => {
+    const { organizationId } = args;
+    const counts: OrgStatCounts = { ...EMPTY_ORG_STATS };
+    let lastLoginAt: number | undefined;
+
+    const tally = (table: OrgStatTable, docs: Doc<OrgStatTable>[]) => {
+      for (const doc of docs) {
+        for (const [field, value] of Object.entries(contribution(table, doc)) as [OrgStatField, number][]) {
+          counts[field] += value;
+        }
+      }
+    };
+
+    const [users, properties, dwellings, participants, maintenanceRequests, incidents] =
+      await Promise.all([
+        ctx.db.query("users").withIndex("by_organizationId", (q) => q.eq("organizationId", organizationId)).collect(),
+        ctx.db.query("properties").withIndex("by_organizationId", (q) => q.eq("organizationId", organizationId)).collect(),
+        ctx.db.query("dwellings").withIndex("by_organizationId", (q) => q.eq("organizationId", organizationId)).collect(),
+        ctx.db.query("participants").withIndex("by_organizationId", (q) => q.eq("organizationId", organizationId)).collect(),
+        ctx.db.query("maintenanceRequests").withIndex("by_organizationId", (q) => q.eq("organizationId", organizationId)).collect(),
+        ctx.db.query("incidents").withIndex("by_organizationId", (q) => q.eq("organizationId", organizationId)).collect(),
+      ]);
+
+    tally("users", users);
+    tally("properties", properties);
+    tally("dwellings", dwellings);
+    tally("participants", participants);
+    tally("maintenanceRequests", maintenanceRequests);
+    tally("incidents", incidents);
+
+    for (const u of users) {
+      if (u.lastLogin && (!lastLoginAt || u.lastLogin > lastLoginAt)) {
+        lastLoginAt = u.lastLogin;
+      }
+    }
+
+    const existing = await getOrgStats(ctx, organizationId);
+    const now = Date.now();
+    if (existing) {
+      await ctx.db.patch(existing._id, { ...counts, lastLoginAt, updatedAt: now, reconciledAt: now });
+    } else {
+      await ctx.db.insert("organizationStats", {
+        organizationId,
+        ...counts,
+        lastLoginAt,
+        updatedAt: now,
+        reconciledAt: now,
+      });
+    }
+
+    return counts;
+  },
+});
+
+/**
+ * Schedule a reconcile for every organization.
+ */
+export const reconcileAll = internalMutation({
+  args: {},
+  handler: async (ctx) => {
+    const organizations = await ctx.db.query("organizations").collect();
+    for (const org of organizations) {
+      await ctx.scheduler.runAfter(0, internal.orgStats.reconcileOrganization, {
+        organizationId: org._id,
+      });
+    }
+    return { scheduled: organizations.length };
+  },
+});
+
+// Monthly list prices (AUD) used for MRR. Shared with superAdmin.getFinancialMetrics.
+export const PLAN_PRICES: Record<string, number> = {
+  starter: 250,
+  professional: 450,
+  enterprise: 600,
+};
+
+type PlanKey = "starter" | "professional" | "enterprise";
+type SubscriptionKey = "active" | "trialing" | "past_due" | "canceled" | "trial_expired";
+
+// Organizations folded into the rollup per mutation, so a run's reads stay
+// bounded however many tenants the platform has
+const ROLLUP_PAGE_SIZE = 100;
+
+const planCountValidator = v.object({ count: v.number(), activeCount: v.number() });
+
+// Platform totals carried between rollup pages (platformMetricsDaily minus date/createdAt)
+const platformSnapshotValidator = v.object({
+  totalOrganizations: v.number(),
+  activeOrganizations: v.number(),
+  userCount: v.number(),
+  activeUserCount: v.number(),
+  propertyCount: v.number(),
+  activePropertyCount: v.number(),
+  dwellingCount: v.number(),
+  activeDwellingCount: v.number(),
+  participantCount: v.number(),
+  activeParticipantCount: v.number(),
+  maintenanceCount: v.number(),
+  activeMaintenanceCount: v.number(),
+  incidentCount: v.number(),
+  orgsByPlan: v.object({
+    starter: planCountValidator,
+    professional: planCountValidator,
+    enterprise: planCountValidator,
+  }),
+  subscriptionBreakdown: v.object({
+    active: v.number(),
+    trialing: v.number(),
+    past_due: v.number(),
+    canceled: v.number(),
+    trial_expired: v.number(),
+  }),
+  activePayingCount: v.number(),
+  mrr: v.number(),
+});
+
+export type PlatformSnapshot = Infer<typeof platformSnapshotValidator>;
+
+export function emptyPlatformSnapshot(): PlatformSnapshot {
+  return {
+    totalOrganizations: 0,
+    activeOrganizations: 0,
+    ...EMPTY_ORG_STATS,
+    orgsByPlan: {
+      starter: { count: 0, activeCount: 0 },
+      professional: { count: 0, activeCount: 0 },
+      enterprise: { count: 0, activeCount: 0 },
+    },
+    subscriptionBreakdown: { active: 0, trialing: 0, past_due: 0, canceled: 0, trial_expired: 0 },
+    activePayingCount: 0,
+    mrr: 0,
+  };
+}
+
+/**
+ * Fold one organization and its counters row into a platform snapshot.
+ */
+function addOrganization(
+  snapshot: PlatformSnapshot,
+  org: Doc<"organizations">,
+  stats: Doc<"organizationStats"> | null
+): void {
+  snapshot.totalOrganizations++;
+  if (org.isActive) snapshot.activeOrganizations++;
+  if (stats) {
+    for (const field of Object.keys(EMPTY_ORG_STATS) as OrgStatField[]) {
+      snapshot[field] += stats[field];
+    }
+  }
+  const plan = snapshot.orgsByPlan[org.plan as PlanKey];
+  if (plan) {
+    plan.count++;
+    if (org.isActive) plan.activeCount++;
+  }
+  if (org.subscriptionStatus in snapshot.subscriptionBreakdown) {
+    snapshot.subscriptionBreakdown[org.subscriptionStatus as SubscriptionKey]++;
+  }
+  if (org.isActive && org.subscriptionStatus === "active") {
+    snapshot.activePayingCount++;
+    snapshot.mrr += PLAN_PRICES[org.plan] || 0;
+  }
+}
+
+/**
+ * Write today's platform rollup row (idempotent: re-running replaces it).
+ * Walks organizations a page at a time, reading one organizationStats row per
+ * org, and reschedules itself with the running totals until the last page,
+ * which writes the row. Runs hourly from crons.ts.
+ */
+export const rollupPlatformDaily = internalMutation({
+  args: {
+    cursor: v.optional(v.union(v.string(), v.null())),
+    partial: v.optional(platformSnapshotValidator),
+    startedAt: v.optional(v.number()),
+  },
+  handler: async (ctx, args) => {
+    const startedAt = args.startedAt ?? Date.now();
+    const snapshot = args.partial ?? emptyPlatformSnapshot();
+
+    const page = await ctx.db
+      .query("organizations")
+      .paginate({ numItems: ROLLUP_PAGE_SIZE, cursor: args.cursor ?? null });
+    for (const org of page.page) {
+      addOrganization(snapshot, org, await getOrgStats(ctx, org._id));
+    }
+
+    if (!page.isDone) {
+      await ctx.scheduler.runAfter(0, internal.orgStats.rollupPlatformDaily, {
+        cursor: page.continueCursor,
+        partial: snapshot,
+        startedAt,
+      });
+      return { done: false };
+    }
+
+    // Dated by when the run started so a run spanning midnight stays on one day
+    const date = new Date(startedAt).toISOString().split("T")[0];
+    const row = { date, ...snapshot, createdAt: Date.now() };
+
+    const existing = await ctx.db
+      .query("platformMetricsDaily")
+      .withIndex("by_date", (q) => q.eq("date", date))
+      .first();
+    if (existing) {
+      await ctx.db.replace(existing._id, row);
+    } else {
+      await ctx.db.insert("platformMetricsDaily", row);
+    }
+    return { done: true, date };
+  },
+});
@@ -4,10 +4,20 @@ import { internalAction } from "./_generated/server";
 import { v } from "convex/values";
 import { internal } from "./_generated/api";
 import { Id } from "./_generated/dataModel";
-
-// Microsoft Graph API endpoints
+import {
+  ExternalEventUpsert,
+  GRAPH_BATCH_LIMIT,
+  ProviderRequest,
+  ProviderResponse,
+  buildGraphBatchBody,
+  chunk,
+  parseGraphBatchResponse,
+} from "./lib/calendarSync";
+
+// Microsoft Graph API endpoints.
+// MICROSOFT_GRAPH_URL points calls at a local fake Graph server for testing.
 const MS_TOKEN_URL = "https://login.microsoftonline.com/common/oauth2/v2.0/token";
-const MS_GRAPH_BASE = "https://graph.microsoft.com/v1.0";
+const MS_GRAPH_BASE = `${process.env.MICROSOFT_GRAPH_URL || "https://graph.microsoft.com"}/v1.0`;
 
 // Scopes must match the OAuth connect route
 const SCOPES = "Calendars.ReadWrite offline_access User.Read";
@@ -131,40 +141,47 @@ export const syncFromOutlook = internalAction({
     let deleted = 0;
     let deltaLink: string | undefined;
 
+    // Write each page of changes in one mutation as it arrives
+    const applyPage = async (events: Array<MsGraphEvent & { removed: boolean }>) => {
+      const upserts: ExternalEventUpsert[] = [];
+      const deletes: string[] = [];
+      for (const event of events) {
+        if (event.removed) {
+          deletes.push(event.id);
+        } else {
+          upserts.push({
+            externalEventId: event.id,
+            title: event.subject || "(No subject)",
+            startTime: convertMsDateTime(event.start.dateTime, event.start.timeZone),
+            endTime: convertMsDateTime(event.end.dateTime, event.end.timeZone),
+            allDay: event.isAllDay,
+            description: event.bodyPreview,
+            location: event.location?.displayName,
+            attendees: mapAttendees(event.attendees),
+          });
+        }
+      }
+      if (upserts.length === 0 && deletes.length === 0) return;
+
+      const applied = await ctx.runMutation(internal.calendarSync.applyExternalChanges, {
+        organizationId: connection.organizationId as Id<"organizations">,
+        externalProvider: "outlook",
+        externalCalendarId: connection.calendarId,
+        createdBy: connection.userId,
+        syncedAt: Date.now(),
+        upserts,
+        deletes,
+      });
+      synced += applied.upserted;
+      deleted += applied.deleted;
+    };
+
     let needsFullSync = !connection.syncToken;
 
     if (connection.syncToken) {
-      // Attempt incremental delta sync using stored deltaLink
+      // Attempt incremental delta sync using the stored deltaLink
       try {
-        const result = await fetchDeltaEvents(accessToken, connection.syncToken);
-        for (const event of result.events) {
-          if (event.removed) {
-            // Soft-delete local copy
-            await ctx.runMutation(internal.outlookCalendarDb.softDeleteExternalEvent, {
-              externalEventId: event.id,
-              externalProvider: "outlook",
-              organizationId: connection.organizationId as Id<"organizations">,
-            });
-            deleted++;
-          } else {
-            await ctx.runMutation(internal.outlookCalendarDb.upsertExternalEvent, {
-              organizationId: connection.organizationId as Id<"organizations">,
-              externalEventId: event.id,
-              externalProvider: "outlook",
-              externalCalendarId: connection.calendarId,
-              title: event.subject || "(No subject)",
-              startTime: convertMsDateTime(event.start.dateTime, event.start.timeZone),
-              endTime: convertMsDateTime(event.end.dateTime, event.end.timeZone),
-              allDay: event.isAllDay,
-              description: event.bodyPreview,
-              location: event.location?.displayName,
-              attendees: mapAttendees(event.attendees),
-              syncedAt: Date.now(),
-            });
-            synced++;
-          }
-        }
-        deltaLink = result.deltaLink;
+        deltaLink = await fetchDeltaEvents(accessToken, connection.syncToken, applyPage);
       } catch (deltaError: unknown) {
         // If delta token expired, fall back to full sync
         const errorMessage = deltaError instanceof Error ? deltaError.message : String(deltaError);
@@ -183,28 +200,10 @@ export const syncFromOutlook = internalAction({
       const startDateTime = new Date(now.getTime() - 30 * 24 * 60 * 60 * 1000).toISOString();
       const endDateTime = new Date(now.getTime() + 90 * 24 * 60 * 60 * 1000).toISOString();
 
-      const result = await fetchCalendarViewWithDelta(accessToken, startDateTime, endDateTime);
-      for (const event of result.events) {
-        await ctx.runMutation(internal.outlookCalendarDb.upsertExternalEvent, {
-          organizationId: connection.organizationId as Id<"organizations">,
-          externalEventId: event.id,
-          externalProvider: "outlook",
-          externalCalendarId: connection.calendarId,
-          title: event.subject || "(No subject)",
-          startTime: convertMsDateTime(event.start.dateTime, event.start.timeZone),
-          endTime: convertMsDateTime(event.end.dateTime, event.end.timeZone),
-          allDay: event.isAllDay,
-          description: event.bodyPreview,
-          location: event.location?.displayName,
-          attendees: mapAttendees(event.attendees),
-          syncedAt: Date.now(),
-        });
-        synced++;
-      }
-      deltaLink = result.deltaLink;
+      deltaLink = await fetchCalendarViewWithDelta(accessToken, startDateTime, endDateTime, applyPage);
     }
 
-    // Update connection with sync metadata
+    // Persist the deltaLink (in syncToken, like Google's sync token) for the next incremental run
     await ctx.runMutation(internal.outlookCalendarDb.updateConnectionSync, {
       connectionId: args.connectionId,
       lastSyncAt: Date.now(),
@@ -368,47 +367,95 @@ export const deleteFromOutlook = internalAction({
 });
 
 // ============================================
-// SYNC ALL CONNECTIONS (CRON TARGET)
+// BATCHED PUSH TO OUTLOOK
 // ============================================
 
 /**
- * Sync all active Outlook connections. Called by cron job.
- * Processes in batches of 5 to avoid overwhelming the API.
+ * Push several local events to Outlook through Graph JSON batching.
+ * Creates or updates each event like pushToOutlook and deletes the given
+ * Outlook event IDs, GRAPH_BATCH_LIMIT calls per HTTP request. Failures are
+ * reported per event instead of failing the batch.
+ * Called by calendarSync.flushPushQueue.
  */
-export const syncAllOutlookConnections = internalAction({
-  args: {},
-  handler: async (ctx): Promise<{ processed: number; errors: number }> => {
-    const connections = await ctx.runQuery(
-      internal.outlookCalendarDb.getActiveOutlookConnections,
-      {}
-    );
+export const pushBatchToOutlook = internalAction({
+  args: {
+    connectionId: v.id("calendarConnections"),
+    eventIds: v.array(v.id("calendarEvents")),
+    deletes: v.optional(v.array(v.string())),
+  },
+  handler: async (
+    ctx,
+    args
+  ): Promise<Array<{ eventId: Id<"calendarEvents">; externalEventId?: string; error?: string }>> => {
+    const connection = await ctx.runQuery(internal.outlookCalendarDb.getConnection, {
+      connectionId: args.connectionId,
+    });
+    if (!connection) {
+      throw new Error("Calendar connection not found");
+    }
 
-    let processed = 0;
-    let errors = 0;
-    const batchSize = 5;
+    // Get a valid access token
+    let accessToken = connection.accessToken;
+    if (connection.expiresAt < Date.now() - 60_000) {
+      const refreshed = await ctx.runAction(internal.outlookCalendar.refreshOutlookToken, {
+        connectionId: args.connectionId,
+      });
+      accessToken = refreshed.accessToken;
+    }
 
-    for (let i = 0; i < connections.length; i += batchSize) {
-      const batch = connections.slice(i, i + batchSize);
+    const events = await ctx.runQuery(internal.calendarSync.getEventsByIds, {
+      eventIds: args.eventIds,
+    });
 
-      const results = await Promise.allSettled(
-        batch.map((conn) =>
-          ctx.runAction(internal.outlookCalendar.syncFromOutlook, {
-            connectionId: conn._id,
-          })
-        )
+    const requests: ProviderRequest[] = events.map((event) => {
+      const body = buildMsGraphEventBody(
+        event.title,
+        event.startTime,
+        event.endTime,
+        event.allDay,
+        event.description,
+        event.location
       );
+      return event.externalEventId
+        ? { method: "PATCH", path: `/me/events/${event.externalEventId}`, body }
+        : { method: "POST", path: "/me/events", body };
+    });
+    const deletes = args.deletes ?? [];
+    for (const externalEventId of deletes) {
+      requests.push({ method: "DELETE", path: `/me/events/${externalEventId}` });
+    }
+    const responses = await sendGraphBatch(accessToken, requests);
 
-      for (const result of results) {
-        if (result.status === "fulfilled") {
-          processed++;
-        } else {
-          errors++;
-          console.error("Outlook sync error:", result.reason);
-        }
+    // 404 Not Found = already deleted
+    deletes.forEach((externalEventId, i) => {
+      const response = responses[events.length + i];
+      if (response.status >= 300 && response.status !== 404) {
+        console.error("Outlook batch delete error:", externalEventId, response.status, response.body);
       }
+    });
+
+    const results: Array<{ eventId: Id<"calendarEvents">; externalEventId?: string; error?: string }> = [];
+    const pushed: Array<{ eventId: Id<"calendarEvents">; externalEventId: string }> = [];
+    events.forEach((event, i) => {
+      const response = responses[i];
+      if (response.status >= 200 && response.status < 300 && response.body?.id) {
+        results.push({ eventId: event._id, externalEventId: response.body.id });
+        pushed.push({ eventId: event._id, externalEventId: response.body.id });
+      } else {
+        console.error("Outlook batch push error:", event._id, response.status, response.body);
+        results.push({ eventId: event._id, error: `Outlook error: ${response.status}` });
+      }
+    });
+
+    if (pushed.length > 0) {
+      await ctx.runMutation(internal.calendarSync.setExternalEventIds, {
+        externalProvider: "outlook",
+        syncedAt: Date.now(),
+        events: pushed,
+      });
     }
 
-    return { processed, errors };
+    return results;
   },
 });
 
@@ -502,15 +549,48 @@ function buildMsGraphEventBody(
   return event;
 }
 
+/**
+ * Send Graph calls through the JSON $batch endpoint, GRAPH_BATCH_LIMIT per
+ * request. Responses come back in request order.
+ */
+async function sendGraphBatch(
+  accessToken: string,
+  requests: ProviderRequest[]
+): Promise<ProviderResponse[]> {
+  const responses: ProviderResponse[] = [];
+
+  for (const batch of chunk(requests, GRAPH_BATCH_LIMIT)) {
+    const response = await fetch(`${MS_GRAPH_BASE}/$batch`, {
+      method: "POST",
+      headers: {
+        Authorization: `Bearer ${accessToken}`,
+        "Content-Type": "application/json",
+      },
+      body: JSON.stringify(buildGraphBatchBody(batch)),
+    });
+
+    if (!response.ok) {
+      const errorText = await response.text();
+      console.error("Graph batch request failed:", response.status, errorText);
+      throw new Error(`Graph batch request failed: ${response.status}`);
+    }
+
+    responses.push(...parseGraphBatchResponse(await response.json(), batch.length));
+  }
+
+  return responses;
+}
+
 /**
  * Fetch calendar events using the delta API for incremental sync.
- * Uses the stored deltaLink from a previous sync.
+ * Follows pages from the stored deltaLink, handing each page to onPage,
+ * and returns the new deltaLink.
  */
 async function fetchDeltaEvents(
   accessToken: string,
-  deltaLink: string
-): Promise<{ events: Array<MsGraphEvent & { removed: boolean }>; deltaLink?: string }> {
-  const allEvents: Array<MsGraphEvent & { removed: boolean }> = [];
+  deltaLink: string,
+  onPage: (events: Array<MsGraphEvent & { removed: boolean }>) => Promise<void>
+): Promise<string | undefined> {
   let nextUrl: string | undefined = deltaLink;
   let newDeltaLink: string | undefined;
 
@@ -534,14 +614,7 @@ async function fetchDeltaEvents(
     }
 
     const data: MsGraphDeltaResponse = await response.json();
-
-    for (const item of data.value) {
-      if (item["@removed"]) {
-        allEvents.push({ ...item, removed: true });
-      } else {
-        allEvents.push({ ...item, removed: false });
-      }
-    }
+    await onPage(data.value.map((item) => ({ ...item, removed: !!item["@removed"] })));
 
     nextUrl = data["@odata.nextLink"];
     if (data["@odata.deltaLink"]) {
@@ -549,20 +622,20 @@ async function fetchDeltaEvents(
     }
   }
 
-  return { events: allEvents, deltaLink: newDeltaLink };
+  return newDeltaLink;
 }
 
 /**
  * Fetch full calendar view with delta tracking for initial sync.
  * Uses the calendarView endpoint to get all events in a date range,
- * then follows pagination and captures the deltaLink.
+ * hands each page to onPage and returns the deltaLink.
  */
 async function fetchCalendarViewWithDelta(
   accessToken: string,
   startDateTime: string,
-  endDateTime: string
-): Promise<{ events: MsGraphEvent[]; deltaLink?: string }> {
-  const allEvents: MsGraphEvent[] = [];
+  endDateTime: string,
+  onPage: (events: Array<MsGraphEvent & { removed: boolean }>) => Promise<void>
+): Promise<string | undefined> {
   const selectFields = "subject,start,end,isAllDay,bodyPreview,location,attendees,isCancelled";
 
   // Use calendarView/delta for initial sync to get a deltaLink for future incremental syncs
@@ -586,13 +659,12 @@ async function fetchCalendarViewWithDelta(
 
     const data: MsGraphDeltaResponse = await response.json();
 
-    for (const item of data.value) {
-      // Skip cancelled events on initial sync
-      if (item.isCancelled) continue;
-      if (!item["@removed"]) {
-        allEvents.push(item);
-      }
-    }
+    // Skip cancelled and removed events on initial sync
+    await onPage(
+      data.value
+        .filter((item) => !item.isCancelled && !item["@removed"])
+        .map((item) => ({ ...item, removed: false }))
+    );
 
     nextUrl = data["@odata.nextLink"];
     if (data["@odata.deltaLink"]) {
@@ -600,5 +672,5 @@ async function fetchCalendarViewWithDelta(
     }
   }
 
-  return { events: allEvents, deltaLink };
+  return deltaLink;
 }
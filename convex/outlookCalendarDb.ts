@@ -32,22 +32,6 @@ export const getConnection = internalQuery({
   },
 });
 
-/**
- * Get all active Outlook connections for sync.
- * Note: Does NOT decrypt tokens here (each sync call reads via getConnection which decrypts).
- */
-export const getActiveOutlookConnections = internalQuery({
-  args: {},
-  handler: async (ctx) => {
-    const connections = await ctx.db
-      .query("calendarConnections")
-      .withIndex("by_syncEnabled", (q) => q.eq("syncEnabled", true))
-      .collect();
-
-    return connections.filter((c) => c.provider === "outlook");
-  },
-});
-
 // ============================================
 // INTERNAL MUTATIONS (for outlookCalendar actions to write DB)
 // ============================================
@@ -95,105 +79,6 @@ export const updateConnectionSync = internalMutation({
   },
 });
 
-/**
- * Upsert an external calendar event from Outlook.
- * Matches by externalEventId + externalProvider to avoid duplicates.
- */
-export const upsertExternalEvent = internalMutation({
-  args: {
-    organizationId: v.id("organizations"),
-    externalEventId: v.string(),
-    externalProvider: v.literal("outlook"),
-    externalCalendarId: v.optional(v.string()),
-    title: v.string(),
-    startTime: v.string(),
-    endTime: v.string(),
-    allDay: v.boolean(),
-    description: v.optional(v.string()),
-    location: v.optional(v.string()),
-    attendees: v.optional(v.array(v.object({
-      email: v.string(),
-      name: v.optional(v.string()),
-      status: v.optional(v.union(
-        v.literal("accepted"), v.literal("declined"),
-        v.literal("tentative"), v.literal("pending")
-      )),
-    }))),
-    syncedAt: v.number(),
-  },
-  handler: async (ctx, args) => {
-    // Check for existing event by externalEventId + provider
-    const existing = await ctx.db
-      .query("calendarEvents")
-      .withIndex("by_externalEventId", (q) =>
-        q.eq("externalEventId", args.externalEventId).eq("externalProvider", args.externalProvider)
-      )
-      .first();
-
-    if (existing) {
-      // Update existing event
-      await ctx.db.patch(existing._id, {
-        title: args.title,
-        startTime: args.startTime,
-        endTime: args.endTime,
-        allDay: args.allDay,
-        description: args.description,
-        location: args.location,
-        attendees: args.attendees,
-        syncedAt: args.syncedAt,
-        updatedAt: Date.now(),
-        isDeleted: false, // Un-delete if it was previously removed
-      });
-      return existing._id;
-    } else {
-      // Create new external event
-      const eventId = await ctx.db.insert("calendarEvents", {
-        organizationId: args.organizationId,
-        title: args.title,
-        startTime: args.startTime,
-        endTime: args.endTime,
-        allDay: args.allDay,
-        description: args.description,
-        location: args.location,
-        eventType: "external",
-        externalEventId: args.externalEventId,
-        externalProvider: args.externalProvider,
-        externalCalendarId: args.externalCalendarId,
-        attendees: args.attendees,
-        syncedAt: args.syncedAt,
-        createdAt: Date.now(),
-      });
-      return eventId;
-    }
-  },
-});
-
-/**
- * Soft-delete an external event that was removed from Outlook.
- */
-export const softDeleteExternalEvent = internalMutation({
-  args: {
-    externalEventId: v.string(),
-    externalProvider: v.literal("outlook"),
-    organizationId: v.id("organizations"),
-  },
-  handler: async (ctx, args) => {
-    const existing = await ctx.db
-      .query("calendarEvents")
-      .withIndex("by_externalEventId", (q) =>
-        q.eq("externalEventId", args.externalEventId).eq("externalProvider", args.externalProvider)
-      )
-      .first();
-
-    if (existing && existing.organizationId === args.organizationId) {
-      await ctx.db.patch(existing._id, {
-        isDeleted: true,
-        updatedAt: Date.now(),
-      });
-    }
-  },
-});
-
 /**
  * Set the external event ID on a local event after pushing to Outlook.
  */
@@ -1,6 +1,7 @@
 import { mutation, query } from "./_generated/server";
 import { v } from "convex/values";
 import { requireAuth, requireTenant } from "./authHelpers";
+import { syncCalendarIndex } from "./calendarIndex";
 import { internal } from "./_generated/api";
 
 // Create a new plan
@@ -61,6 +62,7 @@ export const create = mutation({
         planStatus: "expired",
         updatedAt: Date.now(),
       });
+      await syncCalendarIndex(ctx, "participantPlans", plan._id);
     }
 
     const now = Date.now();
@@ -72,6 +74,7 @@ export const create = mutation({
       createdAt: now,
       updatedAt: now,
     });
+    await syncCalendarIndex(ctx, "participantPlans", planId);
 
     // Audit log: Plan created
     await ctx.runMutation(internal.auditLog.log, {
@@ -231,6 +234,7 @@ export const update = mutation({
     }
 
     await ctx.db.patch(planId, filteredUpdates);
+    await syncCalendarIndex(ctx, "participantPlans", planId);
 
     // Build changes object (only include what actually changed)
     const changes: Record<string, unknown> = {};
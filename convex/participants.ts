@@ -1,7 +1,8 @@
 import { mutation, query, internalQuery, internalMutation } from "./_generated/server";
 import { v } from "convex/values";
 import { internal } from "./_generated/api";
-import { requirePermission, requireAuth, requireTenant, requireActiveSubscription } from "./authHelpers";
+import { Doc } from "./_generated/dataModel";
+import { requirePermission, requireAuth, requireTenant, requireActiveSubscription, getAuthContext } from "./authHelpers";
 import { paginationArgs } from "./paginationHelpers";
 import {
   validateRequiredString,
@@ -12,6 +13,8 @@ import {
 } from "./validationHelpers";
 import { encryptField, decryptField, createBlindIndex, isEncrypted } from "./lib/encryption";
 import { createAlertIfNotExists } from "./alertHelpers";
+import { trackOrgStats } from "./orgStats";
+import { markDashboardStale } from "./dashboard";
 
 // Decrypt sensitive participant fields (handles both encrypted and plaintext for migration)
 async function decryptParticipantFields<T extends Record<string, any>>(p: T): Promise<T> {
@@ -131,6 +134,7 @@ export const create = mutation({
       createdAt: now,
       updatedAt: now,
     });
+    await trackOrgStats(ctx, "participants", participantId, null);
 
     // Update dwelling occupancy (only counts active participants)
     await updateDwellingOccupancy(ctx, args.dwellingId);
@@ -256,6 +260,7 @@ export const createIncomplete = mutation({
       createdAt: now,
       updatedAt: now,
     });
+    await trackOrgStats(ctx, "participants", participantId, null);
 
     // Create profile_incomplete alert
     const todayStr = new Date().toISOString().split("T")[0];
@@ -321,14 +326,8 @@ export const getAll = query({
     includeArchived: v.optional(v.boolean()),
   },
   handler: async (ctx, args) => {
-    // Get tenant context for multi-tenant isolation
-    const { organizationId } = await requireTenant(ctx, args.userId);
-
-    // Get requesting user for role-based access control
-    const requestingUser = await ctx.db.get(args.userId);
-    if (!requestingUser) {
-      throw new Error("User not found");
-    }
+    // Tenant context and requesting user (for role-based access control)
+    const { organizationId, user: requestingUser } = await getAuthContext(ctx, args.userId);
 
     // Fetch participants scoped to organization using index
     const allParticipants = await ctx.db
@@ -518,6 +517,7 @@ export const update = mutation({
     }
 
     await ctx.db.patch(participantId, filteredUpdates);
+    await trackOrgStats(ctx, "participants", participantId, participant);
 
     // Update occupancy if dwelling changed
     if (updates.dwellingId && updates.dwellingId !== oldDwellingId) {
@@ -540,6 +540,7 @@ export const update = mutation({
             status: "pending_move_in",
             updatedAt: Date.now(),
           });
+          await trackOrgStats(ctx, "participants", participantId, updated);
 
           // Resolve any active profile_incomplete alerts for this participant
           const activeAlerts = await ctx.db
@@ -611,6 +612,7 @@ export const revertToPending = mutation({
       status: "pending_move_in",
       updatedAt: Date.now(),
     });
+    await trackOrgStats(ctx, "participants", args.participantId, participant);
 
     // Update dwelling occupancy (guard for incomplete participants without dwelling)
     if (participant.dwellingId) {
@@ -650,6 +652,7 @@ export const moveIn = mutation({
       moveInDate: args.moveInDate,
       updatedAt: Date.now(),
     });
+    await trackOrgStats(ctx, "participants", args.participantId, participant);
 
     // Update dwelling occupancy (guard for incomplete participants without dwelling)
     if (participant.dwellingId) {
@@ -685,6 +688,7 @@ export const moveOut = mutation({
       moveOutDate: args.moveOutDate,
       updatedAt: Date.now(),
     });
+    await trackOrgStats(ctx, "participants", args.participantId, participant);
 
     // Update dwelling occupancy (guard for incomplete participants without dwelling)
     if (participant.dwellingId) {
@@ -716,6 +720,7 @@ export const archive = mutation({
       status: "archived",
       updatedAt: Date.now(),
     });
+    await trackOrgStats(ctx, "participants", args.participantId, participant);
 
     // Update dwelling occupancy if participant had a dwelling
     if (participant.dwellingId) {
@@ -860,6 +865,7 @@ export const recordConsent = mutation({
       consentWithdrawnBy: undefined,
       updatedAt: Date.now(),
     });
+    await markDashboardStale(ctx, organizationId);
 
     // Resolve any existing consent alerts for this participant
     const activeAlerts = await ctx.db
@@ -988,6 +994,7 @@ export const withdrawConsent = mutation({
     }
 
     await ctx.db.patch(args.participantId, updateFields);
+    await trackOrgStats(ctx, "participants", args.participantId, participant);
 
     if (participant.status === "active" && participant.dwellingId) {
       await updateDwellingOccupancy(ctx, participant.dwellingId);
@@ -1050,6 +1057,7 @@ export const renewConsent = mutation({
       consentWithdrawnBy: undefined,
       updatedAt: Date.now(),
     });
+    await markDashboardStale(ctx, organizationId);
 
     const activeAlerts = await ctx.db
       .query("alerts")
@@ -1142,9 +1150,7 @@ export const getArchivedParticipant = query({
     participantId: v.id("participants"),
   },
   handler: async (ctx, args) => {
-    const { organizationId } = await requireTenant(ctx, args.userId);
-    const user = await ctx.db.get(args.userId);
-    if (!user) throw new Error("User not found");
+    const { organizationId, user } = await getAuthContext(ctx, args.userId);
 
     // Only super-admins or org admins can access archived data
     if (!user.isSuperAdmin && user.role !== "admin") {
@@ -1210,3 +1216,49 @@ export const cleanupExpiredArchives = internalMutation({
     return { processed: deleted };
   },
 });
+
+/**
+ * Set organizationId on participants and plans created without one (AI plan
+ * import used to omit it), from the participant's dwelling and the plan's
+ * participant. Pages through one table and re-schedules itself until done;
+ * run participants first:
+ *   npx convex run participants:backfillOrganizationIds '{"table":"participants"}'
+ *   npx convex run participants:backfillOrganizationIds '{"table":"participantPlans"}'
+ */
+export const backfillOrganizationIds = internalMutation({
+  args: {
+    table: v.union(v.literal("participants"), v.literal("participantPlans")),
+    cursor: v.optional(v.string()),
+  },
+  handler: async (ctx, args) => {
+    const result = await ctx.db
+      .query(args.table)
+      .withIndex("by_organizationId", (q) => q.eq("organizationId", undefined))
+      .paginate({ numItems: 100, cursor: args.cursor ?? null });
+
+    let updated = 0;
+    for (const row of result.page) {
+      if (args.table === "participants") {
+        const participant = row as Doc<"participants">;
+        const dwelling = participant.dwellingId ? await ctx.db.get(participant.dwellingId) : null;
+        if (!dwelling?.organizationId) continue;
+        await ctx.db.patch(participant._id, { organizationId: dwelling.organizationId });
+        await trackOrgStats(ctx, "participants", participant._id, null);
+      } else {
+        const plan = row as Doc<"participantPlans">;
+        const participant = await ctx.db.get(plan.participantId);
+        if (!participant?.organizationId) continue;
+        await ctx.db.patch(plan._id, { organizationId: participant.organizationId });
+      }
+      updated++;
+    }
+
+    if (!result.isDone) {
+      await ctx.scheduler.runAfter(0, internal.participants.backfillOrganizationIds, {
+        table: args.table,
+        cursor: result.continueCursor,
+      });
+    }
+    return { updated, isDone: result.isDone };
+  },
+});
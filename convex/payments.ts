@@ -1,7 +1,7 @@
 import { mutation, query } from "./_generated/server";
 import { v } from "convex/values";
 import { internal } from "./_generated/api";
-import { requirePermission, requireTenant } from "./authHelpers";
+import { requirePermission, requireTenant, getAuthContext } from "./authHelpers";
 import { z } from "zod";
 
 // Zod schema for payment validation
@@ -173,13 +173,9 @@ export const getAll = query({
   },
   handler: async (ctx, args) => {
     // Get tenant context for multi-tenant isolation
-    const { organizationId } = await requireTenant(ctx, args.userId);
+    const { organizationId, user: requestingUser } = await getAuthContext(ctx, args.userId);
 
     // Admin or accountant permission check
-    const requestingUser = await ctx.db.get(args.userId);
-    if (!requestingUser) {
-      throw new Error("User not found");
-    }
     if (requestingUser.role !== "admin" && requestingUser.role !== "accountant") {
       throw new Error("Access denied: Admin or accountant permission required to view all payments");
     }
@@ -566,13 +562,9 @@ export const getAllPaginated = query({
     limit: v.optional(v.number()),
   },
   handler: async (ctx, args) => {
-    const { organizationId } = await requireTenant(ctx, args.userId);
+    const { organizationId, user: requestingUser } = await getAuthContext(ctx, args.userId);
 
     // Admin or accountant permission check
-    const requestingUser = await ctx.db.get(args.userId);
-    if (!requestingUser) {
-      throw new Error("User not found");
-    }
     if (requestingUser.role !== "admin" && requestingUser.role !== "accountant") {
       throw new Error("Access denied: Admin or accountant permission required to view all payments");
     }
@@ -0,0 +1,110 @@
+import { v } from "convex/values";
+import { mutation, query, internalMutation } from "./_generated/server";
+import { requireTenant } from "./authHelpers";
+
+/**
+ * Generated PDF cache
+ *
+ * Report PDFs built in the browser (src/lib/pdfExport.ts) are uploaded to
+ * file storage keyed by a SHA-256 hash of the report input. Re-exporting an
+ * unchanged report downloads the stored file instead of rebuilding it.
+ * Entries are scoped to the organization and purged after
+ * PDF_CACHE_RETENTION_DAYS by a daily cron.
+ */
+
+const PDF_CACHE_RETENTION_DAYS = 7;
+
+/**
+ * Look up a cached PDF by content hash.
+ */
+export const getCached = query({
+  args: {
+    userId: v.id("users"),
+    contentHash: v.string(),
+  },
+  handler: async (ctx, args) => {
+    const { organizationId } = await requireTenant(ctx, args.userId);
+    const entry = await ctx.db
+      .query("pdfCache")
+      .withIndex("by_organizationId_contentHash", (q) =>
+        q.eq("organizationId", organizationId).eq("contentHash", args.contentHash)
+      )
+      .first();
+    if (!entry) return null;
+
+    const url = await ctx.storage.getUrl(entry.storageId);
+    return url ? { url, byteSize: entry.byteSize } : null;
+  },
+});
+
+export const generateUploadUrl = mutation({
+  args: {
+    userId: v.id("users"),
+  },
+  handler: async (ctx, args) => {
+    await requireTenant(ctx, args.userId);
+    return await ctx.storage.generateUploadUrl();
+  },
+});
+
+/**
+ * Record an uploaded PDF under its content hash.
+ * If another export cached the same hash first, the new upload is discarded.
+ */
+export const saveCached = mutation({
+  args: {
+    userId: v.id("users"),
+    contentHash: v.string(),
+    kind: v.string(),
+    storageId: v.id("_storage"),
+  },
+  handler: async (ctx, args) => {
+    const { organizationId } = await requireTenant(ctx, args.userId);
+
+    const existing = await ctx.db
+      .query("pdfCache")
+      .withIndex("by_organizationId_contentHash", (q) =>
+        q.eq("organizationId", organizationId).eq("contentHash", args.contentHash)
+      )
+      .first();
+    if (existing) {
+      await ctx.storage.delete(args.storageId);
+      return existing._id;
+    }
+
+    const file = await ctx.db.system.get(args.storageId);
+    if (!file) {
+      throw new Error("Uploaded file not found");
+    }
+
+    return await ctx.db.insert("pdfCache", {
+      organizationId,
+      contentHash: args.contentHash,
+      kind: args.kind,
+      storageId: args.storageId,
+      byteSize: file.size,
+      createdAt: Date.now(),
+    });
+  },
+});
+
+/**
+ * Delete cached PDFs older than the retention period.
+ */
+export const cleanupExpired = internalMutation({
+  args: {},
+  handler: async (ctx): Promise<number> => {
+    const cutoff = Date.now() - PDF_CACHE_RETENTION_DAYS * 24 * 60 * 60 * 1000;
+    const expired = await ctx.db
+      .query("pdfCache")
+      .withIndex("by_createdAt", (q) => q.lt("createdAt", cutoff))
+      .take(200);
+
+    for (const entry of expired) {
+      await ctx.storage.delete(entry.storageId);
+      await ctx.db.delete(entry._id);
+    }
+
+    return expired.length;
+  },
+});
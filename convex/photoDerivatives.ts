@@ -0,0 +1,61 @@
+"use node";
+
+import { internalAction } from "./_generated/server";
+import { v } from "convex/values";
+import { internal } from "./_generated/api";
+import sharp from "sharp";
+import { DERIVATIVE_SIZES, photoTableValidator } from "./photoDerivativesHelpers";
+
+/**
+ * Generate thumbnail and medium JPEG renditions of a stored photo.
+ *
+ * Scheduled when a photo record is created (see scheduleDerivatives). EXIF
+ * orientation is applied and all metadata is dropped. JPEG is used so the
+ * medium rendition can be embedded directly by jsPDF in inspection reports.
+ */
+export const generate = internalAction({
+  args: { table: photoTableValidator, photoId: v.string() },
+  handler: async (ctx, args) => {
+    const source = await ctx.runQuery(internal.photoDerivativesHelpers.getPhotoSource, args);
+    if (!source) return;
+
+    try {
+      const original = await ctx.storage.get(source.storageId);
+      if (!original) throw new Error("Original file not found in storage");
+      const input = Buffer.from(await original.arrayBuffer());
+
+      const render = (size: { maxDimension: number; quality: number }) =>
+        sharp(input)
+          .rotate()
+          .resize({
+            width: size.maxDimension,
+            height: size.maxDimension,
+            fit: "inside",
+            withoutEnlargement: true,
+          })
+          .jpeg({ quality: size.quality, mozjpeg: true })
+          .toBuffer();
+
+      const [thumbnail, medium] = await Promise.all([
+        render(DERIVATIVE_SIZES.thumbnail),
+        render(DERIVATIVE_SIZES.medium),
+      ]);
+
+      const [thumbnailStorageId, mediumStorageId] = await Promise.all([
+        ctx.storage.store(new Blob([new Uint8Array(thumbnail)], { type: "image/jpeg" })),
+        ctx.storage.store(new Blob([new Uint8Array(medium)], { type: "image/jpeg" })),
+      ]);
+
+      await ctx.runMutation(internal.photoDerivativesHelpers.saveDerivatives, {
+        ...args,
+        thumbnailStorageId,
+        mediumStorageId,
+      });
+    } catch (err) {
+      await ctx.runMutation(internal.photoDerivativesHelpers.markDerivativesFailed, {
+        ...args,
+        error: err instanceof Error ? err.message : String(err),
+      });
+    }
+  },
+});
@@ -0,0 +1,208 @@
+import { internalQuery, internalMutation, MutationCtx, QueryCtx } from "./_generated/server";
+import { v } from "convex/values";
+import { Doc, Id } from "./_generated/dataModel";
+import { WithoutSystemFields } from "convex/server";
+import { internal } from "./_generated/api";
+
+/**
+ * Photo derivatives (thumbnail and medium renditions).
+ *
+ * Every stored inspection, maintenance and incident photo gets two JPEG
+ * renditions generated by photoDerivatives.generate (a Node action using
+ * sharp): a thumbnail for galleries and a medium size for reports and PDFs.
+ * Queries return thumbnailUrl / mediumUrl alongside the original url,
+ * falling back to the original until the renditions exist.
+ *
+ * Internal queries and mutations used by the photoDerivatives.ts action live
+ * here because "use node" files can only export actions.
+ */
+
+export type PhotoTable = "inspectionPhotos" | "maintenancePhotos" | "incidentPhotos";
+
+export const photoTableValidator = v.union(
+  v.literal("inspectionPhotos"),
+  v.literal("maintenancePhotos"),
+  v.literal("incidentPhotos")
+);
+
+// Longest edge in pixels and JPEG quality for each rendition
+export const DERIVATIVE_SIZES = {
+  thumbnail: { maxDimension: 320, quality: 70 },
+  medium: { maxDimension: 1280, quality: 80 },
+} as const;
+
+interface StoredPhoto {
+  storageId: Id<"_storage">;
+  thumbnailStorageId?: Id<"_storage">;
+  mediumStorageId?: Id<"_storage">;
+}
+
+/**
+ * Schedule rendition generation for a newly stored photo.
+ * Non-image files (e.g. incident videos) are skipped.
+ */
+export async function scheduleDerivatives(
+  ctx: MutationCtx,
+  table: PhotoTable,
+  photoId: string,
+  fileType: string,
+  delayMs = 0
+): Promise<void> {
+  if (!fileType.startsWith("image/")) return;
+  await ctx.scheduler.runAfter(delayMs, internal.photoDerivatives.generate, {
+    table,
+    photoId,
+  });
+}
+
+/**
+ * Store a copy of another table's photo (e.g. inspection item photos copied
+ * onto a maintenance request). The copy reuses the source's renditions once
+ * they are ready; otherwise its own are generated.
+ */
+export async function insertPhotoCopy<T extends PhotoTable>(
+  ctx: MutationCtx,
+  table: T,
+  source: StoredPhoto & { fileType: string; derivativesStatus?: "ready" | "failed" },
+  fields: Omit<WithoutSystemFields<Doc<T>>, "thumbnailStorageId" | "mediumStorageId" | "derivativesStatus">
+): Promise<Id<T>> {
+  const derivativesReady = source.derivativesStatus === "ready";
+  const photoId = await ctx.db.insert(table, {
+    ...fields,
+    ...(derivativesReady && {
+      thumbnailStorageId: source.thumbnailStorageId,
+      mediumStorageId: source.mediumStorageId,
+      derivativesStatus: source.derivativesStatus,
+    }),
+  } as WithoutSystemFields<Doc<T>>);
+  if (!derivativesReady) {
+    await scheduleDerivatives(ctx, table, photoId, source.fileType);
+  }
+  return photoId;
+}
+
+/**
+ * Attach original, thumbnail and medium URLs to a photo record.
+ * Missing renditions fall back to the original.
+ */
+export async function withPhotoUrls<T extends StoredPhoto>(
+  ctx: QueryCtx,
+  photo: T
+): Promise<T & { url: string | null; thumbnailUrl: string | null; mediumUrl: string | null }> {
+  const [url, thumbnailUrl, mediumUrl] = await Promise.all([
+    ctx.storage.getUrl(photo.storageId),
+    photo.thumbnailStorageId ? ctx.storage.getUrl(photo.thumbnailStorageId) : null,
+    photo.mediumStorageId ? ctx.storage.getUrl(photo.mediumStorageId) : null,
+  ]);
+  return {
+    ...photo,
+    url,
+    thumbnailUrl: thumbnailUrl ?? mediumUrl ?? url,
+    mediumUrl: mediumUrl ?? url,
+  };
+}
+
+/**
+ * Delete a photo's rendition files (call alongside deleting the original).
+ */
+export async function deletePhotoDerivatives(
+  ctx: MutationCtx,
+  photo: StoredPhoto
+): Promise<void> {
+  if (photo.thumbnailStorageId) await ctx.storage.delete(photo.thumbnailStorageId);
+  if (photo.mediumStorageId) await ctx.storage.delete(photo.mediumStorageId);
+}
+
+// ============================================
+// INTERNAL QUERIES / MUTATIONS (used by photoDerivatives.generate)
+// ============================================
+
+/**
+ * Original file details for a photo, or null if it is gone or already done.
+ */
+export const getPhotoSource = internalQuery({
+  args: { table: photoTableValidator, photoId: v.string() },
+  handler: async (ctx, args) => {
+    const id = ctx.db.normalizeId(args.table, args.photoId);
+    if (!id) return null;
+    const photo = await ctx.db.get(id);
+    if (!photo || photo.derivativesStatus === "ready") return null;
+    return { storageId: photo.storageId, fileType: photo.fileType };
+  },
+});
+
+/**
+ * Record generated renditions. If the photo was deleted while they were
+ * being generated, the new files are removed instead.
+ */
+export const saveDerivatives = internalMutation({
+  args: {
+    table: photoTableValidator,
+    photoId: v.string(),
+    thumbnailStorageId: v.id("_storage"),
+    mediumStorageId: v.id("_storage"),
+  },
+  handler: async (ctx, args) => {
+    const id = ctx.db.normalizeId(args.table, args.photoId);
+    const photo = id ? await ctx.db.get(id) : null;
+    if (!id || !photo) {
+      await ctx.storage.delete(args.thumbnailStorageId);
+      await ctx.storage.delete(args.mediumStorageId);
+      return;
+    }
+
+    // Replace renditions from an earlier run, if any
+    await deletePhotoDerivatives(ctx, photo);
+    await ctx.db.patch(id, {
+      thumbnailStorageId: args.thumbnailStorageId,
+      mediumStorageId: args.mediumStorageId,
+      derivativesStatus: "ready",
+    });
+  },
+});
+
+/**
+ * Record that renditions could not be generated (unsupported format, etc.).
+ * Queries keep serving the original.
+ */
+export const markDerivativesFailed = internalMutation({
+  args: { table: photoTableValidator, photoId: v.string(), error: v.string() },
+  handler: async (ctx, args) => {
+    const id = ctx.db.normalizeId(args.table, args.photoId);
+    if (!id) return;
+    const photo = await ctx.db.get(id);
+    if (!photo) return;
+    console.warn(`[PhotoDerivatives] ${args.table}/${args.photoId}: ${args.error}`);
+    await ctx.db.patch(id, { derivativesStatus: "failed" });
+  },
+});
+
+/**
+ * Backfill renditions for photos stored before derivatives existed.
+ * Pages through one table and re-schedules itself until done:
+ *   npx convex run photoDerivativesHelpers:backfill '{"table":"inspectionPhotos"}'
+ */
+export const backfill = internalMutation({
+  args: { table: photoTableValidator, cursor: v.optional(v.string()) },
+  handler: async (ctx, args) => {
+    const result = await ctx.db
+      .query(args.table)
+      .paginate({ numItems: 100, cursor: args.cursor ?? null });
+
+    let scheduled = 0;
+    for (const photo of result.page) {
+      if (photo.derivativesStatus) continue;
+      // Stagger generation so a backfill does not saturate the action pool
+      await scheduleDerivatives(ctx, args.table, photo._id, photo.fileType, scheduled * 500);
+      scheduled++;
+    }
+
+    if (!result.isDone) {
+      await ctx.scheduler.runAfter(scheduled * 500, internal.photoDerivativesHelpers.backfill, {
+        table: args.table,
+        cursor: result.continueCursor,
+      });
+    }
+    return { scheduled, isDone: result.isDone };
+  },
+});
@@ -1,7 +1,7 @@
 import { v } from "convex/values";
 import { mutation, query, internalMutation, internalQuery, action } from "./_generated/server";
 import { internal } from "./_generated/api";
-import { requireTenant, requirePermission, getUserFullName } from "./authHelpers";
+import { requireTenant, requirePermission, getUserFullName, getAuthContext } from "./authHelpers";
 import { callClaudeAPI, extractJSON } from "./aiUtils";
 
 // Generate a signed upload URL for policy document files
@@ -93,10 +93,8 @@ export const create = mutation({
     content: v.optional(v.string()),
   },
   handler: async (ctx, args) => {
-    const { organizationId } = await requireTenant(ctx, args.userId);
     await requirePermission(ctx, args.userId, "policies", "create");
-    const user = await ctx.db.get(args.userId);
-    if (!user) throw new Error("User not found");
+    const { organizationId, user } = await getAuthContext(ctx, args.userId);
 
     const { userId, ...policyData } = args;
     const now = Date.now();
@@ -151,10 +149,8 @@ export const update = mutation({
     content: v.optional(v.string()),
   },
   handler: async (ctx, args) => {
-    const { organizationId } = await requireTenant(ctx, args.userId);
     await requirePermission(ctx, args.userId, "policies", "update");
-    const user = await ctx.db.get(args.userId);
-    if (!user) throw new Error("User not found");
+    const { organizationId, user } = await getAuthContext(ctx, args.userId);
 
     const policy = await ctx.db.get(args.policyId);
     if (!policy) throw new Error("Policy not found");
@@ -197,10 +193,8 @@ export const remove = mutation({
     policyId: v.id("policies"),
   },
   handler: async (ctx, args) => {
-    const { organizationId } = await requireTenant(ctx, args.userId);
     await requirePermission(ctx, args.userId, "policies", "delete");
-    const user = await ctx.db.get(args.userId);
-    if (!user) throw new Error("User not found");
+    const { organizationId, user } = await getAuthContext(ctx, args.userId);
 
     const policy = await ctx.db.get(args.policyId);
     if (!policy) throw new Error("Policy not found");
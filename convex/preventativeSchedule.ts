@@ -1,6 +1,8 @@
 import { mutation, query } from "./_generated/server";
 import { v } from "convex/values";
 import { requireTenant } from "./authHelpers";
+import { syncCalendarIndex } from "./calendarIndex";
+import { markDashboardStale } from "./dashboard";
 
 // Create a new preventative maintenance schedule
 export const create = mutation({
@@ -43,6 +45,8 @@ export const create = mutation({
       createdAt: now,
       updatedAt: now,
     });
+    await syncCalendarIndex(ctx, "preventativeSchedule", scheduleId);
+    await markDashboardStale(ctx, organizationId);
 
     return scheduleId;
   },
@@ -191,6 +195,8 @@ export const update = mutation({
     }
 
     await ctx.db.patch(scheduleId, filteredUpdates);
+    await syncCalendarIndex(ctx, "preventativeSchedule", scheduleId);
+    await markDashboardStale(ctx, organizationId);
     return { success: true };
   },
 });
@@ -211,6 +217,8 @@ export const remove = mutation({
     }
 
     await ctx.db.delete(args.scheduleId);
+    await syncCalendarIndex(ctx, "preventativeSchedule", args.scheduleId);
+    await markDashboardStale(ctx, organizationId);
     return { success: true };
   },
 });
@@ -266,6 +274,8 @@ export const complete = mutation({
       nextDueDate: nextDueDateStr,
       updatedAt: Date.now(),
     });
+    await syncCalendarIndex(ctx, "preventativeSchedule", args.scheduleId);
+    await markDashboardStale(ctx, organizationId);
 
     // Optionally create a maintenance record for this completion
     if (args.createMaintenanceRecord && schedule.dwellingId) {
@@ -472,7 +482,7 @@ export const createSpecialistSchedule = mutation({
   handler: async (ctx, args) => {
     const { organizationId } = await requireTenant(ctx, args.userId);
     const now = Date.now();
-    return await ctx.db.insert("preventativeSchedule", {
+    const scheduleId = await ctx.db.insert("preventativeSchedule", {
       organizationId,
       propertyId: args.propertyId,
       dwellingId: args.dwellingId,
@@ -493,6 +503,9 @@ export const createSpecialistSchedule = mutation({
       createdAt: now,
       updatedAt: now,
     });
+    await syncCalendarIndex(ctx, "preventativeSchedule", scheduleId);
+    await markDashboardStale(ctx, organizationId);
+    return scheduleId;
   },
 });
 
@@ -610,6 +623,8 @@ export const completeSpecialistSchedule = mutation({
       notes: args.notes || schedule.notes,
       updatedAt: Date.now(),
     });
+    await syncCalendarIndex(ctx, "preventativeSchedule", args.scheduleId);
+    await markDashboardStale(ctx, organizationId);
 
     return { success: true, nextDueDate: nextDueDateStr };
   },
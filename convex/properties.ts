@@ -4,6 +4,8 @@ import { internal } from "./_generated/api";
 import { requirePermission, requireAuth, requireTenant, enforcePlanLimit, requireActiveSubscription } from "./authHelpers";
 import { paginationArgs, DEFAULT_PAGE_SIZE } from "./paginationHelpers";
 import { decryptField } from "./lib/encryption";
+import { trackOrgStats } from "./orgStats";
+import { markDashboardStale } from "./dashboard";
 
 // Create a new property
 export const create = mutation({
@@ -79,6 +81,7 @@ export const create = mutation({
       createdAt: now,
       updatedAt: now,
     });
+    await trackOrgStats(ctx, "properties", propertyId, null);
 
     // Audit log the creation
     const propertyName = args.propertyName || args.addressLine1;
@@ -285,6 +288,7 @@ export const update = mutation({
     }
 
     await ctx.db.patch(propertyId, filteredUpdates);
+    await markDashboardStale(ctx, organizationId);
 
     // Audit log the update
     await ctx.runMutation(internal.auditLog.log, {
@@ -329,6 +333,7 @@ export const remove = mutation({
       isActive: false,
       updatedAt: Date.now(),
     });
+    await trackOrgStats(ctx, "properties", args.propertyId, property);
 
     // Audit log the deletion
     await ctx.runMutation(internal.auditLog.log, {
@@ -0,0 +1,124 @@
+import { v } from "convex/values";
+import { mutation, query, internalMutation, QueryCtx } from "./_generated/server";
+
+/**
+ * Shared Rate Limit Counters
+ *
+ * Backing store for the Next.js sliding-window rate limiter
+ * (src/app/api/_lib/distributedRateLimit.ts). Each Next.js instance counts
+ * hits locally and periodically pushes the delta here, so limits hold
+ * across horizontally scaled instances and survive cold starts.
+ *
+ * Counters are stored per (key, fixed window, shard). A push only touches
+ * one randomly chosen shard row, so concurrent instances rarely contend on
+ * the same document; reads sum the shards of the current and previous
+ * window to compute the sliding-window estimate.
+ *
+ * Both functions are public (called via ConvexHttpClient) and gated by
+ * CONVEX_WEBHOOK_SECRET, the same shared secret the Stripe webhook route uses.
+ */
+
+export const RATE_LIMIT_SHARDS = 8;
+
+function verifySecret(providedSecret: string): void {
+  const expectedSecret = process.env.CONVEX_WEBHOOK_SECRET;
+  if (!expectedSecret) {
+    throw new Error("CONVEX_WEBHOOK_SECRET environment variable is not configured");
+  }
+  if (providedSecret !== expectedSecret) {
+    throw new Error("Invalid webhook secret - unauthorized access");
+  }
+}
+
+async function sumWindow(
+  ctx: QueryCtx,
+  key: string,
+  windowStart: number
+): Promise<number> {
+  const shards = await ctx.db
+    .query("rateLimitShards")
+    .withIndex("by_key_windowStart_shard", (q) =>
+      q.eq("key", key).eq("windowStart", windowStart)
+    )
+    .collect();
+  return shards.reduce((sum, s) => sum + s.count, 0);
+}
+
+/**
+ * Add locally counted hits to one shard of a fixed window.
+ * Writes only the chosen shard row to keep write contention low.
+ */
+export const recordHits = mutation({
+  args: {
+    secret: v.string(),
+    key: v.string(),
+    windowMs: v.number(),
+    windowStart: v.number(),
+    hits: v.number(),
+  },
+  handler: async (ctx, args) => {
+    verifySecret(args.secret);
+    if (args.hits <= 0) return;
+
+    const shard = Math.floor(Math.random() * RATE_LIMIT_SHARDS);
+    const existing = await ctx.db
+      .query("rateLimitShards")
+      .withIndex("by_key_windowStart_shard", (q) =>
+        q.eq("key", args.key).eq("windowStart", args.windowStart).eq("shard", shard)
+      )
+      .first();
+
+    if (existing) {
+      await ctx.db.patch(existing._id, { count: existing.count + args.hits });
+    } else {
+      await ctx.db.insert("rateLimitShards", {
+        key: args.key,
+        windowStart: args.windowStart,
+        shard,
+        count: args.hits,
+        // Still needed as the "previous window" for one more window
+        expiresAt: args.windowStart + 2 * args.windowMs,
+      });
+    }
+  },
+});
+
+/**
+ * Read the global hit totals for a key's current and previous window.
+ */
+export const getWindowCounts = query({
+  args: {
+    secret: v.string(),
+    key: v.string(),
+    windowMs: v.number(),
+    windowStart: v.number(),
+  },
+  handler: async (ctx, args) => {
+    verifySecret(args.secret);
+
+    const [current, previous] = await Promise.all([
+      sumWindow(ctx, args.key, args.windowStart),
+      sumWindow(ctx, args.key, args.windowStart - args.windowMs),
+    ]);
+    return { current, previous };
+  },
+});
+
+/**
+ * Delete counter rows whose windows can no longer affect any estimate.
+ */
+export const cleanupExpired = internalMutation({
+  args: {},
+  handler: async (ctx): Promise<number> => {
+    const expired = await ctx.db
+      .query("rateLimitShards")
+      .withIndex("by_expiresAt", (q) => q.lt("expiresAt", Date.now()))
+      .take(1000);
+
+    for (const row of expired) {
+      await ctx.db.delete(row._id);
+    }
+
+    return expired.length;
+  },
+});
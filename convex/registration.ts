@@ -5,6 +5,7 @@ import { Id } from "./_generated/dataModel";
 import bcrypt from "bcryptjs";
 import { requirePasswordComplexity } from "./lib/passwordValidation";
 import { assertValidEmail, assertValidPhone } from "./lib/validation";
+import { trackOrgStats } from "./orgStats";
 
 /**
  * Registration Module - Sprint 3 SaaS Onboarding
@@ -237,6 +238,7 @@ export const createAdminUserInternal = internalMutation({
       createdAt: now,
       updatedAt: now,
     });
+    await trackOrgStats(ctx, "users", userId, null);
 
     return userId;
   },
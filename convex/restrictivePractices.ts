@@ -3,6 +3,7 @@ import { v } from "convex/values";
 import { internal } from "./_generated/api";
 import { requirePermission, requireTenant, requireActiveSubscription } from "./authHelpers";
 import { Id } from "./_generated/dataModel";
+import { markDashboardStale } from "./dashboard";
 
 // ============================================================================
 // N1: Restrictive Practices Register — NDIS Practice Standards compliance
@@ -228,6 +229,7 @@ export const create = mutation({
       createdAt: now,
       updatedAt: now,
     });
+    await markDashboardStale(ctx, organizationId);
 
     // Audit log
     await ctx.runMutation(internal.auditLog.log, {
@@ -303,6 +305,7 @@ export const update = mutation({
     filteredUpdates.updatedAt = Date.now();
 
     await ctx.db.patch(args.id, filteredUpdates);
+    await markDashboardStale(ctx, organizationId);
 
     // Audit log
     await ctx.runMutation(internal.auditLog.log, {
@@ -343,6 +346,7 @@ export const remove = mutation({
       deletedBy: args.userId,
       updatedAt: Date.now(),
     });
+    await markDashboardStale(ctx, organizationId);
 
     await ctx.runMutation(internal.auditLog.log, {
       organizationId,
@@ -503,6 +507,7 @@ export const conductReview = mutation({
     }
 
     await ctx.db.patch(args.id, updates);
+    await markDashboardStale(ctx, organizationId);
 
     // Audit log
     await ctx.runMutation(internal.auditLog.log, {
@@ -138,6 +138,193 @@ export default defineSchema({
     .index("by_inboundEmailAddress", ["inboundEmailAddress"])
     .index("by_postmarkHashAddress", ["postmarkHashAddress"]),
 
+  // Per-organization usage counters for the super-admin console.
+  // Maintained by owning mutations via orgStats.trackOrgStats; recounted nightly.
+  organizationStats: defineTable({
+    organizationId: v.id("organizations"),
+    userCount: v.number(),
+    activeUserCount: v.number(),
+    propertyCount: v.number(),
+    activePropertyCount: v.number(),
+    dwellingCount: v.number(),
+    activeDwellingCount: v.number(),
+    participantCount: v.number(),
+    activeParticipantCount: v.number(), // active + pending_move_in
+    maintenanceCount: v.number(),
+    activeMaintenanceCount: v.number(), // not completed/cancelled
+    incidentCount: v.number(),
+    lastLoginAt: v.optional(v.number()), // Most recent login by any user in the org
+    updatedAt: v.number(),
+    reconciledAt: v.optional(v.number()), // Last full recount from source tables
+  })
+    .index("by_organizationId", ["organizationId"]),
+
+  // Daily platform-wide rollup (one row per UTC day) - super-admin time series
+  platformMetricsDaily: defineTable({
+    date: v.string(), // YYYY-MM-DD (UTC)
+    totalOrganizations: v.number(),
+    activeOrganizations: v.number(),
+    userCount: v.number(),
+    activeUserCount: v.number(),
+    propertyCount: v.number(),
+    activePropertyCount: v.number(),
+    dwellingCount: v.number(),
+    activeDwellingCount: v.number(),
+    participantCount: v.number(),
+    activeParticipantCount: v.number(),
+    maintenanceCount: v.number(),
+    activeMaintenanceCount: v.number(),
+    incidentCount: v.number(),
+    orgsByPlan: v.object({
+      starter: v.object({ count: v.number(), activeCount: v.number() }),
+      professional: v.object({ count: v.number(), activeCount: v.number() }),
+      enterprise: v.object({ count: v.number(), activeCount: v.number() }),
+    }),
+    subscriptionBreakdown: v.object({
+      active: v.number(),
+      trialing: v.number(),
+      past_due: v.number(),
+      canceled: v.number(),
+      trial_expired: v.number(),
+    }),
+    activePayingCount: v.number(),
+    mrr: v.number(),
+    createdAt: v.number(),
+  })
+    .index("by_date", ["date"]),
+
+  // Sampled production function calls from the log stream (see functionMetrics.ts)
+  functionMetricSamples: defineTable({
+    requestId: v.string(),
+    functionName: v.string(), // e.g. "communications:getThreadedView"
+    kind: v.optional(v.string()), // query | mutation | action | http_action
+    timestamp: v.number(),
+    durationMs: v.optional(v.number()),
+    docsRead: v.optional(v.number()),
+    readBytes: v.optional(v.number()),
+    failed: v.optional(v.boolean()),
+    // Only set for functions defined with instrumentedQuery/Mutation/Action
+    organizationId: v.optional(v.string()),
+    argShape: v.optional(v.string()),
+    resultBytes: v.optional(v.number()),
+  })
+    .index("by_requestId", ["requestId"])
+    .index("by_timestamp", ["timestamp"]),
+
+  // Hourly per-function rollup of functionMetricSamples - super-admin hotspots
+  functionMetrics: defineTable({
+    windowStart: v.number(), // Start of the hour (ms, UTC)
+    functionName: v.string(),
+    kind: v.optional(v.string()),
+    calls: v.number(), // Sampled calls in the window
+    failures: v.number(),
+    p50Ms: v.number(),
+    p95Ms: v.number(),
+    maxMs: v.number(),
+    p95DocsRead: v.number(),
+    maxDocsRead: v.number(),
+    p95ResultBytes: v.number(),
+    topOrganizations: v.array(v.object({ organizationId: v.string(), calls: v.number() })),
+    topArgShapes: v.array(v.object({ shape: v.string(), calls: v.number() })),
+    createdAt: v.number(),
+  })
+    .index("by_windowStart", ["windowStart"])
+    .index("by_functionName_windowStart", ["functionName", "windowStart"]),
+
+  // Materialized dashboard for each organization (see dashboard.ts)
+  dashboardSummaries: defineTable({
+    organizationId: v.id("organizations"),
+    portfolio: v.object({
+      totalProperties: v.number(),
+      totalDwellings: v.number(),
+      totalParticipants: v.number(),
+      totalVacancies: v.number(),
+      activeSdaCount: v.number(),
+      underConstructionCount: v.number(),
+      planningCount: v.number(),
+      silPropertyCount: v.number(),
+    }),
+    alerts: v.object({ active: v.number(), critical: v.number() }),
+    recentAlerts: v.array(
+      v.object({
+        alertId: v.id("alerts"),
+        severity: v.string(),
+        title: v.string(),
+        message: v.string(),
+      })
+    ),
+    tasks: v.object({
+      open: v.number(),
+      overdue: v.number(),
+      urgent: v.number(),
+      funding: v.number(),
+    }),
+    upcomingTaskCount: v.number(), // Open tasks due in the next 30 days
+    upcomingTasks: v.array(
+      v.object({
+        taskId: v.id("tasks"),
+        title: v.string(),
+        priority: v.string(),
+        category: v.string(),
+        dueDate: v.string(),
+        participantName: v.optional(v.string()),
+      })
+    ),
+    schedules: v.object({
+      overdue: v.number(),
+      dueWithin7Days: v.number(),
+      dueWithin30Days: v.number(),
+      estimatedCost30Days: v.number(),
+    }),
+    upcomingSchedules: v.array(
+      v.object({
+        scheduleId: v.id("preventativeSchedule"),
+        taskName: v.string(),
+        propertyName: v.optional(v.string()),
+        nextDueDate: v.string(),
+        estimatedCost: v.optional(v.number()),
+      })
+    ),
+    consent: v.object({
+      active: v.number(),
+      expiringSoon: v.number(),
+      expired: v.number(),
+      missing: v.number(),
+      total: v.number(),
+    }),
+    certifications: v.object({
+      total: v.number(),
+      expired: v.number(),
+      expiringSoon: v.number(),
+    }),
+    restrictivePractices: v.object({
+      activeCount: v.number(),
+      reviewsOverdue: v.number(),
+      authorisationsExpiring: v.number(),
+      unauthorised: v.number(),
+      unreported: v.number(),
+      totalRecords: v.number(),
+    }),
+    training: v.object({
+      totalRecords: v.number(),
+      expired: v.number(),
+      expiring: v.number(),
+      staffCount: v.number(),
+      compliantStaff: v.number(),
+      compliancePercentage: v.number(),
+    }),
+    computedAt: v.number(),
+    staleSince: v.optional(v.number()), // Legacy stale flag; cleared by the next rebuild (see dashboardRebuilds)
+  })
+    .index("by_organizationId", ["organizationId"]),
+
+  // Pending dashboard rebuild per organization (see dashboard.ts markDashboardStale)
+  dashboardRebuilds: defineTable({
+    organizationId: v.id("organizations"),
+    requestedAt: v.number(),
+  })
+    .index("by_organizationId", ["organizationId"]),
+
   // Audit Logs table - track all user actions for security and compliance
   auditLogs: defineTable({
     organizationId: v.optional(v.id("organizations")), // Multi-tenant: Organization this audit log belongs to
@@ -382,6 +569,8 @@ export default defineSchema({
     .index("by_status", ["status"])
     .index("by_dwelling_status", ["dwellingId", "status"])
     .index("by_organizationId", ["organizationId"])
+    .index("by_organizationId_status", ["organizationId", "status"])
+    .index("by_organizationId_updatedAt", ["organizationId", "updatedAt"])
     .index("by_consentStatus", ["consentStatus"]),
 
   // Participant Plans table - NDIS plan details
@@ -442,7 +631,8 @@ export default defineSchema({
     .index("by_participant", ["participantId"])
     .index("by_status", ["planStatus"])
     .index("by_participant_status", ["participantId", "planStatus"])
-    .index("by_organizationId", ["organizationId"]),
+    .index("by_organizationId", ["organizationId"])
+    .index("by_organizationId_planStatus", ["organizationId", "planStatus"]),
 
   // Payments table - SDA payments received
   payments: defineTable({
@@ -664,7 +854,9 @@ export default defineSchema({
     .index("by_status_priority", ["status", "priority"])
     .index("by_inspection", ["inspectionId"])
     .index("by_maintenanceCategory", ["maintenanceCategory"])
-    .index("by_organizationId", ["organizationId"]),
+    .index("by_organizationId", ["organizationId"])
+    .index("by_organizationId_status", ["organizationId", "status"])
+    .index("by_organizationId_updatedAt", ["organizationId", "updatedAt"]),
 
   // Maintenance Photos table - photos attached to maintenance requests
   maintenancePhotos: defineTable({
@@ -683,6 +875,9 @@ export default defineSchema({
     ),
     uploadedBy: v.id("users"),
     createdAt: v.number(),
+    thumbnailStorageId: v.optional(v.id("_storage")), // Gallery rendition (see photoDerivativesHelpers)
+    mediumStorageId: v.optional(v.id("_storage")), // Report/PDF rendition
+    derivativesStatus: v.optional(v.union(v.literal("ready"), v.literal("failed"))),
   })
     .index("by_maintenance_request", ["maintenanceRequestId"])
     .index("by_organizationId", ["organizationId"]),
@@ -986,7 +1181,8 @@ export default defineSchema({
     .index("by_status_alertType", ["status", "alertType"])
     .index("by_participant", ["linkedParticipantId"])
     .index("by_property", ["linkedPropertyId"])
-    .index("by_organizationId", ["organizationId"]),
+    .index("by_organizationId", ["organizationId"])
+    .index("by_organizationId_status", ["organizationId", "status"]),
 
   // Incidents table - incident reports for properties/participants
   incidents: defineTable({
@@ -1072,7 +1268,9 @@ export default defineSchema({
     .index("by_ndisNotificationStatus", ["ndisNotificationStatus"])
     .index("by_property_status", ["propertyId", "status"])
     .index("by_property_severity", ["propertyId", "severity"])
-    .index("by_organizationId", ["organizationId"]),
+    .index("by_organizationId", ["organizationId"])
+    .index("by_organizationId_status", ["organizationId", "status"])
+    .index("by_organizationId_updatedAt", ["organizationId", "updatedAt"]),
 
   // Incident Photos table
   incidentPhotos: defineTable({
@@ -1085,6 +1283,9 @@ export default defineSchema({
     description: v.optional(v.string()),
     uploadedBy: v.id("users"),
     createdAt: v.number(),
+    thumbnailStorageId: v.optional(v.id("_storage")), // Gallery rendition (see photoDerivativesHelpers)
+    mediumStorageId: v.optional(v.id("_storage")), // Report/PDF rendition
+    derivativesStatus: v.optional(v.union(v.literal("ready"), v.literal("failed"))),
   })
     .index("by_incident", ["incidentId"])
     .index("by_organizationId", ["organizationId"]),
@@ -1219,6 +1420,7 @@ export default defineSchema({
     updatedAt: v.number(),
   })
     .index("by_inspection", ["inspectionId"])
+    .index("by_inspection_status", ["inspectionId", "status"])
     .index("by_status", ["status"])
     .index("by_organizationId", ["organizationId"]),
 
@@ -1235,6 +1437,9 @@ export default defineSchema({
     isGeneralPhoto: v.optional(v.boolean()), // True for photos not tied to items
     uploadedBy: v.id("users"),
     createdAt: v.number(),
+    thumbnailStorageId: v.optional(v.id("_storage")), // Gallery rendition (see photoDerivativesHelpers)
+    mediumStorageId: v.optional(v.id("_storage")), // Report/PDF rendition
+    derivativesStatus: v.optional(v.union(v.literal("ready"), v.literal("failed"))),
   })
     .index("by_inspection", ["inspectionId"])
     .index("by_item", ["inspectionItemId"])
@@ -1280,6 +1485,47 @@ export default defineSchema({
     .index("by_isActive", ["isActive"])
     .index("by_organizationId", ["organizationId"]),
 
+  // AI assistant reply and tool-result cache (see aiCache.ts)
+  aiCacheEntries: defineTable({
+    organizationId: v.id("organizations"),
+    key: v.string(), // "response:<question>" or "tool:<name>:<input>"
+    dataVersion: v.number(), // organizationStats.updatedAt when written
+    response: v.string(),
+    createdAt: v.number(),
+    expiresAt: v.number(),
+  })
+    .index("by_organizationId_key", ["organizationId", "key"])
+    .index("by_expiresAt", ["expiresAt"]),
+
+  // Streamed partial replies for in-flight AI assistant turns (deleted when the turn ends)
+  aiReplyDrafts: defineTable({
+    userId: v.id("users"),
+    requestId: v.string(), // Client-generated per message
+    content: v.string(),
+    updatedAt: v.number(),
+  })
+    .index("by_user_requestId", ["userId", "requestId"])
+    .index("by_updatedAt", ["updatedAt"]),
+
+  // Per-turn latency and token usage for the AI assistant
+  aiTurnMetrics: defineTable({
+    organizationId: v.optional(v.id("organizations")),
+    userId: v.id("users"),
+    toolName: v.optional(v.string()),
+    responseCacheHit: v.boolean(),
+    toolCacheHit: v.boolean(),
+    modelLatencyMs: v.number(),
+    toolLatencyMs: v.number(),
+    totalLatencyMs: v.number(),
+    inputTokens: v.number(),
+    outputTokens: v.number(),
+    cacheCreationInputTokens: v.number(), // Prompt-prefix cache writes
+    cacheReadInputTokens: v.number(), // Prompt-prefix cache reads
+    createdAt: v.number(),
+  })
+    .index("by_organizationId_createdAt", ["organizationId", "createdAt"])
+    .index("by_createdAt", ["createdAt"]),
+
   // Contractors table - trade contractors for maintenance work
   contractors: defineTable({
     organizationId: v.optional(v.id("organizations")), // Multi-tenant: Organization this record belongs to
@@ -1842,7 +2088,8 @@ export default defineSchema({
     .index("by_participant", ["participantId"])
     .index("by_property", ["propertyId"])
     .index("by_owner", ["ownerId"])
-    .index("by_organizationId", ["organizationId"]),
+    .index("by_organizationId", ["organizationId"])
+    .index("by_organizationId_periodMonth", ["organizationId", "periodMonth"]),
 
   // Payment Schedules table - recurring payment configurations
   paymentSchedules: defineTable({
@@ -2166,7 +2413,11 @@ export default defineSchema({
     .index("by_source", ["source"])
     .index("by_acknowledgmentDueDate", ["acknowledgmentDueDate"])
     .index("by_resolutionDueDate", ["resolutionDueDate"])
-    .index("by_organizationId", ["organizationId"]),
+    .index("by_organizationId", ["organizationId"])
+    .index("by_organizationId_receivedDate", ["organizationId", "receivedDate"])
+    .index("by_organizationId_status_receivedDate", ["organizationId", "status", "receivedDate"])
+    .index("by_organizationId_category_receivedDate", ["organizationId", "category", "receivedDate"])
+    .index("by_organizationId_severity_receivedDate", ["organizationId", "severity", "receivedDate"]),
 
   // ============================================
   // COMMUNICATIONS & TASKS TABLES
@@ -2328,6 +2579,9 @@ export default defineSchema({
     .index("by_isDeleted", ["isDeleted"])
     .index("by_organizationId", ["organizationId"])
     .index("by_org_contactName", ["organizationId", "contactName"])
+    .index("by_organizationId_date", ["organizationId", "communicationDate"])
+    .index("by_organizationId_contactType_date", ["organizationId", "contactType", "communicationDate"])
+    .index("by_organizationId_updatedAt", ["organizationId", "updatedAt"])
     .index("by_postmarkMessageId", ["postmarkMessageId"]),
 
   // Thread summaries table - performance cache for thread views
@@ -2345,11 +2599,20 @@ export default defineSchema({
     complianceCategories: v.array(v.string()),
     requiresAction: v.boolean(),
     status: v.optional(v.union(v.literal("active"), v.literal("completed"), v.literal("archived"))),
+    // Incremental counters (see convex/lib/threadSummaryCounters.ts); absent on
+    // summaries written before they existed, which are rebuilt on next change
+    unreadCount: v.optional(v.number()),
+    requiresActionCount: v.optional(v.number()),
+    categoryCounts: v.optional(v.array(v.object({
+      category: v.string(),
+      count: v.number(),
+    }))),
   })
     .index("by_participant_activity", ["participantId", "lastActivityAt"])
     .index("by_thread", ["threadId"])
     .index("by_status_activity", ["status", "lastActivityAt"])
-    .index("by_organizationId", ["organizationId"]),
+    .index("by_organizationId", ["organizationId"])
+    .index("by_organizationId_activity", ["organizationId", "lastActivityAt"]),
 
   // Tasks table - follow-up tasks and action items
   tasks: defineTable({
@@ -2538,6 +2801,17 @@ export default defineSchema({
     .index("by_organizationId", ["organizationId"])
     .index("by_isActive", ["isActive"]),
 
+  // Rate limit counters shared across Next.js instances (sliding window, sharded)
+  rateLimitShards: defineTable({
+    key: v.string(), // e.g. "api:<keyId>" or "complaints_hourly:<ip>"
+    windowStart: v.number(), // Start of the fixed window (ms)
+    shard: v.number(), // 0..RATE_LIMIT_SHARDS-1
+    count: v.number(),
+    expiresAt: v.number(), // windowStart + 2 * windowMs
+  })
+    .index("by_key_windowStart_shard", ["key", "windowStart", "shard"])
+    .index("by_expiresAt", ["expiresAt"]),
+
   // Email Forwarders - maps approved sender emails to org+user for inbound email processing
   emailForwarders: defineTable({
     organizationId: v.id("organizations"),
@@ -2549,6 +2823,38 @@ export default defineSchema({
     .index("by_email", ["email"])
     .index("by_organizationId", ["organizationId"]),
 
+  // Inbound email ingestion queue - raw Postmark payloads awaiting batch processing (inboundEmailQueue.ts)
+  inboundEmailQueue: defineTable({
+    fromEmail: v.string(),
+    fromName: v.string(),
+    toAddress: v.string(),
+    subject: v.string(),
+    textBody: v.string(),
+    strippedReply: v.optional(v.string()),
+    emailDate: v.optional(v.string()),
+    postmarkMessageId: v.optional(v.string()), // Deduplication key
+    status: v.union(v.literal("pending"), v.literal("processed"), v.literal("failed")),
+    error: v.optional(v.string()),
+    communicationId: v.optional(v.id("communications")), // Set once processed
+    attachmentCount: v.number(), // Attachments received with the payload
+    attachmentStorageIds: v.optional(v.array(v.string())), // Uploaded by the webhook before enqueueing
+    attachmentMetadata: v.optional(v.array(v.object({
+      fileName: v.string(),
+      fileSize: v.number(),
+      fileType: v.string(),
+      uploadedAt: v.number()
+    }))),
+    receivedAt: v.number(),
+    processedAt: v.optional(v.number()),
+  })
+    .index("by_postmarkMessageId", ["postmarkMessageId"])
+    .index("by_status_receivedAt", ["status", "receivedAt"]),
+
+  // Single row held while an inboundEmailQueue processBatch chain runs
+  inboundEmailQueueLease: defineTable({
+    expiresAt: v.number(), // A chain that stops without releasing it is restarted after this
+  }),
+
   // Emergency Management Plans - per-property emergency procedures (NDIS compliance)
   emergencyManagementPlans: defineTable({
     organizationId: v.id("organizations"),
@@ -2753,6 +3059,36 @@ export default defineSchema({
     .index("by_linkedTask", ["linkedTaskId"])
     .index("by_createdBy", ["createdBy"]),
 
+  // Unified calendar index - one row per (calendar entry, day), maintained by
+  // the owning mutations via calendarIndex.syncCalendarIndex so the calendar
+  // view is a single date-range read instead of ten full table scans
+  calendarIndex: defineTable({
+    organizationId: v.id("organizations"),
+    date: v.string(),                // YYYY-MM-DD bucket (multi-day events get one row per day)
+    eventType: v.string(),           // task, maintenance, preventative, inspection, plan_expiry, ...
+    propertyId: v.optional(v.id("properties")),
+    matchesAllProperties: v.optional(v.boolean()), // Shown under every property filter (no property of its own)
+    sourceTable: v.string(),         // Owning table (calendarEvents, tasks, ...)
+    sourceId: v.string(),            // Owning document _id
+    entryKey: v.string(),            // Stable event id returned to the UI (e.g. `${complaintId}_ack`)
+    title: v.string(),
+    start: v.string(),
+    end: v.string(),
+    allDay: v.boolean(),
+    color: v.string(),
+    linkedEntityId: v.union(v.string(), v.null()),
+    linkedEntityType: v.union(v.string(), v.null()),
+    url: v.union(v.string(), v.null()),
+    longSpan: v.optional(v.boolean()), // Spans more than MAX_SPAN_DAYS: single row on its start day
+  })
+    .index("by_organizationId_date", ["organizationId", "date"])
+    .index("by_organizationId_eventType_date", ["organizationId", "eventType", "date"])
+    .index("by_organizationId_propertyId_date", ["organizationId", "propertyId", "date"])
+    .index("by_organizationId_matchesAllProperties_date", ["organizationId", "matchesAllProperties", "date"])
+    .index("by_organizationId_longSpan_date", ["organizationId", "longSpan", "date"])
+    .index("by_organizationId_sourceTable", ["organizationId", "sourceTable"])
+    .index("by_sourceId", ["sourceId"]),
+
   // ============================================
   // WEBHOOKS TABLES
   // ============================================
@@ -2770,11 +3106,55 @@ export default defineSchema({
     lastTriggeredAt: v.optional(v.number()), // Last successful delivery timestamp
     failureCount: v.number(), // Consecutive failure count (resets on success)
     lastError: v.optional(v.string()), // Last error message
+    consecutiveAttemptFailures: v.optional(v.number()), // Circuit breaker: failed attempts in a row
+    circuitOpenUntil: v.optional(v.number()), // Circuit breaker: deliveries paused until this time
+    inFlightCount: v.optional(v.number()), // Queued deliveries currently being attempted (concurrency cap)
   })
     .index("by_organizationId", ["organizationId"])
     .index("by_isActive", ["isActive"])
     .index("by_organizationId_isActive", ["organizationId", "isActive"]),
 
+  // Offline sync idempotency receipts - keys of offline changes already
+  // applied by offlineSync.applyBatch or incidents.create (purged after 7 days)
+  offlineSyncReceipts: defineTable({
+    organizationId: v.id("organizations"),
+    key: v.string(), // Client-generated idempotency key
+    entityId: v.optional(v.string()), // Record created for the key (replayed incidents)
+    createdAt: v.number(),
+  })
+    .index("by_organizationId_key", ["organizationId", "key"])
+    .index("by_createdAt", ["createdAt"]),
+
+  // Generated report PDFs keyed by a hash of their input (see pdfCache.ts)
+  pdfCache: defineTable({
+    organizationId: v.id("organizations"),
+    contentHash: v.string(), // SHA-256 of the report input
+    kind: v.string(), // thread, inspection, complaintsRegister, auditCompliance
+    storageId: v.id("_storage"),
+    byteSize: v.number(),
+    createdAt: v.number(),
+  })
+    .index("by_organizationId_contentHash", ["organizationId", "contentHash"])
+    .index("by_createdAt", ["createdAt"]),
+
+  // Webhook delivery queue - pending/in-flight deliveries with retry state.
+  // Rows are removed once delivered or finally failed (see webhookDeliveries).
+  webhookQueue: defineTable({
+    webhookId: v.id("webhooks"),
+    organizationId: v.id("organizations"),
+    event: v.string(),
+    payloadBody: v.string(), // Exact JSON body to sign and send
+    timestamp: v.string(), // Event time (seconds); each attempt is re-signed with its own timestamp
+    status: v.union(v.literal("pending"), v.literal("in_flight")),
+    attemptCount: v.number(),
+    nextAttemptAt: v.number(),
+    claimedAt: v.optional(v.number()),
+    lastError: v.optional(v.string()),
+    createdAt: v.number(),
+  })
+    .index("by_status_nextAttemptAt", ["status", "nextAttemptAt"])
+    .index("by_webhookId_status_nextAttemptAt", ["webhookId", "status", "nextAttemptAt"]),
+
   // Webhook Deliveries table - log of all delivery attempts
   webhookDeliveries: defineTable({
     webhookId: v.id("webhooks"),
@@ -2813,6 +3193,16 @@ export default defineSchema({
     .index("by_userId_provider", ["userId", "provider"])
     .index("by_syncEnabled", ["syncEnabled"]),
 
+  // Local calendar edits waiting to be pushed to a connection (see calendarSync.ts)
+  calendarPushQueue: defineTable({
+    connectionId: v.id("calendarConnections"),
+    eventId: v.id("calendarEvents"),
+    action: v.union(v.literal("upsert"), v.literal("delete")),
+    externalEventId: v.optional(v.string()), // Provider event to delete
+    queuedAt: v.number(),
+  })
+    .index("by_connectionId_eventId", ["connectionId", "eventId"]),
+
   // Support Tickets - customer-facing issue tracking with SLA
   supportTickets: defineTable({
     organizationId: v.id("organizations"),
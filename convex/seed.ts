@@ -2,6 +2,7 @@ import { mutation, action, internalMutation } from "./_generated/server";
 import { v } from "convex/values";
 import { internal } from "./_generated/api";
 import bcrypt from "bcryptjs";
+import { insertPhotoCopy } from "./photoDerivativesHelpers";
 
 /**
  * Seed Script - Sprint 1 Organization Migration
@@ -1259,7 +1260,7 @@ export const backfillInspectionPhotos = mutation({
           continue;
         }
 
-        await ctx.db.insert("maintenancePhotos", {
+        await insertPhotoCopy(ctx, "maintenancePhotos", photo, {
           maintenanceRequestId: mr._id,
           organizationId: mr.organizationId,
           storageId: photo.storageId,
@@ -1,6 +1,8 @@
 import { v } from "convex/values";
 import { mutation, query } from "./_generated/server";
 import { Id } from "./_generated/dataModel";
+import { syncCalendarIndex } from "./calendarIndex";
+import { trackOrgStats } from "./orgStats";
 
 // ============================================
 // SIL PROVIDER PORTAL - RESTRICTED ACCESS QUERIES
@@ -392,6 +394,7 @@ export const createIncident = mutation({
       createdAt: now,
       updatedAt: now,
     });
+    await trackOrgStats(ctx, "incidents", incidentId, null);
 
     return incidentId;
   },
@@ -566,6 +569,8 @@ export const createMaintenanceRequest = mutation({
       createdAt: now,
       updatedAt: now,
     });
+    await trackOrgStats(ctx, "maintenanceRequests", requestId, null);
+    await syncCalendarIndex(ctx, "maintenanceRequests", requestId);
 
     return requestId;
   },
@@ -4,6 +4,7 @@ import { Id } from "./_generated/dataModel";
 import { internal } from "./_generated/api";
 import { requirePermission, requireAuth, getUserFullName, requireTenant } from "./authHelpers";
 import { assertValidEmail, assertValidPhone } from "./lib/validation";
+import { trackOrgStats } from "./orgStats";
 
 // Predefined Sydney regions (same as support coordinators)
 export const SYDNEY_REGIONS = [
@@ -706,6 +707,7 @@ export const createProviderUser = mutation({
       createdAt: now,
       updatedAt: now,
     });
+    await trackOrgStats(ctx, "users", userId, null);
 
     return userId;
   },
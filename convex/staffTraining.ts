@@ -2,13 +2,14 @@ import { mutation, query } from "./_generated/server";
 import { v } from "convex/values";
 import { internal } from "./_generated/api";
 import { requirePermission, requireTenant, requireActiveSubscription } from "./authHelpers";
+import { markDashboardStale } from "./dashboard";
 
 // ============================================================================
 // N4: Staff Training & Competency Tracking
 // ============================================================================
 
 // Mandatory training categories for NDIS workers
-const MANDATORY_TRAINING = [
+export const MANDATORY_TRAINING = [
   "ndis_orientation",
   "first_aid",
   "manual_handling",
@@ -269,6 +270,7 @@ export const create = mutation({
       createdAt: now,
       updatedAt: now,
     });
+    await markDashboardStale(ctx, organizationId);
 
     // Audit log
     await ctx.runMutation(internal.auditLog.log, {
@@ -320,6 +322,7 @@ export const update = mutation({
     filteredUpdates.updatedAt = Date.now();
 
     await ctx.db.patch(args.id, filteredUpdates);
+    await markDashboardStale(ctx, organizationId);
 
     await ctx.runMutation(internal.auditLog.log, {
       organizationId,
@@ -354,6 +357,7 @@ export const remove = mutation({
     }
 
     await ctx.db.delete(args.id);
+    await markDashboardStale(ctx, organizationId);
 
     await ctx.runMutation(internal.auditLog.log, {
       organizationId,
@@ -1,6 +1,9 @@
 import { v } from "convex/values";
 import { query, mutation, QueryCtx, MutationCtx } from "./_generated/server";
 import { Id } from "./_generated/dataModel";
+import { internal } from "./_generated/api";
+import { getOrgStats, EMPTY_ORG_STATS, emptyPlatformSnapshot, PLAN_PRICES } from "./orgStats";
+import { rankHotspots } from "./lib/functionMetrics";
 
 /**
  * Super-Admin Module - Platform-level administration for MySDAManager SaaS
@@ -42,7 +45,8 @@ async function requireSuperAdmin(
 /**
  * Get all organizations with enriched usage stats.
  * Returns org details + counts of users, properties, dwellings, participants,
- * active maintenance requests, incidents, and the most recent user login timestamp.
+ * active maintenance requests, incidents, and the most recent user login timestamp
+ * (read from organizationStats rather than counting each org's tables).
  * Sorted by most recent activity (last login) descending.
  */
 export const getAllOrganizations = query({
@@ -54,84 +58,26 @@ export const getAllOrganizations = query({
 
     const organizations = await ctx.db.query("organizations").collect();
 
-    // Build enriched org list with stats
+    // Build enriched org list from the per-org counter rows (one read per org)
     const enrichedOrgs = await Promise.all(
       organizations.map(async (org) => {
-        // Count users in this org
-        const users = await ctx.db
-          .query("users")
-          .withIndex("by_organizationId", (q) =>
-            q.eq("organizationId", org._id)
-          )
-          .collect();
-
-        // Count properties in this org
-        const properties = await ctx.db
-          .query("properties")
-          .withIndex("by_organizationId", (q) =>
-            q.eq("organizationId", org._id)
-          )
-          .collect();
-
-        // Count dwellings in this org
-        const dwellings = await ctx.db
-          .query("dwellings")
-          .withIndex("by_organizationId", (q) =>
-            q.eq("organizationId", org._id)
-          )
-          .collect();
-
-        // Count participants in this org
-        const participants = await ctx.db
-          .query("participants")
-          .withIndex("by_organizationId", (q) =>
-            q.eq("organizationId", org._id)
-          )
-          .collect();
-
-        // Count active maintenance requests
-        const maintenanceRequests = await ctx.db
-          .query("maintenanceRequests")
-          .withIndex("by_organizationId", (q) =>
-            q.eq("organizationId", org._id)
-          )
-          .collect();
-        const activeMaintenanceCount = maintenanceRequests.filter(
-          (m) => m.status !== "completed" && m.status !== "cancelled"
-        ).length;
-
-        // Count incidents
-        const incidents = await ctx.db
-          .query("incidents")
-          .withIndex("by_organizationId", (q) =>
-            q.eq("organizationId", org._id)
-          )
-          .collect();
-
-        // Find most recent user login in this org
-        const lastLoginTimestamp = users.reduce<number | null>((latest, u) => {
-          if (!u.lastLogin) return latest;
-          if (latest === null) return u.lastLogin;
-          return u.lastLogin > latest ? u.lastLogin : latest;
-        }, null);
+        const stats = await getOrgStats(ctx, org._id);
+        const counts = stats ?? EMPTY_ORG_STATS;
 
         return {
           ...org,
           stats: {
-            userCount: users.length,
-            activeUserCount: users.filter((u) => u.isActive).length,
-            propertyCount: properties.length,
-            activePropertyCount: properties.filter((p) => p.isActive !== false)
-              .length,
-            dwellingCount: dwellings.length,
-            participantCount: participants.length,
-            activeParticipantCount: participants.filter(
-              (p) => p.status === "active" || p.status === "pending_move_in"
-            ).length,
-            activeMaintenanceCount,
-            incidentCount: incidents.length,
+            userCount: counts.userCount,
+            activeUserCount: counts.activeUserCount,
+            propertyCount: counts.propertyCount,
+            activePropertyCount: counts.activePropertyCount,
+            dwellingCount: counts.dwellingCount,
+            participantCount: counts.participantCount,
+            activeParticipantCount: counts.activeParticipantCount,
+            activeMaintenanceCount: counts.activeMaintenanceCount,
+            incidentCount: counts.incidentCount,
           },
-          lastLoginTimestamp,
+          lastLoginTimestamp: stats?.lastLoginAt ?? null,
         };
       })
     );
@@ -359,7 +305,9 @@ export const getOrganizationDetail = query({
 
 /**
  * Get platform-level metrics for the super-admin dashboard.
- * Aggregates counts across all organizations.
+ * Serves the latest platformMetricsDaily rollup (a single read). The rollup is
+ * refreshed hourly, so `computedAt` is returned for the UI to show its age;
+ * it is null (and the counts zero) until the first rollup has run.
  */
 export const getPlatformMetrics = query({
   args: {
@@ -368,67 +316,118 @@ export const getPlatformMetrics = query({
   handler: async (ctx, args) => {
     await requireSuperAdmin(ctx, args.userId);
 
-    // Count organizations
-    const organizations = await ctx.db.query("organizations").collect();
-    const activeOrganizations = organizations.filter((o) => o.isActive);
+    const latest = await ctx.db
+      .query("platformMetricsDaily")
+      .withIndex("by_date")
+      .order("desc")
+      .first();
+    const snapshot = latest ?? emptyPlatformSnapshot();
 
-    // Count all users across all orgs
-    const allUsers = await ctx.db.query("users").collect();
-    const activeUsers = allUsers.filter((u) => u.isActive);
+    return {
+      totalOrganizations: snapshot.totalOrganizations,
+      activeOrganizations: snapshot.activeOrganizations,
+      totalUsers: snapshot.userCount,
+      activeUsers: snapshot.activeUserCount,
+      totalProperties: snapshot.propertyCount,
+      totalDwellings: snapshot.dwellingCount,
+      totalParticipants: snapshot.participantCount,
+      revenueByPlan: snapshot.orgsByPlan,
+      subscriptionBreakdown: {
+        active: snapshot.subscriptionBreakdown.active,
+        trialing: snapshot.subscriptionBreakdown.trialing,
+        past_due: snapshot.subscriptionBreakdown.past_due,
+        canceled: snapshot.subscriptionBreakdown.canceled,
+      },
+      computedAt: latest?.createdAt ?? null,
+    };
+  },
+});
 
-    // Count all properties across all orgs
-    const allProperties = await ctx.db.query("properties").collect();
+/**
+ * Get the daily platform rollup as a time series for growth trend charts.
+ * Returns up to `days` most recent daily rows, oldest first.
+ */
+export const getPlatformMetricsHistory = query({
+  args: {
+    userId: v.id("users"),
+    days: v.optional(v.number()), // Default 90, max 730
+  },
+  handler: async (ctx, args) => {
+    await requireSuperAdmin(ctx, args.userId);
 
-    // Count all dwellings across all orgs
-    const allDwellings = await ctx.db.query("dwellings").collect();
+    const days = Math.min(Math.max(args.days ?? 90, 1), 730);
+    const rows = await ctx.db
+      .query("platformMetricsDaily")
+      .withIndex("by_date")
+      .order("desc")
+      .take(days);
+
+    return rows.reverse().map((r) => ({
+      date: r.date,
+      totalOrganizations: r.totalOrganizations,
+      activeOrganizations: r.activeOrganizations,
+      activePayingCount: r.activePayingCount,
+      mrr: r.mrr,
+      users: r.userCount,
+      activeUsers: r.activeUserCount,
+      properties: r.propertyCount,
+      dwellings: r.dwellingCount,
+      participants: r.participantCount,
+      activeParticipants: r.activeParticipantCount,
+    }));
+  },
+});
 
-    // Count all participants across all orgs
-    const allParticipants = await ctx.db.query("participants").collect();
+/**
+ * Get the Convex functions with the worst production latency, read volume or
+ * call count over the last `hours`, from the hourly functionMetrics rollups
+ * (see functionMetrics.ts). Each row includes the busiest organizations and
+ * argument shapes for functions defined with the instrumented builders.
+ */
+export const getFunctionHotspots = query({
+  args: {
+    userId: v.id("users"),
+    hours: v.optional(v.number()), // Default 24, max 48
+    sortBy: v.optional(
+      v.union(v.literal("totalTime"), v.literal("p95"), v.literal("docsRead"), v.literal("calls"))
+    ),
+    limit: v.optional(v.number()), // Default 25, max 100
+  },
+  handler: async (ctx, args) => {
+    await requireSuperAdmin(ctx, args.userId);
 
-    // Revenue by plan: count organizations per plan tier
-    const revenueByPlan = {
-      starter: {
-        count: organizations.filter((o) => o.plan === "starter").length,
-        activeCount: activeOrganizations.filter((o) => o.plan === "starter")
-          .length,
-      },
-      professional: {
-        count: organizations.filter((o) => o.plan === "professional").length,
-        activeCount: activeOrganizations.filter(
-          (o) => o.plan === "professional"
-        ).length,
-      },
-      enterprise: {
-        count: organizations.filter((o) => o.plan === "enterprise").length,
-        activeCount: activeOrganizations.filter((o) => o.plan === "enterprise")
-          .length,
-      },
-    };
+    const hours = Math.min(Math.max(args.hours ?? 24, 1), 48);
+    const limit = Math.min(Math.max(args.limit ?? 25, 1), 100);
+    const since = Date.now() - hours * 60 * 60 * 1000;
 
-    // Subscription status breakdown
-    const subscriptionBreakdown = {
-      active: organizations.filter((o) => o.subscriptionStatus === "active")
-        .length,
-      trialing: organizations.filter((o) => o.subscriptionStatus === "trialing")
-        .length,
-      past_due: organizations.filter(
-        (o) => o.subscriptionStatus === "past_due"
-      ).length,
-      canceled: organizations.filter(
-        (o) => o.subscriptionStatus === "canceled"
-      ).length,
-    };
+    const rollups = await ctx.db
+      .query("functionMetrics")
+      .withIndex("by_windowStart", (q) => q.gte("windowStart", since))
+      .collect();
+
+    const hotspots = rankHotspots(rollups, args.sortBy ?? "totalTime", limit);
+
+    // Resolve names for the organizations shown
+    const orgIds = new Set(hotspots.flatMap((h) => h.topOrganizations.map((o) => o.organizationId)));
+    const orgNames = new Map<string, string>();
+    await Promise.all(
+      Array.from(orgIds).map(async (id) => {
+        const orgId = ctx.db.normalizeId("organizations", id);
+        const org = orgId ? await ctx.db.get(orgId) : null;
+        if (org) orgNames.set(id, org.name);
+      })
+    );
 
     return {
-      totalOrganizations: organizations.length,
-      activeOrganizations: activeOrganizations.length,
-      totalUsers: allUsers.length,
-      activeUsers: activeUsers.length,
-      totalProperties: allProperties.length,
-      totalDwellings: allDwellings.length,
-      totalParticipants: allParticipants.length,
-      revenueByPlan,
-      subscriptionBreakdown,
+      hours,
+      windows: new Set(rollups.map((r) => r.windowStart)).size,
+      hotspots: hotspots.map((h) => ({
+        ...h,
+        topOrganizations: h.topOrganizations.map((o) => ({
+          ...o,
+          name: orgNames.get(o.organizationId) ?? null,
+        })),
+      })),
     };
   },
 });
@@ -443,16 +442,11 @@ export const getFinancialMetrics = query({
     await requireSuperAdmin(ctx, args.userId);
     const orgs = await ctx.db.query("organizations").collect();
 
-    const PRICES: Record<string, number> = {
-      starter: 250,
-      professional: 450,
-      enterprise: 600,
-    };
     const activePayingOrgs = orgs.filter(
       (o) => o.isActive && o.subscriptionStatus === "active"
     );
     const mrr = activePayingOrgs.reduce(
-      (sum, o) => sum + (PRICES[o.plan] || 0),
+      (sum, o) => sum + (PLAN_PRICES[o.plan] || 0),
       0
     );
     const arr = mrr * 12;
@@ -514,7 +508,7 @@ export const getFinancialMetrics = query({
         plan: o.plan,
         subscriptionStatus: o.subscriptionStatus,
         monthlyAmount:
-          o.subscriptionStatus === "active" ? PRICES[o.plan] || 0 : 0,
+          o.subscriptionStatus === "active" ? PLAN_PRICES[o.plan] || 0 : 0,
         trialEndsAt: o.trialEndsAt,
         createdAt: o.createdAt,
       }))
@@ -892,6 +886,30 @@ export const updateAdminNotes = mutation({
   },
 });
 
+/**
+ * Recount every organization's usage counters and refresh today's platform
+ * rollup on demand, instead of waiting for the nightly crons.
+ */
+export const refreshPlatformMetrics = mutation({
+  args: {
+    userId: v.id("users"),
+  },
+  handler: async (ctx, args) => {
+    await requireSuperAdmin(ctx, args.userId);
+
+    const organizations = await ctx.db.query("organizations").collect();
+    for (const org of organizations) {
+      await ctx.scheduler.runAfter(0, internal.orgStats.reconcileOrganization, {
+        organizationId: org._id,
+      });
+    }
+    // Roll up after the per-org recounts have had time to land
+    await ctx.scheduler.runAfter(60_000, internal.orgStats.rollupPlatformDaily, {});
+
+    return { success: true, organizations: organizations.length };
+  },
+});
+
 /**
  * Get recent support tickets for a specific organization.
  * Returns the 10 most recent tickets, sorted by creation time descending.
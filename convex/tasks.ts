@@ -2,6 +2,8 @@ import { mutation, query, internalMutation } from "./_generated/server";
 import { v } from "convex/values";
 import { internal } from "./_generated/api";
 import { requirePermission, requireTenant } from "./authHelpers";
+import { syncCalendarIndex } from "./calendarIndex";
+import { markDashboardStale } from "./dashboard";
 
 // Create a new task
 export const create = mutation({
@@ -41,6 +43,8 @@ export const create = mutation({
       createdAt: now,
       updatedAt: now,
     });
+    await syncCalendarIndex(ctx, "tasks", taskId);
+    await markDashboardStale(ctx, organizationId);
 
     // Audit log
     await ctx.runMutation(internal.auditLog.log, {
@@ -113,6 +117,8 @@ export const update = mutation({
       ...updates,
       updatedAt: Date.now(),
     });
+    await syncCalendarIndex(ctx, "tasks", id);
+    await markDashboardStale(ctx, organizationId);
 
     // Audit log
     await ctx.runMutation(internal.auditLog.log, {
@@ -168,6 +174,8 @@ export const updateStatus = mutation({
     }
 
     await ctx.db.patch(args.id, updates);
+    await syncCalendarIndex(ctx, "tasks", args.id);
+    await markDashboardStale(ctx, organizationId);
 
     // Audit log
     await ctx.runMutation(internal.auditLog.log, {
@@ -213,6 +221,8 @@ export const complete = mutation({
       completionNotes: args.completionNotes,
       updatedAt: Date.now(),
     });
+    await syncCalendarIndex(ctx, "tasks", args.id);
+    await markDashboardStale(ctx, organizationId);
 
     // Audit log
     await ctx.runMutation(internal.auditLog.log, {
@@ -251,6 +261,8 @@ export const remove = mutation({
     }
 
     await ctx.db.delete(args.id);
+    await syncCalendarIndex(ctx, "tasks", args.id);
+    await markDashboardStale(ctx, organizationId);
 
     // Audit log
     await ctx.runMutation(internal.auditLog.log, {
@@ -599,6 +611,8 @@ export const createFollowUpTask = internalMutation({
       createdAt: now,
       updatedAt: now,
     });
+    await syncCalendarIndex(ctx, "tasks", taskId);
+    await markDashboardStale(ctx, args.organizationId);
 
     // Audit log
     await ctx.runMutation(internal.auditLog.log, {
@@ -1,9 +1,17 @@
 import { v } from "convex/values";
 import { redactPII } from "./lib/redact";
-import { mutation, query, action, internalMutation, internalAction } from "./_generated/server";
+import {
+  mutation,
+  query,
+  action,
+  internalMutation,
+  internalQuery,
+  internalAction,
+  MutationCtx,
+} from "./_generated/server";
 import { internal } from "./_generated/api";
 import { requireTenant, requireAdmin } from "./authHelpers";
-import { Id } from "./_generated/dataModel";
+import { Doc, Id } from "./_generated/dataModel";
 
 /**
  * Webhooks Module - Outbound Webhook Management
@@ -14,8 +22,9 @@ import { Id } from "./_generated/dataModel";
  * Security:
  * - All payloads signed with HMAC-SHA256 (X-Webhook-Signature header)
  * - Webhook secrets generated server-side (never transmitted after creation)
- * - 3 retry attempts with exponential backoff
- * - Auto-disable after 10 consecutive failures
+ * - Deliveries queued per endpoint and retried up to 5 times with
+ *   exponential backoff and jitter; circuit breaker pauses failing endpoints
+ * - Auto-disable after 10 consecutive failed deliveries
  * - Admin-only access for CRUD operations
  */
 
@@ -128,6 +137,7 @@ export const getAll = query({
       lastTriggeredAt: w.lastTriggeredAt,
       failureCount: w.failureCount,
       lastError: w.lastError,
+      circuitOpenUntil: w.circuitOpenUntil,
     }));
   },
 });
@@ -303,6 +313,8 @@ export const update = mutation({
       if (args.isActive) {
         updates.failureCount = 0;
         updates.lastError = undefined;
+        updates.consecutiveAttemptFailures = 0;
+        updates.circuitOpenUntil = undefined;
       }
     }
 
@@ -338,6 +350,15 @@ export const remove = mutation({
       await ctx.db.delete(delivery._id);
     }
 
+    // Drop any deliveries still queued for it
+    const queued = await ctx.db
+      .query("webhookQueue")
+      .withIndex("by_webhookId_status_nextAttemptAt", (q) => q.eq("webhookId", args.webhookId))
+      .collect();
+    for (const row of queued) {
+      await ctx.db.delete(row._id);
+    }
+
     // Delete the webhook itself
     await ctx.db.delete(args.webhookId);
 
@@ -346,42 +367,149 @@ export const remove = mutation({
 });
 
 // ============================================================================
-// INTERNAL MUTATIONS (used by actions to record deliveries)
+// DELIVERY QUEUE
+//
+// triggerWebhook enqueues one webhookQueue row per subscribed endpoint and
+// returns immediately. dispatchEndpoint claims that endpoint's due rows up to
+// its concurrency limit, tracked in the webhook's own inFlightCount, and
+// schedules one deliverQueued action per row. Every mutation therefore only
+// touches the endpoint it delivers to, so a burst of events for different
+// endpoints never conflicts, and a slow or failing endpoint never delays other
+// subscribers. Failed attempts are rescheduled with exponential backoff and
+// jitter via the scheduler; an endpoint that keeps failing trips a circuit
+// breaker and its deliveries wait until the circuit closes. Each attempt is
+// signed with its own timestamp, so receivers enforcing a replay window accept
+// late retries.
 // ============================================================================
 
+// Attempts per delivery before it is recorded as failed
+const MAX_ATTEMPTS = 5;
+// Backoff before attempt n+1: RETRY_BASE_MS * 2^(n-1), with +/-50% jitter
+const RETRY_BASE_MS = 30 * 1000;
+// Concurrent in-flight deliveries per endpoint
+const MAX_IN_FLIGHT_PER_WEBHOOK = 3;
+// Consecutive failed attempts that open the circuit, and its cooldown range
+const CIRCUIT_FAILURE_THRESHOLD = 5;
+const CIRCUIT_COOLDOWN_MS = 60 * 1000;
+const CIRCUIT_MAX_COOLDOWN_MS = 60 * 60 * 1000;
+// In-flight rows older than this are assumed lost (action crashed) and retried
+const IN_FLIGHT_TIMEOUT_MS = 2 * 60 * 1000;
+// Rows the safety-net sweep looks at per run
+const SWEEP_BATCH = 200;
+
+/**
+ * Delay before the next attempt: exponential backoff with jitter so retries
+ * from a burst of events do not all land on the endpoint at once.
+ */
+function retryDelayMs(attemptCount: number): number {
+  const base = RETRY_BASE_MS * Math.pow(2, attemptCount - 1);
+  return Math.round(base * (0.5 + Math.random()));
+}
+
+/**
+ * Claim one endpoint's due queue rows up to its free concurrency slots and
+ * schedule a delivery action for each. Reads only that endpoint's webhook
+ * document and queue range. Pass `released` when the caller has just freed
+ * slots (the counter is decremented in the same patch).
+ */
+async function dispatchEndpoint(
+  ctx: MutationCtx,
+  webhook: Doc<"webhooks">,
+  released = 0
+): Promise<number> {
+  const now = Date.now();
+  const inFlight = Math.max(0, (webhook.inFlightCount ?? 0) - released);
+  const circuitOpen = webhook.circuitOpenUntil !== undefined && webhook.circuitOpenUntil > now;
+  const available = circuitOpen ? 0 : MAX_IN_FLIGHT_PER_WEBHOOK - inFlight;
+
+  const due =
+    available > 0
+      ? await ctx.db
+          .query("webhookQueue")
+          .withIndex("by_webhookId_status_nextAttemptAt", (q) =>
+            q.eq("webhookId", webhook._id).eq("status", "pending").lte("nextAttemptAt", now)
+          )
+          .take(available)
+      : [];
+
+  for (const row of due) {
+    await ctx.db.patch(row._id, { status: "in_flight", claimedAt: now });
+    await ctx.scheduler.runAfter(0, internal.webhooks.deliverQueued, {
+      queueId: row._id,
+      claimedAt: now,
+    });
+  }
+
+  const inFlightCount = inFlight + due.length;
+  if (inFlightCount !== (webhook.inFlightCount ?? 0)) {
+    await ctx.db.patch(webhook._id, { inFlightCount });
+  }
+  return due.length;
+}
+
 /**
- * Get active webhooks for an organization that subscribe to a given event.
- * Internal use only - called from triggerWebhook action.
+ * Record a final delivery result and update the webhook's failure state.
  */
-export const getActiveWebhooksForEvent = internalMutation({
+async function recordDeliveryResult(
+  ctx: MutationCtx,
   args: {
-    organizationId: v.id("organizations"),
-    event: v.string(),
-  },
-  handler: async (ctx, args): Promise<Array<{
-    _id: Id<"webhooks">;
-    url: string;
-    secret: string;
+    webhookId: Id<"webhooks">;
     organizationId: Id<"organizations">;
-  }>> => {
-    const webhooks = await ctx.db
-      .query("webhooks")
-      .withIndex("by_organizationId_isActive", (q) =>
-        q.eq("organizationId", args.organizationId).eq("isActive", true)
-      )
-      .collect();
+    event: string;
+    payload: string;
+    statusCode?: number;
+    response?: string;
+    success: boolean;
+    attemptCount: number;
+    error?: string;
+    duration?: number;
+  }
+): Promise<void> {
+  await ctx.db.insert("webhookDeliveries", {
+    ...args,
+    createdAt: Date.now(),
+  });
+}
 
-    // Filter to webhooks that subscribe to this event
-    return webhooks
-      .filter((w) => w.events.includes(args.event))
-      .map((w) => ({
-        _id: w._id,
-        url: w.url,
-        secret: w.secret,
-        organizationId: w.organizationId,
-      }));
-  },
-});
+/**
+ * Update webhook status after a delivery (success or final failure).
+ */
+async function applyWebhookStatus(
+  ctx: MutationCtx,
+  webhookId: Id<"webhooks">,
+  success: boolean,
+  error?: string
+): Promise<void> {
+  const webhook = await ctx.db.get(webhookId);
+  if (!webhook) return;
+
+  if (success) {
+    // Reset failure count on success
+    await ctx.db.patch(webhookId, {
+      lastTriggeredAt: Date.now(),
+      failureCount: 0,
+      lastError: undefined,
+    });
+  } else {
+    const newFailureCount = webhook.failureCount + 1;
+    const updates: Record<string, unknown> = {
+      failureCount: newFailureCount,
+      lastError: error || "Unknown error",
+    };
+
+    // Auto-disable after MAX_FAILURE_COUNT consecutive failures
+    if (newFailureCount >= MAX_FAILURE_COUNT) {
+      updates.isActive = false;
+      updates.lastError = `Auto-disabled after ${MAX_FAILURE_COUNT} consecutive failures. Last error: ${error || "Unknown error"}`;
+    }
+
+    await ctx.db.patch(webhookId, updates);
+  }
+}
+
+// ============================================================================
+// INTERNAL MUTATIONS (used by actions to record deliveries)
+// ============================================================================
 
 /**
  * Record a webhook delivery attempt.
@@ -400,19 +528,7 @@ export const recordDelivery = internalMutation({
     duration: v.optional(v.number()),
   },
   handler: async (ctx, args): Promise<void> => {
-    await ctx.db.insert("webhookDeliveries", {
-      webhookId: args.webhookId,
-      organizationId: args.organizationId,
-      event: args.event,
-      payload: args.payload,
-      statusCode: args.statusCode,
-      response: args.response,
-      success: args.success,
-      attemptCount: args.attemptCount,
-      error: args.error,
-      duration: args.duration,
-      createdAt: Date.now(),
-    });
+    await recordDeliveryResult(ctx, args);
   },
 });
 
@@ -426,155 +542,336 @@ export const updateWebhookStatus = internalMutation({
     error: v.optional(v.string()),
   },
   handler: async (ctx, args): Promise<void> => {
-    const webhook = await ctx.db.get(args.webhookId);
-    if (!webhook) return;
-
-    if (args.success) {
-      // Reset failure count on success
-      await ctx.db.patch(args.webhookId, {
-        lastTriggeredAt: Date.now(),
-        failureCount: 0,
-        lastError: undefined,
-      });
-    } else {
-      const newFailureCount = webhook.failureCount + 1;
-      const updates: Record<string, unknown> = {
-        failureCount: newFailureCount,
-        lastError: args.error || "Unknown error",
-      };
-
-      // Auto-disable after MAX_FAILURE_COUNT consecutive failures
-      if (newFailureCount >= MAX_FAILURE_COUNT) {
-        updates.isActive = false;
-        updates.lastError = `Auto-disabled after ${MAX_FAILURE_COUNT} consecutive failures. Last error: ${args.error || "Unknown error"}`;
-      }
-
-      await ctx.db.patch(args.webhookId, updates);
-    }
+    await applyWebhookStatus(ctx, args.webhookId, args.success, args.error);
   },
 });
 
-// ============================================================================
-// ACTIONS (HTTP calls)
-// ============================================================================
-
 /**
  * Trigger webhooks for a specific event.
  * This is the main entry point - call this from mutations when events occur.
  *
- * Finds all active webhooks for the organization that subscribe to the event,
- * sends the payload to each, and records delivery results.
- *
- * Retry logic: 3 attempts with exponential backoff (1s, 2s, 4s).
+ * Enqueues one delivery per active webhook of the organization that
+ * subscribes to the event, then dispatches what each endpoint's concurrency
+ * limit allows. Delivery, retries and recording happen asynchronously.
  */
-export const triggerWebhook = internalAction({
+export const triggerWebhook = internalMutation({
   args: {
     organizationId: v.id("organizations"),
     event: v.string(),
     payload: v.string(),
   },
   handler: async (ctx, args): Promise<void> => {
-    // Get all active webhooks for this org + event
-    const webhooks = await ctx.runMutation(
-      internal.webhooks.getActiveWebhooksForEvent,
-      {
-        organizationId: args.organizationId,
-        event: args.event,
-      }
-    );
+    const webhooks = (
+      await ctx.db
+        .query("webhooks")
+        .withIndex("by_organizationId_isActive", (q) =>
+          q.eq("organizationId", args.organizationId).eq("isActive", true)
+        )
+        .collect()
+    ).filter((w) => w.events.includes(args.event));
 
     if (webhooks.length === 0) return;
 
-    // Build the payload JSON
-    const timestamp = Math.floor(Date.now() / 1000).toString();
-    const parsedPayload = JSON.parse(args.payload);
+    // Build the payload JSON once; every endpoint receives the same body. The
+    // timestamp is replaced with the attempt time when each attempt is signed.
+    const now = Date.now();
+    const timestamp = Math.floor(now / 1000).toString();
     const payloadBody = JSON.stringify({
       event: args.event,
       timestamp,
-      data: parsedPayload,
+      data: JSON.parse(args.payload),
     });
 
-    // Deliver to each webhook
     for (const webhook of webhooks) {
-      let success = false;
-      let lastStatusCode: number | undefined;
-      let lastResponse: string | undefined;
-      let lastError: string | undefined;
-      let attemptCount = 0;
-      let totalDuration = 0;
-
-      // Retry loop: 3 attempts with exponential backoff
-      for (let attempt = 0; attempt < 3; attempt++) {
-        attemptCount = attempt + 1;
-
-        // Exponential backoff: 0s, 1s, 2s
-        if (attempt > 0) {
-          await new Promise((resolve) =>
-            setTimeout(resolve, Math.pow(2, attempt - 1) * 1000)
-          );
-        }
+      await ctx.db.insert("webhookQueue", {
+        webhookId: webhook._id,
+        organizationId: webhook.organizationId,
+        event: args.event,
+        payloadBody,
+        timestamp,
+        status: "pending",
+        attemptCount: 0,
+        nextAttemptAt: now,
+        createdAt: now,
+      });
+      await dispatchEndpoint(ctx, webhook);
+    }
+  },
+});
 
-        try {
-          // Sign the payload with HMAC-SHA256
-          const signature = await hmacSign(webhook.secret, payloadBody);
-
-          const startTime = Date.now();
-          const response = await fetch(webhook.url, {
-            method: "POST",
-            headers: {
-              "Content-Type": "application/json",
-              "X-Webhook-Signature": signature,
-              "X-Webhook-Event": args.event,
-              "X-Webhook-Timestamp": timestamp,
-              "X-Webhook-Id": webhook._id,
-              "User-Agent": "MySDAManager-Webhook/1.0",
-            },
-            body: payloadBody,
-            signal: AbortSignal.timeout(10000), // 10s timeout
+/**
+ * Dispatch one endpoint's due rows. Scheduled at each retry time.
+ */
+export const dispatchWebhook = internalMutation({
+  args: { webhookId: v.id("webhooks") },
+  handler: async (ctx, args): Promise<number> => {
+    const webhook = await ctx.db.get(args.webhookId);
+    if (!webhook) return 0;
+    return await dispatchEndpoint(ctx, webhook);
+  },
+});
+
+/**
+ * Safety net run by cron: recover in-flight rows whose delivery action never
+ * reported back, then dispatch every endpoint that has due rows.
+ */
+export const dispatchDue = internalMutation({
+  args: {},
+  handler: async (ctx): Promise<number> => {
+    const now = Date.now();
+    const released = new Map<Id<"webhooks">, number>();
+
+    const inFlight = await ctx.db
+      .query("webhookQueue")
+      .withIndex("by_status_nextAttemptAt", (q) => q.eq("status", "in_flight"))
+      .take(SWEEP_BATCH);
+    for (const row of inFlight) {
+      if (row.claimedAt !== undefined && now - row.claimedAt > IN_FLIGHT_TIMEOUT_MS) {
+        await ctx.db.patch(row._id, { status: "pending", nextAttemptAt: now, claimedAt: undefined });
+        released.set(row.webhookId, (released.get(row.webhookId) ?? 0) + 1);
+      }
+    }
+
+    const due = await ctx.db
+      .query("webhookQueue")
+      .withIndex("by_status_nextAttemptAt", (q) =>
+        q.eq("status", "pending").lte("nextAttemptAt", now)
+      )
+      .take(SWEEP_BATCH);
+    const webhookIds = new Set([...released.keys(), ...due.map((row) => row.webhookId)]);
+
+    let claimed = 0;
+    for (const webhookId of webhookIds) {
+      const webhook = await ctx.db.get(webhookId);
+      if (webhook) {
+        claimed += await dispatchEndpoint(ctx, webhook, released.get(webhookId) ?? 0);
+      }
+    }
+    return claimed;
+  },
+});
+
+/**
+ * Load a claimed queue row with the endpoint details needed to deliver it.
+ * Returns null if the row or webhook is gone, the webhook was disabled, or the
+ * row has since been reclaimed by another attempt.
+ */
+export const getQueuedDelivery = internalQuery({
+  args: { queueId: v.id("webhookQueue"), claimedAt: v.number() },
+  handler: async (ctx, args) => {
+    const row = await ctx.db.get(args.queueId);
+    if (!row || row.status !== "in_flight" || row.claimedAt !== args.claimedAt) return null;
+    const webhook = await ctx.db.get(row.webhookId);
+    if (!webhook || !webhook.isActive) return null;
+    return {
+      url: webhook.url,
+      secret: webhook.secret,
+      event: row.event,
+      payloadBody: row.payloadBody,
+      webhookId: row.webhookId,
+    };
+  },
+});
+
+/**
+ * Record the outcome of one delivery attempt.
+ * Success (or a final failure) writes the delivery log and removes the row;
+ * otherwise the row is rescheduled with backoff. Also drives the circuit
+ * breaker, frees the endpoint's concurrency slot and dispatches its next
+ * queued deliveries.
+ */
+export const completeAttempt = internalMutation({
+  args: {
+    queueId: v.id("webhookQueue"),
+    claimedAt: v.number(),
+    success: v.boolean(),
+    statusCode: v.optional(v.number()),
+    response: v.optional(v.string()),
+    error: v.optional(v.string()),
+    duration: v.optional(v.number()),
+    // True when the webhook was deleted or disabled before delivery
+    abandoned: v.optional(v.boolean()),
+  },
+  handler: async (ctx, args): Promise<void> => {
+    const row = await ctx.db.get(args.queueId);
+    // A row recovered by the sweep (and possibly reclaimed) belongs to another attempt
+    if (!row || row.status !== "in_flight" || row.claimedAt !== args.claimedAt) return;
+
+    const webhook = await ctx.db.get(row.webhookId);
+
+    if (args.abandoned) {
+      await ctx.db.delete(row._id);
+      if (webhook) await dispatchEndpoint(ctx, webhook, 1);
+      return;
+    }
+
+    const now = Date.now();
+    const attemptCount = row.attemptCount + 1;
+
+    // Circuit breaker: track consecutive failed attempts per endpoint
+    let circuitOpenUntil = webhook?.circuitOpenUntil;
+    if (webhook) {
+      if (args.success) {
+        if (webhook.consecutiveAttemptFailures || webhook.circuitOpenUntil) {
+          circuitOpenUntil = undefined;
+          await ctx.db.patch(webhook._id, {
+            consecutiveAttemptFailures: 0,
+            circuitOpenUntil: undefined,
           });
-          totalDuration = Date.now() - startTime;
-
-          lastStatusCode = response.status;
-          // Read only first 1000 chars of response
-          const responseText = await response.text();
-          lastResponse = responseText.substring(0, 1000);
-
-          // Success: 2xx status codes
-          if (response.ok) {
-            success = true;
-            lastError = undefined;
-            break;
-          } else {
-            lastError = `HTTP ${response.status}: ${lastResponse.substring(0, 200)}`;
-          }
-        } catch (err) {
-          lastError = err instanceof Error ? err.message : String(err);
-          lastStatusCode = undefined;
-          lastResponse = undefined;
-          totalDuration = 0;
         }
+      } else {
+        const failures = (webhook.consecutiveAttemptFailures ?? 0) + 1;
+        const updates: { consecutiveAttemptFailures: number; circuitOpenUntil?: number } = {
+          consecutiveAttemptFailures: failures,
+        };
+        if (failures >= CIRCUIT_FAILURE_THRESHOLD) {
+          const cooldown = Math.min(
+            CIRCUIT_COOLDOWN_MS * Math.pow(2, failures - CIRCUIT_FAILURE_THRESHOLD),
+            CIRCUIT_MAX_COOLDOWN_MS
+          );
+          circuitOpenUntil = now + cooldown;
+          updates.circuitOpenUntil = circuitOpenUntil;
+        }
+        await ctx.db.patch(webhook._id, updates);
       }
+    }
 
-      // Record the delivery (redact PII from stored payload and response)
-      const redactedPayload = redactPII(payloadBody) as string;
-      await ctx.runMutation(internal.webhooks.recordDelivery, {
-        webhookId: webhook._id,
-        organizationId: webhook.organizationId,
-        event: args.event,
-        payload: redactedPayload,
-        statusCode: lastStatusCode,
-        response: lastResponse,
-        success,
+    if (!args.success && attemptCount < MAX_ATTEMPTS && webhook?.isActive) {
+      const retryAt = Math.max(now + retryDelayMs(attemptCount), circuitOpenUntil ?? 0);
+      await ctx.db.patch(row._id, {
+        status: "pending",
+        attemptCount,
+        nextAttemptAt: retryAt,
+        claimedAt: undefined,
+        lastError: args.error,
+      });
+      await ctx.scheduler.runAt(retryAt, internal.webhooks.dispatchWebhook, {
+        webhookId: row.webhookId,
+      });
+    } else {
+      // Record the delivery (redact PII from stored payload)
+      await recordDeliveryResult(ctx, {
+        webhookId: row.webhookId,
+        organizationId: row.organizationId,
+        event: row.event,
+        payload: redactPII(row.payloadBody) as string,
+        statusCode: args.statusCode,
+        response: args.response,
+        success: args.success,
         attemptCount,
-        error: lastError,
-        duration: totalDuration > 0 ? totalDuration : undefined,
+        error: args.error,
+        duration: args.duration,
       });
+      await applyWebhookStatus(ctx, row.webhookId, args.success, args.error);
+      await ctx.db.delete(row._id);
+    }
 
-      // Update webhook status (failure count / last triggered)
-      await ctx.runMutation(internal.webhooks.updateWebhookStatus, {
-        webhookId: webhook._id,
-        success,
-        error: lastError,
+    // Re-read: the circuit breaker and status updates above patched it
+    const current = await ctx.db.get(row.webhookId);
+    if (current) await dispatchEndpoint(ctx, current, 1);
+  },
+});
+
+// ============================================================================
+// ACTIONS (HTTP calls)
+// ============================================================================
+
+/**
+ * POST a signed payload to an endpoint. The body's timestamp is set to the
+ * time of this attempt and matches X-Webhook-Timestamp, so every retry is
+ * signed fresh.
+ *
+ * Test-receiver mode (for load testing the queue without real endpoints):
+ * - WEBHOOK_TEST_RECEIVER_URL=<url> sends every delivery to that URL instead
+ *   of the configured endpoint (e.g. a local receiver).
+ * - WEBHOOK_TEST_RECEIVER_URL=simulate skips the network entirely and
+ *   simulates a receiver, waiting WEBHOOK_TEST_LATENCY_MS (default 50) and
+ *   failing with HTTP 503 at WEBHOOK_TEST_FAILURE_RATE (0-1, default 0).
+ */
+async function postWebhook(
+  url: string,
+  secret: string,
+  event: string,
+  webhookId: string,
+  payloadBody: string
+): Promise<{ ok: boolean; status: number; text: string }> {
+  const timestamp = Math.floor(Date.now() / 1000).toString();
+  const body = JSON.stringify({ ...JSON.parse(payloadBody), timestamp });
+
+  const testReceiver = process.env.WEBHOOK_TEST_RECEIVER_URL;
+  if (testReceiver === "simulate") {
+    const latency = Number(process.env.WEBHOOK_TEST_LATENCY_MS ?? 50);
+    const failureRate = Number(process.env.WEBHOOK_TEST_FAILURE_RATE ?? 0);
+    await new Promise((resolve) => setTimeout(resolve, latency));
+    return Math.random() < failureRate
+      ? { ok: false, status: 503, text: "Simulated failure" }
+      : { ok: true, status: 200, text: "Simulated OK" };
+  }
+
+  // Sign the payload with HMAC-SHA256
+  const signature = await hmacSign(secret, body);
+  const response = await fetch(testReceiver || url, {
+    method: "POST",
+    headers: {
+      "Content-Type": "application/json",
+      "X-Webhook-Signature": signature,
+      "X-Webhook-Event": event,
+      "X-Webhook-Timestamp": timestamp,
+      "X-Webhook-Id": webhookId,
+      "User-Agent": "MySDAManager-Webhook/1.0",
+    },
+    body,
+    signal: AbortSignal.timeout(10000), // 10s timeout
+  });
+  // Read only first 1000 chars of response
+  const text = (await response.text()).substring(0, 1000);
+  return { ok: response.ok, status: response.status, text };
+}
+
+/**
+ * Make one delivery attempt for a claimed queue row and report the result.
+ */
+export const deliverQueued = internalAction({
+  args: { queueId: v.id("webhookQueue"), claimedAt: v.number() },
+  handler: async (ctx, args): Promise<void> => {
+    const delivery = await ctx.runQuery(internal.webhooks.getQueuedDelivery, {
+      queueId: args.queueId,
+      claimedAt: args.claimedAt,
+    });
+    if (!delivery) {
+      await ctx.runMutation(internal.webhooks.completeAttempt, {
+        queueId: args.queueId,
+        claimedAt: args.claimedAt,
+        success: false,
+        abandoned: true,
+      });
+      return;
+    }
+
+    const startTime = Date.now();
+    try {
+      const response = await postWebhook(
+        delivery.url,
+        delivery.secret,
+        delivery.event,
+        delivery.webhookId,
+        delivery.payloadBody
+      );
+      await ctx.runMutation(internal.webhooks.completeAttempt, {
+        queueId: args.queueId,
+        claimedAt: args.claimedAt,
+        success: response.ok,
+        statusCode: response.status,
+        response: response.text,
+        error: response.ok ? undefined : `HTTP ${response.status}: ${response.text.substring(0, 200)}`,
+        duration: Date.now() - startTime,
+      });
+    } catch (err) {
+      await ctx.runMutation(internal.webhooks.completeAttempt, {
+        queueId: args.queueId,
+        claimedAt: args.claimedAt,
+        success: false,
+        error: err instanceof Error ? err.message : String(err),
       });
     }
   },
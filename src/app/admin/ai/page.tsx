@@ -51,6 +51,8 @@ function AIAssistantContent() {
   const [isLoading, setIsLoading] = useState(false);
   const [sidebarOpen, setSidebarOpen] = useState(true);
   const [pendingAction, setPendingAction] = useState<PendingAction | null>(null);
+  // Identifies the in-flight reply so its streamed draft can be shown
+  const [replyRequestId, setReplyRequestId] = useState<string | null>(null);
   const [lastClassifiedDoc, setLastClassifiedDoc] = useState<{
     fileBase64: string;
     mediaType: string;
@@ -72,6 +74,12 @@ function AIAssistantContent() {
     activeConversationId ? { conversationId: activeConversationId } : "skip"
   );
 
+  // Partial reply streamed by the assistant while a message is processing
+  const replyDraft = useQuery(
+    api.aiChatbot.getReplyDraft,
+    userId && replyRequestId ? { userId, requestId: replyRequestId } : "skip"
+  );
+
   // Fetch properties for filing dropdown
   const properties = useQuery(
     api.properties.getAll,
@@ -174,11 +182,15 @@ function AIAssistantContent() {
       return;
     }
 
+    const requestId = crypto.randomUUID();
+    setReplyRequestId(requestId);
+
     try {
       const result = await processQuery({
         conversationId: activeConversationId,
         userMessage: content,
         userId,
+        requestId,
       });
 
       // Add assistant response
@@ -207,6 +219,7 @@ function AIAssistantContent() {
       };
       setMessages((prev) => [...prev, errorMessage]);
     } finally {
+      setReplyRequestId(null);
       setIsLoading(false);
     }
   };
@@ -596,6 +609,7 @@ function AIAssistantContent() {
             onFileUpload={handleFileUpload}
             isLoading={isLoading}
             pendingAction={pendingAction}
+            streamingContent={replyRequestId ? replyDraft ?? null : null}
           />
 
           {/* Document Filing Confirmation Panel */}
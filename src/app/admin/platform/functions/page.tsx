@@ -0,0 +1,293 @@
+"use client";
+
+import { useState } from "react";
+import { useQuery } from "convex/react";
+import { api } from "../../../../../convex/_generated/api";
+import { Id } from "../../../../../convex/_generated/dataModel";
+import type { FunctionReturnType } from "convex/server";
+import Link from "next/link";
+import Header from "../../../../components/Header";
+import { RequireAuth } from "../../../../components/RequireAuth";
+import { useAuth } from "../../../../hooks/useAuth";
+import { ArrowLeft, Activity, ShieldCheck } from "lucide-react";
+
+// ---------------------------------------------------------------------------
+// Types and formatting
+// ---------------------------------------------------------------------------
+
+type SortKey = "totalTime" | "p95" | "docsRead" | "calls";
+
+const SORT_OPTIONS: { key: SortKey; label: string }[] = [
+  { key: "totalTime", label: "Total time" },
+  { key: "p95", label: "p95 latency" },
+  { key: "docsRead", label: "Docs read" },
+  { key: "calls", label: "Calls" },
+];
+
+const RANGE_OPTIONS = [
+  { hours: 6, label: "6 hours" },
+  { hours: 24, label: "24 hours" },
+  { hours: 48, label: "48 hours" },
+];
+
+function formatMs(ms: number): string {
+  return ms >= 1000 ? `${(ms / 1000).toFixed(1)} s` : `${Math.round(ms)} ms`;
+}
+
+function formatBytes(bytes: number): string {
+  if (bytes >= 1024 * 1024) return `${(bytes / (1024 * 1024)).toFixed(1)} MB`;
+  if (bytes >= 1024) return `${(bytes / 1024).toFixed(1)} KB`;
+  return `${bytes} B`;
+}
+
+// ---------------------------------------------------------------------------
+// Main page export
+// ---------------------------------------------------------------------------
+
+export default function FunctionHotspotsPage() {
+  return (
+    <RequireAuth allowedRoles={["admin"]}>
+      <FunctionHotspotsContent />
+    </RequireAuth>
+  );
+}
+
+// ---------------------------------------------------------------------------
+// Page content (rendered inside RequireAuth)
+// ---------------------------------------------------------------------------
+
+function FunctionHotspotsContent() {
+  const { user } = useAuth();
+  const userId = user ? (user.id as Id<"users">) : undefined;
+
+  // Super-admin guard
+  const dbUser = useQuery(api.auth.getUser, userId ? { userId } : "skip");
+  const isSuperAdmin = dbUser?.isSuperAdmin === true;
+
+  const [sortBy, setSortBy] = useState<SortKey>("totalTime");
+  const [hours, setHours] = useState(24);
+  const [expanded, setExpanded] = useState<string | null>(null);
+
+  const data = useQuery(
+    api.superAdmin.getFunctionHotspots,
+    userId && isSuperAdmin ? { userId, hours, sortBy } : "skip"
+  );
+
+  // ---- Access denied state ----
+  if (dbUser !== undefined && !isSuperAdmin) {
+    return (
+      <div className="min-h-screen bg-gray-900">
+        <Header currentPage="admin" />
+        <main className="max-w-7xl mx-auto px-4 sm:px-6 lg:px-8 py-8">
+          <div className="flex flex-col items-center justify-center py-24">
+            <div className="p-4 bg-red-600/20 rounded-full mb-4">
+              <ShieldCheck className="w-10 h-10 text-red-400" aria-hidden="true" />
+            </div>
+            <h1 className="text-2xl font-bold text-white mb-2">Access Denied</h1>
+            <p className="text-gray-400 text-center max-w-md">
+              This page is restricted to platform super-administrators.
+            </p>
+            <Link
+              href="/dashboard"
+              className="mt-6 px-4 py-2 bg-teal-600 hover:bg-teal-700 text-white text-sm font-medium rounded-lg transition-colors focus:outline-none focus-visible:ring-2 focus-visible:ring-teal-500"
+            >
+              Return to Dashboard
+            </Link>
+          </div>
+        </main>
+      </div>
+    );
+  }
+
+  return (
+    <div className="min-h-screen bg-gray-900">
+      <Header currentPage="admin" />
+
+      <main className="max-w-7xl mx-auto px-4 sm:px-6 lg:px-8 py-8">
+        {/* Back link */}
+        <Link
+          href="/admin/platform"
+          className="inline-flex items-center gap-1.5 text-sm text-teal-400 hover:text-teal-300 transition-colors mb-6 focus:outline-none focus-visible:ring-2 focus-visible:ring-teal-500 rounded"
+        >
+          <ArrowLeft className="w-4 h-4" aria-hidden="true" />
+          Back to Platform Dashboard
+        </Link>
+
+        {/* Page header */}
+        <div className="flex items-center gap-3 mb-8">
+          <div className="p-3 bg-teal-600/20 rounded-lg">
+            <Activity className="w-8 h-8 text-teal-400" aria-hidden="true" />
+          </div>
+          <div>
+            <h1 className="text-2xl font-bold text-white">Function Hotspots</h1>
+            <p className="text-gray-400">
+              Sampled production latency and read volume per Convex function
+            </p>
+          </div>
+        </div>
+
+        {/* Controls */}
+        <div className="flex flex-col sm:flex-row gap-3 mb-6">
+          <div
+            className="flex bg-gray-800 border border-gray-700 rounded-lg overflow-hidden flex-wrap"
+            role="tablist"
+            aria-label="Rank functions by"
+          >
+            {SORT_OPTIONS.map((option) => (
+              <button
+                key={option.key}
+                role="tab"
+                aria-selected={sortBy === option.key}
+                onClick={() => setSortBy(option.key)}
+                className={`px-3 py-1.5 text-sm font-medium transition-colors focus:outline-none focus-visible:ring-2 focus-visible:ring-teal-500 ${
+                  sortBy === option.key
+                    ? "bg-teal-600 text-white"
+                    : "text-gray-400 hover:text-white hover:bg-gray-700"
+                }`}
+              >
+                {option.label}
+              </button>
+            ))}
+          </div>
+
+          <select
+            value={hours}
+            onChange={(e) => setHours(Number(e.target.value))}
+            className="px-3 py-2 bg-gray-800 border border-gray-700 rounded-lg text-white text-sm focus:outline-none focus:ring-2 focus:ring-teal-500"
+            aria-label="Time range"
+          >
+            {RANGE_OPTIONS.map((option) => (
+              <option key={option.hours} value={option.hours}>
+                Last {option.label}
+              </option>
+            ))}
+          </select>
+        </div>
+
+        {/* Hotspot table */}
+        {!data ? (
+          <div className="bg-gray-800 border border-gray-700 rounded-lg p-12 animate-pulse" />
+        ) : data.hotspots.length === 0 ? (
+          <div className="bg-gray-800 border border-gray-700 rounded-lg p-12 text-center">
+            <Activity className="w-10 h-10 text-gray-400 mx-auto mb-3" aria-hidden="true" />
+            <p className="text-gray-400">
+              No function metrics in this range. Check that the Convex log stream webhook
+              is configured for /api/function-metrics.
+            </p>
+          </div>
+        ) : (
+          <div className="bg-gray-800 border border-gray-700 rounded-lg overflow-x-auto">
+            <table className="w-full text-sm">
+              <thead>
+                <tr className="text-left text-gray-400 border-b border-gray-700">
+                  <th scope="col" className="px-4 py-3 font-medium">Function</th>
+                  <th scope="col" className="px-4 py-3 font-medium text-right">Sampled calls</th>
+                  <th scope="col" className="px-4 py-3 font-medium text-right">p50</th>
+                  <th scope="col" className="px-4 py-3 font-medium text-right">p95</th>
+                  <th scope="col" className="px-4 py-3 font-medium text-right">p95 docs read</th>
+                  <th scope="col" className="px-4 py-3 font-medium text-right">p95 result</th>
+                  <th scope="col" className="px-4 py-3 font-medium text-right">Failures</th>
+                </tr>
+              </thead>
+              <tbody>
+                {data.hotspots.map((hotspot) => (
+                  <HotspotRow
+                    key={hotspot.functionName}
+                    hotspot={hotspot}
+                    isExpanded={expanded === hotspot.functionName}
+                    onToggle={() =>
+                      setExpanded(expanded === hotspot.functionName ? null : hotspot.functionName)
+                    }
+                  />
+                ))}
+              </tbody>
+            </table>
+          </div>
+        )}
+
+        {data && data.hotspots.length > 0 && (
+          <p className="mt-4 text-sm text-gray-400">
+            {data.windows} hourly window{data.windows !== 1 ? "s" : ""} in the last {data.hours}{" "}
+            hours. p95 is the worst hourly p95 in the range.
+          </p>
+        )}
+      </main>
+    </div>
+  );
+}
+
+// ---------------------------------------------------------------------------
+// Table row with organization / argument shape breakdown
+// ---------------------------------------------------------------------------
+
+type Hotspot = FunctionReturnType<typeof api.superAdmin.getFunctionHotspots>["hotspots"][number];
+
+function HotspotRow({
+  hotspot,
+  isExpanded,
+  onToggle,
+}: {
+  hotspot: Hotspot;
+  isExpanded: boolean;
+  onToggle: () => void;
+}) {
+  const hasBreakdown = hotspot.topOrganizations.length > 0 || hotspot.topArgShapes.length > 0;
+
+  return (
+    <>
+      <tr className="border-b border-gray-700/50 text-gray-300">
+        <td className="px-4 py-3">
+          <button
+            onClick={onToggle}
+            disabled={!hasBreakdown}
+            aria-expanded={isExpanded}
+            className="font-mono text-teal-400 hover:text-teal-300 disabled:text-white disabled:cursor-default text-left focus:outline-none focus-visible:ring-2 focus-visible:ring-teal-500 rounded"
+          >
+            {hotspot.functionName}
+          </button>
+          {hotspot.kind && <span className="ml-2 text-xs text-gray-400">{hotspot.kind}</span>}
+        </td>
+        <td className="px-4 py-3 text-right">{hotspot.sampledCalls.toLocaleString()}</td>
+        <td className="px-4 py-3 text-right">{formatMs(hotspot.p50Ms)}</td>
+        <td className="px-4 py-3 text-right">{formatMs(hotspot.p95Ms)}</td>
+        <td className="px-4 py-3 text-right">{hotspot.p95DocsRead.toLocaleString()}</td>
+        <td className="px-4 py-3 text-right">
+          {hotspot.p95ResultBytes ? formatBytes(hotspot.p95ResultBytes) : "-"}
+        </td>
+        <td className={`px-4 py-3 text-right ${hotspot.failures > 0 ? "text-red-400" : ""}`}>
+          {hotspot.failures}
+        </td>
+      </tr>
+      {isExpanded && (
+        <tr className="border-b border-gray-700/50 bg-gray-900/40">
+          <td colSpan={7} className="px-4 py-3">
+            <div className="grid grid-cols-1 md:grid-cols-2 gap-4 text-xs">
+              <div>
+                <h3 className="text-gray-400 font-medium mb-1">Busiest organizations</h3>
+                <ul className="space-y-1">
+                  {hotspot.topOrganizations.map((org) => (
+                    <li key={org.organizationId} className="flex justify-between text-gray-300">
+                      <span>{org.name ?? org.organizationId}</span>
+                      <span>{org.calls.toLocaleString()}</span>
+                    </li>
+                  ))}
+                </ul>
+              </div>
+              <div>
+                <h3 className="text-gray-400 font-medium mb-1">Argument shapes</h3>
+                <ul className="space-y-1">
+                  {hotspot.topArgShapes.map((shape) => (
+                    <li key={shape.shape} className="flex justify-between gap-3 text-gray-300">
+                      <span className="font-mono break-all">{shape.shape}</span>
+                      <span>{shape.calls.toLocaleString()}</span>
+                    </li>
+                  ))}
+                </ul>
+              </div>
+            </div>
+          </td>
+        </tr>
+      )}
+    </>
+  );
+}
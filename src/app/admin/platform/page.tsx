@@ -38,6 +38,7 @@ import {
   CircleDot,
   Timer,
   CheckCircle2,
+  Activity,
 } from "lucide-react";
 import {
   formatCentsCurrency,
@@ -784,6 +785,13 @@ function PlatformDashboardContent() {
             <h1 className="text-2xl font-bold text-white">Platform Dashboard</h1>
             <p className="text-gray-400">MySDAManager Super Admin</p>
           </div>
+          <Link
+            href="/admin/platform/functions"
+            className="ml-auto inline-flex items-center gap-1.5 px-3 py-2 bg-gray-800 border border-gray-700 hover:bg-gray-700 text-sm text-gray-300 hover:text-white rounded-lg transition-colors focus:outline-none focus-visible:ring-2 focus-visible:ring-teal-500"
+          >
+            <Activity className="w-4 h-4" aria-hidden="true" />
+            Function Hotspots
+          </Link>
         </div>
 
         {/* ---- Tab Bar ---- */}
@@ -822,40 +830,47 @@ function PlatformDashboardContent() {
             {!metrics ? (
               <StatsSkeleton count={5} />
             ) : (
-              <div className="grid grid-cols-1 sm:grid-cols-2 lg:grid-cols-5 gap-4 mb-8">
-                <StatCard
-                  title="Organizations"
-                  value={metrics.totalOrganizations}
-                  subtitle={`${metrics.activeOrganizations} active`}
-                  color="blue"
-                  icon={<Globe className="w-6 h-6" aria-hidden="true" />}
-                />
-                <StatCard
-                  title="Total Users"
-                  value={metrics.totalUsers}
-                  subtitle={`${metrics.activeUsers} active`}
-                  color="green"
-                  icon={<Users className="w-6 h-6" aria-hidden="true" />}
-                />
-                <StatCard
-                  title="Properties"
-                  value={metrics.totalProperties}
-                  color="purple"
-                  icon={<Building2 className="w-6 h-6" aria-hidden="true" />}
-                />
-                <StatCard
-                  title="Dwellings"
-                  value={metrics.totalDwellings}
-                  color="yellow"
-                  icon={<Home className="w-6 h-6" aria-hidden="true" />}
-                />
-                <StatCard
-                  title="Participants"
-                  value={metrics.totalParticipants}
-                  color="green"
-                  icon={<UserCheck className="w-6 h-6" aria-hidden="true" />}
-                />
-              </div>
+              <>
+                <p className="text-xs text-gray-400 mb-2">
+                  {metrics.computedAt
+                    ? `Platform totals updated ${formatRelativeTime(metrics.computedAt)}`
+                    : "Platform totals have not been computed yet"}
+                </p>
+                <div className="grid grid-cols-1 sm:grid-cols-2 lg:grid-cols-5 gap-4 mb-8">
+                  <StatCard
+                    title="Organizations"
+                    value={metrics.totalOrganizations}
+                    subtitle={`${metrics.activeOrganizations} active`}
+                    color="blue"
+                    icon={<Globe className="w-6 h-6" aria-hidden="true" />}
+                  />
+                  <StatCard
+                    title="Total Users"
+                    value={metrics.totalUsers}
+                    subtitle={`${metrics.activeUsers} active`}
+                    color="green"
+                    icon={<Users className="w-6 h-6" aria-hidden="true" />}
+                  />
+                  <StatCard
+                    title="Properties"
+                    value={metrics.totalProperties}
+                    color="purple"
+                    icon={<Building2 className="w-6 h-6" aria-hidden="true" />}
+                  />
+                  <StatCard
+                    title="Dwellings"
+                    value={metrics.totalDwellings}
+                    color="yellow"
+                    icon={<Home className="w-6 h-6" aria-hidden="true" />}
+                  />
+                  <StatCard
+                    title="Participants"
+                    value={metrics.totalParticipants}
+                    color="green"
+                    icon={<UserCheck className="w-6 h-6" aria-hidden="true" />}
+                  />
+                </div>
+              </>
             )}
 
             {/* Plan Distribution */}
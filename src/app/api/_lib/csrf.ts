@@ -18,6 +18,7 @@
  * EXEMPT endpoints (use their own signature verification):
  * - /api/stripe/webhook  - Stripe signature (STRIPE_WEBHOOK_SECRET)
  * - /api/mail            - Postmark webhook secret (INBOUND_EMAIL_WEBHOOK_SECRET)
+ * - /api/function-metrics - Convex log stream token (FUNCTION_METRICS_TOKEN)
  *
  * EXEMPT endpoints (use API key / session token auth):
  * - /api/v1/*            - Bearer API key authentication
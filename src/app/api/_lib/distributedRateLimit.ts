@@ -0,0 +1,239 @@
+import { ConvexHttpClient } from "convex/browser";
+import { api } from "../../../../convex/_generated/api";
+import {
+  windowStartFor,
+  slidingWindowEstimate,
+  msUntilAllowed,
+} from "../../../utils/slidingWindow";
+
+/**
+ * Distributed Sliding-Window Rate Limiter
+ *
+ * Shared by the public-endpoint limiter (_lib/rateLimit.ts) and the REST
+ * API limiter (v1/_lib/rateLimit.ts).
+ *
+ * - Algorithm: sliding-window counter. The previous fixed window's count is
+ *   weighted by its remaining overlap with the window ending now, which
+ *   avoids the burst-at-boundary problem of plain fixed windows.
+ * - Fast path: each instance counts hits in memory and decides locally
+ *   using the last known global totals plus its own unsynced hits.
+ * - Sync: hits are pushed to sharded counters in Convex
+ *   (convex/rateLimits.ts) and global totals pulled back at most once per
+ *   sync interval, or immediately when the key is close to its limit.
+ *   This keeps limits and X-RateLimit-* headers accurate across Vercel
+ *   instances and cold starts without a Convex round-trip per request.
+ * - If Convex is unreachable or not configured (NEXT_PUBLIC_CONVEX_URL /
+ *   CONVEX_WEBHOOK_SECRET), limiting degrades to this instance's counts.
+ */
+
+interface WindowState {
+  windowMs: number;
+  windowStart: number;
+  /** Global hits in the previous window (last synced) */
+  previous: number;
+  /** Global hits in the current window as of the last sync, including ours */
+  current: number;
+  /** Hits counted here that have not been pushed to Convex yet */
+  pending: number;
+  lastSyncAt: number;
+  syncing: Promise<void> | null;
+}
+
+export interface SlidingWindowResult {
+  allowed: boolean;
+  limit: number;
+  remaining: number;
+  /** Epoch ms at which the current fixed window ends */
+  resetAt: number;
+  /** Seconds until a request would be allowed (only when denied) */
+  retryAfter?: number;
+}
+
+const MAX_KEYS = 10_000;
+const MIN_SYNC_INTERVAL_MS = 1_000;
+const MAX_SYNC_INTERVAL_MS = 10_000;
+const SYNC_TIMEOUT_MS = 750;
+// Sync before deciding once the estimate passes this share of the limit
+const NEAR_LIMIT_RATIO = 0.8;
+
+// Map iteration order is insertion order; touched keys are re-inserted,
+// so the first key is always the least recently used.
+const windows = new Map<string, WindowState>();
+
+let _convex: ConvexHttpClient | null | undefined;
+
+function getConvex(): ConvexHttpClient | null {
+  if (_convex === undefined) {
+    const url = process.env.NEXT_PUBLIC_CONVEX_URL;
+    _convex = url && process.env.CONVEX_WEBHOOK_SECRET ? new ConvexHttpClient(url) : null;
+  }
+  return _convex;
+}
+
+function syncIntervalFor(windowMs: number): number {
+  return Math.min(Math.max(windowMs / 60, MIN_SYNC_INTERVAL_MS), MAX_SYNC_INTERVAL_MS);
+}
+
+function getWindow(key: string, windowMs: number, now: number): WindowState {
+  const windowStart = windowStartFor(now, windowMs);
+  let state = windows.get(key);
+
+  if (state) {
+    windows.delete(key);
+  } else {
+    if (windows.size >= MAX_KEYS) {
+      const oldest = windows.keys().next().value;
+      if (oldest !== undefined) windows.delete(oldest);
+    }
+    state = {
+      windowMs,
+      windowStart,
+      previous: 0,
+      current: 0,
+      pending: 0,
+      lastSyncAt: 0,
+      syncing: null,
+    };
+  }
+  windows.set(key, state);
+  return state;
+}
+
+/**
+ * Roll the state forward to the window containing `now`.
+ * Unsynced hits from the old window are kept as local history; they are
+ * only pushed for the window they happened in.
+ */
+function rollWindow(state: WindowState, now: number): void {
+  const windowStart = windowStartFor(now, state.windowMs);
+  if (windowStart === state.windowStart) return;
+
+  const contiguous = windowStart - state.windowStart === state.windowMs;
+  state.previous = contiguous ? state.current + state.pending : 0;
+  state.current = 0;
+  state.pending = 0;
+  state.windowStart = windowStart;
+  state.lastSyncAt = 0;
+}
+
+async function syncWindow(key: string, state: WindowState): Promise<void> {
+  const convex = getConvex();
+  if (!convex) return;
+  if (state.syncing) return state.syncing;
+
+  const secret = process.env.CONVEX_WEBHOOK_SECRET!;
+  const { windowMs, windowStart } = state;
+  // Hits stay in `pending` until Convex has recorded them, so a failed push
+  // is retried by the next sync and still counts towards local decisions
+  const hits = state.pending;
+
+  const run = async () => {
+    let pushed = false;
+    try {
+      if (hits > 0) {
+        await convex.mutation(api.rateLimits.recordHits, {
+          secret,
+          key,
+          windowMs,
+          windowStart,
+          hits,
+        });
+        pushed = true;
+        if (state.windowStart === windowStart) {
+          state.pending -= hits;
+          state.current += hits;
+        }
+      }
+      const counts = await convex.query(api.rateLimits.getWindowCounts, {
+        secret,
+        key,
+        windowMs,
+        windowStart,
+      });
+      // Ignore results for a window we have already rolled past
+      if (state.windowStart === windowStart) {
+        state.previous = Math.max(state.previous, counts.previous);
+        state.current = Math.max(state.current, counts.current);
+        state.lastSyncAt = Date.now();
+      }
+    } catch (err) {
+      console.error(
+        `[RateLimit] Sync failed (${pushed ? "counts not refreshed" : "hits kept for retry"}), using local counts:`,
+        err
+      );
+      if (state.windowStart === windowStart) {
+        state.lastSyncAt = Date.now();
+      }
+    }
+  };
+
+  const timeout = new Promise<void>((resolve) => {
+    const timer = setTimeout(resolve, SYNC_TIMEOUT_MS);
+    if (typeof timer === "object" && "unref" in timer) timer.unref();
+  });
+
+  state.syncing = run().finally(() => {
+    state.syncing = null;
+  });
+  // Do not hold the request longer than SYNC_TIMEOUT_MS; the sync keeps running
+  await Promise.race([state.syncing, timeout]);
+}
+
+/**
+ * Count one hit against `key` and decide whether it is allowed.
+ *
+ * @param key - Namespaced limiter key (e.g. "api:<keyId>", "complaints_hourly:<ip>")
+ * @param maxRequests - Maximum requests in any sliding window of `windowMs`
+ * @param windowMs - Window length in milliseconds
+ */
+export async function consumeSlidingWindow(
+  key: string,
+  maxRequests: number,
+  windowMs: number
+): Promise<SlidingWindowResult> {
+  const now = Date.now();
+  const state = getWindow(key, windowMs, now);
+  rollWindow(state, now);
+
+  const estimate = () =>
+    slidingWindowEstimate(
+      state.previous,
+      state.current + state.pending,
+      Date.now(),
+      state.windowStart,
+      windowMs
+    );
+
+  const syncDue = now - state.lastSyncAt >= syncIntervalFor(windowMs);
+  const nearLimit = estimate() + 1 > maxRequests * NEAR_LIMIT_RATIO;
+  if (syncDue || nearLimit) {
+    await syncWindow(key, state);
+  }
+
+  const resetAt = state.windowStart + windowMs;
+  if (estimate() + 1 > maxRequests) {
+    const waitMs = msUntilAllowed(
+      state.previous,
+      state.current + state.pending,
+      maxRequests,
+      Date.now(),
+      state.windowStart,
+      windowMs
+    );
+    return {
+      allowed: false,
+      limit: maxRequests,
+      remaining: 0,
+      resetAt,
+      retryAfter: Math.max(1, Math.ceil(waitMs / 1000)),
+    };
+  }
+
+  state.pending += 1;
+  return {
+    allowed: true,
+    limit: maxRequests,
+    remaining: Math.max(0, Math.floor(maxRequests - estimate())),
+    resetAt,
+  };
+}
@@ -127,7 +127,7 @@ export async function POST(request: NextRequest) {
 
   // ─── RATE LIMITING: IP-based ───────────────────────────────────────
   // Hourly limit: 3 submissions per IP per hour
-  const hourlyLimit = checkRateLimit(request, {
+  const hourlyLimit = await checkRateLimit(request, {
     windowMs: 60 * 60 * 1000, // 1 hour
     maxRequests: 3,
     keyPrefix: "complaints_hourly",
@@ -143,7 +143,7 @@ export async function POST(request: NextRequest) {
   }
 
   // Daily limit: 10 submissions per IP per 24 hours
-  const dailyLimit = checkRateLimit(request, {
+  const dailyLimit = await checkRateLimit(request, {
     windowMs: 24 * 60 * 60 * 1000, // 24 hours
     maxRequests: 10,
     keyPrefix: "complaints_daily",
@@ -0,0 +1,102 @@
+/**
+ * POST /api/function-metrics
+ *
+ * Convex Webhook Log Stream Receiver
+ *
+ * Receives the Convex deployment's log stream (configured in the Convex
+ * dashboard as a webhook to /api/function-metrics?token=...) and records a
+ * request-ID sample of function calls for production hotspot analysis (see
+ * convex/functionMetrics.ts). function_execution events carry timing and
+ * documents read; console lines from instrumented functions add the
+ * organization, argument shape and result size.
+ *
+ * Security posture:
+ * - Authentication: Shared token in the query string (FUNCTION_METRICS_TOKEN)
+ * - Rate limiting: NOT NEEDED - Convex controls call frequency; token prevents abuse
+ * - CSRF/Origin: EXEMPT - called server-to-server by Convex, not from a browser
+ * - Input validation: YES - events are parsed defensively; unknown shapes are dropped
+ * - Env validation: FAIL-FAST - checks FUNCTION_METRICS_TOKEN + NEXT_PUBLIC_CONVEX_URL +
+ *   FUNCTION_METRICS_INGEST_SECRET
+ *
+ * FUNCTION_METRICS_SAMPLE_RATE (0-1) overrides the default sample rate.
+ */
+
+import { NextRequest, NextResponse } from "next/server";
+import { ConvexHttpClient } from "convex/browser";
+import { api } from "../../../../convex/_generated/api";
+import { DEFAULT_SAMPLE_RATE, samplesFromLogEvents } from "../../../../convex/lib/functionMetrics";
+import { validateRequiredEnvVars } from "../_lib/envValidation";
+
+// Samples per recordSamples call (the mutation accepts up to 500)
+const INGEST_BATCH = 200;
+
+let _convex: ConvexHttpClient | null = null;
+
+function getConvex(): ConvexHttpClient {
+  if (!_convex) {
+    _convex = new ConvexHttpClient(process.env.NEXT_PUBLIC_CONVEX_URL!);
+  }
+  return _convex;
+}
+
+function getSampleRate(): number {
+  const configured = parseFloat(process.env.FUNCTION_METRICS_SAMPLE_RATE ?? "");
+  return Number.isNaN(configured) ? DEFAULT_SAMPLE_RATE : configured;
+}
+
+/**
+ * Parse a log stream body: a JSON array of events, or one event per line.
+ */
+function parseEvents(body: string): unknown[] {
+  const trimmed = body.trim();
+  if (trimmed === "") return [];
+  if (trimmed.startsWith("[")) return JSON.parse(trimmed);
+  return trimmed
+    .split("\n")
+    .filter((line) => line.trim() !== "")
+    .map((line) => JSON.parse(line));
+}
+
+export async function POST(request: NextRequest) {
+  // ─── FAIL-FAST: Environment variable validation ────────────────────
+  const envCheck = validateRequiredEnvVars([
+    "FUNCTION_METRICS_TOKEN",
+    "NEXT_PUBLIC_CONVEX_URL",
+    "FUNCTION_METRICS_INGEST_SECRET",
+  ]);
+  if (!envCheck.valid) {
+    console.error(`[CRITICAL] Function metrics receiver is misconfigured: ${envCheck.error}`);
+    return NextResponse.json({ error: "Service not configured" }, { status: 500 });
+  }
+
+  if (request.nextUrl.searchParams.get("token") !== process.env.FUNCTION_METRICS_TOKEN) {
+    return NextResponse.json({ error: "Unauthorized" }, { status: 401 });
+  }
+
+  let events: unknown[];
+  try {
+    events = parseEvents(await request.text());
+  } catch {
+    return NextResponse.json({ error: "Invalid log stream payload" }, { status: 400 });
+  }
+
+  // Skip the ingestion pipeline's own calls so it doesn't measure itself
+  const samples = samplesFromLogEvents(events, getSampleRate()).filter(
+    (sample) => !sample.functionName.startsWith("functionMetrics:")
+  );
+
+  try {
+    for (let i = 0; i < samples.length; i += INGEST_BATCH) {
+      await getConvex().mutation(api.functionMetrics.recordSamples, {
+        webhookSecret: process.env.FUNCTION_METRICS_INGEST_SECRET!,
+        samples: samples.slice(i, i + INGEST_BATCH),
+      });
+    }
+  } catch (err) {
+    const message = err instanceof Error ? err.message : "Unknown error";
+    console.error(`[Function Metrics] Failed to record samples: ${message}`);
+    return NextResponse.json({ error: "Failed to record samples" }, { status: 500 });
+  }
+
+  return NextResponse.json({ received: events.length, sampled: samples.length });
+}
@@ -3,9 +3,11 @@
  *
  * Postmark Inbound Email Webhook Handler
  *
- * Receives parsed emails from Postmark and creates communication records
- * in MySDAManager. Users forward emails from Outlook to a unique org
- * address; Postmark parses them and POSTs the JSON payload here.
+ * Receives parsed emails from Postmark and hands them to the inbound email
+ * ingestion queue (convex/inboundEmailQueue.ts), which deduplicates by
+ * Message-ID and creates communication records in batches. Users forward
+ * emails from Outlook to a unique org address; Postmark parses them and
+ * POSTs the JSON payload here.
  *
  * Security posture:
  * - Authentication: Webhook secret verification (INBOUND_EMAIL_WEBHOOK_SECRET)
@@ -21,8 +23,21 @@
 import { NextRequest, NextResponse } from "next/server";
 import { ConvexHttpClient } from "convex/browser";
 import { api } from "../../../../convex/_generated/api";
+import type { Id } from "../../../../convex/_generated/dataModel";
 import { validateRequiredEnvVars } from "../_lib/envValidation";
 
+// Postmark allows up to 35 MB per message. Attachments are uploaded to Convex
+// file storage before enqueueing (per-file rules are enforced again there)
+const MAX_ATTACHMENT_BYTES = 10 * 1024 * 1024;
+const MAX_TOTAL_ATTACHMENT_BYTES = 25 * 1024 * 1024;
+
+interface PostmarkAttachment {
+  Name?: string;
+  Content?: string;
+  ContentType?: string;
+  ContentLength?: number;
+}
+
 let _convex: ConvexHttpClient | null = null;
 
 function getConvex(): ConvexHttpClient {
@@ -99,27 +114,39 @@ export async function POST(request: NextRequest) {
     );
 
     const convex = getConvex();
-    const result = await convex.mutation(api.inboundEmail.processInboundEmail, {
+    const attachments = await uploadAttachments(
+      convex,
+      webhookSecret,
+      selectAttachments(payload.Attachments)
+    );
+    const result = await convex.mutation(api.inboundEmailQueue.enqueue, {
       webhookSecret,
-      fromEmail,
-      fromName: fromName || fromEmail,
-      toAddress,
-      subject,
-      textBody,
-      strippedReply,
-      emailDate,
-      postmarkMessageId,
+      emails: [
+        {
+          fromEmail,
+          fromName: fromName || fromEmail,
+          toAddress,
+          subject,
+          textBody,
+          strippedReply,
+          emailDate,
+          postmarkMessageId,
+          attachments: attachments.length > 0 ? attachments : undefined,
+        },
+      ],
     });
 
     console.log(
-      `[Inbound Email] Created communication ${result.communicationId} in thread ${result.threadId}`
+      result.duplicates > 0
+        ? `[Inbound Email] Ignored duplicate message ${postmarkMessageId}`
+        : `[Inbound Email] Queued message ${postmarkMessageId ?? "(no Message-ID)"}`
     );
 
     return NextResponse.json(
       {
         success: true,
-        communicationId: result.communicationId,
-        threadId: result.threadId,
+        queued: result.queued > 0,
+        duplicate: result.duplicates > 0,
       },
       { status: 200 }
     );
@@ -135,6 +162,62 @@ export async function POST(request: NextRequest) {
   }
 }
 
+/**
+ * Pick the Postmark attachments to forward, skipping oversized files and
+ * stopping once the total size budget is used.
+ */
+function selectAttachments(raw: PostmarkAttachment[] | undefined): PostmarkAttachment[] {
+  const selected: PostmarkAttachment[] = [];
+  let totalBytes = 0;
+  for (const attachment of raw ?? []) {
+    if (!attachment.Content || !attachment.Name) continue;
+    // Base64 encodes 3 bytes in 4 characters
+    const size = attachment.ContentLength ?? Math.floor((attachment.Content.length * 3) / 4);
+    if (size > MAX_ATTACHMENT_BYTES || totalBytes + size > MAX_TOTAL_ATTACHMENT_BYTES) {
+      console.warn(`[Inbound Email] Skipped attachment "${attachment.Name}" (${size} bytes)`);
+      continue;
+    }
+    totalBytes += size;
+    selected.push(attachment);
+  }
+  return selected;
+}
+
+/**
+ * Upload attachments to Convex file storage and return their storage IDs.
+ * A failed upload skips that attachment; the email itself is still queued.
+ */
+async function uploadAttachments(
+  convex: ConvexHttpClient,
+  webhookSecret: string,
+  attachments: PostmarkAttachment[]
+): Promise<Array<{ storageId: Id<"_storage">; fileName: string; fileType: string }>> {
+  const uploaded = await Promise.all(
+    attachments.map(async (attachment) => {
+      const fileType = attachment.ContentType || "application/octet-stream";
+      try {
+        const uploadUrl = await convex.mutation(
+          api.inboundEmailQueue.generateAttachmentUploadUrl,
+          { webhookSecret }
+        );
+        const response = await fetch(uploadUrl, {
+          method: "POST",
+          headers: { "Content-Type": fileType },
+          body: Buffer.from(attachment.Content!, "base64"),
+        });
+        if (!response.ok) throw new Error(`Upload failed: ${response.status}`);
+        const { storageId } = (await response.json()) as { storageId: Id<"_storage"> };
+        return { storageId, fileName: attachment.Name!, fileType };
+      } catch (err) {
+        const message = err instanceof Error ? err.message : String(err);
+        console.warn(`[Inbound Email] Could not store attachment "${attachment.Name}": ${message}`);
+        return null;
+      }
+    })
+  );
+  return uploaded.filter((attachment) => attachment !== null);
+}
+
 /**
  * Extract email address from a "Name <email>" string.
  */
@@ -0,0 +1,199 @@
+import { after } from "next/server";
+import type { ConvexHttpClient } from "convex/browser";
+import { api } from "../../../../../convex/_generated/api";
+
+/**
+ * REST API Key Validation Cache
+ *
+ * Short-TTL, per-instance cache of validated API keys so that a burst of
+ * REST calls from one integration (Outlook add-in, Android widget, etc.)
+ * costs one Convex round-trip per cache window instead of one mutation per
+ * request.
+ *
+ * - Entries are keyed by the SHA-256 hash of the key; plaintext keys are
+ *   never retained in memory beyond the request.
+ * - Positive entries live for VALID_TTL_MS (capped at the key's own
+ *   expiresAt), so a revoked key stops working within that window.
+ * - Invalid keys are cached briefly (INVALID_TTL_MS) to shield Convex from
+ *   repeated bad-key traffic.
+ * - Concurrent misses for the same key share a single lookup.
+ * - lastUsedAt is recorded in memory and flushed with after() once the
+ *   response has been sent, so the write survives the serverless instance
+ *   being frozen. A key's usage is written at most once per
+ *   USAGE_FLUSH_INTERVAL_MS; later uses in that window are coalesced into the
+ *   next flush. Any key the flush reports as revoked or expired is evicted
+ *   immediately.
+ * - Convex calls carry API_KEY_SERVER_SECRET; a key hash alone is not a
+ *   credential.
+ */
+
+export type ApiKeyValidation =
+  | {
+      valid: true;
+      organizationId: string;
+      permissions: string[];
+      keyId: string;
+      createdBy: string;
+      subscriptionStatus: string;
+      accessLevel: string;
+      expiresAt: number | null;
+    }
+  | { valid: false };
+
+interface CacheEntry {
+  result: ApiKeyValidation;
+  expiresAt: number;
+}
+
+const VALID_TTL_MS = 30 * 1000; // 30 seconds
+const INVALID_TTL_MS = 10 * 1000; // 10 seconds
+const MAX_ENTRIES = 5000;
+const USAGE_FLUSH_INTERVAL_MS = 60 * 1000; // 1 minute
+const USAGE_BATCH = 500; // apiKeys.recordKeyUsage accepts at most 500 per call
+
+const cache = new Map<string, CacheEntry>();
+const inFlight = new Map<string, Promise<ApiKeyValidation>>();
+const pendingUsage = new Map<string, number>(); // keyHash -> latest use
+const lastFlushed = new Map<string, number>(); // keyHash -> when its usage was last written
+let flushing: Promise<void> | null = null;
+
+function serverSecret(): string {
+  const secret = process.env.API_KEY_SERVER_SECRET;
+  if (!secret) {
+    throw new Error("API_KEY_SERVER_SECRET is not configured");
+  }
+  return secret;
+}
+
+/**
+ * SHA-256 hex digest of a raw API key (matches the hash stored in Convex).
+ */
+export async function hashApiKey(apiKey: string): Promise<string> {
+  const data = new TextEncoder().encode(apiKey);
+  const hashBuffer = await crypto.subtle.digest("SHA-256", data);
+  return Array.from(new Uint8Array(hashBuffer))
+    .map((b) => b.toString(16).padStart(2, "0"))
+    .join("");
+}
+
+function setEntry(keyHash: string, result: ApiKeyValidation): void {
+  const now = Date.now();
+  let expiresAt = now + (result.valid ? VALID_TTL_MS : INVALID_TTL_MS);
+  if (result.valid && result.expiresAt !== null) {
+    expiresAt = Math.min(expiresAt, result.expiresAt);
+  }
+
+  // Map iteration order is insertion order, so the first key is the oldest
+  if (cache.size >= MAX_ENTRIES) {
+    const oldest = cache.keys().next().value;
+    if (oldest !== undefined) cache.delete(oldest);
+  }
+  cache.set(keyHash, { result, expiresAt });
+}
+
+/**
+ * Resolve an API key hash, serving from the cache when fresh.
+ */
+export async function resolveApiKeyCached(
+  convex: ConvexHttpClient,
+  keyHash: string
+): Promise<ApiKeyValidation> {
+  const entry = cache.get(keyHash);
+  if (entry && entry.expiresAt > Date.now()) {
+    return entry.result;
+  }
+  if (entry) cache.delete(keyHash);
+
+  const pending = inFlight.get(keyHash);
+  if (pending) return pending;
+
+  const lookup = convex
+    .query(api.apiKeys.resolveApiKey, { serverSecret: serverSecret(), keyHash })
+    .then((result) => {
+      setEntry(keyHash, result);
+      return result;
+    })
+    .finally(() => {
+      inFlight.delete(keyHash);
+    });
+  inFlight.set(keyHash, lookup);
+  return lookup;
+}
+
+/**
+ * Drop a key from the cache (e.g. after the flush reports it revoked).
+ */
+export function invalidateApiKey(keyHash: string): void {
+  cache.delete(keyHash);
+}
+
+/**
+ * Record that a key was used. Must be called while handling a request: when
+ * the key's usage hasn't been written for USAGE_FLUSH_INTERVAL_MS, a flush is
+ * scheduled to run after the response is sent.
+ */
+export function recordApiKeyUsage(
+  convex: ConvexHttpClient,
+  keyHash: string,
+  usedAt = Date.now()
+): void {
+  pendingUsage.set(keyHash, Math.max(pendingUsage.get(keyHash) ?? 0, usedAt));
+  if (usedAt - (lastFlushed.get(keyHash) ?? 0) < USAGE_FLUSH_INTERVAL_MS) return;
+
+  after(() => flushApiKeyUsage(convex));
+}
+
+/**
+ * Write all pending lastUsedAt timestamps, USAGE_BATCH per mutation.
+ * Failed batches are merged back so the next flush retries them.
+ */
+export async function flushApiKeyUsage(convex: ConvexHttpClient): Promise<void> {
+  if (flushing) return flushing;
+  if (pendingUsage.size === 0) return;
+
+  const usages = Array.from(pendingUsage, ([keyHash, lastUsedAt]) => ({
+    keyHash,
+    lastUsedAt,
+  }));
+  pendingUsage.clear();
+
+  flushing = (async () => {
+    for (let i = 0; i < usages.length; i += USAGE_BATCH) {
+      const batch = usages.slice(i, i + USAGE_BATCH);
+      try {
+        const { invalid } = await convex.mutation(api.apiKeys.recordKeyUsage, {
+          serverSecret: serverSecret(),
+          usages: batch,
+        });
+        const now = Date.now();
+        for (const { keyHash } of batch) {
+          markFlushed(keyHash, now);
+        }
+        for (const keyHash of invalid) {
+          invalidateApiKey(keyHash);
+        }
+      } catch (err) {
+        console.error("[REST API] Failed to flush API key usage:", err);
+        for (const { keyHash, lastUsedAt } of batch) {
+          pendingUsage.set(
+            keyHash,
+            Math.max(pendingUsage.get(keyHash) ?? 0, lastUsedAt)
+          );
+        }
+      }
+    }
+  })().finally(() => {
+    flushing = null;
+  });
+  return flushing;
+}
+
+function markFlushed(keyHash: string, at: number): void {
+  // Re-insert so iteration order tracks recency, and bound the map like the cache
+  lastFlushed.delete(keyHash);
+  if (lastFlushed.size >= MAX_ENTRIES) {
+    const oldest = lastFlushed.keys().next().value;
+    if (oldest !== undefined) lastFlushed.delete(oldest);
+  }
+  lastFlushed.set(keyHash, at);
+}
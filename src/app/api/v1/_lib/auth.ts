@@ -1,13 +1,18 @@
 import { ConvexHttpClient } from "convex/browser";
 import { checkRateLimit, rateLimitHeaders, type RateLimitResult } from "./rateLimit";
-import { api } from "../../../../../convex/_generated/api";
+import {
+  hashApiKey,
+  resolveApiKeyCached,
+  recordApiKeyUsage,
+} from "./apiKeyCache";
 
 /**
  * REST API Authentication Middleware - Sprint 7
  *
  * Validates API keys from the Authorization header (Bearer token).
- * Keys are validated via Convex mutation which hashes the key and
- * checks it against the database.
+ * The key is hashed locally and resolved against Convex through a
+ * short-TTL cache (see apiKeyCache.ts); lastUsedAt is written back after
+ * the response, at most once a minute per key, rather than on every request.
  *
  * Security notes:
  * - API keys are SHA-256 hashed in the database (never stored in plain text)
@@ -102,9 +107,8 @@ export async function authenticateApiRequest(
 
   try {
     const convex = getConvex();
-    const result = await convex.mutation(api.apiKeys.validateApiKey, {
-      key: apiKey,
-    });
+    const keyHash = await hashApiKey(apiKey);
+    const result = await resolveApiKeyCached(convex, keyHash);
 
     if (!result.valid) {
       return {
@@ -113,6 +117,8 @@ export async function authenticateApiRequest(
       };
     }
 
+    recordApiKeyUsage(convex, keyHash);
+
     const authResult: ApiAuthSuccess = {
       organizationId: result.organizationId,
       permissions: result.permissions,
@@ -121,7 +127,7 @@ export async function authenticateApiRequest(
     };
 
     // S16: Automatic rate limiting on successful auth (100 req/min per API key)
-    const rlResult = checkRateLimit(authResult.keyId, 100, 60000);
+    const rlResult = await checkRateLimit(authResult.keyId, 100, 60000);
     if (!rlResult.allowed) {
       return {
         error: "Rate limit exceeded. Please retry later.",
@@ -194,12 +200,12 @@ export const API_CORS_HEADERS = {
  * @param windowMs - Window in ms (default 60s)
  * @returns null if allowed, or { headers, status } for 429 response
  */
-export function checkApiRateLimit(
+export async function checkApiRateLimit(
   auth: ApiAuthSuccess,
   maxRequests = 100,
   windowMs = 60000
-): { headers: Record<string, string>; status: 429 } | null {
-  const result = checkRateLimit(auth.keyId, maxRequests, windowMs);
+): Promise<{ headers: Record<string, string>; status: 429 } | null> {
+  const result = await checkRateLimit(auth.keyId, maxRequests, windowMs);
   if (!result.allowed) {
     return {
       headers: { ...API_CORS_HEADERS, ...rateLimitHeaders(result, maxRequests) },
@@ -0,0 +1,60 @@
+/**
+ * REST API Pagination Helpers
+ *
+ * Shared parsing for the cursor-paginated list endpoints.
+ *
+ * Query parameters:
+ * - cursor: Opaque token from a previous response's meta.nextCursor
+ * - updatedSince: Only records changed after this time. Accepts epoch
+ *   milliseconds or an ISO 8601 timestamp.
+ *
+ * Clients page by repeating the request with `cursor` until
+ * meta.hasMore is false. For incremental sync, store the largest
+ * `updatedAt` seen and pass it as `updatedSince` next time.
+ */
+
+import { ConvexError } from "convex/values";
+import { CURSOR_ERROR_CODE } from "../../../../../convex/lib/apiCursor";
+
+export interface PaginationParams {
+  cursor?: string;
+  updatedSince?: number;
+}
+
+/**
+ * Parse cursor and updatedSince from the request's search params.
+ * Returns an error message for a malformed updatedSince.
+ */
+export function parsePaginationParams(
+  searchParams: URLSearchParams
+): PaginationParams | { error: string } {
+  const cursor = searchParams.get("cursor") || undefined;
+  const updatedSinceParam = searchParams.get("updatedSince");
+
+  if (!updatedSinceParam) {
+    return { cursor };
+  }
+
+  const updatedSince = /^\d+$/.test(updatedSinceParam)
+    ? Number(updatedSinceParam)
+    : Date.parse(updatedSinceParam);
+  if (!Number.isFinite(updatedSince)) {
+    return {
+      error: "Invalid updatedSince. Expected epoch milliseconds or an ISO 8601 timestamp",
+    };
+  }
+
+  return { cursor, updatedSince };
+}
+
+/**
+ * Whether a Convex error was caused by a bad or mismatched cursor.
+ * Lets routes answer 400 instead of 500. Checks the structured error code,
+ * since Convex redacts plain error messages in production.
+ */
+export function isCursorError(err: unknown): boolean {
+  return (
+    err instanceof ConvexError &&
+    (err.data as { code?: unknown } | null)?.code === CURSOR_ERROR_CODE
+  );
+}
@@ -1,39 +1,18 @@
+import { consumeSlidingWindow } from "../../_lib/distributedRateLimit";
+
 /**
  * REST API Rate Limiting (S16)
  *
- * In-memory rate limiter for REST API endpoints.
- * Uses a sliding window counter per API key.
- *
- * Note: In-memory rate limiting resets on server restart and is per-instance.
- * For multi-instance deployments, consider using Redis or a database-backed solution.
+ * Sliding-window rate limiter for REST API endpoints, keyed per API key.
+ * Counts are shared across server instances through Convex (see
+ * _lib/distributedRateLimit.ts); decisions are made locally between syncs.
  */
 
-interface RateLimitEntry {
-  count: number;
-  resetAt: number;
-}
-
-const rateLimitMap = new Map<string, RateLimitEntry>();
-
-// Periodically clean up expired entries to prevent memory leaks
-const CLEANUP_INTERVAL_MS = 5 * 60 * 1000; // 5 minutes
-let lastCleanup = Date.now();
-
-function cleanupExpiredEntries(): void {
-  const now = Date.now();
-  if (now - lastCleanup < CLEANUP_INTERVAL_MS) return;
-  lastCleanup = now;
-  for (const [key, entry] of rateLimitMap.entries()) {
-    if (now > entry.resetAt) {
-      rateLimitMap.delete(key);
-    }
-  }
-}
-
 export interface RateLimitResult {
   allowed: boolean;
   retryAfter?: number;
   remaining?: number;
+  resetAt?: number;
 }
 
 /**
@@ -44,29 +23,18 @@ export interface RateLimitResult {
  * @param windowMs - Time window in milliseconds (default: 60000 = 1 minute)
  * @returns Whether the request is allowed and retry-after if not
  */
-export function checkRateLimit(
+export async function checkRateLimit(
   key: string,
   maxRequests = 100,
   windowMs = 60000
-): RateLimitResult {
-  cleanupExpiredEntries();
-
-  const now = Date.now();
-  const entry = rateLimitMap.get(key);
-
-  if (!entry || now > entry.resetAt) {
-    // New window
-    rateLimitMap.set(key, { count: 1, resetAt: now + windowMs });
-    return { allowed: true, remaining: maxRequests - 1 };
-  }
-
-  if (entry.count >= maxRequests) {
-    const retryAfter = Math.ceil((entry.resetAt - now) / 1000);
-    return { allowed: false, retryAfter, remaining: 0 };
-  }
-
-  entry.count++;
-  return { allowed: true, remaining: maxRequests - entry.count };
+): Promise<RateLimitResult> {
+  const result = await consumeSlidingWindow(`api:${key}`, maxRequests, windowMs);
+  return {
+    allowed: result.allowed,
+    retryAfter: result.retryAfter,
+    remaining: result.remaining,
+    resetAt: result.resetAt,
+  };
 }
 
 /**
@@ -79,6 +47,7 @@ export function rateLimitHeaders(
   return {
     "X-RateLimit-Limit": String(maxRequests),
     "X-RateLimit-Remaining": String(result.remaining ?? 0),
+    ...(result.resetAt ? { "X-RateLimit-Reset": String(Math.ceil(result.resetAt / 1000)) } : {}),
     ...(result.retryAfter ? { "Retry-After": String(result.retryAfter) } : {}),
   };
-}
\ No newline at end of file
+}
@@ -8,6 +8,7 @@ import {
   checkApiRateLimit,
   API_CORS_HEADERS,
 } from "../_lib/auth";
+import { parsePaginationParams, isCursorError } from "../_lib/pagination";
 
 /**
  * REST API - Communications Endpoint
@@ -21,6 +22,11 @@ import {
  * - CSRF/Origin: EXEMPT - API key authentication replaces Origin checks
  * - Input validation: YES - required fields, enum validation, date format, max lengths
  * - Tenant isolation: Automatic via organizationId from API key
+ *
+ * Filters that are not index-backed (such as search) are applied while
+ * reading, so a page normally holds `limit` matches. After 2,000 rows are
+ * scanned a page can come back short or empty with meta.hasMore still
+ * true; keep following meta.nextCursor.
  */
 
 let _convex: ConvexHttpClient | null = null;
@@ -41,7 +47,10 @@ function getConvex(): ConvexHttpClient {
  * - contactType: Filter by contact type
  * - contactName: Filter by contact name
  * - search: Search in name, subject, summary
+ * - dateFrom / dateTo: Communication date range (YYYY-MM-DD, inclusive)
  * - limit: Maximum results (1-100, default 100)
+ * - cursor: Opaque token from meta.nextCursor to fetch the next page
+ * - updatedSince: Only records changed after this time (epoch ms or ISO 8601)
  */
 export async function GET(request: NextRequest) {
   const auth = await authenticateApiRequest(request);
@@ -62,37 +71,58 @@ export async function GET(request: NextRequest) {
   try {
     const convex = getConvex();
     const { searchParams } = new URL(request.url);
+    const pagination = parsePaginationParams(searchParams);
+    if ("error" in pagination) {
+      return NextResponse.json(
+        { error: pagination.error },
+        { status: 400, headers: API_CORS_HEADERS }
+      );
+    }
 
     const contactType = searchParams.get("contactType") || undefined;
     const contactName = searchParams.get("contactName") || undefined;
     const search = searchParams.get("search") || undefined;
+    const dateFrom = searchParams.get("dateFrom") || undefined;
+    const dateTo = searchParams.get("dateTo") || undefined;
     const limitParam = searchParams.get("limit");
     const limit = limitParam
       ? Math.min(Math.max(parseInt(limitParam, 10) || 100, 1), 100)
       : undefined;
 
-    const communications = await convex.query(
+    const result = await convex.query(
       api.apiQueries.listCommunications,
       {
         organizationId: auth.organizationId as Id<"organizations">,
         contactType,
         contactName,
         search,
+        dateFrom,
+        dateTo,
         limit,
+        cursor: pagination.cursor,
+        updatedSince: pagination.updatedSince,
       }
     );
 
     return NextResponse.json(
       {
-        data: communications,
+        data: result.items,
         meta: {
-          count: communications.length,
+          count: result.items.length,
+          nextCursor: result.nextCursor,
+          hasMore: result.hasMore,
           timestamp: new Date().toISOString(),
         },
       },
       { status: 200, headers: API_CORS_HEADERS }
     );
   } catch (err) {
+    if (isCursorError(err)) {
+      return NextResponse.json(
+        { error: "Invalid cursor. Restart from the first page with the same filters." },
+        { status: 400, headers: API_CORS_HEADERS }
+      );
+    }
     console.error("[REST API] GET /api/v1/communications error:", err);
     return NextResponse.json(
       { error: "Failed to fetch communications" },
@@ -7,6 +7,7 @@ import {
   hasPermission,
   API_CORS_HEADERS,
 } from "../../_lib/auth";
+import { parsePaginationParams, isCursorError } from "../../_lib/pagination";
 
 /**
  * REST API - Communication Threads Endpoint
@@ -19,6 +20,11 @@ import {
  * - CSRF/Origin: EXEMPT - API key authentication replaces Origin checks
  * - Input validation: YES - search, limit parameters validated
  * - Tenant isolation: Automatic via organizationId from API key
+ *
+ * Filters that are not index-backed (such as search) are applied while
+ * reading, so a page normally holds `limit` matches. After 2,000 rows are
+ * scanned a page can come back short or empty with meta.hasMore still
+ * true; keep following meta.nextCursor.
  */
 
 let _convex: ConvexHttpClient | null = null;
@@ -39,6 +45,8 @@ function getConvex(): ConvexHttpClient {
  * - contactName: Filter threads by contact name
  * - search: Search in contact names and subjects
  * - limit: Maximum results (1-50, default 20)
+ * - cursor: Opaque token from meta.nextCursor to fetch the next page
+ * - updatedSince: Only records changed after this time (epoch ms or ISO 8601)
  */
 export async function GET(request: NextRequest) {
   const auth = await authenticateApiRequest(request);
@@ -59,6 +67,13 @@ export async function GET(request: NextRequest) {
   try {
     const convex = getConvex();
     const { searchParams } = new URL(request.url);
+    const pagination = parsePaginationParams(searchParams);
+    if ("error" in pagination) {
+      return NextResponse.json(
+        { error: pagination.error },
+        { status: 400, headers: API_CORS_HEADERS }
+      );
+    }
 
     const contactName = searchParams.get("contactName") || undefined;
     const search = searchParams.get("search") || undefined;
@@ -67,24 +82,34 @@ export async function GET(request: NextRequest) {
       ? Math.min(Math.max(parseInt(limitParam, 10) || 20, 1), 50)
       : undefined;
 
-    const threads = await convex.query(api.apiQueries.findThreads, {
+    const result = await convex.query(api.apiQueries.findThreads, {
       organizationId: auth.organizationId as Id<"organizations">,
       contactName,
       search,
       limit,
+      cursor: pagination.cursor,
+      updatedSince: pagination.updatedSince,
     });
 
     return NextResponse.json(
       {
-        data: threads,
+        data: result.items,
         meta: {
-          count: threads.length,
+          count: result.items.length,
+          nextCursor: result.nextCursor,
+          hasMore: result.hasMore,
           timestamp: new Date().toISOString(),
         },
       },
       { status: 200, headers: API_CORS_HEADERS }
     );
   } catch (err) {
+    if (isCursorError(err)) {
+      return NextResponse.json(
+        { error: "Invalid cursor. Restart from the first page with the same filters." },
+        { status: 400, headers: API_CORS_HEADERS }
+      );
+    }
     console.error("[REST API] GET /api/v1/communications/threads error:", err);
     return NextResponse.json(
       { error: "Failed to fetch threads" },
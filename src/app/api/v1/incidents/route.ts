@@ -8,6 +8,7 @@ import {
   checkApiRateLimit,
   API_CORS_HEADERS,
 } from "../_lib/auth";
+import { parsePaginationParams, isCursorError } from "../_lib/pagination";
 
 /**
  * REST API - Incidents Endpoint
@@ -22,6 +23,11 @@ import {
  *   API keys are not browser-accessible credentials
  * - Input validation: YES - required fields, enum validation, date format, boolean type checks, max lengths
  * - Tenant isolation: Automatic via organizationId from API key
+ *
+ * Filters that are not index-backed (such as search) are applied while
+ * reading, so a page normally holds `limit` matches. After 2,000 rows are
+ * scanned a page can come back short or empty with meta.hasMore still
+ * true; keep following meta.nextCursor.
  */
 
 let _convex: ConvexHttpClient | null = null;
@@ -43,6 +49,8 @@ function getConvex(): ConvexHttpClient {
  * - severity: Filter by severity (minor, moderate, major, critical)
  * - search: Search by title or description
  * - limit: Maximum results (1-100, default 100)
+ * - cursor: Opaque token from meta.nextCursor to fetch the next page
+ * - updatedSince: Only records changed after this time (epoch ms or ISO 8601)
  */
 export async function GET(request: NextRequest) {
   const auth = await authenticateApiRequest(request);
@@ -63,6 +71,13 @@ export async function GET(request: NextRequest) {
   try {
     const convex = getConvex();
     const { searchParams } = new URL(request.url);
+    const pagination = parsePaginationParams(searchParams);
+    if ("error" in pagination) {
+      return NextResponse.json(
+        { error: pagination.error },
+        { status: 400, headers: API_CORS_HEADERS }
+      );
+    }
 
     const status = searchParams.get("status") || undefined;
     const severity = searchParams.get("severity") || undefined;
@@ -70,25 +85,35 @@ export async function GET(request: NextRequest) {
     const limitParam = searchParams.get("limit");
     const limit = limitParam ? Math.min(Math.max(parseInt(limitParam, 10) || 100, 1), 100) : undefined;
 
-    const incidents = await convex.query(api.apiQueries.listIncidents, {
+    const result = await convex.query(api.apiQueries.listIncidents, {
       organizationId: auth.organizationId as Id<"organizations">,
       status,
       severity,
       search,
       limit,
+      cursor: pagination.cursor,
+      updatedSince: pagination.updatedSince,
     });
 
     return NextResponse.json(
       {
-        data: incidents,
+        data: result.items,
         meta: {
-          count: incidents.length,
+          count: result.items.length,
+          nextCursor: result.nextCursor,
+          hasMore: result.hasMore,
           timestamp: new Date().toISOString(),
         },
       },
       { status: 200, headers: API_CORS_HEADERS }
     );
   } catch (err) {
+    if (isCursorError(err)) {
+      return NextResponse.json(
+        { error: "Invalid cursor. Restart from the first page with the same filters." },
+        { status: 400, headers: API_CORS_HEADERS }
+      );
+    }
     console.error("[REST API] GET /api/v1/incidents error:", err);
     return NextResponse.json(
       { error: "Failed to fetch incidents" },
@@ -1,8 +1,8 @@
 "use client";
 
-import { useState, useEffect, useMemo } from "react";
+import { useState, useEffect } from "react";
 import { useRouter } from "next/navigation";
-import { useQuery } from "convex/react";
+import { useQuery, usePaginatedQuery, useConvex } from "convex/react";
 import { api } from "../../../../convex/_generated/api";
 import { Id } from "../../../../convex/_generated/dataModel";
 import Header from "../../../components/Header";
@@ -10,8 +10,10 @@ import { RequireAuth } from "../../../components/RequireAuth";
 import { LoadingScreen, StatCard } from "../../../components/ui";
 import Badge from "../../../components/ui/Badge";
 import { formatDate, formatStatus } from "../../../utils/format";
-import { generateComplaintsRegisterPdf } from "../../../utils/complaintsRegisterPdf";
+import { exportPdf } from "../../../lib/pdfExport";
+import { complaintsRegisterPdfFileName } from "../../../utils/complaintsRegisterPdf";
 import { useOrganization } from "../../../contexts/OrganizationContext";
+import { useConfirmDialog } from "../../../components/ui/ConfirmDialog";
 import Link from "next/link";
 import HelpGuideButton from "@/components/ui/HelpGuideButton";
 import HelpGuidePanel from "@/components/ui/HelpGuidePanel";
@@ -60,6 +62,12 @@ const SOURCE_BADGE: Record<string, { variant: "info" | "neutral"; label: string
   internal: { variant: "neutral", label: "Internal" },
 };
 
+// Complaints loaded per page in the register list
+const PAGE_SIZE = 50;
+
+// Wait for typing to pause before re-running the search query
+const SEARCH_DEBOUNCE_MS = 300;
+
 // -- Helper: hours between two dates --
 
 function hoursBetween(a: Date, b: Date): number {
@@ -72,6 +80,7 @@ function ComplaintsRegisterContent() {
   const router = useRouter();
   const [user, setUser] = useState<{ id: string; role: string } | null>(null);
   const { organization } = useOrganization();
+  const { alert: alertDialog } = useConfirmDialog();
 
   const [showHelp, setShowHelp] = useState(false);
   const [isExporting, setIsExporting] = useState(false);
@@ -82,6 +91,12 @@ function ComplaintsRegisterContent() {
   const [categoryFilter, setCategoryFilter] = useState("");
   const [severityFilter, setSeverityFilter] = useState("");
   const [sourceFilter, setSourceFilter] = useState("");
+  const [debouncedSearch, setDebouncedSearch] = useState("");
+
+  useEffect(() => {
+    const timer = setTimeout(() => setDebouncedSearch(searchText.trim()), SEARCH_DEBOUNCE_MS);
+    return () => clearTimeout(timer);
+  }, [searchText]);
 
   // Auth
   useEffect(() => {
@@ -99,33 +114,27 @@ function ComplaintsRegisterContent() {
 
   // Queries
   const complaintsStats = useQuery(api.complaints.getStats, user ? { userId: user.id as Id<"users"> } : "skip");
-  const complaints = useQuery(api.complaints.getAll, user?.id ? {
-    userId: user.id as Id<"users">,
+  const convex = useConvex();
+  // All filters run in the query, so every loaded page is complete for them
+  const serverFilters = {
     status: statusFilter || undefined,
     category: categoryFilter || undefined,
     severity: severityFilter || undefined,
-  } : "skip");
+    source: sourceFilter || undefined,
+    search: debouncedSearch || undefined,
+  };
+  const {
+    results: complaintsPage,
+    status: pageStatus,
+    loadMore,
+  } = usePaginatedQuery(
+    api.complaints.getAllPaginated,
+    user?.id ? { userId: user.id as Id<"users">, ...serverFilters } : "skip",
+    { initialNumItems: PAGE_SIZE }
+  );
+  const complaints = pageStatus === "LoadingFirstPage" ? undefined : complaintsPage;
   const pendingAck = useQuery(api.complaints.getPendingAcknowledgment, user ? { userId: user.id as Id<"users"> } : "skip");
 
-  // Client-side filtering for search text and source (not handled by backend)
-  const filteredComplaints = useMemo(() => {
-    if (!complaints) return [];
-    return complaints.filter((c) => {
-      if (sourceFilter && c.source !== sourceFilter) return false;
-      if (searchText) {
-        const search = searchText.toLowerCase();
-        if (
-          !(c.referenceNumber || "").toLowerCase().includes(search) &&
-          !(c.complainantName || "").toLowerCase().includes(search) &&
-          !c.description.toLowerCase().includes(search)
-        ) {
-          return false;
-        }
-      }
-      return true;
-    });
-  }, [complaints, sourceFilter, searchText]);
-
   const hasFilters = searchText || statusFilter || categoryFilter || severityFilter || sourceFilter;
 
   // Next deadline helper — shows acknowledgment deadline OR resolution deadline
@@ -178,27 +187,16 @@ function ComplaintsRegisterContent() {
   };
 
   const handleExportPdf = async () => {
-    if (!filteredComplaints.length || !complaintsStats) return;
+    if (!complaints?.length || !complaintsStats || !user?.id) return;
     setIsExporting(true);
     try {
-      const now = new Date();
-      const pdfData = filteredComplaints.map((c) => {
-        const receivedDate = new Date(c.receivedDate);
-        const daysOpen = Math.floor(
-          (now.getTime() - receivedDate.getTime()) / (1000 * 60 * 60 * 24)
-        );
-        const daysToAcknowledge = c.acknowledgedDate
-          ? Math.floor(
-              (new Date(c.acknowledgedDate).getTime() - receivedDate.getTime()) /
-                (1000 * 60 * 60 * 24)
-            )
-          : null;
-        const daysToResolve = c.resolutionDate
-          ? Math.floor(
-              (new Date(c.resolutionDate).getTime() - receivedDate.getTime()) /
-                (1000 * 60 * 60 * 24)
-            )
-          : null;
+      // Export the full register for the current filters, not just the loaded pages
+      const registerData = await convex.query(api.complaints.getComplaintsRegisterData, {
+        userId: user.id as Id<"users">,
+        ...serverFilters,
+      });
+      const pdfData = registerData.map((c) => {
+        const { daysOpen, daysToAcknowledge, daysToResolve } = c;
 
         return {
           _id: c._id,
@@ -239,8 +237,18 @@ function ComplaintsRegisterContent() {
         };
       });
 
-      generateComplaintsRegisterPdf(pdfData, complaintsStats, undefined, organization?.name);
+      await exportPdf(
+        {
+          kind: "complaintsRegister",
+          complaints: pdfData,
+          stats: complaintsStats,
+          organizationName: organization?.name,
+        },
+        complaintsRegisterPdfFileName(),
+        { convex, userId: user.id as Id<"users"> }
+      );
     } catch (error) {
+      await alertDialog("Failed to export complaints register. " + (error instanceof Error ? error.message : "Please try again."));
     } finally {
       setIsExporting(false);
     }
@@ -269,9 +277,9 @@ function ComplaintsRegisterContent() {
             <HelpGuideButton onClick={() => setShowHelp(true)} />
             <button
               onClick={handleExportPdf}
-              disabled={isExporting || !filteredComplaints.length}
+              disabled={isExporting || !complaints?.length}
               className={`px-4 py-2 rounded-lg text-sm transition-colors focus:outline-none focus-visible:ring-2 focus-visible:ring-teal-600 focus-visible:ring-offset-2 focus-visible:ring-offset-gray-900 ${
-                isExporting || !filteredComplaints.length
+                isExporting || !complaints?.length
                   ? "bg-gray-700 text-gray-400 cursor-not-allowed"
                   : "bg-gray-700 hover:bg-gray-600 text-white"
               }`}
@@ -486,7 +494,7 @@ function ComplaintsRegisterContent() {
         {/* Complaints Table */}
         {complaints === undefined ? (
           <LoadingScreen fullScreen={false} message="Loading complaints..." />
-        ) : filteredComplaints.length === 0 ? (
+        ) : complaints.length === 0 ? (
           <div className="bg-gray-800 rounded-lg p-12 text-center">
             <svg
               className="w-12 h-12 mx-auto text-gray-400 mb-4"
@@ -549,7 +557,7 @@ function ComplaintsRegisterContent() {
                   </tr>
                 </thead>
                 <tbody className="divide-y divide-gray-700">
-                  {filteredComplaints.map((complaint) => {
+                  {complaints.map((complaint) => {
                     const severityInfo =
                       SEVERITY_BADGE[complaint.severity] || {
                         variant: "neutral" as const,
@@ -656,10 +664,16 @@ function ComplaintsRegisterContent() {
 
             {/* Results count */}
             <div className="px-4 py-3 border-t border-gray-700 text-sm text-gray-400">
-              Showing {filteredComplaints.length} complaint{filteredComplaints.length !== 1 ? "s" : ""}
-              {hasFilters && complaints && filteredComplaints.length !== complaints.length
-                ? ` of ${complaints.length}`
-                : ""}
+              Showing {complaints.length} complaint{complaints.length !== 1 ? "s" : ""}
+              {(pageStatus === "CanLoadMore" || pageStatus === "LoadingMore") && (
+                <button
+                  onClick={() => loadMore(PAGE_SIZE)}
+                  disabled={pageStatus === "LoadingMore"}
+                  className="ml-4 text-teal-500 hover:text-teal-400 disabled:text-gray-400 focus:outline-none focus-visible:ring-2 focus-visible:ring-teal-600 rounded"
+                >
+                  {pageStatus === "LoadingMore" ? "Loading..." : "Load more"}
+                </button>
+              )}
             </div>
           </div>
         )}
@@ -2,7 +2,7 @@
 
 import { useQuery, useMutation } from "convex/react";
 import { api } from "../../../convex/_generated/api";
-import { useMemo, useState, useCallback } from "react";
+import { useState, useCallback, useEffect } from "react";
 import Link from "next/link";
 import Header from "@/components/Header";
 import BottomNav from "@/components/BottomNav";
@@ -16,18 +16,28 @@ import { Id } from "../../../convex/_generated/dataModel";
 export default function DashboardPage() {
   const { user, isLoading } = useAuth();
   const userId = user ? (user.id as Id<"users">) : undefined;
-  const properties = useQuery(api.properties.getAll, userId ? { userId } : "skip");
-  const alertStats = useQuery(api.alerts.getStats, userId ? { userId } : "skip");
-  const scheduleStats = useQuery(api.preventativeSchedule.getStats, userId ? { userId } : "skip");
-  const upcomingSchedules = useQuery(api.preventativeSchedule.getUpcoming, userId ? { userId, limit: 5 } : "skip");
-  const overdueSchedules = useQuery(api.preventativeSchedule.getOverdue, userId ? { userId } : "skip");
-  const activeAlerts = useQuery(api.alerts.getActive, userId ? { userId } : "skip");
-  const taskStats = useQuery(api.tasks.getStats, userId ? { userId } : "skip");
-  const upcomingTasks = useQuery(api.tasks.getUpcoming, userId ? { userId, days: 30 } : "skip");
-  const certStats = useQuery(api.complianceCertifications.getDashboardStats, userId ? { userId } : "skip");
-  const consentStats = useQuery(api.participants.getConsentStats, userId ? { userId } : "skip");
-  const rpStats = useQuery(api.restrictivePractices.getDashboardStats, userId ? { userId } : "skip");
-  const trainingStats = useQuery(api.staffTraining.getDashboardStats, userId ? { userId } : "skip");
+  const summary = useQuery(api.dashboard.getSummary, userId ? { userId } : "skip");
+  const ensureSummary = useMutation(api.dashboard.ensureSummary);
+
+  // The organization's summary row is created the first time anyone opens the dashboard
+  useEffect(() => {
+    if (userId && summary === null) {
+      ensureSummary({ userId }).catch((err) => console.error(err));
+    }
+  }, [userId, summary, ensureSummary]);
+
+  const propertyStats = summary?.portfolio;
+  const alertStats = summary?.alerts;
+  const activeAlerts = summary?.recentAlerts;
+  const taskStats = summary?.tasks;
+  const upcomingTasks = summary?.upcomingTasks;
+  const upcomingTaskCount = summary?.upcomingTaskCount ?? 0;
+  const scheduleStats = summary?.schedules;
+  const upcomingSchedules = summary?.upcomingSchedules;
+  const consentStats = summary?.consent;
+  const certStats = summary?.certifications;
+  const rpStats = summary?.restrictivePractices;
+  const trainingStats = summary?.training;
 
   const createTask = useMutation(api.tasks.create);
   const updateTaskStatus = useMutation(api.tasks.updateStatus);
@@ -77,36 +87,6 @@ export default function DashboardPage() {
     });
   };
 
-  // Memoize property calculations
-  const propertyStats = useMemo(() => {
-    if (!properties) return null;
-
-    const activeProperties = properties.filter(p => !p.propertyStatus || p.propertyStatus === "active");
-
-    return {
-      totalProperties: properties.length,
-      totalDwellings: properties.reduce((sum, p) => sum + p.dwellingCount, 0),
-      totalParticipants: activeProperties.reduce((sum, p) => sum + p.currentOccupancy, 0),
-      totalVacancies: activeProperties.reduce((sum, p) => sum + p.vacancies, 0),
-      activeSdaCount: activeProperties.length,
-      underConstructionCount: properties.filter(p => p.propertyStatus === "under_construction").length,
-      planningCount: properties.filter(p => p.propertyStatus === "planning").length,
-      silPropertyCount: properties.filter(p => p.propertyStatus === "sil_property").length,
-    };
-  }, [properties]);
-
-  // Memoize schedule calculations
-  const scheduleCalcs = useMemo(() => {
-    if (!upcomingSchedules) return { dueWithin7Days: 0, estimatedCost30Days: 0 };
-
-    return {
-      dueWithin7Days: upcomingSchedules.filter(s => s.daysUntilDue >= 0 && s.daysUntilDue <= 7).length,
-      estimatedCost30Days: upcomingSchedules
-        .filter(s => s.daysUntilDue >= 0 && s.daysUntilDue <= 30)
-        .reduce((sum, s) => sum + (s.estimatedCost || 0), 0),
-    };
-  }, [upcomingSchedules]);
-
   if (isLoading || !user) {
     return <LoadingScreen message="Loading dashboard..." />;
   }
@@ -255,15 +235,15 @@ export default function DashboardPage() {
               <Link href="/follow-ups?priority=urgent">
                 <DashboardCard
                   title="Urgent Tasks"
-                  value={(taskStats?.byPriority?.urgent || 0).toString()}
+                  value={(taskStats?.urgent || 0).toString()}
                   subtitle="High priority items"
-                  color={taskStats?.byPriority?.urgent && taskStats.byPriority.urgent > 0 ? "orange" : "green"}
+                  color={taskStats?.urgent && taskStats.urgent > 0 ? "orange" : "green"}
                 />
               </Link>
               <Link href="/follow-ups?category=funding">
                 <DashboardCard
                   title="Funding Tasks"
-                  value={(taskStats?.byCategory?.funding || 0).toString()}
+                  value={(taskStats?.funding || 0).toString()}
                   subtitle="Funding follow-ups"
                   color="yellow"
                 />
@@ -298,7 +278,7 @@ export default function DashboardPage() {
               <Link href="/operations?tab=schedule">
                 <DashboardCard
                   title="Due Within 7 Days"
-                  value={scheduleCalcs.dueWithin7Days.toString()}
+                  value={(scheduleStats?.dueWithin7Days || 0).toString()}
                   subtitle="Upcoming scheduled tasks"
                   color="yellow"
                 />
@@ -307,7 +287,7 @@ export default function DashboardPage() {
                 <DashboardCard
                   title="Due Within 30 Days"
                   value={(scheduleStats?.dueWithin30Days || 0).toString()}
-                  subtitle={`Est. ${formatCurrency(scheduleCalcs.estimatedCost30Days)}`}
+                  subtitle={`Est. ${formatCurrency(scheduleStats?.estimatedCost30Days || 0)}`}
                   color="blue"
                 />
               </Link>
@@ -327,9 +307,9 @@ export default function DashboardPage() {
               <h3 id="section-command-centre" className="text-xs font-semibold text-gray-300 uppercase tracking-wider">
                 Tasks
               </h3>
-              {upcomingTasks && upcomingTasks.length > 0 && (
+              {upcomingTaskCount > 0 && (
                 <span className="px-2 py-0.5 text-xs font-medium rounded-full bg-teal-700 text-white">
-                  {upcomingTasks.length}
+                  {upcomingTaskCount}
                 </span>
               )}
             </div>
@@ -361,12 +341,12 @@ export default function DashboardPage() {
                 <div className={`space-y-2 ${tasksExpanded ? "max-h-[400px] overflow-y-auto pr-1" : ""}`}>
                   {upcomingTasks.slice(0, tasksExpanded ? 15 : 5).map((task) => (
                     <div
-                      key={task._id}
+                      key={task.taskId}
                       className="flex items-center gap-3 p-3 bg-gray-700/50 rounded-lg hover:bg-gray-700 transition-colors group"
                     >
                       {/* Checkbox */}
                       <button
-                        onClick={() => handleCompleteTask(task._id as Id<"tasks">)}
+                        onClick={() => handleCompleteTask(task.taskId)}
                         className="w-5 h-5 flex-shrink-0 rounded-full border-2 border-gray-500 hover:border-teal-500 hover:bg-teal-500/20 transition-colors flex items-center justify-center"
                         title="Mark complete"
                         aria-label={`Complete task: ${task.title}`}
@@ -375,7 +355,7 @@ export default function DashboardPage() {
                       </button>
 
                       {/* Task Content */}
-                      <Link href={`/follow-ups/tasks/${task._id}`} className="flex-1 min-w-0">
+                      <Link href={`/follow-ups/tasks/${task.taskId}`} className="flex-1 min-w-0">
                         <div className="flex items-center gap-2 mb-0.5">
                           <p className="text-white text-sm font-medium truncate">{task.title}</p>
                           <span className={`px-1.5 py-0.5 text-white text-xs rounded-full ${priorityColors[task.priority]} flex-shrink-0`}>
@@ -389,7 +369,7 @@ export default function DashboardPage() {
                         </div>
                         <p className="text-gray-400 text-xs">
                           {categoryLabels[task.category]}
-                          {task.participant && ` · ${task.participant.firstName} ${task.participant.lastName}`}
+                          {task.participantName && ` · ${task.participantName}`}
                         </p>
                       </Link>
 
@@ -405,7 +385,7 @@ export default function DashboardPage() {
               )}
 
               {/* Expand/Collapse Toggle */}
-              {upcomingTasks && upcomingTasks.length > 5 && (
+              {upcomingTaskCount > 5 && (
                 <button
                   onClick={() => toggleSection("tasksExpanded")}
                   className="w-full mt-2 py-1.5 text-sm text-gray-400 hover:text-teal-400 transition-colors flex items-center justify-center gap-1"
@@ -418,7 +398,7 @@ export default function DashboardPage() {
                   ) : (
                     <>
                       <svg className="w-4 h-4" fill="none" stroke="currentColor" viewBox="0 0 24 24"><path strokeLinecap="round" strokeLinejoin="round" strokeWidth={2} d="M19 9l-7 7-7-7" /></svg>
-                      Show more ({upcomingTasks.length - 5} more)
+                      Show more ({upcomingTaskCount - 5} more)
                     </>
                   )}
                 </button>
@@ -508,7 +488,7 @@ export default function DashboardPage() {
             {!collapsed["maintenance"] && (
               <div className="space-y-3 mt-4">
                 {upcomingSchedules.map((schedule) => (
-                  <Link key={schedule._id} href="/operations?tab=schedule">
+                  <Link key={schedule.scheduleId} href="/operations?tab=schedule">
                     <div className="flex justify-between items-center p-4 bg-gray-700/50 rounded-lg hover:bg-gray-700 transition-colors">
                       <div>
                         <div className="flex items-center gap-2 mb-1">
@@ -528,7 +508,7 @@ export default function DashboardPage() {
                           </span>
                         </div>
                         <p className="text-gray-400 text-sm">
-                          {schedule.property?.propertyName || schedule.property?.addressLine1 || "Unknown property"}
+                          {schedule.propertyName || "Unknown property"}
                         </p>
                       </div>
                       <div className="text-right">
@@ -800,8 +780,8 @@ export default function DashboardPage() {
             <>
               {activeAlerts && activeAlerts.length > 0 ? (
                 <div className="space-y-3 mt-4">
-                  {activeAlerts.slice(0, 5).map((alert) => (
-                    <div key={alert._id} className="p-4 bg-gray-700/50 rounded-lg">
+                  {activeAlerts.map((alert) => (
+                    <div key={alert.alertId} className="p-4 bg-gray-700/50 rounded-lg">
                       <div className="flex items-center gap-2 mb-2">
                         <span
                           className={`px-2 py-1 text-white text-xs rounded-full ${
@@ -9,6 +9,7 @@ import Header from "@/components/Header";
 import Breadcrumbs from "@/components/ui/Breadcrumbs";
 import { useConfirmDialog } from "@/components/ui/ConfirmDialog";
 import { Id } from "../../../../convex/_generated/dataModel";
+import { compressImage } from "@/lib/imageCompression";
 
 interface PendingMedia {
   file: File;
@@ -229,11 +230,12 @@ export default function IncidentDetailPage() {
 
         for (const media of pendingMedia) {
           try {
+            const { file } = await compressImage(media.file);
             const uploadUrl = await generateUploadUrl({ userId: currentUserId as Id<"users"> });
             const response = await fetch(uploadUrl, {
               method: "POST",
-              headers: { "Content-Type": media.file.type },
-              body: media.file,
+              headers: { "Content-Type": file.type },
+              body: file,
             });
 
             if (!response.ok) {
@@ -252,9 +254,9 @@ export default function IncidentDetailPage() {
             await addPhoto({
               incidentId,
               storageId: storageId as Id<"_storage">,
-              fileName: media.file.name,
-              fileSize: media.file.size,
-              fileType: media.file.type,
+              fileName: file.name,
+              fileSize: file.size,
+              fileType: file.type,
               description: media.description || undefined,
               uploadedBy: currentUserId as Id<"users">,
             });
@@ -1010,7 +1012,7 @@ export default function IncidentDetailPage() {
                           />
                         ) : (
                           <img
-                            src={media.url}
+                            src={media.thumbnailUrl ?? media.url}
                             alt={media.description || media.fileName}
                             className="w-full h-full object-cover rounded cursor-pointer"
                             onClick={() => window.open(media.url!, "_blank")}
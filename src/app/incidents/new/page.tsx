@@ -10,7 +10,10 @@ import { RequireAuth } from "@/components/RequireAuth";
 import OfflineIndicator from "@/components/OfflineIndicator";
 import { useConfirmDialog } from "@/components/ui/ConfirmDialog";
 import { addToQueue } from "@/lib/offlineQueue";
+import { requestBackgroundReplay } from "@/lib/backgroundSync";
 import { Id } from "../../../../convex/_generated/dataModel";
+import { compressImages } from "@/lib/imageCompression";
+import { formatBytes } from "@/utils/imageCompression";
 
 type MediaUpload = {
   file: File;
@@ -160,16 +163,6 @@ export default function NewIncidentPage() {
     setMedia(newMedia);
   };
 
-  // Helper function to convert File to base64 for offline storage
-  const fileToBase64 = (file: File): Promise<string> => {
-    return new Promise((resolve, reject) => {
-      const reader = new FileReader();
-      reader.readAsDataURL(file);
-      reader.onload = () => resolve(reader.result as string);
-      reader.onerror = (error) => reject(error);
-    });
-  };
-
   const handleSubmit = async (e: React.FormEvent) => {
     e.preventDefault();
     setError("");
@@ -192,6 +185,10 @@ export default function NewIncidentPage() {
     setIsSubmitting(true);
 
     try {
+      // Resize and re-encode photos once for either path (videos pass through)
+      const compressed = await compressImages(media.map((item) => item.file));
+      const bytesSaved = compressed.reduce((sum, c) => sum + Math.max(0, c.bytesSaved), 0);
+
       // Check if offline - save to IndexedDB
       if (!isOnline) {
         // Prepare incident data for offline queue
@@ -213,24 +210,28 @@ export default function NewIncidentPage() {
           reportedToNdis: formData.reportedToNdis,
           ndisReportDate: formData.ndisReportDate || undefined,
           reportedBy: user.id,
-          // Store media as base64 for offline support
-          media: await Promise.all(
-            media.map(async (item) => ({
-              file: await fileToBase64(item.file),
-              fileName: item.file.name,
-              fileSize: item.file.size,
-              fileType: item.file.type,
-              description: item.description || undefined,
-              isVideo: item.isVideo,
-            }))
-          ),
+          // Store media as Blobs (IndexedDB stores them natively)
+          media: media.map((item, index) => ({
+            file: compressed[index].file,
+            fileName: compressed[index].file.name,
+            fileSize: compressed[index].file.size,
+            fileType: compressed[index].file.type,
+            description: item.description || undefined,
+            isVideo: item.isVideo,
+          })),
         };
 
         // Save to offline queue
         await addToQueue(incidentData);
+        // Let the service worker submit it once back online, even if this tab closes
+        requestBackgroundReplay();
 
         // Show success message
-        await alertDialog("Incident saved locally. It will sync when you're back online.");
+        await alertDialog(
+          bytesSaved > 0
+            ? `Incident saved locally (photos compressed, ${formatBytes(bytesSaved)} saved). It will sync when you're back online.`
+            : "Incident saved locally. It will sync when you're back online."
+        );
 
         // Redirect to incidents page
         router.push("/incidents");
@@ -261,21 +262,22 @@ export default function NewIncidentPage() {
       });
 
       // Upload media (photos/videos)
-      for (const item of media) {
+      for (const [index, item] of media.entries()) {
+        const file = compressed[index].file;
         const uploadUrl = await generateUploadUrl({ userId: user.id as Id<"users"> });
         const response = await fetch(uploadUrl, {
           method: "POST",
-          headers: { "Content-Type": item.file.type },
-          body: item.file,
+          headers: { "Content-Type": file.type },
+          body: file,
         });
         const { storageId } = await response.json();
 
         await addPhoto({
           incidentId: incidentId as Id<"incidents">,
           storageId: storageId as Id<"_storage">,
-          fileName: item.file.name,
-          fileSize: item.file.size,
-          fileType: item.file.type,
+          fileName: file.name,
+          fileSize: file.size,
+          fileType: file.type,
           description: item.description || undefined,
           uploadedBy: user.id as Id<"users">,
         });
@@ -10,6 +10,7 @@ import Header from "@/components/Header";
 import { RequireAuth } from "@/components/RequireAuth";
 import { useConfirmDialog } from "@/components/ui/ConfirmDialog";
 import { Id } from "../../../../convex/_generated/dataModel";
+import { compressImage } from "@/lib/imageCompression";
 
 type ItemStatus = "pending" | "pass" | "fail" | "na";
 
@@ -90,6 +91,7 @@ export default function InspectionDetailPage() {
   }, []);
 
   const updateItemStatus = useMutation(api.inspections.updateItemStatus);
+  const bulkUpdateItems = useMutation(api.inspections.bulkUpdateItems);
   const startInspection = useMutation(api.inspections.startInspection);
   const completeInspection = useMutation(api.inspections.completeInspection);
   const generateUploadUrl = useMutation(api.inspections.generateUploadUrl);
@@ -192,8 +194,16 @@ export default function InspectionDetailPage() {
     try {
       // Auto-mark remaining pending items as N/A
       const pendingItems = (items ?? []).filter(i => i.status === "pending");
-      for (const item of pendingItems) {
-        await updateItemStatus({ itemId: item._id, status: "na" as const, updatedBy: user.id as Id<"users"> });
+      if (pendingItems.length > 0) {
+        await bulkUpdateItems({
+          updates: pendingItems.map((item) => ({
+            itemId: item._id,
+            status: "na" as const,
+            condition: item.condition,
+            remarks: item.remarks,
+          })),
+          updatedBy: user.id as Id<"users">,
+        });
       }
       const result = await completeInspection({
         userId: user.id as Id<"users">,
@@ -216,8 +226,16 @@ export default function InspectionDetailPage() {
     try {
       // Auto-mark remaining pending items as N/A
       const pendingItems = (items ?? []).filter(i => i.status === "pending");
-      for (const item of pendingItems) {
-        await updateItemStatus({ itemId: item._id, status: "na" as const, updatedBy: user.id as Id<"users"> });
+      if (pendingItems.length > 0) {
+        await bulkUpdateItems({
+          updates: pendingItems.map((item) => ({
+            itemId: item._id,
+            status: "na" as const,
+            condition: item.condition,
+            remarks: item.remarks,
+          })),
+          updatedBy: user.id as Id<"users">,
+        });
       }
       const result = await completeInspection({
         userId: user.id as Id<"users">,
@@ -236,10 +254,10 @@ export default function InspectionDetailPage() {
   const handlePhotoUpload = async (e: React.ChangeEvent<HTMLInputElement>, itemId: string) => {
     if (!e.target.files || !e.target.files[0] || !user) return;
 
-    const file = e.target.files[0];
     setUploadingFor(itemId);
 
     try {
+      const { file } = await compressImage(e.target.files[0]);
       const uploadUrl = await generateUploadUrl({ userId: user.id as Id<"users"> });
       const result = await fetch(uploadUrl, {
         method: "POST",
@@ -283,10 +301,10 @@ export default function InspectionDetailPage() {
   const handleGeneralPhotoUpload = async (e: React.ChangeEvent<HTMLInputElement>) => {
     if (!e.target.files || !e.target.files[0] || !user) return;
 
-    const file = e.target.files[0];
     setUploadingGeneral(true);
 
     try {
+      const { file } = await compressImage(e.target.files[0]);
       const uploadUrl = await generateUploadUrl({ userId: user.id as Id<"users"> });
       const result = await fetch(uploadUrl, {
         method: "POST",
@@ -730,7 +748,7 @@ export default function InspectionDetailPage() {
                                   <div key={photo._id} className="relative group">
                                     {photo.url && (
                                       <img
-                                        src={photo.url}
+                                        src={photo.thumbnailUrl ?? photo.url}
                                         alt={photo.fileName}
                                         className="w-20 h-20 object-cover rounded-lg"
                                       />
@@ -795,7 +813,7 @@ export default function InspectionDetailPage() {
                   <div key={photo._id} className="relative group">
                     {photo.url && (
                       <img
-                        src={photo.url}
+                        src={photo.thumbnailUrl ?? photo.url}
                         alt={photo.fileName}
                         className="w-24 h-24 object-cover rounded-lg"
                       />
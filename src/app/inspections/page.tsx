@@ -12,7 +12,8 @@ import { EmptyState } from "@/components/ui/EmptyState";
 import { StatCard } from "@/components/ui/StatCard";
 import { Id } from "../../../convex/_generated/dataModel";
 import { formatStatus } from "@/utils/format";
-import { generateInspectionPDF } from "@/utils/inspectionPdf";
+import { exportPdf } from "@/lib/pdfExport";
+import { inspectionPdfFileName } from "@/utils/inspectionPdf";
 import { useOrganization } from "@/contexts/OrganizationContext";
 import { useConfirmDialog } from "@/components/ui/ConfirmDialog";
 import HelpGuideButton from "@/components/ui/HelpGuideButton";
@@ -131,7 +132,11 @@ function InspectionsContent() {
         inspectionId,
         userId: user.id as Id<"users">,
       });
-      await generateInspectionPDF(reportData, organization?.name);
+      await exportPdf(
+        { kind: "inspection", data: reportData, organizationName: organization?.name },
+        inspectionPdfFileName(reportData),
+        { convex, userId: user.id as Id<"users"> }
+      );
     } catch (error) {
       await alertDialog("Error generating PDF. Please try again.");
     } finally {
@@ -11,6 +11,7 @@ import Breadcrumbs from "@/components/ui/Breadcrumbs";
 import { Id } from "../../../../convex/_generated/dataModel";
 import { useConfirmDialog } from "@/components/ui/ConfirmDialog";
 import { useOrganization } from "@/contexts/OrganizationContext";
+import { compressImage } from "@/lib/imageCompression";
 
 interface PendingMedia {
   file: File;
@@ -237,20 +238,21 @@ export default function MaintenanceRequestDetailPage() {
         setUploadingMedia(true);
         for (const media of pendingMedia) {
           try {
+            const { file } = await compressImage(media.file);
             const uploadUrl = await generateUploadUrl({ userId: user.id as Id<"users"> });
             const response = await fetch(uploadUrl, {
               method: "POST",
-              headers: { "Content-Type": media.file.type },
-              body: media.file,
+              headers: { "Content-Type": file.type },
+              body: file,
             });
             const { storageId } = await response.json();
 
             await addPhoto({
               maintenanceRequestId: requestId,
               storageId: storageId as Id<"_storage">,
-              fileName: media.file.name,
-              fileSize: media.file.size,
-              fileType: media.file.type,
+              fileName: file.name,
+              fileSize: file.size,
+              fileType: file.type,
               description: media.description || undefined,
               photoType: media.photoType,
               uploadedBy: user.id as Id<"users">,
@@ -848,7 +850,7 @@ export default function MaintenanceRequestDetailPage() {
                           />
                         ) : (
                           <img
-                            src={media.url}
+                            src={media.thumbnailUrl ?? media.url}
                             alt={media.description || media.fileName}
                             className="w-full h-full object-cover rounded cursor-pointer"
                             onClick={() => window.open(media.url!, "_blank")}
@@ -8,6 +8,7 @@ import Link from "next/link";
 import Header from "@/components/Header";
 import { RequireAuth } from "@/components/RequireAuth";
 import { Id } from "../../../../convex/_generated/dataModel";
+import { compressImage } from "@/lib/imageCompression";
 
 interface PendingPhoto {
   file: File;
@@ -247,20 +248,21 @@ function NewMaintenanceRequestContent() {
         setUploadingPhotos(true);
         for (const photo of pendingPhotos) {
           try {
+            const { file } = await compressImage(photo.file);
             const uploadUrl = await generateUploadUrl({ userId: user.id as Id<"users"> });
             const response = await fetch(uploadUrl, {
               method: "POST",
-              headers: { "Content-Type": photo.file.type },
-              body: photo.file,
+              headers: { "Content-Type": file.type },
+              body: file,
             });
             const { storageId } = await response.json();
 
             await addPhoto({
               maintenanceRequestId: requestId,
               storageId: storageId as Id<"_storage">,
-              fileName: photo.file.name,
-              fileSize: photo.file.size,
-              fileType: photo.file.type,
+              fileName: file.name,
+              fileSize: file.size,
+              fileType: file.type,
               description: photo.description || undefined,
               photoType: photo.photoType,
               uploadedBy: user.id as Id<"users">,
@@ -92,7 +92,7 @@ export default function NewPropertyPage() {
   const silProviders = useQuery(api.silProviders.getAll, userIdTyped ? { status: "active", userId: userIdTyped } : "skip");
   const createOwner = useMutation(api.owners.create);
   const createProperty = useMutation(api.properties.create);
-  const createDwelling = useMutation(api.dwellings.create);
+  const createDwellings = useMutation(api.dwellings.createBatch);
 
   // Check if this is a SIL property (skips owner requirement)
   const isSilProperty = propertyData.propertyStatus === "sil_property";
@@ -197,12 +197,12 @@ export default function NewPropertyPage() {
         notes: propertyData.notes || undefined,
       });
 
-      // Step 3: Create dwellings
-      for (const dwelling of dwellings) {
-        await createDwelling({
+      // Step 3: Create dwellings (plan capacity is checked for the whole batch)
+      if (dwellings.length > 0) {
+        await createDwellings({
           userId: user?.id as Id<"users">,
           propertyId: propertyId as any,
-          ...dwelling,
+          dwellings,
         });
       }
 
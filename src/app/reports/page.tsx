@@ -1,6 +1,6 @@
 "use client";
 
-import { useQuery } from "convex/react";
+import { useQuery, useConvex } from "convex/react";
 import { api } from "../../../convex/_generated/api";
 import { useRouter } from "next/navigation";
 import { useEffect, useState, useCallback } from "react";
@@ -9,13 +9,9 @@ import { useConfirmDialog } from "@/components/ui/ConfirmDialog";
 import { RequireAuth } from "@/components/RequireAuth";
 import { useOrganization } from "@/contexts/OrganizationContext";
 import Link from "next/link";
-import jsPDF from "jspdf";
-import autoTable from "jspdf-autotable";
 import { Id } from "../../../convex/_generated/dataModel";
-import {
-  generateAuditCompliancePdf,
-  type AuditComplianceData,
-} from "@/utils/auditCompliancePdf";
+import type { AuditComplianceData } from "@/utils/auditCompliancePdf";
+import { exportPdf } from "@/lib/pdfExport";
 
 type ReportTab = "financial" | "compliance" | "operational" | "owner";
 
@@ -31,6 +27,7 @@ export default function ReportsPage() {
   const [selectedPropertyId, setSelectedPropertyId] = useState<string>("");
 
   const userId = user?.id as Id<"users"> | undefined;
+  const convex = useConvex();
 
   // Existing reports
   const complianceReport = useQuery(
@@ -159,73 +156,20 @@ export default function ReportsPage() {
       return;
     }
 
-    const doc = new jsPDF();
-    let yPos = 20;
-
-    ownerStatement.forEach((property, idx) => {
-      if (idx > 0) {
-        doc.addPage();
-        yPos = 20;
-      }
-
-      doc.setFontSize(18);
-      doc.text("Owner Statement / Folio Summary", 14, yPos);
-      yPos += 10;
-
-      doc.setFontSize(12);
-      doc.text(`Property: ${property?.propertyName}`, 14, yPos);
-      yPos += 6;
-      doc.text(`Address: ${property?.address}`, 14, yPos);
-      yPos += 6;
-      doc.text(`Period: ${startDate} to ${endDate}`, 14, yPos);
-      yPos += 10;
-
-      if (property?.owner) {
-        doc.text(`Owner: ${property.owner.name}`, 14, yPos);
-        yPos += 6;
-        if (property.owner.bankAccountName) {
-          doc.text(`Bank: ${property.owner.bankAccountName}`, 14, yPos);
-          yPos += 6;
-          doc.text(`BSB: ${property.owner.bankBsb} | Account: ${property.owner.bankAccountNumber}`, 14, yPos);
-          yPos += 10;
-        }
-      }
-
-      const tableData: string[][] = [];
-      property?.dwellings.forEach((dwelling) => {
-        dwelling.participants.forEach((p) => {
-          if (p) {
-            tableData.push([
-              dwelling.dwellingName,
-              p.participantName,
-              `$${p.monthlySda.toLocaleString()}`,
-              `$${p.monthlyRrc.toLocaleString()}`,
-              `$${p.totalRevenue.toLocaleString()}`,
-              `${p.managementFeePercent}%`,
-              `$${p.managementFee.toLocaleString()}`,
-              `$${p.netToOwner.toLocaleString()}`,
-            ]);
-          }
-        });
-      });
-
-      autoTable(doc, {
-        startY: yPos,
-        head: [["Dwelling", "Participant", "SDA", "RRC", "Total", "Fee %", "Fee $", "Net"]],
-        body: tableData,
-        theme: "grid",
-        styles: { fontSize: 8 },
-      });
-
-      yPos = (doc as any).lastAutoTable.finalY + 10;
-
-      doc.setFontSize(12);
-      doc.text(`Total Monthly Revenue: $${property?.totalMonthlyRevenue.toLocaleString()}`, 14, yPos);
-      yPos += 6;
-      doc.text(`Total Net to Owner: $${property?.totalMonthlyNetToOwner.toLocaleString()}`, 14, yPos);
-    });
-
-    doc.save(`owner-statement-${startDate}-to-${endDate}.pdf`);
+    try {
+      await exportPdf(
+        {
+          kind: "ownerStatement",
+          properties: ownerStatement.filter((property) => property !== null),
+          startDate,
+          endDate,
+        },
+        `owner-statement-${startDate}-to-${endDate}.pdf`,
+        userId ? { convex, userId } : undefined
+      );
+    } catch {
+      await alertDialog("Failed to export owner statement. Please try again.");
+    }
   };
 
   // Generate Audit Compliance Pack PDF
@@ -323,9 +267,12 @@ export default function ReportsPage() {
           : null,
       };
 
-      const pdf = generateAuditCompliancePdf(auditData);
       const dateStr = new Date().toISOString().split("T")[0];
-      pdf.save(`Audit_Compliance_Pack_${dateStr}.pdf`);
+      await exportPdf(
+        { kind: "auditCompliance", data: auditData },
+        `Audit_Compliance_Pack_${dateStr}.pdf`,
+        userId ? { convex, userId } : undefined
+      );
     } catch (error) {
       await alertDialog("Failed to generate audit compliance pack. Please try again.");
     } finally {
@@ -344,6 +291,8 @@ export default function ReportsPage() {
     startDate,
     endDate,
     alertDialog,
+    convex,
+    userId,
   ]);
 
   return (
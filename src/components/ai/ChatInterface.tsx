@@ -26,6 +26,8 @@ interface ChatInterfaceProps {
   onFileUpload?: (file: File, instructions?: string) => Promise<void>;
   isLoading: boolean;
   pendingAction: PendingAction | null;
+  /** Partial assistant reply streamed while the request is in flight */
+  streamingContent?: string | null;
 }
 
 export default function ChatInterface({
@@ -36,6 +38,7 @@ export default function ChatInterface({
   onFileUpload,
   isLoading,
   pendingAction,
+  streamingContent,
 }: ChatInterfaceProps) {
   const [input, setInput] = useState("");
   const [selectedFile, setSelectedFile] = useState<File | null>(null);
@@ -51,7 +54,7 @@ export default function ChatInterface({
 
   useEffect(() => {
     scrollToBottom();
-  }, [messages, pendingAction]);
+  }, [messages, pendingAction, streamingContent]);
 
   const handleSubmit = async (e?: React.FormEvent) => {
     e?.preventDefault();
@@ -243,7 +246,11 @@ export default function ChatInterface({
               </div>
             )}
 
-            {isLoading && (
+            {isLoading && streamingContent && (
+              <ChatMessage role="assistant" content={streamingContent} timestamp={Date.now()} />
+            )}
+
+            {isLoading && !streamingContent && (
               <div className="flex gap-3">
                 <div className="flex-shrink-0 w-8 h-8 rounded-full bg-purple-600 flex items-center justify-center">
                   <Bot className="w-4 h-4 text-white" />
@@ -1,14 +1,15 @@
 "use client";
 
 import { useState, useCallback } from "react";
-import { useQuery, useMutation } from "convex/react";
+import { useQuery, useMutation, useConvex } from "convex/react";
 import { api } from "../../../convex/_generated/api";
 import { Id } from "../../../convex/_generated/dataModel";
 import Link from "next/link";
 import Badge, { CommunicationTypeBadge } from "../ui/Badge";
 import { LoadingScreen } from "../ui/LoadingScreen";
 import { EmptyState } from "../ui/EmptyState";
-import { exportThreadToPdf } from "../../lib/threadPdfExport";
+import { exportPdf } from "../../lib/pdfExport";
+import { threadPdfFileName } from "../../lib/threadPdfExport";
 import { useOrganization } from "../../contexts/OrganizationContext";
 import { useConfirmDialog } from "../ui/ConfirmDialog";
 import ThreadPickerModal from "./ThreadPickerModal";
@@ -313,6 +314,7 @@ export function ThreadView({ userId, filterUnread, filterRequiresAction, statusF
 
   const markRead = useMutation(api.communications.markThreadRead);
   const updateThreadStatus = useMutation(api.communications.updateThreadStatus);
+  const convex = useConvex();
 
   // Merge paginated results
   const threads = cursor ? [...allThreads, ...(data?.threads || [])] : (data?.threads || []);
@@ -407,13 +409,17 @@ export function ThreadView({ userId, filterUnread, filterRequiresAction, statusF
           }];
         }
 
-        await exportThreadToPdf(exportData);
+        await exportPdf({ kind: "thread", data: exportData }, threadPdfFileName(exportData), {
+          convex,
+          userId: userId as Id<"users">,
+        });
       } catch (error) {
+        await alertDialog("Failed to export thread PDF. " + (error instanceof Error ? error.message : "Please try again."));
       } finally {
         setExportingThreadId(null);
       }
     },
-    []
+    [convex, userId, alertDialog]
   );
 
   if (!data) {
@@ -1,7 +1,12 @@
 "use client";
 
 import { createContext, useContext, useEffect, useState, useCallback, ReactNode } from "react";
+import { Capacitor } from "@capacitor/core";
+import { App } from "@capacitor/app";
+import { useConvex } from "convex/react";
 import { getPendingCount } from "@/lib/offlineStorage";
+import { onReplayMessage, replayInWorker, requestBackgroundReplay } from "@/lib/backgroundSync";
+import { syncIncidents, syncInspectionChanges } from "@/lib/offlineSyncEngine";
 
 interface NetworkContextType {
   isOnline: boolean;
@@ -16,6 +21,7 @@ const NetworkContext = createContext<NetworkContextType>({
 });
 
 export function NetworkProvider({ children }: { children: ReactNode }) {
+  const convex = useConvex();
   const [isOnline, setIsOnline] = useState(true);
   const [pendingCount, setPendingCount] = useState(0);
 
@@ -27,12 +33,31 @@ export function NetworkProvider({ children }: { children: ReactNode }) {
     }
   }, []);
 
+  /**
+   * Replay the offline queues through the service worker, or in the page
+   * when no worker controls it (first launch, or the worker failed to
+   * install).
+   */
+  const replay = useCallback(async () => {
+    if (await replayInWorker()) return;
+    if (!navigator.onLine) return;
+    try {
+      await syncIncidents(convex);
+      await syncInspectionChanges(convex);
+    } catch (error) {
+      console.error("Offline replay failed:", error);
+    }
+    await refreshPendingCount();
+  }, [convex, refreshPendingCount]);
+
   useEffect(() => {
     // Initialize online status
     setIsOnline(navigator.onLine);
 
     const handleOnline = () => {
       setIsOnline(true);
+      // Connectivity is back: have the service worker drain the offline queues
+      replayInWorker(true);
     };
 
     const handleOffline = () => {
@@ -45,11 +70,28 @@ export function NetworkProvider({ children }: { children: ReactNode }) {
     // Check pending count on mount
     refreshPendingCount();
 
+    // Register background replay, and refresh counts when the worker finishes a run
+    requestBackgroundReplay();
+    const unsubscribe = onReplayMessage((message) => {
+      if (message.phase === "done") refreshPendingCount();
+    });
+
+    // The Android WebView has no Background Sync; replay on resume and when
+    // the app is backgrounded instead
+    const nativeListeners = Capacitor.isNativePlatform()
+      ? [
+          App.addListener("resume", () => replay()),
+          App.addListener("pause", () => replay()),
+        ]
+      : [];
+
     return () => {
       window.removeEventListener("online", handleOnline);
       window.removeEventListener("offline", handleOffline);
+      unsubscribe();
+      nativeListeners.forEach((listener) => listener.then((handle) => handle.remove()));
     };
-  }, [refreshPendingCount]);
+  }, [refreshPendingCount, replay]);
 
   return (
     <NetworkContext.Provider value={{ isOnline, pendingCount, refreshPendingCount }}>
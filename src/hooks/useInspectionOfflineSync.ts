@@ -1,18 +1,13 @@
 "use client";
 
 import { useEffect, useState, useCallback } from "react";
-import { useMutation } from "convex/react";
-import { api } from "../../convex/_generated/api";
-import { Id } from "../../convex/_generated/dataModel";
+import { useConvex } from "convex/react";
 import {
-  getPendingChanges,
   getPendingInspectionCount,
-  markChangeAsSynced,
-  markChangeSyncFailed,
-  removeChange,
   cacheInspectionData,
-  type QueuedInspectionChange,
 } from "@/lib/inspectionOfflineQueue";
+import { syncInspectionChanges } from "@/lib/offlineSyncEngine";
+import { hasReplayWorker, onReplayMessage } from "@/lib/backgroundSync";
 
 // ---------------------------------------------------------------------------
 // Types
@@ -34,14 +29,12 @@ export interface InspectionOfflineSyncStatus {
  * Hook for managing offline inspection change synchronisation.
  *
  * Monitors network connectivity, automatically syncs queued inspection item
- * changes when the connection is restored, and exposes a manual `syncNow`
- * trigger for the UI.
+ * changes when the connection is restored (through the service worker when
+ * one controls the page), and exposes a manual `syncNow` trigger for the UI.
  *
- * Change types handled:
- *  - "status"  : calls `inspections.updateItemStatus`
- *  - "remarks" : calls `inspections.updateItemStatus` with remarks only
- *  - "photo"   : uploads the file via `inspections.generateUploadUrl` then
- *                calls `inspections.saveInspectionPhoto`
+ * Sync is delegated to the offline sync engine, which coalesces repeated
+ * edits to the same item, applies them in batched mutations with
+ * idempotency keys and uploads queued photos in parallel.
  */
 export function useInspectionOfflineSync() {
   const [status, setStatus] = useState<InspectionOfflineSyncStatus>({
@@ -52,10 +45,7 @@ export function useInspectionOfflineSync() {
     error: null,
   });
 
-  // Convex mutations used during sync
-  const updateItemStatus = useMutation(api.inspections.updateItemStatus);
-  const generateUploadUrl = useMutation(api.inspections.generateUploadUrl);
-  const saveInspectionPhoto = useMutation(api.inspections.saveInspectionPhoto);
+  const convex = useConvex();
 
   // -------------------------------------------------------------------
   // Pending count refresh
@@ -69,84 +59,6 @@ export function useInspectionOfflineSync() {
     }
   }, []);
 
-  // -------------------------------------------------------------------
-  // Single change sync
-  // -------------------------------------------------------------------
-
-  const syncSingleChange = useCallback(
-    async (change: QueuedInspectionChange): Promise<void> => {
-      const { changeType, data, itemId, inspectionId } = change;
-
-      switch (changeType) {
-        case "status": {
-          await updateItemStatus({
-            itemId: itemId as Id<"inspectionItems">,
-            status: data.status as "pending" | "pass" | "fail" | "na",
-            condition: data.condition as string | undefined,
-            remarks: data.remarks as string | undefined,
-            updatedBy: data.updatedBy as Id<"users">,
-          });
-          break;
-        }
-
-        case "remarks": {
-          // The backend does not have a standalone remarks mutation. We call
-          // updateItemStatus with only the remarks field populated. The status
-          // field is required by Convex validation so we pass the current
-          // status stored in the change data.
-          await updateItemStatus({
-            itemId: itemId as Id<"inspectionItems">,
-            status: (data.currentStatus as "pending" | "pass" | "fail" | "na") ?? "pending",
-            remarks: data.remarks as string,
-            updatedBy: data.updatedBy as Id<"users">,
-          });
-          break;
-        }
-
-        case "photo": {
-          // 1. Convert the stored base64 data URL back to a File object
-          const base64 = data.base64 as string;
-          const fileName = data.fileName as string;
-          const fileType = data.fileType as string;
-          const fileSize = data.fileSize as number;
-          const description = data.description as string | undefined;
-          const uploadedBy = data.uploadedBy as Id<"users">;
-
-          const response = await fetch(base64);
-          const blob = await response.blob();
-          const file = new File([blob], fileName, { type: fileType });
-
-          // 2. Get an upload URL from Convex storage
-          const uploadUrl = await generateUploadUrl({ userId: uploadedBy });
-
-          // 3. Upload the binary data
-          const uploadResponse = await fetch(uploadUrl, {
-            method: "POST",
-            headers: { "Content-Type": file.type },
-            body: file,
-          });
-          const { storageId } = await uploadResponse.json();
-
-          // 4. Create the inspection photo record
-          await saveInspectionPhoto({
-            inspectionId: inspectionId as Id<"inspections">,
-            inspectionItemId: itemId as Id<"inspectionItems">,
-            storageId: storageId as Id<"_storage">,
-            fileName,
-            fileSize,
-            fileType,
-            description,
-            uploadedBy,
-          });
-          break;
-        }
-
-        default:
-      }
-    },
-    [updateItemStatus, generateUploadUrl, saveInspectionPhoto]
-  );
-
   // -------------------------------------------------------------------
   // Full sync pass
   // -------------------------------------------------------------------
@@ -159,40 +71,8 @@ export function useInspectionOfflineSync() {
     setStatus((prev) => ({ ...prev, isSyncing: true, error: null }));
 
     try {
-      const pending = await getPendingChanges();
-
-      if (pending.length === 0) {
-        setStatus((prev) => ({
-          ...prev,
-          isSyncing: false,
-          lastSync: new Date(),
-        }));
-        return { success: true, synced: 0, failed: 0 };
-      }
-
-
-      let syncedCount = 0;
-      let failedCount = 0;
-
-      // Process changes sequentially to preserve order of operations
-      for (const change of pending) {
-        try {
-          await syncSingleChange(change);
-
-          // Mark as synced then remove from queue
-          await markChangeAsSynced(change.id);
-          await removeChange(change.id);
-
-          syncedCount++;
-        } catch (err) {
-          failedCount++;
-          const errorMessage =
-            err instanceof Error ? err.message : "Unknown error";
-
-
-          await markChangeSyncFailed(change.id, errorMessage);
-        }
-      }
+      const { synced: syncedCount, failed: failedCount } =
+        await syncInspectionChanges(convex);
 
       await updatePendingCount();
 
@@ -223,7 +103,7 @@ export function useInspectionOfflineSync() {
 
       return { success: false, synced: 0, failed: 0 };
     }
-  }, [syncSingleChange, updatePendingCount]);
+  }, [convex, updatePendingCount]);
 
   // -------------------------------------------------------------------
   // Cache helper exposed to consumers
@@ -254,6 +134,9 @@ export function useInspectionOfflineSync() {
     const handleOnline = async () => {
       setStatus((prev) => ({ ...prev, isOnline: true }));
 
+      // The service worker replays on reconnect and reports back below
+      if (hasReplayWorker()) return;
+
       // Wait 1 second for connection to stabilise
       await new Promise((resolve) => setTimeout(resolve, 1000));
 
@@ -267,6 +150,21 @@ export function useInspectionOfflineSync() {
     window.addEventListener("online", handleOnline);
     window.addEventListener("offline", handleOffline);
 
+    // Reflect background replays run by the service worker
+    const unsubscribe = onReplayMessage((message) => {
+      if (message.phase === "start") {
+        setStatus((prev) => ({ ...prev, isSyncing: true, error: null }));
+      } else if (message.phase === "done") {
+        updatePendingCount();
+        setStatus((prev) => ({
+          ...prev,
+          isSyncing: false,
+          lastSync: new Date(),
+          error: message.error ?? (message.failed > 0 ? `${message.failed} change(s) failed to sync` : null),
+        }));
+      }
+    });
+
     // Initial pending count on mount
     updatePendingCount();
 
@@ -276,6 +174,7 @@ export function useInspectionOfflineSync() {
     return () => {
       window.removeEventListener("online", handleOnline);
       window.removeEventListener("offline", handleOffline);
+      unsubscribe();
       clearInterval(intervalId);
     };
   }, [syncPendingChanges, updatePendingCount]);
@@ -1,16 +1,45 @@
 "use client";
 
-import { useEffect } from "react";
+import { useEffect, useRef } from "react";
 import { cacheData, getCachedData } from "@/lib/offlineStorage";
 
-export function useOfflineCache<T>(key: string, data: T | undefined | null) {
+// Reactive queries can update several times a second; only persist once they settle
+const CACHE_WRITE_DEBOUNCE_MS = 1000;
+
+interface OfflineCacheOptions {
+  version?: number; // Bump when the cached data's shape changes
+  debounceMs?: number;
+}
+
+export function useOfflineCache<T>(
+  key: string,
+  data: T | undefined | null,
+  options: OfflineCacheOptions = {}
+) {
+  const { version, debounceMs = CACHE_WRITE_DEBOUNCE_MS } = options;
+  const pendingWrite = useRef<(() => void) | null>(null);
+
   useEffect(() => {
-    if (data) {
-      cacheData(key, data);
-    }
-  }, [key, data]);
+    if (!data) return;
+
+    const write = () => {
+      pendingWrite.current = null;
+      cacheData(key, data, { version }).catch((err) =>
+        console.error(`Failed to cache offline data for ${key}:`, err)
+      );
+    };
+    pendingWrite.current = write;
+    const timer = setTimeout(write, debounceMs);
+    return () => clearTimeout(timer);
+  }, [key, data, version, debounceMs]);
+
+  // Flush a debounced write when the page unmounts
+  useEffect(() => () => pendingWrite.current?.(), []);
 }
 
-export async function getOfflineCachedData<T>(key: string): Promise<T | null> {
-  return getCachedData<T>(key);
+export async function getOfflineCachedData<T>(
+  key: string,
+  options: { version?: number } = {}
+): Promise<T | null> {
+  return getCachedData<T>(key, options);
 }
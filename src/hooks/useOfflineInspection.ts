@@ -5,7 +5,9 @@ import { useMutation } from "convex/react";
 import { api } from "../../convex/_generated/api";
 import { useNetwork } from "@/contexts/NetworkContext";
 import { addPendingMutation, addOfflinePhoto } from "@/lib/offlineStorage";
+import { requestBackgroundReplay } from "@/lib/backgroundSync";
 import { Id } from "../../convex/_generated/dataModel";
+import { compressImage } from "@/lib/imageCompression";
 
 export function useOfflineInspection() {
   const { isOnline, refreshPendingCount } = useNetwork();
@@ -23,9 +25,10 @@ export function useOfflineInspection() {
       return updateItemStatusMutation({ itemId, status, remarks, updatedBy });
     }
 
-    // Queue for later sync
+    // Queue for later sync. Each edit gets its own id (it doubles as the
+    // server idempotency key); the sync engine keeps only the latest per item
     await addPendingMutation({
-      id: `inspection-item-${itemId}-${Date.now()}`,
+      id: `inspection-item-${itemId}-${crypto.randomUUID()}`,
       type: "inspection",
       action: "update",
       data: { itemId, status, remarks, updatedBy },
@@ -33,6 +36,7 @@ export function useOfflineInspection() {
       retryCount: 0,
     });
     await refreshPendingCount();
+    requestBackgroundReplay();
   }, [isOnline, updateItemStatusMutation, refreshPendingCount]);
 
   const uploadPhoto = useCallback(async (
@@ -41,6 +45,9 @@ export function useOfflineInspection() {
     inspectionItemId: Id<"inspectionItems">,
     uploadedBy: Id<"users">
   ) => {
+    // Compress once; the same file is uploaded now or stored for later
+    ({ file } = await compressImage(file));
+
     if (isOnline) {
       try {
         const uploadUrl = await generateUploadUrl({ userId: uploadedBy });
@@ -73,8 +80,10 @@ export function useOfflineInspection() {
       blob: file,
       fileName: file.name,
       timestamp: Date.now(),
+      uploadedBy,
     });
     await refreshPendingCount();
+    requestBackgroundReplay();
   }, [isOnline, generateUploadUrl, savePhotoMutation, refreshPendingCount]);
 
   return { updateItemStatus, uploadPhoto, isOnline };
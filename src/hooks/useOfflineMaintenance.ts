@@ -5,7 +5,9 @@ import { useMutation } from "convex/react";
 import { api } from "../../convex/_generated/api";
 import { useNetwork } from "@/contexts/NetworkContext";
 import { addOfflinePhoto } from "@/lib/offlineStorage";
+import { requestBackgroundReplay } from "@/lib/backgroundSync";
 import { Id } from "../../convex/_generated/dataModel";
+import { compressImage } from "@/lib/imageCompression";
 
 export function useOfflineMaintenance() {
   const { isOnline, refreshPendingCount } = useNetwork();
@@ -19,6 +21,9 @@ export function useOfflineMaintenance() {
     photoType: "before" | "during" | "after" | "issue" = "issue",
     description?: string
   ) => {
+    // Compress once; the same file is uploaded now or stored for later
+    ({ file } = await compressImage(file));
+
     if (isOnline) {
       try {
         const uploadUrl = await generateUploadUrl({ userId: uploadedBy });
@@ -51,8 +56,12 @@ export function useOfflineMaintenance() {
       blob: file,
       fileName: file.name,
       timestamp: Date.now(),
+      uploadedBy,
+      photoType,
+      description,
     });
     await refreshPendingCount();
+    requestBackgroundReplay();
   }, [isOnline, generateUploadUrl, addPhotoMutation, refreshPendingCount]);
 
   return { uploadMaintenancePhoto, isOnline };
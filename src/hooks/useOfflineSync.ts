@@ -1,16 +1,10 @@
 "use client";
 
 import { useEffect, useState, useCallback } from "react";
-import { useMutation } from "convex/react";
-import { api } from "../../convex/_generated/api";
-import { Id } from "../../convex/_generated/dataModel";
-import {
-  getPendingIncidents,
-  markAsSynced,
-  markSyncFailed,
-  removeFromQueue,
-  getPendingCount,
-} from "@/lib/offlineQueue";
+import { useConvex } from "convex/react";
+import { getPendingCount } from "@/lib/offlineQueue";
+import { syncIncidents } from "@/lib/offlineSyncEngine";
+import { hasReplayWorker, onReplayMessage } from "@/lib/backgroundSync";
 
 export interface OfflineSyncStatus {
   isOnline: boolean;
@@ -23,8 +17,11 @@ export interface OfflineSyncStatus {
 /**
  * Hook for managing offline incident sync
  *
- * Automatically syncs pending incidents when connection is restored.
- * Provides status and manual sync capability.
+ * Automatically syncs pending incidents when connection is restored: the
+ * service worker replays in the background where one controls the page
+ * (progress is reflected here), otherwise the page syncs itself.
+ * Provides status and manual sync capability. Media for all queued
+ * incidents is uploaded in parallel by the offline sync engine.
  */
 export function useOfflineSync() {
   const [status, setStatus] = useState<OfflineSyncStatus>({
@@ -35,10 +32,7 @@ export function useOfflineSync() {
     error: null,
   });
 
-  // Convex mutations for creating incidents and uploading photos
-  const createIncident = useMutation(api.incidents.create);
-  const addPhoto = useMutation(api.incidents.addPhoto);
-  const generateUploadUrl = useMutation(api.maintenancePhotos.generateUploadUrl);
+  const convex = useConvex();
 
   /**
    * Update pending count
@@ -62,82 +56,7 @@ export function useOfflineSync() {
     setStatus((prev) => ({ ...prev, isSyncing: true, error: null }));
 
     try {
-      const pending = await getPendingIncidents();
-
-      if (pending.length === 0) {
-        setStatus((prev) => ({
-          ...prev,
-          isSyncing: false,
-          lastSync: new Date(),
-        }));
-        return { success: true, synced: 0, failed: 0 };
-      }
-
-
-      let syncedCount = 0;
-      let failedCount = 0;
-
-      // Sync incidents one by one to handle failures gracefully
-      for (const queuedIncident of pending) {
-        try {
-          const { media, ...incidentData } = queuedIncident.data;
-
-          // Create the incident on server
-          const incidentId = await createIncident(incidentData);
-
-          // Upload photos/videos if any
-          if (media && Array.isArray(media) && media.length > 0) {
-            for (const mediaItem of media) {
-              try {
-                // Convert base64 back to File
-                const response = await fetch(mediaItem.file);
-                const blob = await response.blob();
-                const file = new File([blob], mediaItem.fileName, {
-                  type: mediaItem.fileType,
-                });
-
-                // Upload to Convex storage
-                const uploadUrl = await generateUploadUrl({
-                  userId: incidentData.reportedBy as Id<"users">,
-                });
-                const uploadResponse = await fetch(uploadUrl, {
-                  method: "POST",
-                  headers: { "Content-Type": file.type },
-                  body: file,
-                });
-                const { storageId } = await uploadResponse.json();
-
-                // Add photo record
-                await addPhoto({
-                  incidentId: incidentId as Id<"incidents">,
-                  storageId: storageId as Id<"_storage">,
-                  fileName: mediaItem.fileName,
-                  fileSize: mediaItem.fileSize,
-                  fileType: mediaItem.fileType,
-                  description: mediaItem.description,
-                  uploadedBy: incidentData.reportedBy as Id<"users">,
-                });
-              } catch (photoError) {
-                // Continue with other photos even if one fails
-              }
-            }
-          }
-
-          // Mark as synced and remove from queue
-          await markAsSynced(queuedIncident.id);
-          await removeFromQueue(queuedIncident.id);
-
-          syncedCount++;
-        } catch (error) {
-          failedCount++;
-          const errorMessage =
-            error instanceof Error ? error.message : "Unknown error";
-
-
-          // Mark sync as failed (increases retry count)
-          await markSyncFailed(queuedIncident.id, errorMessage);
-        }
-      }
+      const { synced: syncedCount, failed: failedCount } = await syncIncidents(convex);
 
       // Update status
       await updatePendingCount();
@@ -165,7 +84,7 @@ export function useOfflineSync() {
 
       return { success: false, synced: 0, failed: 0 };
     }
-  }, [createIncident, addPhoto, generateUploadUrl, updatePendingCount]);
+  }, [convex, updatePendingCount]);
 
   /**
    * Listen for online/offline events
@@ -174,6 +93,9 @@ export function useOfflineSync() {
     const handleOnline = async () => {
       setStatus((prev) => ({ ...prev, isOnline: true }));
 
+      // The service worker replays on reconnect and reports back below
+      if (hasReplayWorker()) return;
+
       // Wait a moment for connection to stabilize
       await new Promise((resolve) => setTimeout(resolve, 1000));
 
@@ -188,6 +110,21 @@ export function useOfflineSync() {
     window.addEventListener("online", handleOnline);
     window.addEventListener("offline", handleOffline);
 
+    // Reflect background replays run by the service worker
+    const unsubscribe = onReplayMessage((message) => {
+      if (message.phase === "start") {
+        setStatus((prev) => ({ ...prev, isSyncing: true, error: null }));
+      } else if (message.phase === "done") {
+        updatePendingCount();
+        setStatus((prev) => ({
+          ...prev,
+          isSyncing: false,
+          lastSync: new Date(),
+          error: message.error ?? (message.failed > 0 ? `${message.failed} change(s) failed to sync` : null),
+        }));
+      }
+    });
+
     // Update pending count on mount
     updatePendingCount();
 
@@ -197,6 +134,7 @@ export function useOfflineSync() {
     return () => {
       window.removeEventListener("online", handleOnline);
       window.removeEventListener("offline", handleOffline);
+      unsubscribe();
       clearInterval(intervalId);
     };
   }, [syncPendingIncidents, updatePendingCount]);
@@ -0,0 +1,122 @@
+/**
+ * Background Replay
+ *
+ * Hands replay of the offline queues (offlineQueue, inspectionOfflineQueue,
+ * offlineStorage) to the service worker in worker/index.ts, so queued
+ * changes reach the server as soon as connectivity returns even when no
+ * page with an offline hook is open:
+ *
+ * - A one-off Background Sync registration fires when the device is back
+ *   online, including after every tab has been closed.
+ * - Periodic Background Sync (where granted) retries entries that failed.
+ * - NetworkProvider asks the worker to replay straight away on the "online"
+ *   event, and in the Capacitor app on resume and when sent to background
+ *   (the Android WebView has no Background Sync).
+ *
+ * The worker reports progress to every open window with REPLAY_MESSAGE
+ * messages. Where there is no service worker, callers fall back to replaying
+ * in the page with the offline sync engine.
+ *
+ * Imported by the worker for the shared tags and message types, so this
+ * module must stay free of window-only dependencies.
+ */
+
+import { saveReplayState } from "@/lib/offlineStorage";
+
+export const REPLAY_SYNC_TAG = "offline-replay";
+export const REPLAY_PERIODIC_TAG = "offline-replay-periodic";
+// Message a page posts to the worker to replay now
+export const REPLAY_REQUEST = "offline-replay:run";
+// Messages the worker posts back to pages
+export const REPLAY_MESSAGE = "offline-replay:status";
+
+// Browsers clamp this to their own minimum (12 hours in Chrome by default)
+const PERIODIC_MIN_INTERVAL_MS = 15 * 60 * 1000;
+
+export type ReplayMessage =
+  | { type: typeof REPLAY_MESSAGE; phase: "start" }
+  | {
+      type: typeof REPLAY_MESSAGE;
+      phase: "progress";
+      queue: "inspections" | "incidents";
+      synced: number;
+      failed: number;
+    }
+  | {
+      type: typeof REPLAY_MESSAGE;
+      phase: "done";
+      synced: number;
+      failed: number;
+      nextAttemptAt: number;
+      error?: string;
+    };
+
+// Background Sync and Periodic Background Sync are not in the DOM typings yet
+interface SyncCapableRegistration extends ServiceWorkerRegistration {
+  sync?: { register(tag: string): Promise<void> };
+  periodicSync?: { register(tag: string, options: { minInterval: number }): Promise<void> };
+}
+
+function hasServiceWorker(): boolean {
+  return typeof navigator !== "undefined" && "serviceWorker" in navigator;
+}
+
+/**
+ * Whether a service worker controls this page and can replay for it.
+ */
+export function hasReplayWorker(): boolean {
+  return hasServiceWorker() && !!navigator.serviceWorker.controller;
+}
+
+/**
+ * Record the Convex URL for the worker and register background replay.
+ * Call after queueing anything offline. Returns false when the browser has
+ * no Background Sync, in which case replay relies on open pages.
+ */
+export async function requestBackgroundReplay(): Promise<boolean> {
+  if (!hasServiceWorker()) return false;
+
+  try {
+    await saveReplayState({ convexUrl: process.env.NEXT_PUBLIC_CONVEX_URL });
+    const registration = (await navigator.serviceWorker.ready) as SyncCapableRegistration;
+
+    if (registration.periodicSync) {
+      // Only succeeds for installed PWAs; failures are expected elsewhere
+      await registration.periodicSync
+        .register(REPLAY_PERIODIC_TAG, { minInterval: PERIODIC_MIN_INTERVAL_MS })
+        .catch(() => {});
+    }
+
+    if (!registration.sync) return false;
+    await registration.sync.register(REPLAY_SYNC_TAG);
+    return true;
+  } catch {
+    return false;
+  }
+}
+
+/**
+ * Ask the controlling service worker to replay now. `force` skips the
+ * failure backoff (use when connectivity has just returned). Returns false
+ * when no worker controls the page.
+ */
+export async function replayInWorker(force = false): Promise<boolean> {
+  if (!hasReplayWorker()) return false;
+  await saveReplayState({ convexUrl: process.env.NEXT_PUBLIC_CONVEX_URL });
+  navigator.serviceWorker.controller!.postMessage({ type: REPLAY_REQUEST, force });
+  return true;
+}
+
+/**
+ * Listen for replay progress from the service worker. Returns an unsubscribe
+ * function.
+ */
+export function onReplayMessage(listener: (message: ReplayMessage) => void): () => void {
+  if (!hasServiceWorker()) return () => {};
+
+  const handler = (event: MessageEvent) => {
+    if (event.data?.type === REPLAY_MESSAGE) listener(event.data as ReplayMessage);
+  };
+  navigator.serviceWorker.addEventListener("message", handler);
+  return () => navigator.serviceWorker.removeEventListener("message", handler);
+}
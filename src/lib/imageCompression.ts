@@ -0,0 +1,190 @@
+/**
+ * Photo Compression Pipeline
+ *
+ * Resizes and re-encodes photos (WebP, JPEG fallback) in a web worker
+ * before they are uploaded or queued offline. A 12 MP phone capture
+ * typically drops from 3-5 MB to a few hundred KB, which cuts upload time
+ * on mobile networks, IndexedDB quota use and Convex storage.
+ *
+ * - Re-encoding drops all metadata, including EXIF GPS location. The
+ *   re-encoded photo is used even when it comes out larger than the
+ *   original, so location never leaves the device.
+ * - Videos, GIFs and SVGs pass through untouched.
+ * - If the browser lacks OffscreenCanvas/createImageBitmap in workers, or
+ *   compression fails, the original is uploaded so uploads never break.
+ *   JPEGs have their metadata segments removed first; other formats are
+ *   uploaded as-is and may keep their metadata.
+ * - Bytes saved are reported per file and accumulated for the session
+ *   (getCompressionStats).
+ */
+
+import {
+  DEFAULT_IMAGE_COMPRESSION,
+  isCompressibleImage,
+  renameForMimeType,
+  stripJpegMetadata,
+  type ImageCompressionOptions,
+} from "@/utils/imageCompression";
+import type { CompressRequest, CompressResponse } from "@/workers/imageCompression.worker";
+
+export interface CompressedImage {
+  file: File;
+  originalBytes: number;
+  compressedBytes: number;
+  bytesSaved: number;
+  compressed: boolean;
+}
+
+// A worker that does not answer within this time is treated as failed
+const WORKER_TIMEOUT_MS = 30_000;
+
+let worker: Worker | null | undefined;
+let nextRequestId = 0;
+const pending = new Map<number, (response: CompressResponse) => void>();
+const stats = { files: 0, originalBytes: 0, compressedBytes: 0 };
+
+function getWorker(): Worker | null {
+  if (worker !== undefined) return worker;
+  if (
+    typeof window === "undefined" ||
+    typeof Worker === "undefined" ||
+    typeof OffscreenCanvas === "undefined"
+  ) {
+    worker = null;
+    return worker;
+  }
+
+  try {
+    worker = new Worker(new URL("../workers/imageCompression.worker.ts", import.meta.url), {
+      type: "module",
+    });
+    worker.onmessage = (event: MessageEvent<CompressResponse>) => {
+      const resolve = pending.get(event.data.id);
+      if (resolve) {
+        pending.delete(event.data.id);
+        resolve(event.data);
+      }
+    };
+    worker.onerror = () => {
+      // Fail everything in flight and stop using the worker
+      for (const [id, resolve] of pending) {
+        resolve({ id, ok: false, error: "Compression worker crashed" });
+      }
+      pending.clear();
+      worker?.terminate();
+      worker = null;
+    };
+  } catch {
+    worker = null;
+  }
+  return worker;
+}
+
+function runInWorker(
+  target: Worker,
+  blob: Blob,
+  options: ImageCompressionOptions
+): Promise<CompressResponse> {
+  const id = nextRequestId++;
+  return new Promise((resolve) => {
+    const timer = setTimeout(() => {
+      pending.delete(id);
+      resolve({ id, ok: false, error: "Compression timed out" });
+    }, WORKER_TIMEOUT_MS);
+
+    pending.set(id, (response) => {
+      clearTimeout(timer);
+      resolve(response);
+    });
+    const request: CompressRequest = { id, blob, options };
+    target.postMessage(request);
+  });
+}
+
+function passThrough(file: File): CompressedImage {
+  return {
+    file,
+    originalBytes: file.size,
+    compressedBytes: file.size,
+    bytesSaved: 0,
+    compressed: false,
+  };
+}
+
+/**
+ * Original photo for when re-encoding is unavailable, with JPEG metadata
+ * (including GPS location) removed.
+ */
+async function withoutMetadata(file: File): Promise<CompressedImage> {
+  if (file.type !== "image/jpeg") return passThrough(file);
+  try {
+    const stripped = stripJpegMetadata(new Uint8Array(await file.arrayBuffer()));
+    if (!stripped) return passThrough(file);
+    return passThrough(
+      new File([stripped], file.name, { type: file.type, lastModified: file.lastModified })
+    );
+  } catch {
+    return passThrough(file);
+  }
+}
+
+/**
+ * Compress a photo for upload or offline storage.
+ * Non-image files are returned unchanged.
+ */
+export async function compressImage(
+  file: File,
+  options: Partial<ImageCompressionOptions> = {}
+): Promise<CompressedImage> {
+  if (!isCompressibleImage(file.type)) return passThrough(file);
+
+  const target = getWorker();
+  if (!target) return withoutMetadata(file);
+
+  const resolved = { ...DEFAULT_IMAGE_COMPRESSION, ...options };
+  const response = await runInWorker(target, file, resolved);
+  if (!response.ok) {
+    console.warn("[ImageCompression] Using original photo:", response.error);
+    return withoutMetadata(file);
+  }
+
+  // Kept even if larger (already-compressed JPEGs, small PNGs): it carries no metadata
+  const output = new File([response.blob], renameForMimeType(file.name, response.blob.type), {
+    type: response.blob.type,
+    lastModified: file.lastModified,
+  });
+
+  stats.files++;
+  stats.originalBytes += file.size;
+  stats.compressedBytes += output.size;
+
+  return {
+    file: output,
+    originalBytes: file.size,
+    compressedBytes: output.size,
+    bytesSaved: file.size - output.size,
+    compressed: true,
+  };
+}
+
+/**
+ * Compress several photos; the worker processes them one at a time.
+ */
+export async function compressImages(
+  files: File[],
+  options: Partial<ImageCompressionOptions> = {}
+): Promise<CompressedImage[]> {
+  return Promise.all(files.map((file) => compressImage(file, options)));
+}
+
+/**
+ * Totals for photos compressed in this session.
+ */
+export function getCompressionStats(): {
+  files: number;
+  originalBytes: number;
+  compressedBytes: number;
+  bytesSaved: number;
+} {
+  return { ...stats, bytesSaved: stats.originalBytes - stats.compressedBytes };
+}
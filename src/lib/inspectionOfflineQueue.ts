@@ -35,7 +35,9 @@ export interface QueuedInspectionChange {
   /** The payload varies by changeType:
    *  - "status": { status, condition?, remarks? }
    *  - "remarks": { remarks }
-   *  - "photo": { base64, fileName, fileSize, fileType, description? }
+   *  - "photo": { blob, fileName, fileSize, fileType, description? }
+   *    (store the compressed Blob from compressImage; entries queued by
+   *    older versions hold a base64 data URL in `base64` instead)
    */
   data: Record<string, unknown>;
   timestamp: number;
@@ -224,6 +226,57 @@ export async function markChangeSyncFailed(
   });
 }
 
+/**
+ * Merge extra fields into a queued change's payload (e.g. the storageId of a
+ * photo that has been uploaded but not yet recorded).
+ */
+export async function updateChangeData(
+  id: string,
+  data: Record<string, unknown>
+): Promise<void> {
+  const db = await openDB();
+
+  return new Promise((resolve, reject) => {
+    const tx = db.transaction([CHANGES_STORE], "readwrite");
+    const store = tx.objectStore(CHANGES_STORE);
+    const request = store.get(id);
+
+    request.onsuccess = () => {
+      const entry = request.result as QueuedInspectionChange | undefined;
+      if (entry) {
+        entry.data = { ...entry.data, ...data };
+        store.put(entry);
+      }
+      resolve();
+    };
+
+    request.onerror = () => reject(request.error);
+    tx.oncomplete = () => db.close();
+  });
+}
+
+/**
+ * Remove several changes in a single transaction.
+ */
+export async function removeChanges(ids: string[]): Promise<void> {
+  if (ids.length === 0) return;
+  const db = await openDB();
+
+  return new Promise((resolve, reject) => {
+    const tx = db.transaction([CHANGES_STORE], "readwrite");
+    const store = tx.objectStore(CHANGES_STORE);
+    for (const id of ids) {
+      store.delete(id);
+    }
+
+    tx.oncomplete = () => {
+      db.close();
+      resolve();
+    };
+    tx.onerror = () => reject(tx.error);
+  });
+}
+
 /**
  * Remove a change from the queue entirely (typically after successful sync).
  */
@@ -12,11 +12,13 @@ const STORE_NAME = "pending_incidents";
 
 export interface QueuedIncident {
   id: string; // UUID for local tracking
-  data: any; // Incident data to be submitted
+  data: any; // Incident data to be submitted (media[].file is a compressed Blob; older entries hold a base64 data URL)
   timestamp: number; // When it was created offline
   synced: boolean; // Whether it's been synced to server
   retryCount: number; // Number of sync attempts
   error?: string; // Last sync error if any
+  serverIncidentId?: string; // Set once the incident exists on the server, so retries only resend media
+  mediaStorageIds?: Record<number, string>; // Media index -> uploaded storage ID
 }
 
 /**
@@ -78,10 +80,16 @@ export async function getPendingIncidents(): Promise<QueuedIncident[]> {
   return new Promise((resolve, reject) => {
     const transaction = db.transaction([STORE_NAME], "readonly");
     const store = transaction.objectStore(STORE_NAME);
-    const index = store.index("synced");
-    const request = index.getAll(IDBKeyRange.only(0)); // Get all unsynced (0 = false)
+    // Booleans are not valid IndexedDB keys, so the "synced" index never
+    // contains these records; filter a full scan instead
+    const request = store.getAll();
 
-    request.onsuccess = () => resolve(request.result);
+    request.onsuccess = () =>
+      resolve(
+        (request.result as QueuedIncident[])
+          .filter((incident) => !incident.synced)
+          .sort((a, b) => a.timestamp - b.timestamp)
+      );
     request.onerror = () => reject(request.error);
 
     transaction.oncomplete = () => db.close();
@@ -152,6 +160,34 @@ export async function markSyncFailed(
   });
 }
 
+/**
+ * Record sync progress on a queued incident (server ID, uploaded media)
+ */
+export async function updateQueuedIncident(
+  id: string,
+  updates: Pick<QueuedIncident, "serverIncidentId" | "mediaStorageIds">
+): Promise<void> {
+  const db = await openDB();
+
+  return new Promise((resolve, reject) => {
+    const transaction = db.transaction([STORE_NAME], "readwrite");
+    const store = transaction.objectStore(STORE_NAME);
+    const request = store.get(id);
+
+    request.onsuccess = () => {
+      const incident = request.result;
+      if (incident) {
+        store.put({ ...incident, ...updates });
+      }
+      resolve();
+    };
+
+    request.onerror = () => reject(request.error);
+
+    transaction.oncomplete = () => db.close();
+  });
+}
+
 /**
  * Remove incident from queue (after successful sync)
  */
@@ -1,6 +1,13 @@
 import { openDB, DBSchema, IDBPDatabase } from "idb";
+import { stableStringify, sha256Hex } from "../../convex/lib/stableHash";
+import {
+  CacheEntryMeta,
+  OFFLINE_CACHE_SCHEMA_VERSION,
+  isCurrentEntry,
+  planEviction,
+} from "@/utils/offlineCache";
 
-interface PendingMutation {
+export interface PendingMutation {
   id: string;
   type: "inspection" | "maintenance" | "photo";
   action: "create" | "update";
@@ -15,7 +22,7 @@ interface CachedData {
   timestamp: number;
 }
 
-interface OfflinePhoto {
+export interface OfflinePhoto {
   id: string;
   inspectionId?: string;
   maintenanceId?: string;
@@ -23,6 +30,20 @@ interface OfflinePhoto {
   blob: Blob;
   fileName: string;
   timestamp: number;
+  uploadedBy?: string;
+  photoType?: "before" | "during" | "after" | "issue";
+  description?: string;
+  storageId?: string; // Set once uploaded, before the photo record is created
+}
+
+// Shared between pages and the service worker, which replays the queues in
+// the background (see src/lib/backgroundSync.ts)
+export interface ReplayState {
+  key: "replay";
+  convexUrl?: string; // Written by the page; the worker has no build-time env
+  failures: number; // Consecutive replay runs that left entries unsynced
+  nextAttemptAt: number;
+  lastRunAt?: number;
 }
 
 interface OfflineDB extends DBSchema {
@@ -34,10 +55,20 @@ interface OfflineDB extends DBSchema {
     key: string;
     value: CachedData;
   };
+  // Small per-entry records (size, hash, version, last access) so quota and
+  // LRU checks never have to load the cached payloads themselves
+  cacheMeta: {
+    key: string;
+    value: CacheEntryMeta;
+  };
   offlinePhotos: {
     key: string;
     value: OfflinePhoto;
   };
+  replayState: {
+    key: string;
+    value: ReplayState;
+  };
 }
 
 let db: IDBPDatabase<OfflineDB> | null = null;
@@ -45,17 +76,31 @@ let db: IDBPDatabase<OfflineDB> | null = null;
 export async function getDB(): Promise<IDBPDatabase<OfflineDB>> {
   if (db) return db;
 
-  db = await openDB<OfflineDB>("sda-offline", 1, {
-    upgrade(database) {
+  db = await openDB<OfflineDB>("sda-offline", 3, {
+    upgrade(database, oldVersion, _newVersion, transaction) {
       if (!database.objectStoreNames.contains("pendingMutations")) {
         database.createObjectStore("pendingMutations", { keyPath: "id" });
       }
       if (!database.objectStoreNames.contains("cachedData")) {
         database.createObjectStore("cachedData", { keyPath: "type" });
+      } else if (oldVersion < 2) {
+        // v1 entries have no size or version accounting; start the cache fresh
+        transaction.objectStore("cachedData").clear();
       }
       if (!database.objectStoreNames.contains("offlinePhotos")) {
         database.createObjectStore("offlinePhotos", { keyPath: "id" });
       }
+      if (!database.objectStoreNames.contains("cacheMeta")) {
+        database.createObjectStore("cacheMeta", { keyPath: "type" });
+      }
+      if (!database.objectStoreNames.contains("replayState")) {
+        database.createObjectStore("replayState", { keyPath: "key" });
+      }
+    },
+    blocking() {
+      // A newer page or worker needs to upgrade; let it
+      db?.close();
+      db = null;
     },
   });
 
@@ -78,6 +123,13 @@ export async function removePendingMutation(id: string): Promise<void> {
   await database.delete("pendingMutations", id);
 }
 
+export async function removePendingMutations(ids: string[]): Promise<void> {
+  if (ids.length === 0) return;
+  const database = await getDB();
+  const tx = database.transaction("pendingMutations", "readwrite");
+  await Promise.all([...ids.map((id) => tx.store.delete(id)), tx.done]);
+}
+
 export async function updateMutationRetryCount(id: string, retryCount: number): Promise<void> {
   const database = await getDB();
   const mutation = await database.get("pendingMutations", id);
@@ -88,20 +140,78 @@ export async function updateMutationRetryCount(id: string, retryCount: number):
 }
 
 // Cached Data
-export async function cacheData(type: string, data: unknown): Promise<void> {
+// Query results cached for offline reads. Writes are skipped when the content
+// hash is unchanged, and least recently used entries are evicted to stay
+// under OFFLINE_CACHE_QUOTA_BYTES.
+export async function cacheData(
+  type: string,
+  data: unknown,
+  options: { version?: number } = {}
+): Promise<void> {
+  const version = options.version ?? 0;
+  const json = stableStringify(data);
+  const bytes = new TextEncoder().encode(json).length;
+  const hash = await sha256Hex(json);
+
   const database = await getDB();
-  await database.put("cachedData", { type, data, timestamp: Date.now() });
+  const existing = await database.get("cacheMeta", type);
+  if (existing && existing.hash === hash && isCurrentEntry(existing, version)) return;
+
+  const tx = database.transaction(["cachedData", "cacheMeta"], "readwrite");
+  const dataStore = tx.objectStore("cachedData");
+  const metaStore = tx.objectStore("cacheMeta");
+  const evict = planEviction(await metaStore.getAll(), { type, bytes });
+
+  if (evict === null) {
+    // Larger than the whole quota: drop any older copy rather than keep stale data
+    await Promise.all([dataStore.delete(type), metaStore.delete(type), tx.done]);
+    return;
+  }
+
+  const now = Date.now();
+  await Promise.all([
+    ...evict.flatMap((key) => [dataStore.delete(key), metaStore.delete(key)]),
+    dataStore.put({ type, data, timestamp: now }),
+    metaStore.put({
+      type,
+      bytes,
+      hash,
+      schemaVersion: OFFLINE_CACHE_SCHEMA_VERSION,
+      version,
+      lastAccessed: now,
+      timestamp: now,
+    }),
+    tx.done,
+  ]);
 }
 
-export async function getCachedData<T>(type: string): Promise<T | null> {
+export async function getCachedData<T>(
+  type: string,
+  options: { version?: number } = {}
+): Promise<T | null> {
   const database = await getDB();
+  const meta = await database.get("cacheMeta", type);
+  if (!meta) return null;
+
+  if (!isCurrentEntry(meta, options.version ?? 0)) {
+    await clearCachedData(type);
+    return null;
+  }
+
   const cached = await database.get("cachedData", type);
-  return cached?.data as T | null;
+  if (!cached) return null;
+  await database.put("cacheMeta", { ...meta, lastAccessed: Date.now() });
+  return cached.data as T;
 }
 
 export async function clearCachedData(type: string): Promise<void> {
   const database = await getDB();
-  await database.delete("cachedData", type);
+  const tx = database.transaction(["cachedData", "cacheMeta"], "readwrite");
+  await Promise.all([
+    tx.objectStore("cachedData").delete(type),
+    tx.objectStore("cacheMeta").delete(type),
+    tx.done,
+  ]);
 }
 
 // Offline Photos
@@ -127,16 +237,43 @@ export async function getOfflinePhotosByMaintenance(maintenanceId: string): Prom
   return all.filter(p => p.maintenanceId === maintenanceId);
 }
 
+export async function removeOfflinePhotos(ids: string[]): Promise<void> {
+  if (ids.length === 0) return;
+  const database = await getDB();
+  const tx = database.transaction("offlinePhotos", "readwrite");
+  await Promise.all([...ids.map((id) => tx.store.delete(id)), tx.done]);
+}
+
 export async function removeOfflinePhoto(id: string): Promise<void> {
   const database = await getDB();
   await database.delete("offlinePhotos", id);
 }
 
+// Background replay state
+export async function getReplayState(): Promise<ReplayState> {
+  const database = await getDB();
+  return (
+    (await database.get("replayState", "replay")) ?? { key: "replay", failures: 0, nextAttemptAt: 0 }
+  );
+}
+
+export async function saveReplayState(
+  updates: Partial<Omit<ReplayState, "key">>
+): Promise<ReplayState> {
+  const database = await getDB();
+  const tx = database.transaction("replayState", "readwrite");
+  const current = (await tx.store.get("replay")) ?? { key: "replay" as const, failures: 0, nextAttemptAt: 0 };
+  const next = { ...current, ...updates };
+  await Promise.all([tx.store.put(next), tx.done]);
+  return next;
+}
+
 // Utility
 export async function clearAllOfflineData(): Promise<void> {
   const database = await getDB();
   await database.clear("pendingMutations");
   await database.clear("cachedData");
+  await database.clear("cacheMeta");
   await database.clear("offlinePhotos");
 }
 
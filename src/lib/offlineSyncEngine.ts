@@ -0,0 +1,570 @@
+/**
+ * Offline Sync Engine
+ *
+ * Replays everything queued while offline in a handful of round-trips:
+ *
+ * - Inspection item edits from both queues (inspectionOfflineQueue and
+ *   offlineStorage.pendingMutations) are coalesced to the latest edit per
+ *   item and sent in batches through offlineSync.applyBatch.
+ * - Photos are uploaded in parallel (UPLOAD_CONCURRENCY at a time) using
+ *   upload URLs fetched in bulk, then recorded in batches.
+ * - Incidents are still created one by one (each is a separate NDIS record),
+ *   but their media is uploaded and recorded with the shared pipeline.
+ *
+ * Every batched entry and every incident carries an idempotency key (its
+ * local queue id), so a batch or incident retried after a dropped response
+ * is not applied twice. Upload
+ * progress (storage IDs, server incident IDs) is persisted locally, so an
+ * interrupted sync resumes without re-uploading or re-creating anything.
+ *
+ * The engine runs both in pages (ConvexReactClient) and in the service
+ * worker (ConvexHttpClient, see worker/index.ts). Runs are serialised with a
+ * Web Lock so a page and the worker never replay the same queue at once.
+ */
+
+import type { FunctionArgs, FunctionReference, FunctionReturnType } from "convex/server";
+import { api } from "../../convex/_generated/api";
+import { Id } from "../../convex/_generated/dataModel";
+import { coalesceLatest, chunk, mapWithConcurrency } from "@/utils/offlineSync";
+import {
+  getPendingChanges,
+  markChangeSyncFailed,
+  removeChanges,
+  updateChangeData,
+} from "@/lib/inspectionOfflineQueue";
+import {
+  getPendingMutations,
+  removePendingMutations,
+  updateMutationRetryCount,
+  getOfflinePhotos,
+  addOfflinePhoto,
+  removeOfflinePhotos,
+  type OfflinePhoto,
+} from "@/lib/offlineStorage";
+import {
+  getPendingIncidents,
+  markSyncFailed,
+  removeFromQueue,
+  updateQueuedIncident,
+  type QueuedIncident,
+} from "@/lib/offlineQueue";
+
+export interface SyncClient {
+  mutation<Mutation extends FunctionReference<"mutation">>(
+    mutation: Mutation,
+    args: FunctionArgs<Mutation>
+  ): Promise<FunctionReturnType<Mutation>>;
+}
+type ItemStatus = "pending" | "pass" | "fail" | "na";
+type PhotoType = "before" | "during" | "after" | "issue";
+type BatchArgs = Omit<FunctionArgs<typeof api.offlineSync.applyBatch>, "userId">;
+
+export interface SyncResult {
+  synced: number;
+  failed: number;
+}
+
+export interface ReplayProgress extends SyncResult {
+  queue: "inspections" | "incidents";
+}
+
+// Entries per applyBatch call (server maximum is 100)
+const BATCH_SIZE = 50;
+// Upload URLs per generateUploadUrls call (server maximum is 20)
+const URL_BATCH_SIZE = 20;
+// Photo uploads in flight at once
+const UPLOAD_CONCURRENCY = 4;
+// Web Lock shared by every page and the service worker
+const REPLAY_LOCK = "sda-offline-replay";
+
+// ---------------------------------------------------------------------------
+// Normalised entries
+// ---------------------------------------------------------------------------
+
+type QueueSource = "inspectionQueue" | "pendingMutations" | "offlinePhotos" | "incidentQueue";
+
+interface ItemUpdateEntry {
+  id: string;
+  source: QueueSource;
+  timestamp: number;
+  retryCount: number;
+  itemId: string;
+  updatedBy: string;
+  status: ItemStatus;
+  condition?: string;
+  remarks?: string;
+}
+
+interface PhotoEntry {
+  id: string;
+  source: QueueSource;
+  uploadedBy: string;
+  fileName: string;
+  fileType: string;
+  fileSize: number;
+  description?: string;
+  storageId?: string;
+  target:
+    | { kind: "inspection"; inspectionId: string; inspectionItemId?: string }
+    | { kind: "maintenance"; maintenanceRequestId: string; photoType: PhotoType }
+    | { kind: "incident"; incidentId: string };
+  getBlob: () => Promise<Blob>;
+  /** Persist the storage ID so a retry does not upload the file again */
+  saveStorageId: (storageId: string) => Promise<void>;
+}
+
+function errorMessage(err: unknown): string {
+  return err instanceof Error ? err.message : "Unknown error";
+}
+
+/**
+ * Queued media is stored as a Blob; entries queued by older versions hold a
+ * base64 data URL instead.
+ */
+async function toBlob(stored: Blob | string): Promise<Blob> {
+  if (typeof stored !== "string") return stored;
+  const response = await fetch(stored);
+  return response.blob();
+}
+
+/**
+ * Run `fn` while holding the replay lock (where Web Locks are available).
+ */
+function withReplayLock<T>(fn: () => Promise<T>): Promise<T> {
+  if (typeof navigator === "undefined" || !navigator.locks) return fn();
+  return navigator.locks.request(REPLAY_LOCK, fn);
+}
+
+function groupBy<T>(items: T[], keyOf: (item: T) => string): Map<string, T[]> {
+  const groups = new Map<string, T[]>();
+  for (const item of items) {
+    const key = keyOf(item);
+    groups.set(key, [...(groups.get(key) ?? []), item]);
+  }
+  return groups;
+}
+
+// ---------------------------------------------------------------------------
+// Shared pipeline
+// ---------------------------------------------------------------------------
+
+/**
+ * Upload every photo that has no storage ID yet, UPLOAD_CONCURRENCY at a
+ * time. Returns the ids of entries whose upload failed.
+ */
+async function uploadPhotos(client: SyncClient, photos: PhotoEntry[]): Promise<Set<string>> {
+  const failed = new Set<string>();
+  const toUpload = photos.filter((p) => !p.storageId);
+
+  for (const [uploadedBy, group] of groupBy(toUpload, (p) => p.uploadedBy)) {
+    const urls: string[] = [];
+    try {
+      for (const part of chunk(group, URL_BATCH_SIZE)) {
+        urls.push(
+          ...(await client.mutation(api.offlineSync.generateUploadUrls, {
+            userId: uploadedBy as Id<"users">,
+            count: part.length,
+          }))
+        );
+      }
+    } catch {
+      group.forEach((p) => failed.add(p.id));
+      continue;
+    }
+
+    const results = await mapWithConcurrency(group, UPLOAD_CONCURRENCY, async (photo, index) => {
+      const blob = await photo.getBlob();
+      const response = await fetch(urls[index], {
+        method: "POST",
+        headers: { "Content-Type": photo.fileType },
+        body: blob,
+      });
+      if (!response.ok) throw new Error(`Upload failed: HTTP ${response.status}`);
+      const { storageId } = await response.json();
+      photo.storageId = storageId;
+      await photo.saveStorageId(storageId);
+    });
+
+    results.forEach((result, index) => {
+      if (result instanceof Error) failed.add(group[index].id);
+    });
+  }
+
+  return failed;
+}
+
+/**
+ * Send entries to offlineSync.applyBatch in chunks, one user at a time.
+ * Returns the ids applied (now or by an earlier attempt) and those that failed.
+ */
+async function applyInBatches<T extends { id: string; userId: string }>(
+  client: SyncClient,
+  entries: T[],
+  toArgs: (batch: T[]) => BatchArgs
+): Promise<{ done: Set<string>; failed: Map<string, string> }> {
+  const done = new Set<string>();
+  const failed = new Map<string, string>();
+
+  for (const [userId, group] of groupBy(entries, (e) => e.userId)) {
+    for (const batch of chunk(group, BATCH_SIZE)) {
+      try {
+        const { applied, skipped } = await client.mutation(api.offlineSync.applyBatch, {
+          userId: userId as Id<"users">,
+          ...toArgs(batch),
+        });
+        [...applied, ...skipped].forEach((key) => done.add(key));
+      } catch (err) {
+        batch.forEach((e) => failed.set(e.id, errorMessage(err)));
+      }
+    }
+  }
+
+  return { done, failed };
+}
+
+/**
+ * Upload and record photos. Returns the ids recorded and those that failed.
+ */
+async function syncPhotos(
+  client: SyncClient,
+  photos: PhotoEntry[]
+): Promise<{ done: Set<string>; failed: Map<string, string> }> {
+  const uploadFailed = await uploadPhotos(client, photos);
+  const uploaded = photos.filter((p) => p.storageId && !uploadFailed.has(p.id));
+
+  const { done, failed } = await applyInBatches(
+    client,
+    uploaded.map((p) => ({ ...p, userId: p.uploadedBy })),
+    (batch) => {
+      const base = (p: PhotoEntry) => ({
+        key: p.id,
+        storageId: p.storageId as Id<"_storage">,
+        fileName: p.fileName,
+        fileSize: p.fileSize,
+        fileType: p.fileType,
+        description: p.description,
+      });
+      return {
+        inspectionPhotos: batch.flatMap((p) =>
+          p.target.kind === "inspection"
+            ? [{
+                ...base(p),
+                inspectionId: p.target.inspectionId as Id<"inspections">,
+                inspectionItemId: p.target.inspectionItemId as Id<"inspectionItems"> | undefined,
+              }]
+            : []
+        ),
+        maintenancePhotos: batch.flatMap((p) =>
+          p.target.kind === "maintenance"
+            ? [{
+                ...base(p),
+                maintenanceRequestId: p.target.maintenanceRequestId as Id<"maintenanceRequests">,
+                photoType: p.target.photoType,
+              }]
+            : []
+        ),
+        incidentPhotos: batch.flatMap((p) =>
+          p.target.kind === "incident"
+            ? [{ ...base(p), incidentId: p.target.incidentId as Id<"incidents"> }]
+            : []
+        ),
+      };
+    }
+  );
+
+  for (const id of uploadFailed) {
+    failed.set(id, "Photo upload failed");
+  }
+  return { done, failed };
+}
+
+// ---------------------------------------------------------------------------
+// Inspections and maintenance
+// ---------------------------------------------------------------------------
+
+/**
+ * Sync queued inspection item edits and inspection/maintenance photos.
+ */
+export function syncInspectionChanges(client: SyncClient): Promise<SyncResult> {
+  return withReplayLock(() => runInspectionSync(client));
+}
+
+async function runInspectionSync(client: SyncClient): Promise<SyncResult> {
+  const [queued, mutations, offlinePhotos] = await Promise.all([
+    getPendingChanges(),
+    getPendingMutations(),
+    getOfflinePhotos(),
+  ]);
+
+  // 1. Normalise item edits from both queues
+  const itemUpdates: ItemUpdateEntry[] = [];
+  const photos: PhotoEntry[] = [];
+
+  for (const change of queued) {
+    const data = change.data;
+    if (change.changeType === "photo") {
+      photos.push({
+        id: change.id,
+        source: "inspectionQueue",
+        uploadedBy: data.uploadedBy as string,
+        fileName: data.fileName as string,
+        fileType: data.fileType as string,
+        fileSize: data.fileSize as number,
+        description: data.description as string | undefined,
+        storageId: data.storageId as string | undefined,
+        target: {
+          kind: "inspection",
+          inspectionId: change.inspectionId,
+          inspectionItemId: change.itemId,
+        },
+        getBlob: () => toBlob((data.blob ?? data.base64) as Blob | string),
+        saveStorageId: (storageId) => updateChangeData(change.id, { storageId }),
+      });
+      continue;
+    }
+
+    itemUpdates.push({
+      id: change.id,
+      source: "inspectionQueue",
+      timestamp: change.timestamp,
+      retryCount: change.retryCount,
+      itemId: change.itemId,
+      updatedBy: data.updatedBy as string,
+      // A remarks-only change resends the item's status at the time of the edit
+      status:
+        change.changeType === "status"
+          ? (data.status as ItemStatus)
+          : ((data.currentStatus as ItemStatus | undefined) ?? "pending"),
+      condition: change.changeType === "status" ? (data.condition as string | undefined) : undefined,
+      remarks: data.remarks as string | undefined,
+    });
+  }
+
+  for (const mutation of mutations) {
+    if (mutation.type !== "inspection" || mutation.action !== "update") continue;
+    const data = mutation.data;
+    itemUpdates.push({
+      id: mutation.id,
+      source: "pendingMutations",
+      timestamp: mutation.timestamp,
+      retryCount: mutation.retryCount,
+      itemId: data.itemId as string,
+      updatedBy: data.updatedBy as string,
+      status: data.status as ItemStatus,
+      condition: data.condition as string | undefined,
+      remarks: data.remarks as string | undefined,
+    });
+  }
+
+  for (const photo of offlinePhotos) {
+    const entry = offlinePhotoEntry(photo);
+    if (entry) photos.push(entry);
+  }
+
+  // 2. Collapse repeated edits to the same item; each update replaces all
+  // fields, so the last one per item is the final state
+  const { latest, superseded } = coalesceLatest(itemUpdates, (u) => u.itemId);
+  const sourceOf = new Map<string, QueueSource>(itemUpdates.map((u) => [u.id, u.source]));
+
+  const itemResult = await applyInBatches(
+    client,
+    latest.map((u) => ({ ...u, userId: u.updatedBy })),
+    (batch) => ({
+      itemUpdates: batch.map((u) => ({
+        key: u.id,
+        itemId: u.itemId as Id<"inspectionItems">,
+        status: u.status,
+        condition: u.condition,
+        remarks: u.remarks,
+      })),
+    })
+  );
+
+  // 3. Photos
+  const photoResult = await syncPhotos(client, photos);
+
+  // 4. Clear what synced (including edits superseded by a synced edit) and
+  // record failures for the rest
+  for (const photo of photos) sourceOf.set(photo.id, photo.source);
+  const removeFrom = (source: QueueSource, ids: string[]) =>
+    ids.filter((id) => sourceOf.get(id) === source);
+
+  const doneIds = [
+    ...Array.from(itemResult.done).flatMap((id) => [id, ...(superseded.get(id) ?? [])]),
+    ...photoResult.done,
+  ];
+  await Promise.all([
+    removeChanges(removeFrom("inspectionQueue", doneIds)),
+    removePendingMutations(removeFrom("pendingMutations", doneIds)),
+    removeOfflinePhotos(removeFrom("offlinePhotos", doneIds)),
+  ]);
+
+  const retryCounts = new Map(itemUpdates.map((u) => [u.id, u.retryCount]));
+  const failures = new Map([...itemResult.failed, ...photoResult.failed]);
+  for (const [id, message] of failures) {
+    const source = sourceOf.get(id);
+    if (source === "inspectionQueue") {
+      await markChangeSyncFailed(id, message);
+    } else if (source === "pendingMutations") {
+      await updateMutationRetryCount(id, (retryCounts.get(id) ?? 0) + 1);
+    }
+  }
+
+  return {
+    synced: itemResult.done.size + photoResult.done.size,
+    failed: failures.size,
+  };
+}
+
+/**
+ * Map a stored offline photo to a pipeline entry. Photos saved before the
+ * uploader was recorded cannot be attributed and are left in place.
+ */
+function offlinePhotoEntry(photo: OfflinePhoto): PhotoEntry | null {
+  if (!photo.uploadedBy) return null;
+
+  let target: PhotoEntry["target"];
+  if (photo.maintenanceId) {
+    target = {
+      kind: "maintenance",
+      maintenanceRequestId: photo.maintenanceId,
+      photoType: photo.photoType ?? "issue",
+    };
+  } else if (photo.inspectionId) {
+    target = { kind: "inspection", inspectionId: photo.inspectionId, inspectionItemId: photo.itemId };
+  } else {
+    return null;
+  }
+
+  return {
+    id: photo.id,
+    source: "offlinePhotos",
+    uploadedBy: photo.uploadedBy,
+    fileName: photo.fileName,
+    fileType: photo.blob.type || "application/octet-stream",
+    fileSize: photo.blob.size,
+    description: photo.description,
+    storageId: photo.storageId,
+    target,
+    getBlob: async () => photo.blob,
+    saveStorageId: (storageId) => addOfflinePhoto({ ...photo, storageId }),
+  };
+}
+
+// ---------------------------------------------------------------------------
+// Incidents
+// ---------------------------------------------------------------------------
+
+interface IncidentMedia {
+  file: Blob | string; // Compressed Blob (base64 data URL in older entries)
+  fileName: string;
+  fileType: string;
+  fileSize: number;
+  description?: string;
+}
+
+/**
+ * Sync queued incidents. Incidents are created in queue order; all of their
+ * media is then uploaded in parallel and recorded in batches. An incident
+ * stays queued (with its server ID remembered) until all of its media has
+ * been recorded.
+ */
+export function syncIncidents(client: SyncClient): Promise<SyncResult> {
+  return withReplayLock(() => runIncidentSync(client));
+}
+
+async function runIncidentSync(client: SyncClient): Promise<SyncResult> {
+  const pending = await getPendingIncidents();
+  const failures = new Map<string, string>();
+  const photos: PhotoEntry[] = [];
+  const created: QueuedIncident[] = [];
+
+  // 1. Create incidents that do not exist on the server yet
+  for (const queued of pending) {
+    const { media, ...incidentData } = queued.data;
+    let incidentId = queued.serverIncidentId;
+
+    if (!incidentId) {
+      try {
+        // Keyed by queue id: a retry after a lost response returns the same incident
+        incidentId = (await client.mutation(api.incidents.create, {
+          ...incidentData,
+          idempotencyKey: `incident:${queued.id}`,
+        })) as string;
+        await updateQueuedIncident(queued.id, { serverIncidentId: incidentId });
+      } catch (err) {
+        failures.set(queued.id, errorMessage(err));
+        continue;
+      }
+    }
+
+    created.push(queued);
+    const storageIds = { ...(queued.mediaStorageIds ?? {}) };
+    ((media ?? []) as IncidentMedia[]).forEach((item, index) => {
+      photos.push({
+        id: `${queued.id}:${index}`,
+        source: "incidentQueue",
+        uploadedBy: incidentData.reportedBy as string,
+        fileName: item.fileName,
+        fileType: item.fileType,
+        fileSize: item.fileSize,
+        description: item.description,
+        storageId: storageIds[index],
+        target: { kind: "incident", incidentId: incidentId! },
+        getBlob: () => toBlob(item.file),
+        saveStorageId: async (storageId) => {
+          storageIds[index] = storageId;
+          await updateQueuedIncident(queued.id, { mediaStorageIds: { ...storageIds } });
+        },
+      });
+    });
+  }
+
+  // 2. Upload and record all media together
+  const photoResult = await syncPhotos(client, photos);
+
+  // 3. Remove incidents whose media all made it
+  let synced = 0;
+  for (const queued of created) {
+    const mediaIds = photos.filter((p) => p.id.startsWith(`${queued.id}:`)).map((p) => p.id);
+    const mediaError = mediaIds.map((id) => photoResult.failed.get(id)).find(Boolean);
+    if (mediaError || mediaIds.some((id) => !photoResult.done.has(id))) {
+      failures.set(queued.id, mediaError ?? "Media not recorded");
+      continue;
+    }
+    await removeFromQueue(queued.id);
+    synced++;
+  }
+
+  for (const [id, message] of failures) {
+    await markSyncFailed(id, message);
+  }
+
+  return { synced, failed: failures.size };
+}
+
+// ---------------------------------------------------------------------------
+// Full replay
+// ---------------------------------------------------------------------------
+
+/**
+ * Replay every offline queue under a single lock, reporting each queue's
+ * result as it finishes. Used by the service worker's background replay.
+ */
+export function replayOfflineQueues(
+  client: SyncClient,
+  onProgress?: (progress: ReplayProgress) => void | Promise<void>
+): Promise<SyncResult> {
+  return withReplayLock(async () => {
+    const inspections = await runInspectionSync(client);
+    await onProgress?.({ queue: "inspections", ...inspections });
+
+    const incidents = await runIncidentSync(client);
+    await onProgress?.({ queue: "incidents", ...incidents });
+
+    return {
+      synced: inspections.synced + incidents.synced,
+      failed: inspections.failed + incidents.failed,
+    };
+  });
+}
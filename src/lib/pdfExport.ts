@@ -0,0 +1,207 @@
+/**
+ * PDF Export Service
+ *
+ * Generates report PDFs in a web worker and downloads them.
+ *
+ * - Builders run in src/workers/pdf.worker.ts, so building a long thread or
+ *   a photo-heavy inspection never blocks the main thread. If workers are
+ *   unavailable or the worker fails, the same builder is loaded lazily and
+ *   run on the main thread.
+ * - With a cache (Convex client + user), the PDF is stored in Convex file
+ *   storage keyed by a SHA-256 hash of its input (convex/pdfCache.ts).
+ *   Re-exporting an unchanged report downloads the stored file instead of
+ *   rebuilding it. Builders stamp the generation date, so the hash includes
+ *   the current day and cached files are only reused on the same day.
+ * - Cache failures never block an export; the PDF is simply rebuilt.
+ */
+
+import type { ConvexReactClient } from "convex/react";
+import { api } from "../../convex/_generated/api";
+import type { Id } from "../../convex/_generated/dataModel";
+import { sha256Hex, stableStringify } from "../../convex/lib/stableHash";
+import type { PdfJob } from "./pdfJobs";
+import type { PdfRequest, PdfResponse } from "@/workers/pdf.worker";
+
+export type { PdfJob } from "./pdfJobs";
+
+export interface PdfCacheOptions {
+  convex: ConvexReactClient;
+  userId: Id<"users">;
+}
+
+// Bump when a builder's output changes so previously cached PDFs are not reused
+const PDF_RENDERER_VERSION = 1;
+
+// Large inspections fetch and embed many photos; give the worker time
+const WORKER_TIMEOUT_MS = 120_000;
+
+let worker: Worker | null | undefined;
+let nextRequestId = 0;
+const pending = new Map<number, (response: PdfResponse) => void>();
+
+function getWorker(): Worker | null {
+  if (worker !== undefined) return worker;
+  if (typeof window === "undefined" || typeof Worker === "undefined") {
+    worker = null;
+    return worker;
+  }
+
+  try {
+    worker = new Worker(new URL("../workers/pdf.worker.ts", import.meta.url), {
+      type: "module",
+    });
+    worker.onmessage = (event: MessageEvent<PdfResponse>) => {
+      const resolve = pending.get(event.data.id);
+      if (resolve) {
+        pending.delete(event.data.id);
+        resolve(event.data);
+      }
+    };
+    worker.onerror = () => {
+      // Fail everything in flight and stop using the worker
+      failInFlight("PDF worker crashed");
+      worker = null;
+    };
+  } catch {
+    worker = null;
+  }
+  return worker;
+}
+
+function failInFlight(error: string, timedOut = false): void {
+  for (const [id, resolve] of pending) {
+    resolve({ id, ok: false, error, timedOut });
+  }
+  pending.clear();
+  worker?.terminate();
+}
+
+function runInWorker(target: Worker, job: PdfJob): Promise<PdfResponse> {
+  const id = nextRequestId++;
+  return new Promise((resolve) => {
+    const timer = setTimeout(() => {
+      // The worker may be stuck on this job; a fresh one is created next time
+      failInFlight("PDF generation timed out", true);
+      worker = undefined;
+    }, WORKER_TIMEOUT_MS);
+
+    pending.set(id, (response) => {
+      clearTimeout(timer);
+      resolve(response);
+    });
+    const request: PdfRequest = { id, job };
+    target.postMessage(request);
+  });
+}
+
+/**
+ * Build a PDF, preferring the worker. A job that times out in the worker
+ * is not retried on the main thread, where it would freeze the page.
+ */
+export async function renderPdf(job: PdfJob): Promise<Blob> {
+  const target = getWorker();
+  if (target) {
+    const response = await runInWorker(target, job);
+    if (response.ok) {
+      return new Blob([response.buffer], { type: "application/pdf" });
+    }
+    if (response.timedOut) {
+      throw new Error(response.error);
+    }
+    console.warn("[PdfExport] Building on the main thread:", response.error);
+  }
+
+  const { buildPdf } = await import("./pdfJobs");
+  return new Blob([await buildPdf(job)], { type: "application/pdf" });
+}
+
+/**
+ * Hash of everything that determines a job's output.
+ */
+export async function pdfContentHash(job: PdfJob, now = new Date()): Promise<string> {
+  const day = now.toISOString().split("T")[0];
+  // The thread export timestamp changes on every click; only its day is rendered
+  const hashed = job.kind === "thread" ? { ...job, data: { ...job.data, exportedAt: day } } : job;
+  return sha256Hex(stableStringify({ version: PDF_RENDERER_VERSION, day, job: hashed }));
+}
+
+function downloadBlob(blob: Blob, fileName: string): void {
+  const url = URL.createObjectURL(blob);
+  const link = document.createElement("a");
+  link.href = url;
+  link.download = fileName;
+  document.body.appendChild(link);
+  link.click();
+  document.body.removeChild(link);
+  // Give the browser time to start the download before releasing the blob
+  setTimeout(() => URL.revokeObjectURL(url), 10_000);
+}
+
+async function fetchCached(
+  cache: PdfCacheOptions,
+  contentHash: string
+): Promise<Blob | null> {
+  const cached = await cache.convex.query(api.pdfCache.getCached, {
+    userId: cache.userId,
+    contentHash,
+  });
+  if (!cached) return null;
+  const response = await fetch(cached.url);
+  return response.ok ? await response.blob() : null;
+}
+
+async function storeCached(
+  cache: PdfCacheOptions,
+  contentHash: string,
+  kind: PdfJob["kind"],
+  blob: Blob
+): Promise<void> {
+  const uploadUrl = await cache.convex.mutation(api.pdfCache.generateUploadUrl, {
+    userId: cache.userId,
+  });
+  const response = await fetch(uploadUrl, {
+    method: "POST",
+    headers: { "Content-Type": "application/pdf" },
+    body: blob,
+  });
+  if (!response.ok) throw new Error(`Upload failed: ${response.status}`);
+  const { storageId } = await response.json();
+  await cache.convex.mutation(api.pdfCache.saveCached, {
+    userId: cache.userId,
+    contentHash,
+    kind,
+    storageId,
+  });
+}
+
+/**
+ * Generate (or fetch from cache) a PDF and download it as `fileName`.
+ */
+export async function exportPdf(
+  job: PdfJob,
+  fileName: string,
+  cache?: PdfCacheOptions
+): Promise<void> {
+  let contentHash: string | null = null;
+  if (cache) {
+    try {
+      contentHash = await pdfContentHash(job);
+      const cached = await fetchCached(cache, contentHash);
+      if (cached) {
+        downloadBlob(cached, fileName);
+        return;
+      }
+    } catch (err) {
+      console.warn("[PdfExport] Cache lookup failed:", err);
+    }
+  }
+
+  const blob = await renderPdf(job);
+  downloadBlob(blob, fileName);
+
+  if (cache && contentHash) {
+    storeCached(cache, contentHash, job.kind, blob).catch((err) => {
+      console.warn("[PdfExport] Could not cache PDF:", err);
+    });
+  }
+}
@@ -0,0 +1,65 @@
+/**
+ * PDF Job Registry
+ *
+ * Maps a serialisable job description to the builder that renders it. Used
+ * inside the PDF worker (src/workers/pdf.worker.ts) and, when workers are
+ * unavailable, lazily on the main thread by src/lib/pdfExport.ts.
+ */
+
+import type jsPDF from "jspdf";
+import { buildThreadPdf, type ThreadExportData } from "./threadPdfExport";
+import { buildInspectionPDF, type InspectionReportData } from "@/utils/inspectionPdf";
+import {
+  buildComplaintsRegisterPdf,
+  type ChainOfCustodyEntry,
+  type ComplaintData,
+  type ComplaintStats,
+} from "@/utils/complaintsRegisterPdf";
+import { generateAuditCompliancePdf, type AuditComplianceData } from "@/utils/auditCompliancePdf";
+import { buildOwnerStatementPdf, type OwnerStatementProperty } from "@/utils/ownerStatementPdf";
+
+export type PdfJob =
+  | { kind: "thread"; data: ThreadExportData }
+  | { kind: "inspection"; data: InspectionReportData; organizationName?: string }
+  | {
+      kind: "complaintsRegister";
+      complaints: ComplaintData[];
+      stats: ComplaintStats;
+      chainOfCustody?: Record<string, ChainOfCustodyEntry[]>;
+      organizationName?: string;
+    }
+  | { kind: "auditCompliance"; data: AuditComplianceData }
+  | {
+      kind: "ownerStatement";
+      properties: OwnerStatementProperty[];
+      startDate: string;
+      endDate: string;
+    };
+
+async function buildDocument(job: PdfJob): Promise<jsPDF> {
+  switch (job.kind) {
+    case "thread":
+      return buildThreadPdf(job.data);
+    case "inspection":
+      return buildInspectionPDF(job.data, job.organizationName);
+    case "complaintsRegister":
+      return buildComplaintsRegisterPdf(
+        job.complaints,
+        job.stats,
+        job.chainOfCustody,
+        job.organizationName
+      );
+    case "auditCompliance":
+      return generateAuditCompliancePdf(job.data);
+    case "ownerStatement":
+      return buildOwnerStatementPdf(job.properties, job.startDate, job.endDate);
+  }
+}
+
+/**
+ * Render a job to PDF bytes.
+ */
+export async function buildPdf(job: PdfJob): Promise<ArrayBuffer> {
+  const doc = await buildDocument(job);
+  return doc.output("arraybuffer");
+}
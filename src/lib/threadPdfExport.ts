@@ -3,7 +3,7 @@ import autoTable from "jspdf-autotable";
 
 // ── Types ──────────────────────────────────────────────────────
 
-interface ThreadExportData {
+export interface ThreadExportData {
   thread: {
     subject: string;
     status?: string;
@@ -700,9 +700,13 @@ function drawSummaryTable(
   return (doc as unknown as { lastAutoTable: { finalY: number } }).lastAutoTable.finalY + 10;
 }
 
-// ── Main Export Function ───────────────────────────────────────
+// ── Main Build Function ────────────────────────────────────────
 
-export async function exportThreadToPdf(data: ThreadExportData): Promise<void> {
+/**
+ * Build the communication record PDF. Has no DOM dependencies, so it runs
+ * in the PDF worker (see src/lib/pdfExport.ts).
+ */
+export function buildThreadPdf(data: ThreadExportData): jsPDF {
   const doc = new jsPDF("p", "mm", "a4");
   const pageWidth = 210;
   const pageHeight = 297;
@@ -816,12 +820,14 @@ export async function exportThreadToPdf(data: ThreadExportData): Promise<void> {
 
   drawPageFooters(doc, pageWidth, marginLeft, marginRight);
 
-  // ── Save ───────────────────────────────────────────────────
+  return doc;
+}
 
+export function threadPdfFileName(data: ThreadExportData): string {
   const safeSubject = (data.thread?.subject || "Communication-Record")
     .replace(/[^a-zA-Z0-9\-_ ]/g, "")
     .replace(/\s+/g, "-")
     .substring(0, 50);
   const dateStamp = new Date().toISOString().split("T")[0];
-  doc.save(`${safeSubject}-${dateStamp}.pdf`);
+  return `${safeSubject}-${dateStamp}.pdf`;
 }
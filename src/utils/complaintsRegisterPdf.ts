@@ -1,7 +1,7 @@
 import jsPDF from "jspdf";
 import autoTable from "jspdf-autotable";
 
-interface ComplaintData {
+export interface ComplaintData {
   _id: string;
   referenceNumber?: string;
   complainantType: string;
@@ -31,7 +31,7 @@ interface ComplaintData {
   assignedToUser?: { firstName: string; lastName: string } | null;
 }
 
-interface ComplaintStats {
+export interface ComplaintStats {
   total: number;
   byStatus: Record<string, number>;
   bySeverity: Record<string, number>;
@@ -39,7 +39,7 @@ interface ComplaintStats {
   escalatedToCommission: number;
 }
 
-interface ChainOfCustodyEntry {
+export interface ChainOfCustodyEntry {
   timestamp: number;
   userName: string;
   action: string;
@@ -77,12 +77,12 @@ const STATUS_COLORS: Record<string, [number, number, number]> = {
   escalated: [239, 68, 68],
 };
 
-export function generateComplaintsRegisterPdf(
+export function buildComplaintsRegisterPdf(
   complaints: ComplaintData[],
   stats: ComplaintStats,
   chainOfCustody?: Record<string, ChainOfCustodyEntry[]>,
   organizationName?: string
-): void {
+): jsPDF {
   const doc = new jsPDF({ orientation: "landscape" });
   const pageWidth = doc.internal.pageSize.getWidth();
   const pageHeight = doc.internal.pageSize.getHeight();
@@ -316,7 +316,10 @@ export function generateComplaintsRegisterPdf(
     );
   }
 
-  // Save
+  return doc;
+}
+
+export function complaintsRegisterPdfFileName(): string {
   const dateStr = new Date().toISOString().split("T")[0];
-  doc.save(`Complaints_Register_${dateStr}.pdf`);
+  return `Complaints_Register_${dateStr}.pdf`;
 }
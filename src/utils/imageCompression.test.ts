@@ -0,0 +1,93 @@
+import { describe, it, expect } from "vitest";
+import {
+  fitWithin,
+  renameForMimeType,
+  isCompressibleImage,
+  formatBytes,
+  stripJpegMetadata,
+} from "./imageCompression";
+
+// ---------------------------------------------------------------------------
+// fitWithin
+// ---------------------------------------------------------------------------
+describe("fitWithin", () => {
+  it("scales a landscape image to the max dimension", () => {
+    expect(fitWithin(4032, 3024, 1920)).toEqual({ width: 1920, height: 1440 });
+  });
+
+  it("scales a portrait image by its height", () => {
+    expect(fitWithin(3024, 4032, 1920)).toEqual({ width: 1440, height: 1920 });
+  });
+
+  it("never upscales small images", () => {
+    expect(fitWithin(800, 600, 1920)).toEqual({ width: 800, height: 600 });
+  });
+});
+
+// ---------------------------------------------------------------------------
+// renameForMimeType
+// ---------------------------------------------------------------------------
+describe("renameForMimeType", () => {
+  it("swaps the extension for the encoded type", () => {
+    expect(renameForMimeType("IMG_0001.HEIC", "image/webp")).toBe("IMG_0001.webp");
+    expect(renameForMimeType("photo.png", "image/jpeg")).toBe("photo.jpg");
+  });
+
+  it("adds an extension when there is none", () => {
+    expect(renameForMimeType("capture", "image/jpeg")).toBe("capture.jpg");
+  });
+
+  it("leaves unknown types alone", () => {
+    expect(renameForMimeType("photo.png", "image/png")).toBe("photo.png");
+  });
+});
+
+// ---------------------------------------------------------------------------
+// isCompressibleImage / formatBytes
+// ---------------------------------------------------------------------------
+describe("isCompressibleImage", () => {
+  it("accepts photos and rejects GIF, SVG and video", () => {
+    expect(isCompressibleImage("image/jpeg")).toBe(true);
+    expect(isCompressibleImage("image/heic")).toBe(true);
+    expect(isCompressibleImage("image/gif")).toBe(false);
+    expect(isCompressibleImage("image/svg+xml")).toBe(false);
+    expect(isCompressibleImage("video/mp4")).toBe(false);
+  });
+});
+
+describe("formatBytes", () => {
+  it("formats bytes, kilobytes and megabytes", () => {
+    expect(formatBytes(512)).toBe("512 B");
+    expect(formatBytes(2048)).toBe("2.0 KB");
+    expect(formatBytes(3.5 * 1024 * 1024)).toBe("3.5 MB");
+  });
+});
+
+// ---------------------------------------------------------------------------
+// stripJpegMetadata
+// ---------------------------------------------------------------------------
+describe("stripJpegMetadata", () => {
+  const segment = (marker: number, payload: number[]) => [
+    0xff,
+    marker,
+    0,
+    payload.length + 2,
+    ...payload,
+  ];
+  const soi = [0xff, 0xd8];
+  const jfif = segment(0xe0, [0x4a, 0x46, 0x49, 0x46, 0]);
+  const exif = segment(0xe1, [0x45, 0x78, 0x69, 0x66, 0, 0, 1, 2, 3]);
+  const icc = segment(0xe2, [9, 9]);
+  const comment = segment(0xfe, [0x68, 0x69]);
+  const scan = [0xff, 0xda, 0, 2, 0x12, 0x34, 0xff, 0xd9];
+
+  it("drops EXIF and comment segments and keeps the rest", () => {
+    const input = new Uint8Array([...soi, ...jfif, ...exif, ...icc, ...comment, ...scan]);
+    expect(Array.from(stripJpegMetadata(input)!)).toEqual([...soi, ...jfif, ...icc, ...scan]);
+  });
+
+  it("rejects data that is not a JPEG", () => {
+    expect(stripJpegMetadata(new Uint8Array([0x89, 0x50, 0x4e, 0x47]))).toBeNull();
+    expect(stripJpegMetadata(new Uint8Array([...soi, 0xff, 0xe1, 0, 40, 1]))).toBeNull();
+  });
+});
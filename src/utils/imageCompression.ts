@@ -0,0 +1,111 @@
+/**
+ * Pure helpers for the photo compression pipeline (src/lib/imageCompression.ts).
+ */
+
+export interface ImageCompressionOptions {
+  /** Longest edge in pixels after resizing (never upscales) */
+  maxDimension: number;
+  /** Encoder quality, 0-1 */
+  quality: number;
+  /** Preferred output type; falls back to JPEG where WebP encoding is unsupported */
+  mimeType: "image/webp" | "image/jpeg";
+}
+
+export const DEFAULT_IMAGE_COMPRESSION: ImageCompressionOptions = {
+  maxDimension: 1920,
+  quality: 0.8,
+  mimeType: "image/webp",
+};
+
+/**
+ * Scale dimensions so the longest edge fits within maxDimension,
+ * preserving aspect ratio. Images already within bounds are unchanged.
+ */
+export function fitWithin(
+  width: number,
+  height: number,
+  maxDimension: number
+): { width: number; height: number } {
+  const longest = Math.max(width, height);
+  if (longest <= maxDimension || longest === 0) {
+    return { width, height };
+  }
+  const scale = maxDimension / longest;
+  return {
+    width: Math.max(1, Math.round(width * scale)),
+    height: Math.max(1, Math.round(height * scale)),
+  };
+}
+
+/**
+ * Replace a file name's extension to match the encoded type.
+ */
+export function renameForMimeType(fileName: string, mimeType: string): string {
+  const extension = mimeType === "image/webp" ? "webp" : mimeType === "image/jpeg" ? "jpg" : null;
+  if (!extension) return fileName;
+  const dot = fileName.lastIndexOf(".");
+  const base = dot > 0 ? fileName.slice(0, dot) : fileName;
+  return `${base}.${extension}`;
+}
+
+/**
+ * Whether a file type can be decoded and re-encoded by the pipeline.
+ * GIFs are skipped so animations are not flattened to a single frame.
+ */
+export function isCompressibleImage(mimeType: string): boolean {
+  return mimeType.startsWith("image/") && mimeType !== "image/gif" && mimeType !== "image/svg+xml";
+}
+
+/**
+ * Remove metadata segments (EXIF, XMP, IPTC, comments) from a JPEG without
+ * re-encoding it. JFIF (APP0) and ICC colour profiles (APP2) are kept.
+ * Returns null if the bytes are not a well-formed JPEG.
+ *
+ * Used when a photo cannot be re-encoded, so GPS location is still removed.
+ * The EXIF orientation goes with it, so such photos may display rotated.
+ */
+export function stripJpegMetadata(bytes: Uint8Array): Uint8Array | null {
+  if (bytes.length < 4 || bytes[0] !== 0xff || bytes[1] !== 0xd8) return null;
+
+  const kept: Uint8Array[] = [bytes.subarray(0, 2)];
+  let offset = 2;
+  while (offset + 4 <= bytes.length) {
+    if (bytes[offset] !== 0xff) return null;
+    const marker = bytes[offset + 1];
+    // Fill bytes before a marker
+    if (marker === 0xff) {
+      offset++;
+      continue;
+    }
+    // Start of scan: the rest is image data
+    if (marker === 0xda) {
+      kept.push(bytes.subarray(offset));
+      break;
+    }
+    const length = (bytes[offset + 2] << 8) | bytes[offset + 3];
+    const end = offset + 2 + length;
+    if (length < 2 || end > bytes.length) return null;
+
+    const isMetadata = (marker >= 0xe1 && marker <= 0xef && marker !== 0xe2) || marker === 0xfe;
+    if (!isMetadata) kept.push(bytes.subarray(offset, end));
+    offset = end;
+  }
+  if (offset + 4 > bytes.length) return null;
+
+  const output = new Uint8Array(kept.reduce((total, part) => total + part.length, 0));
+  let position = 0;
+  for (const part of kept) {
+    output.set(part, position);
+    position += part.length;
+  }
+  return output;
+}
+
+/**
+ * Human-readable byte count (e.g. "1.4 MB").
+ */
+export function formatBytes(bytes: number): string {
+  if (bytes < 1024) return `${bytes} B`;
+  if (bytes < 1024 * 1024) return `${(bytes / 1024).toFixed(1)} KB`;
+  return `${(bytes / (1024 * 1024)).toFixed(1)} MB`;
+}
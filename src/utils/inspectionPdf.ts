@@ -1,8 +1,11 @@
 import jsPDF from "jspdf";
 import autoTable from "jspdf-autotable";
+import { fitWithin } from "./imageCompression";
 
 interface PhotoData {
   url: string | null;
+  /** JPEG medium rendition (falls back to url when missing) */
+  mediumUrl?: string | null;
   fileName: string;
   description?: string | null;
 }
@@ -25,7 +28,7 @@ interface CategorySummary {
   na: number;
 }
 
-interface InspectionReportData {
+export interface InspectionReportData {
   inspection: {
     scheduledDate: string;
     completedDate?: string;
@@ -56,18 +59,50 @@ interface InspectionReportData {
   };
 }
 
-/** Fetch image URL and convert to base64 data URL for PDF embedding */
-async function fetchImageAsBase64(url: string): Promise<string | null> {
+// Photos are downsampled to this longest edge (px) before embedding; the
+// photo slots are ~90mm wide, so larger images only bloat the PDF
+const PDF_IMAGE_MAX_DIMENSION = 1000;
+const PDF_IMAGE_QUALITY = 0.75;
+// Photos fetched and decoded at a time while building the photo pages
+const PHOTO_BATCH_SIZE = 6;
+
+function blobToDataUrl(blob: Blob): Promise<string | null> {
+  return new Promise((resolve) => {
+    const reader = new FileReader();
+    reader.onloadend = () => resolve(reader.result as string);
+    reader.onerror = () => resolve(null);
+    reader.readAsDataURL(blob);
+  });
+}
+
+/** Re-encode an image as a JPEG no larger than PDF_IMAGE_MAX_DIMENSION */
+async function downsampleToJpeg(blob: Blob): Promise<Blob> {
+  const bitmap = await createImageBitmap(blob, { imageOrientation: "from-image" });
+  const { width, height } = fitWithin(bitmap.width, bitmap.height, PDF_IMAGE_MAX_DIMENSION);
+  const canvas = new OffscreenCanvas(width, height);
+  const context = canvas.getContext("2d");
+  if (!context) {
+    bitmap.close();
+    return blob;
+  }
+  // JPEG has no alpha channel; paint transparent areas white
+  context.fillStyle = "#ffffff";
+  context.fillRect(0, 0, width, height);
+  context.drawImage(bitmap, 0, 0, width, height);
+  bitmap.close();
+  return canvas.convertToBlob({ type: "image/jpeg", quality: PDF_IMAGE_QUALITY });
+}
+
+/** Fetch an image, downsample it and convert to a data URL for PDF embedding */
+async function fetchImageForPdf(url: string): Promise<string | null> {
   try {
     const response = await fetch(url);
     if (!response.ok) return null;
-    const blob = await response.blob();
-    return new Promise((resolve) => {
-      const reader = new FileReader();
-      reader.onloadend = () => resolve(reader.result as string);
-      reader.onerror = () => resolve(null);
-      reader.readAsDataURL(blob);
-    });
+    let blob = await response.blob();
+    if (typeof createImageBitmap === "function" && typeof OffscreenCanvas !== "undefined") {
+      blob = await downsampleToJpeg(blob).catch(() => blob);
+    }
+    return await blobToDataUrl(blob);
   } catch {
     return null;
   }
@@ -94,7 +129,14 @@ function getStatusColor(status: string): [number, number, number] {
   }
 }
 
-export async function generateInspectionPDF(data: InspectionReportData, organizationName?: string): Promise<void> {
+/**
+ * Build the inspection report PDF. Has no DOM dependencies, so it runs in
+ * the PDF worker (see src/lib/pdfExport.ts).
+ */
+export async function buildInspectionPDF(
+  data: InspectionReportData,
+  organizationName?: string
+): Promise<jsPDF> {
   const doc = new jsPDF();
   const pageWidth = doc.internal.pageSize.getWidth();
   const margin = 14;
@@ -368,10 +410,11 @@ export async function generateInspectionPDF(data: InspectionReportData, organiza
   const failedPhotos: { label: string; url: string }[] = [];
   for (const item of failedItems) {
     for (const photo of item.photos) {
-      if (photo.url) {
+      const url = photo.mediumUrl ?? photo.url;
+      if (url) {
         failedPhotos.push({
           label: `${item.category} > ${item.itemName}`,
-          url: photo.url,
+          url,
         });
       }
     }
@@ -380,10 +423,10 @@ export async function generateInspectionPDF(data: InspectionReportData, organiza
   const allPhotos = [
     ...failedPhotos.map((p) => ({ ...p, section: "Failed Items" })),
     ...data.generalPhotos
-      .filter((p) => p.url)
+      .filter((p) => p.mediumUrl ?? p.url)
       .map((p) => ({
         label: p.description || p.fileName,
-        url: p.url!,
+        url: (p.mediumUrl ?? p.url)!,
         section: "General Photos",
       })),
   ];
@@ -403,7 +446,17 @@ export async function generateInspectionPDF(data: InspectionReportData, organiza
     const photoHeight = 60;
     let col = 0;
 
-    for (const photo of allPhotos) {
+    let batch: (string | null)[] = [];
+
+    for (let i = 0; i < allPhotos.length; i++) {
+      const photo = allPhotos[i];
+      // Load a few photos at a time so large inspections never hold every image in memory
+      if (i % PHOTO_BATCH_SIZE === 0) {
+        batch = await Promise.all(
+          allPhotos.slice(i, i + PHOTO_BATCH_SIZE).map((p) => fetchImageForPdf(p.url))
+        );
+      }
+
       if (photo.section !== currentSection) {
         currentSection = photo.section;
         if (col === 1) {
@@ -428,8 +481,8 @@ export async function generateInspectionPDF(data: InspectionReportData, organiza
 
       const xPos = margin + col * (photoWidth + 8);
 
-      // Fetch and embed image
-      const base64 = await fetchImageAsBase64(photo.url);
+      // Embed image
+      const base64 = batch[i % PHOTO_BATCH_SIZE];
       if (base64) {
         try {
           doc.addImage(base64, "JPEG", xPos, yPos, photoWidth, photoHeight);
@@ -504,8 +557,11 @@ export async function generateInspectionPDF(data: InspectionReportData, organiza
     doc.text(`Generated by MySDAManager on ${generatedDate}`, pageWidth - margin, pageHeight - 8, { align: "right" });
   }
 
-  // ── DOWNLOAD ───────────────────────────────────────────
+  return doc;
+}
+
+export function inspectionPdfFileName(data: InspectionReportData): string {
   const propertyAddress = data.property?.addressLine1?.replace(/[^a-zA-Z0-9]/g, "_") || "Unknown";
   const date = data.inspection.completedDate || data.inspection.scheduledDate;
-  doc.save(`Inspection_${propertyAddress}_${date}.pdf`);
+  return `Inspection_${propertyAddress}_${date}.pdf`;
 }
@@ -0,0 +1,41 @@
+import { describe, it, expect } from "vitest";
+import { planEviction, isCurrentEntry, OFFLINE_CACHE_SCHEMA_VERSION } from "./offlineCache";
+
+const entry = (type: string, bytes: number, lastAccessed: number) => ({ type, bytes, lastAccessed });
+
+describe("planEviction", () => {
+  it("evicts nothing while under quota", () => {
+    expect(planEviction([entry("a", 40, 1)], { type: "b", bytes: 50 }, 100)).toEqual([]);
+  });
+
+  it("evicts least recently used entries until the new entry fits", () => {
+    const entries = [entry("recent", 40, 30), entry("oldest", 30, 10), entry("older", 30, 20)];
+    expect(planEviction(entries, { type: "new", bytes: 50 }, 100)).toEqual(["oldest", "older"]);
+  });
+
+  it("doesn't count the entry being replaced", () => {
+    expect(planEviction([entry("a", 90, 1)], { type: "a", bytes: 95 }, 100)).toEqual([]);
+  });
+
+  it("refuses entries larger than the quota", () => {
+    expect(planEviction([], { type: "huge", bytes: 101 }, 100)).toBeNull();
+  });
+});
+
+describe("isCurrentEntry", () => {
+  const meta = {
+    type: "properties",
+    bytes: 10,
+    hash: "abc",
+    schemaVersion: OFFLINE_CACHE_SCHEMA_VERSION,
+    version: 2,
+    lastAccessed: 0,
+    timestamp: 0,
+  };
+
+  it("matches schema and caller versions", () => {
+    expect(isCurrentEntry(meta, 2)).toBe(true);
+    expect(isCurrentEntry(meta, 1)).toBe(false);
+    expect(isCurrentEntry({ ...meta, schemaVersion: 0 }, 2)).toBe(false);
+  });
+});
@@ -0,0 +1,54 @@
+/**
+ * Pure helpers for the offline read cache (cachedData / cacheMeta stores in
+ * src/lib/offlineStorage.ts).
+ */
+
+// Total bytes of cached query results kept on the device
+export const OFFLINE_CACHE_QUOTA_BYTES = 5 * 1024 * 1024;
+
+// Bump when the shape of cached entries changes; older entries are discarded on read
+export const OFFLINE_CACHE_SCHEMA_VERSION = 1;
+
+export interface CacheEntryMeta {
+  type: string;
+  bytes: number;
+  hash: string;
+  schemaVersion: number;
+  version: number; // Caller's data-shape version for this key
+  lastAccessed: number;
+  timestamp: number;
+}
+
+/**
+ * Whether a cached entry was written with the current schema and the
+ * caller's expected data version.
+ */
+export function isCurrentEntry(meta: CacheEntryMeta, version = 0): boolean {
+  return meta.schemaVersion === OFFLINE_CACHE_SCHEMA_VERSION && meta.version === version;
+}
+
+/**
+ * Pick the least recently used entries to drop so `incoming` fits under the
+ * quota. The entry being replaced doesn't count against the total. Returns
+ * null when `incoming` alone is larger than the quota (don't cache it).
+ */
+export function planEviction(
+  entries: Pick<CacheEntryMeta, "type" | "bytes" | "lastAccessed">[],
+  incoming: { type: string; bytes: number },
+  quotaBytes = OFFLINE_CACHE_QUOTA_BYTES
+): string[] | null {
+  if (incoming.bytes > quotaBytes) return null;
+
+  const others = entries
+    .filter((e) => e.type !== incoming.type)
+    .sort((a, b) => a.lastAccessed - b.lastAccessed);
+  let total = others.reduce((sum, e) => sum + e.bytes, incoming.bytes);
+
+  const evict: string[] = [];
+  for (const entry of others) {
+    if (total <= quotaBytes) break;
+    evict.push(entry.type);
+    total -= entry.bytes;
+  }
+  return evict;
+}
@@ -0,0 +1,108 @@
+import { describe, it, expect } from "vitest";
+import { coalesceLatest, chunk, mapWithConcurrency, backoffDelay } from "./offlineSync";
+
+// ---------------------------------------------------------------------------
+// coalesceLatest
+// ---------------------------------------------------------------------------
+describe("coalesceLatest", () => {
+  const change = (id: string, itemId: string, timestamp: number) => ({
+    id,
+    itemId,
+    timestamp,
+  });
+
+  it("keeps only the latest change per target", () => {
+    const { latest, superseded } = coalesceLatest(
+      [
+        change("a", "item1", 1),
+        change("b", "item2", 2),
+        change("c", "item1", 3),
+        change("d", "item1", 4),
+      ],
+      (c) => c.itemId
+    );
+
+    expect(latest.map((c) => c.id)).toEqual(["b", "d"]);
+    expect(superseded.get("d")).toEqual(["a", "c"]);
+    expect(superseded.has("b")).toBe(false);
+  });
+
+  it("orders by timestamp regardless of input order", () => {
+    const { latest } = coalesceLatest(
+      [change("late", "item1", 10), change("early", "item1", 5)],
+      (c) => c.itemId
+    );
+    expect(latest.map((c) => c.id)).toEqual(["late"]);
+  });
+});
+
+// ---------------------------------------------------------------------------
+// chunk
+// ---------------------------------------------------------------------------
+describe("chunk", () => {
+  it("splits into fixed-size chunks with a shorter tail", () => {
+    expect(chunk([1, 2, 3, 4, 5], 2)).toEqual([[1, 2], [3, 4], [5]]);
+  });
+
+  it("returns no chunks for an empty array", () => {
+    expect(chunk([], 3)).toEqual([]);
+  });
+});
+
+// ---------------------------------------------------------------------------
+// mapWithConcurrency
+// ---------------------------------------------------------------------------
+describe("mapWithConcurrency", () => {
+  it("never runs more than the limit at once and keeps order", async () => {
+    let active = 0;
+    let peak = 0;
+    const results = await mapWithConcurrency([1, 2, 3, 4, 5, 6], 2, async (n) => {
+      active++;
+      peak = Math.max(peak, active);
+      await new Promise((resolve) => setTimeout(resolve, 5));
+      active--;
+      return n * 10;
+    });
+
+    expect(peak).toBe(2);
+    expect(results).toEqual([10, 20, 30, 40, 50, 60]);
+  });
+
+  it("captures failures per item without stopping the others", async () => {
+    const results = await mapWithConcurrency([1, 2, 3], 3, async (n) => {
+      if (n === 2) throw new Error("boom");
+      return n;
+    });
+
+    expect(results[0]).toBe(1);
+    expect(results[1]).toBeInstanceOf(Error);
+    expect(results[2]).toBe(3);
+  });
+});
+
+// ---------------------------------------------------------------------------
+// backoffDelay
+// ---------------------------------------------------------------------------
+describe("backoffDelay", () => {
+  const max = () => 1;
+  const min = () => 0;
+
+  it("is zero before any failure", () => {
+    expect(backoffDelay(0, 1000, 60000, max)).toBe(0);
+  });
+
+  it("doubles per consecutive failure", () => {
+    expect(backoffDelay(1, 1000, 60000, max)).toBe(1000);
+    expect(backoffDelay(2, 1000, 60000, max)).toBe(2000);
+    expect(backoffDelay(4, 1000, 60000, max)).toBe(8000);
+  });
+
+  it("caps at the maximum", () => {
+    expect(backoffDelay(20, 1000, 60000, max)).toBe(60000);
+  });
+
+  it("jitters within the upper half of the window", () => {
+    expect(backoffDelay(3, 1000, 60000, min)).toBe(2000);
+    expect(backoffDelay(3, 1000, 60000, () => 0.5)).toBe(3000);
+  });
+});
@@ -0,0 +1,104 @@
+/**
+ * Pure helpers for the offline sync engine (src/lib/offlineSyncEngine.ts).
+ */
+
+export interface TimestampedChange {
+  id: string;
+  timestamp: number;
+}
+
+/**
+ * Collapse a queue of changes to the latest change per target.
+ *
+ * Replaying a full item update overwrites every field of the previous one,
+ * so only the most recent change for each target needs to reach the server.
+ * Returns the surviving changes in timestamp order plus the ids of the
+ * superseded ones (which can be dropped from the local queue once the
+ * survivor has synced).
+ */
+export function coalesceLatest<T extends TimestampedChange>(
+  changes: T[],
+  targetOf: (change: T) => string
+): { latest: T[]; superseded: Map<string, string[]> } {
+  const sorted = [...changes].sort((a, b) => a.timestamp - b.timestamp);
+  const byTarget = new Map<string, T>();
+  const dropped = new Map<string, string[]>();
+
+  for (const change of sorted) {
+    const target = targetOf(change);
+    const previous = byTarget.get(target);
+    if (previous) {
+      dropped.set(target, [...(dropped.get(target) ?? []), previous.id]);
+    }
+    byTarget.set(target, change);
+  }
+
+  const latest = Array.from(byTarget.values()).sort((a, b) => a.timestamp - b.timestamp);
+  const superseded = new Map<string, string[]>();
+  for (const [target, ids] of dropped) {
+    superseded.set(byTarget.get(target)!.id, ids);
+  }
+  return { latest, superseded };
+}
+
+/**
+ * Split an array into chunks of at most `size` elements.
+ */
+export function chunk<T>(items: T[], size: number): T[][] {
+  if (size <= 0) throw new Error("Chunk size must be positive");
+  const chunks: T[][] = [];
+  for (let i = 0; i < items.length; i += size) {
+    chunks.push(items.slice(i, i + size));
+  }
+  return chunks;
+}
+
+/**
+ * Map over items with at most `limit` calls in flight at once.
+ * Results keep input order; a rejected call yields an Error in its slot
+ * instead of aborting the rest.
+ */
+export async function mapWithConcurrency<T, R>(
+  items: T[],
+  limit: number,
+  fn: (item: T, index: number) => Promise<R>
+): Promise<Array<R | Error>> {
+  const results: Array<R | Error> = new Array(items.length);
+  let next = 0;
+
+  const worker = async () => {
+    while (next < items.length) {
+      const index = next++;
+      try {
+        results[index] = await fn(items[index], index);
+      } catch (err) {
+        results[index] = err instanceof Error ? err : new Error(String(err));
+      }
+    }
+  };
+
+  await Promise.all(
+    Array.from({ length: Math.min(Math.max(limit, 1), items.length) }, worker)
+  );
+  return results;
+}
+
+// Background replay backoff after a run that left entries unsynced
+export const REPLAY_BACKOFF_BASE_MS = 30 * 1000;
+export const REPLAY_BACKOFF_MAX_MS = 60 * 60 * 1000;
+
+/**
+ * Delay before the next background replay after `failures` consecutive
+ * failed runs: doubles from `baseMs` up to `maxMs`, with jitter over the
+ * upper half so devices that reconnect together don't retry in lockstep.
+ */
+export function backoffDelay(
+  failures: number,
+  baseMs = REPLAY_BACKOFF_BASE_MS,
+  maxMs = REPLAY_BACKOFF_MAX_MS,
+  random: () => number = Math.random
+): number {
+  if (failures <= 0) return 0;
+  const capped = Math.min(maxMs, baseMs * 2 ** (failures - 1));
+  return Math.round(capped / 2 + (capped / 2) * random());
+}
@@ -0,0 +1,106 @@
+import jsPDF from "jspdf";
+import autoTable from "jspdf-autotable";
+
+export interface OwnerStatementParticipant {
+  participantName: string;
+  monthlySda: number;
+  monthlyRrc: number;
+  totalRevenue: number;
+  managementFeePercent: number;
+  managementFee: number;
+  netToOwner: number;
+}
+
+export interface OwnerStatementProperty {
+  propertyName?: string;
+  address: string;
+  owner: {
+    name: string;
+    bankAccountName?: string;
+    bankBsb?: string;
+    bankAccountNumber?: string;
+  } | null;
+  dwellings: {
+    dwellingName: string;
+    participants: (OwnerStatementParticipant | null)[];
+  }[];
+  totalMonthlyRevenue: number;
+  totalMonthlyNetToOwner: number;
+}
+
+/**
+ * Owner statement / folio summary: one page per property.
+ */
+export function buildOwnerStatementPdf(
+  properties: OwnerStatementProperty[],
+  startDate: string,
+  endDate: string
+): jsPDF {
+  const doc = new jsPDF();
+  let yPos = 20;
+
+  properties.forEach((property, idx) => {
+    if (idx > 0) {
+      doc.addPage();
+      yPos = 20;
+    }
+
+    doc.setFontSize(18);
+    doc.text("Owner Statement / Folio Summary", 14, yPos);
+    yPos += 10;
+
+    doc.setFontSize(12);
+    doc.text(`Property: ${property.propertyName}`, 14, yPos);
+    yPos += 6;
+    doc.text(`Address: ${property.address}`, 14, yPos);
+    yPos += 6;
+    doc.text(`Period: ${startDate} to ${endDate}`, 14, yPos);
+    yPos += 10;
+
+    if (property.owner) {
+      doc.text(`Owner: ${property.owner.name}`, 14, yPos);
+      yPos += 6;
+      if (property.owner.bankAccountName) {
+        doc.text(`Bank: ${property.owner.bankAccountName}`, 14, yPos);
+        yPos += 6;
+        doc.text(`BSB: ${property.owner.bankBsb} | Account: ${property.owner.bankAccountNumber}`, 14, yPos);
+        yPos += 10;
+      }
+    }
+
+    const tableData: string[][] = [];
+    property.dwellings.forEach((dwelling) => {
+      dwelling.participants.forEach((p) => {
+        if (p) {
+          tableData.push([
+            dwelling.dwellingName,
+            p.participantName,
+            `$${p.monthlySda.toLocaleString()}`,
+            `$${p.monthlyRrc.toLocaleString()}`,
+            `$${p.totalRevenue.toLocaleString()}`,
+            `${p.managementFeePercent}%`,
+            `$${p.managementFee.toLocaleString()}`,
+            `$${p.netToOwner.toLocaleString()}`,
+          ]);
+        }
+      });
+    });
+
+    autoTable(doc, {
+      startY: yPos,
+      head: [["Dwelling", "Participant", "SDA", "RRC", "Total", "Fee %", "Fee $", "Net"]],
+      body: tableData,
+      theme: "grid",
+      styles: { fontSize: 8 },
+    });
+
+    yPos = (doc as any).lastAutoTable.finalY + 10;
+
+    doc.setFontSize(12);
+    doc.text(`Total Monthly Revenue: $${property.totalMonthlyRevenue.toLocaleString()}`, 14, yPos);
+    yPos += 6;
+    doc.text(`Total Net to Owner: $${property.totalMonthlyNetToOwner.toLocaleString()}`, 14, yPos);
+  });
+
+  return doc;
+}
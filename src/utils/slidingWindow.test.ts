@@ -0,0 +1,57 @@
+import { describe, it, expect } from "vitest";
+import {
+  windowStartFor,
+  slidingWindowEstimate,
+  msUntilAllowed,
+} from "./slidingWindow";
+
+const MINUTE = 60_000;
+
+// ---------------------------------------------------------------------------
+// windowStartFor
+// ---------------------------------------------------------------------------
+describe("windowStartFor", () => {
+  it("floors to the start of the fixed window", () => {
+    expect(windowStartFor(125_000, MINUTE)).toBe(120_000);
+  });
+
+  it("returns the same value on a window boundary", () => {
+    expect(windowStartFor(180_000, MINUTE)).toBe(180_000);
+  });
+});
+
+// ---------------------------------------------------------------------------
+// slidingWindowEstimate
+// ---------------------------------------------------------------------------
+describe("slidingWindowEstimate", () => {
+  it("counts the whole previous window at the start of a window", () => {
+    expect(slidingWindowEstimate(100, 0, 120_000, 120_000, MINUTE)).toBe(100);
+  });
+
+  it("weights the previous window by its remaining overlap", () => {
+    expect(slidingWindowEstimate(100, 10, 150_000, 120_000, MINUTE)).toBe(60);
+  });
+
+  it("ignores the previous window at the end of a window", () => {
+    expect(slidingWindowEstimate(100, 10, 180_000, 120_000, MINUTE)).toBe(10);
+  });
+});
+
+// ---------------------------------------------------------------------------
+// msUntilAllowed
+// ---------------------------------------------------------------------------
+describe("msUntilAllowed", () => {
+  it("returns 0 when there is budget left", () => {
+    expect(msUntilAllowed(0, 5, 100, 130_000, 120_000, MINUTE)).toBe(0);
+  });
+
+  it("waits for the previous window to slide out", () => {
+    // 100 prev, 50 current, limit 100: need prev weight <= 49 → 51% elapsed
+    expect(msUntilAllowed(100, 50, 100, 120_000, 120_000, MINUTE)).toBe(30_600);
+  });
+
+  it("waits into the next window when the current window is full", () => {
+    // 100 current, limit 100: next window needs weight <= 99 → 1% elapsed
+    expect(msUntilAllowed(0, 100, 100, 150_000, 120_000, MINUTE)).toBe(30_600);
+  });
+});
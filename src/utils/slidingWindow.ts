@@ -0,0 +1,48 @@
+/**
+ * Sliding-window rate limit math.
+ * Approximates a true sliding window from two fixed-window counters: the
+ * previous window's count is weighted by how much of it still overlaps the
+ * sliding window ending now.
+ */
+
+// Start of the fixed window containing `now`
+export function windowStartFor(now: number, windowMs: number): number {
+  return Math.floor(now / windowMs) * windowMs;
+}
+
+// Estimated number of hits in the sliding window ending at `now`
+export function slidingWindowEstimate(
+  previous: number,
+  current: number,
+  now: number,
+  windowStart: number,
+  windowMs: number
+): number {
+  const elapsed = Math.min(Math.max((now - windowStart) / windowMs, 0), 1);
+  return previous * (1 - elapsed) + current;
+}
+
+// Milliseconds until one more hit would fit under `maxRequests`, assuming no further hits
+export function msUntilAllowed(
+  previous: number,
+  current: number,
+  maxRequests: number,
+  now: number,
+  windowStart: number,
+  windowMs: number
+): number {
+  const budget = maxRequests - 1;
+  let allowedAt: number;
+
+  if (current <= budget) {
+    // Wait for enough of the previous window to slide out
+    const fraction = previous > 0 ? 1 - (budget - current) / previous : 0;
+    allowedAt = windowStart + Math.max(fraction, 0) * windowMs;
+  } else {
+    // The current window alone is over budget: wait into the next window
+    const fraction = 1 - budget / current;
+    allowedAt = windowStart + windowMs + fraction * windowMs;
+  }
+
+  return Math.max(0, Math.ceil(allowedAt - now));
+}
@@ -0,0 +1,57 @@
+/**
+ * Image compression worker
+ *
+ * Decodes a photo, resizes it to fit the target dimension and re-encodes it
+ * off the main thread, so large camera captures do not freeze the UI.
+ * Re-encoding through a canvas drops all metadata, including EXIF GPS
+ * location; orientation is applied to the pixels before it is lost.
+ */
+
+import { fitWithin, type ImageCompressionOptions } from "../utils/imageCompression";
+
+export interface CompressRequest {
+  id: number;
+  blob: Blob;
+  options: ImageCompressionOptions;
+}
+
+export type CompressResponse =
+  | { id: number; ok: true; blob: Blob; width: number; height: number }
+  | { id: number; ok: false; error: string };
+
+const scope = self as unknown as {
+  onmessage: ((event: MessageEvent<CompressRequest>) => void) | null;
+  postMessage: (message: CompressResponse) => void;
+};
+
+async function encode(canvas: OffscreenCanvas, options: ImageCompressionOptions): Promise<Blob> {
+  const blob = await canvas.convertToBlob({ type: options.mimeType, quality: options.quality });
+  // Browsers without a WebP encoder silently return PNG; use JPEG instead
+  if (blob.type !== options.mimeType && options.mimeType !== "image/jpeg") {
+    return canvas.convertToBlob({ type: "image/jpeg", quality: options.quality });
+  }
+  return blob;
+}
+
+scope.onmessage = async (event) => {
+  const { id, blob, options } = event.data;
+  try {
+    const bitmap = await createImageBitmap(blob, { imageOrientation: "from-image" });
+    const { width, height } = fitWithin(bitmap.width, bitmap.height, options.maxDimension);
+
+    const canvas = new OffscreenCanvas(width, height);
+    const context = canvas.getContext("2d");
+    if (!context) throw new Error("2D canvas context unavailable");
+    context.drawImage(bitmap, 0, 0, width, height);
+    bitmap.close();
+
+    const output = await encode(canvas, options);
+    scope.postMessage({ id, ok: true, blob: output, width, height });
+  } catch (err) {
+    scope.postMessage({
+      id,
+      ok: false,
+      error: err instanceof Error ? err.message : "Image compression failed",
+    });
+  }
+};
@@ -0,0 +1,38 @@
+/**
+ * PDF generation worker
+ *
+ * Builds report PDFs (thread exports, inspection reports, complaints
+ * register, audit pack, owner statements) off the main thread, so long
+ * threads and photo-heavy inspections do not freeze the UI. Photos are
+ * fetched in small batches and downsampled here before embedding.
+ */
+
+import { buildPdf, type PdfJob } from "../lib/pdfJobs";
+
+export interface PdfRequest {
+  id: number;
+  job: PdfJob;
+}
+
+export type PdfResponse =
+  | { id: number; ok: true; buffer: ArrayBuffer }
+  | { id: number; ok: false; error: string; timedOut?: boolean };
+
+const scope = self as unknown as {
+  onmessage: ((event: MessageEvent<PdfRequest>) => void) | null;
+  postMessage: (message: PdfResponse, transfer?: Transferable[]) => void;
+};
+
+scope.onmessage = async (event) => {
+  const { id, job } = event.data;
+  try {
+    const buffer = await buildPdf(job);
+    scope.postMessage({ id, ok: true, buffer }, [buffer]);
+  } catch (err) {
+    scope.postMessage({
+      id,
+      ok: false,
+      error: err instanceof Error ? err.message : "PDF generation failed",
+    });
+  }
+};
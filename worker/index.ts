@@ -1,9 +1,24 @@
 /// <reference lib="webworker" />
 
-export {};
+import { ConvexHttpClient } from "convex/browser";
+import { replayOfflineQueues, type SyncResult } from "../src/lib/offlineSyncEngine";
+import { getReplayState, saveReplayState } from "../src/lib/offlineStorage";
+import {
+  REPLAY_MESSAGE,
+  REPLAY_PERIODIC_TAG,
+  REPLAY_REQUEST,
+  REPLAY_SYNC_TAG,
+  type ReplayMessage,
+} from "../src/lib/backgroundSync";
+import { backoffDelay } from "../src/utils/offlineSync";
 
 const sw = self as unknown as ServiceWorkerGlobalScope;
 
+// Background Sync and Periodic Background Sync events are not in the worker typings yet
+interface SyncEvent extends ExtendableEvent {
+  readonly tag: string;
+}
+
 // Push notification event handler
 sw.addEventListener("push", (event: PushEvent) => {
   if (!event.data) return;
@@ -58,3 +73,82 @@ sw.addEventListener("notificationclick", (event: NotificationEvent) => {
     })
   );
 });
+
+// ---------------------------------------------------------------------------
+// Offline replay
+// ---------------------------------------------------------------------------
+
+async function notifyClients(message: ReplayMessage): Promise<void> {
+  const clientList = await sw.clients.matchAll({ type: "window", includeUncontrolled: true });
+  for (const client of clientList) {
+    client.postMessage(message);
+  }
+}
+
+/**
+ * Replay every offline queue against Convex. Unless `force` is set, runs are
+ * skipped while backing off after failed runs. Resolves with the run's result,
+ * or null when nothing ran.
+ */
+async function replayQueues(force: boolean): Promise<SyncResult | null> {
+  const state = await getReplayState();
+  // No page has recorded the Convex URL yet, so there is nothing to replay
+  if (!state.convexUrl) return null;
+  if (!force && Date.now() < state.nextAttemptAt) return null;
+
+  await notifyClients({ type: REPLAY_MESSAGE, phase: "start" });
+
+  let result: SyncResult = { synced: 0, failed: 0 };
+  let error: string | undefined;
+  try {
+    result = await replayOfflineQueues(new ConvexHttpClient(state.convexUrl), (progress) =>
+      notifyClients({ type: REPLAY_MESSAGE, phase: "progress", ...progress })
+    );
+  } catch (err) {
+    error = err instanceof Error ? err.message : "Replay failed";
+  }
+
+  const failed = error !== undefined || result.failed > 0;
+  const failures = failed ? state.failures + 1 : 0;
+  const now = Date.now();
+  const { nextAttemptAt } = await saveReplayState({
+    failures,
+    nextAttemptAt: now + backoffDelay(failures),
+    lastRunAt: now,
+  });
+
+  await notifyClients({
+    type: REPLAY_MESSAGE,
+    phase: "done",
+    synced: result.synced,
+    failed: result.failed,
+    nextAttemptAt,
+    error,
+  });
+
+  if (failed) {
+    throw new Error(error ?? `${result.failed} offline change(s) failed to sync`);
+  }
+  return result;
+}
+
+// Fires when connectivity returns (even with no page open). A rejected run is
+// retried by the browser on its own backoff schedule.
+sw.addEventListener("sync", (event) => {
+  const syncEvent = event as SyncEvent;
+  if (syncEvent.tag !== REPLAY_SYNC_TAG) return;
+  syncEvent.waitUntil(replayQueues(true));
+});
+
+// Periodic retry for entries that failed, honouring our own backoff
+sw.addEventListener("periodicsync", (event) => {
+  const syncEvent = event as SyncEvent;
+  if (syncEvent.tag !== REPLAY_PERIODIC_TAG) return;
+  syncEvent.waitUntil(replayQueues(false).catch(() => {}));
+});
+
+// Replay requested by an open page (back online, or Capacitor resume/pause)
+sw.addEventListener("message", (event: ExtendableMessageEvent) => {
+  if (event.data?.type !== REPLAY_REQUEST) return;
+  event.waitUntil(replayQueues(Boolean(event.data.force)).catch(() => {}));
+});